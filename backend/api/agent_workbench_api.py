@@ -284,30 +284,7 @@ def get_workbench_stats():
     try:
         user_id = request.args.get('user_id')
         
-        # Calculate stats
-        total_templates = len(agent_workbench.get_agent_templates())
-        total_agents = len(agent_workbench.active_agents)
-        
-        user_agents = []
-        if user_id:
-            user_agents = agent_workbench.get_user_agents(user_id)
-        
-        active_count = sum(1 for agent in agent_workbench.active_agents.values() 
-                          if agent.status == 'active')
-        
-        stats = {
-            'total_templates': total_templates,
-            'total_agents': total_agents,
-            'active_agents': active_count,
-            'user_agents': len(user_agents) if user_id else 0,
-            'template_types': {
-                'research': len([t for t in agent_workbench.get_agent_templates() if t['type'] == 'research']),
-                'ui_design': len([t for t in agent_workbench.get_agent_templates() if t['type'] == 'ui_design']),
-                'api': len([t for t in agent_workbench.get_agent_templates() if t['type'] == 'api']),
-                'security': len([t for t in agent_workbench.get_agent_templates() if t['type'] == 'security']),
-                'custom': len([t for t in agent_workbench.get_agent_templates() if t['type'] == 'custom'])
-            }
-        }
+        stats = agent_workbench.get_workbench_stats(user_id)
         
         return jsonify({
             'success': True,
@@ -332,30 +309,12 @@ def search_agents():
         agent_type = request.args.get('type')
         user_id = request.args.get('user_id')
         
-        # Search templates
-        templates = agent_workbench.get_agent_templates(agent_type)
-        filtered_templates = []
-        
-        for template in templates:
-            if not query or query.lower() in template['name'].lower() or query.lower() in template['description'].lower():
-                filtered_templates.append(template)
-        
-        # Search user agents if user_id provided
-        user_agents = []
-        if user_id:
-            user_agents = agent_workbench.get_user_agents(user_id)
-            filtered_agents = []
-            
-            for agent in user_agents:
-                if not query or query.lower() in agent['name'].lower():
-                    filtered_agents.append(agent)
-            
-            user_agents = filtered_agents
+        results = agent_workbench.search(query, template_type=agent_type, user_id=user_id)
         
         return jsonify({
             'success': True,
-            'templates': filtered_templates,
-            'agents': user_agents,
+            'templates': results['templates'],
+            'agents': results['agents'],
             'query': query,
             'timestamp': datetime.now().isoformat()
         })
@@ -0,0 +1,91 @@
+# Debug API - Request traces with per-stage timing, request coalescing and concurrency limits
+
+from flask import Blueprint, request, jsonify
+import logging
+from datetime import datetime
+
+from services.tracing import get_tracer
+from services.single_flight import get_single_flight_stats as single_flight_stats
+from services.adaptive_concurrency import get_limiter_stats
+from services.loop_monitor import get_loop_lag_stats
+
+# Create blueprint for debug API
+debug_bp = Blueprint('debug', __name__, url_prefix='/api/debug')
+
+logger = logging.getLogger(__name__)
+
+@debug_bp.route('/traces', methods=['GET'])
+def get_slowest_traces():
+    """
+    🔭 Slowest recent requests, broken down by stage
+    Query params: limit (default 20), name (root span name, e.g. orchestra.process_request)
+    """
+    try:
+        tracer = get_tracer()
+        limit = min(max(request.args.get('limit', 20, type=int), 1), tracer.buffer_size)
+        name = request.args.get('name')
+
+        return jsonify({
+            'success': True,
+            'traces': tracer.slowest(limit=limit, name=name),
+            'stage_summary': tracer.stage_summary(),
+            'tracer': tracer.get_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Error listing traces: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@debug_bp.route('/traces/<trace_id>', methods=['GET'])
+def get_trace(trace_id):
+    """
+    🔍 Every span of one trace, looked up by trace id or request id
+    """
+    trace = get_tracer().get_trace(trace_id)
+    if trace is None:
+        return jsonify({
+            'success': False,
+            'error': f'Trace {trace_id} not found in the recent buffer'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'trace': trace
+    })
+
+@debug_bp.route('/single-flight', methods=['GET'])
+def get_single_flight_stats():
+    """
+    🛬 Request coalescing per single-flight group: requests, shared calls and coalescing ratio
+    """
+    return jsonify({
+        'success': True,
+        'groups': single_flight_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@debug_bp.route('/concurrency', methods=['GET'])
+def get_concurrency_stats():
+    """
+    🚦 Adaptive concurrency limit, in-flight calls, queue and shed counts per provider/model/account
+    """
+    return jsonify({
+        'success': True,
+        'limiters': get_limiter_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
+
+@debug_bp.route('/event-loops', methods=['GET'])
+def get_event_loop_stats():
+    """
+    ⏱️ Stall counts, worst lag and last blocking stack for every long-lived event loop
+    """
+    return jsonify({
+        'success': True,
+        'loops': get_loop_lag_stats(),
+        'timestamp': datetime.now().isoformat()
+    })
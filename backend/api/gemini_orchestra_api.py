@@ -383,7 +383,7 @@ def get_model_registry():
     """Get the complete model registry with capabilities"""
     
     try:
-        from ..services.orchestration.model_registry import GEMINI_REGISTRY, export_registry_json
+        from ..services.orchestration.model_registry import get_registry, export_registry_json
         
         registry_json = export_registry_json()
         
@@ -391,7 +391,7 @@ def get_model_registry():
             "success": True,
             "data": {
                 "registry": registry_json,
-                "total_models": len(GEMINI_REGISTRY),
+                "total_models": len(get_registry()),
                 "model_sections": {
                     "conductors": 1,
                     "deep_thinkers": 2,
@@ -0,0 +1,148 @@
+# Jobs API - Background job status, cancellation and retries
+
+from flask import Blueprint, request, jsonify
+from flask_socketio import emit, join_room, leave_room
+import logging
+from datetime import datetime
+
+from services.job_runner import get_job_runner
+
+# Create blueprint for jobs API
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+logger = logging.getLogger(__name__)
+
+@jobs_bp.route('', methods=['GET'])
+def list_jobs():
+    """
+    🧵 Recent background jobs, newest first
+    Query params: kind (scout_workflow, research), status, limit (default 50)
+    """
+    try:
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 500)
+        jobs = get_job_runner().list(
+            kind=request.args.get('kind'),
+            status=request.args.get('status'),
+            limit=limit
+        )
+        for job in jobs:
+            job.pop('result', None)
+
+        return jsonify({
+            'success': True,
+            'jobs': jobs,
+            'count': len(jobs),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Error listing jobs: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@jobs_bp.route('/stats', methods=['GET'])
+def get_job_stats():
+    """
+    📊 Worker pool utilization, queue depth and job counts by status
+    """
+    try:
+        return jsonify({
+            'success': True,
+            'stats': get_job_runner().get_stats(),
+            'timestamp': datetime.now().isoformat()
+        })
+
+    except Exception as e:
+        logger.error(f"Error getting job stats: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """
+    🔍 One job including its payload and result
+    """
+    job = get_job_runner().get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': f'Job {job_id} not found'
+        }), 404
+
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+@jobs_bp.route('/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """
+    🛑 Cancel a queued or running job
+    """
+    runner = get_job_runner()
+    if not runner.cancel(job_id):
+        job = runner.get(job_id)
+        return jsonify({
+            'success': False,
+            'error': f'Job {job_id} not found' if job is None else f"Job {job_id} is already {job['status']}"
+        }), 404 if job is None else 409
+
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'message': 'Cancellation requested'
+    })
+
+@jobs_bp.route('/<job_id>/retry', methods=['POST'])
+def retry_job(job_id):
+    """
+    🔁 Re-run a failed or cancelled job
+    """
+    runner = get_job_runner()
+    job = runner.retry(job_id)
+    if job is None:
+        existing = runner.get(job_id)
+        if existing is None:
+            return jsonify({
+                'success': False,
+                'error': f'Job {job_id} not found'
+            }), 404
+        return jsonify({
+            'success': False,
+            'error': f"Job {job_id} is {existing['status']}; only failed or cancelled jobs can be retried"
+        }), 409
+
+    return jsonify({
+        'success': True,
+        'job': job
+    })
+
+def setup_job_websockets(socketio):
+    """
+    🔌 Progress streaming: clients subscribe to a job and receive
+    job_status / job_progress events in room job_<id>
+    """
+    get_job_runner().attach_socketio(socketio)
+
+    @socketio.on('subscribe_job')
+    def on_subscribe_job(data):
+        job_id = (data or {}).get('job_id')
+        if not job_id:
+            emit('job_error', {'error': 'job_id is required'})
+            return
+        join_room(f'job_{job_id}')
+        job = get_job_runner().get(job_id)
+        if job:
+            job.pop('payload', None)
+            job.pop('result', None)
+        emit('job_subscribed', {'job_id': job_id, 'job': job})
+
+    @socketio.on('unsubscribe_job')
+    def on_unsubscribe_job(data):
+        job_id = (data or {}).get('job_id')
+        if job_id:
+            leave_room(f'job_{job_id}')
@@ -12,6 +12,8 @@ from datetime import datetime
 from typing import Dict, Any
 import uuid
 
+from services.job_runner import get_job_runner, JobContext, JobQueueFullError, JobExistsError
+
 logger = logging.getLogger(__name__)
 
 try:
@@ -36,6 +38,22 @@ library_bp = Blueprint('library', __name__, url_prefix='/api/library')
 # Global library instance
 library_section = None
 
+RESEARCH_JOB_KIND = 'research'
+
+async def run_research_job(ctx: JobContext) -> Dict[str, Any]:
+    """Job handler: run one research session under the job's id"""
+    if not library_section:
+        raise RuntimeError("Library section not initialized")
+    
+    payload = ctx.payload
+    ctx.report_progress(0.05, f"Researching in {payload['mode']} mode")
+    session = await library_section.conduct_research(
+        payload['query'], payload['mode'], payload['depth'], ctx.id
+    )
+    if session.get('status') == 'failed':
+        raise RuntimeError(session.get('error', 'Research session failed'))
+    return session
+
 def init_library_section(app):
     """Initialize the Library section with API keys"""
     global library_section
@@ -136,43 +154,29 @@ def start_research():
         logger.info(f"Query: {query}")
         logger.info(f"Mode: {mode}, Depth: {depth}")
         
-        # Start research in background
-        def run_research():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(
-                    library_section.conduct_research(query, mode, depth, session_id)
-                )
-                return result
-            finally:
-                loop.close()
-        
-        # For now, run synchronously (can be made async later)
+        # Queue the session on the background job runner; the job id is the session id,
+        # and submit() refuses a duplicate atomically
         try:
-            import threading
-            
-            # Start research in a separate thread
-            research_thread = threading.Thread(target=run_research)
-            research_thread.daemon = True
-            research_thread.start()
-            
-            # Return immediate response with session info
-            return jsonify({
-                "status": "started",
-                "session_id": session_id,
+            get_job_runner().submit(RESEARCH_JOB_KIND, {
                 "query": query,
                 "mode": mode,
-                "depth": depth,
-                "estimated_duration": library_section.research_center._get_estimated_duration(ResearchDepth(depth)),
-                "message": "Research session started. Use /status/{session_id} to check progress."
-            })
-            
-        except Exception as e:
-            logger.error(f"Failed to start research thread: {e}")
-            # Fallback to synchronous execution
-            result = run_research()
-            return jsonify(result)
+                "depth": depth
+            }, job_id=session_id)
+        except JobExistsError:
+            return jsonify({"error": f"Session {session_id} already exists"}), 409
+        except JobQueueFullError as e:
+            return jsonify({"error": str(e)}), 429
+        
+        return jsonify({
+            "status": "queued",
+            "session_id": session_id,
+            "job_id": session_id,
+            "query": query,
+            "mode": mode,
+            "depth": depth,
+            "estimated_duration": library_section.research_center._get_estimated_duration(ResearchDepth(depth)),
+            "message": "Research session queued. Use /status/{session_id} to check progress."
+        })
         
     except Exception as e:
         logger.error(f"Error starting research: {e}")
@@ -186,9 +190,23 @@ def get_research_status(session_id):
     
     try:
         session = library_section.get_session_status(session_id)
-        if not session:
+        job = get_job_runner().get(session_id)
+        if not session and not job:
             return jsonify({"error": "Session not found"}), 404
         
+        if not session:
+            # Still queued, or finished before a restart cleared the in-memory sessions
+            session = job['result'] or {
+                "id": session_id,
+                "query": job['payload'].get('query'),
+                "mode": job['payload'].get('mode'),
+                "depth": job['payload'].get('depth'),
+                "status": job['status'],
+                "error": job['error']
+            }
+        if job:
+            session = {**session, "job": {k: v for k, v in job.items() if k not in ('payload', 'result')}}
+        
         return jsonify(session)
         
     except Exception as e:
@@ -219,7 +237,9 @@ def cancel_research(session_id):
         return jsonify({"error": "Library section not initialized"}), 503
     
     try:
-        success = library_section.research_center.cancel_session(session_id)
+        job_cancelled = get_job_runner().cancel(session_id)
+        session_cancelled = library_section.research_center.cancel_session(session_id)
+        success = job_cancelled or session_cancelled
         if success:
             return jsonify({
                 "status": "cancelled",
@@ -308,6 +328,7 @@ def integrate_library_api(app):
         # Initialize the library section
         if init_library_section(app):
             app.register_blueprint(library_bp)
+            get_job_runner().register(RESEARCH_JOB_KIND, run_research_job)
             logger.info("🏛️ Library API integrated successfully!")
             return True
         else:
@@ -0,0 +1,24 @@
+# Metrics API - Prometheus scrape endpoint
+
+from flask import Blueprint, Response
+import logging
+
+from services.metrics_registry import get_metrics_registry
+
+# Create blueprint for metrics (served at the root, where Prometheus expects it)
+metrics_bp = Blueprint('metrics', __name__)
+
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+@metrics_bp.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """
+    📈 Every registered counter, gauge and histogram in Prometheus text format
+    """
+    try:
+        return Response(get_metrics_registry().render(), content_type=PROMETHEUS_CONTENT_TYPE)
+    except Exception as e:
+        logger.error(f"Error rendering metrics: {e}")
+        return Response(f"# metrics unavailable: {e}\n", status=500, content_type=PROMETHEUS_CONTENT_TYPE)
@@ -3,13 +3,13 @@ Multi-Modal Chat API endpoints
 Flask Blueprint for handling chat requests
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from flask_cors import cross_origin
+import time
 import asyncio
 import json
 import logging
 from datetime import datetime
-from backend.services.multi_modal_chat_service import chat_service
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +18,12 @@ logger = logging.getLogger(__name__)
 # Create Blueprint
 multi_modal_chat_bp = Blueprint('multi_modal_chat', __name__, url_prefix='/api/chat')
 
+
+def _chat_service():
+    """The chat service, imported on first use so the routes can be listed without loading the providers"""
+    from backend.services.multi_modal_chat_service import chat_service
+    return chat_service
+
 @multi_modal_chat_bp.route('/health', methods=['GET'])
 @cross_origin()
 def health_check():
@@ -26,7 +32,7 @@ def health_check():
         "status": "healthy",
         "service": "multi-modal-chat",
         "timestamp": datetime.now().isoformat(),
-        "friends_loaded": len(chat_service.get_ai_friends())
+        "friends_loaded": len(_chat_service().get_ai_friends())
     })
 
 @multi_modal_chat_bp.route('/friends', methods=['GET'])
@@ -34,7 +40,7 @@ def health_check():
 def get_ai_friends():
     """Get all AI friends"""
     try:
-        friends = chat_service.get_ai_friends()
+        friends = _chat_service().get_ai_friends()
         return jsonify({
             "success": True,
             "friends": friends,
@@ -59,7 +65,7 @@ def update_ai_friend(friend_id):
                 "error": "No update data provided"
             }), 400
         
-        success = chat_service.update_ai_friend(friend_id, updates)
+        success = _chat_service().update_ai_friend(friend_id, updates)
         if success:
             return jsonify({
                 "success": True,
@@ -102,7 +108,7 @@ def send_message():
         asyncio.set_event_loop(loop)
         try:
             ai_response = loop.run_until_complete(
-                chat_service.send_message(friend_id, message, files, message_type)
+                _chat_service().send_message(friend_id, message, files, message_type)
             )
         finally:
             loop.close()
@@ -140,20 +146,149 @@ def send_message():
             "error": str(e)
         }), 500
 
+def _summarize_fanout(results, requested, elapsed_ms):
+    """Per-provider latency and completion summary for a group send"""
+    providers = {}
+    for result in results:
+        entry = providers.setdefault(result["provider"], {"responses": 0, "errors": 0, "latenciesMs": []})
+        entry["responses"] += 1
+        if not result["success"]:
+            entry["errors"] += 1
+        entry["latenciesMs"].append(result["latencyMs"])
+    for entry in providers.values():
+        latencies = entry.pop("latenciesMs")
+        entry["avgLatencyMs"] = round(sum(latencies) / len(latencies), 1)
+        entry["maxLatencyMs"] = max(latencies)
+    
+    return {
+        "requested": requested,
+        "answered": len(results),
+        "succeeded": sum(1 for r in results if r["success"]),
+        "cancelled": requested - len(results),
+        "elapsedMs": round(elapsed_ms, 1),
+        "providerLatency": providers
+    }
+
+@multi_modal_chat_bp.route('/group/send', methods=['POST'])
+@cross_origin()
+def send_group_message():
+    """
+    Send one message to several AI friends at once.
+    
+    Body: friendIds, message, optional files/type, firstK (stop after k
+    successful answers) and stream (default true: server-sent events, one
+    per friend as it answers, then a final summary event).
+    """
+    try:
+        data = request.get_json()
+        
+        if not data or not data.get('friendIds') or 'message' not in data:
+            return jsonify({
+                "success": False,
+                "error": "friendIds and message are required"
+            }), 400
+        
+        friend_ids = list(dict.fromkeys(data['friendIds']))
+        unknown = [f for f in friend_ids if f not in _chat_service().ai_friends]
+        if unknown:
+            return jsonify({
+                "success": False,
+                "error": f"AI friend(s) not found: {', '.join(unknown)}"
+            }), 404
+        
+        message = data['message']
+        files = data.get('files', [])
+        message_type = data.get('type', 'text')
+        first_k = data.get('firstK')
+        if first_k is not None:
+            try:
+                first_k = None if isinstance(first_k, bool) else int(first_k)
+            except (TypeError, ValueError):
+                first_k = None
+            if first_k is None or first_k < 1:
+                return jsonify({
+                    "success": False,
+                    "error": "firstK must be a positive integer"
+                }), 400
+        stream = data.get('stream', True)
+        
+        def run_fanout():
+            """Drive the async fan-out from this (sync) request thread"""
+            loop = asyncio.new_event_loop()
+            fanout = _chat_service().fan_out_message(friend_ids, message, files, message_type, first_k)
+            try:
+                while True:
+                    try:
+                        yield loop.run_until_complete(fanout.__anext__())
+                    except StopAsyncIteration:
+                        break
+            finally:
+                loop.run_until_complete(fanout.aclose())
+                loop.close()
+        
+        start = time.perf_counter()
+        
+        if not stream:
+            results = list(run_fanout())
+            return jsonify({
+                "success": True,
+                "results": results,
+                "summary": _summarize_fanout(results, len(friend_ids), (time.perf_counter() - start) * 1000)
+            })
+        
+        def generate_events():
+            results = []
+            try:
+                for result in run_fanout():
+                    results.append(result)
+                    yield f"data: {json.dumps(result)}\n\n"
+                summary = _summarize_fanout(results, len(friend_ids), (time.perf_counter() - start) * 1000)
+                yield f"data: {json.dumps({'done': True, 'summary': summary})}\n\n"
+            except Exception as e:
+                logger.error(f"Error in group send: {e}")
+                yield f"data: {json.dumps({'done': True, 'error': str(e)})}\n\n"
+        
+        return Response(
+            generate_events(),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                'Connection': 'keep-alive'
+            }
+        )
+        
+    except Exception as e:
+        logger.error(f"Error sending group message: {e}")
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
 @multi_modal_chat_bp.route('/history/<friend_id>', methods=['GET'])
 @cross_origin()
 def get_conversation_history(friend_id):
-    """Get conversation history with an AI friend"""
+    """Get conversation history with an AI friend (pass nextCursor as `before` for older pages)"""
     try:
         limit = request.args.get('limit', 50, type=int)
-        history = chat_service.get_conversation_history(friend_id, limit)
+        before = request.args.get('before', None, type=int)
+        if limit <= 0:
+            return jsonify({
+                "success": False,
+                "error": "limit must be a positive integer"
+            }), 400
         
-        return jsonify({
-            "success": True,
-            "history": history,
-            "friendId": friend_id,
-            "count": len(history)
-        })
+        history_json, count, next_cursor = _chat_service().get_conversation_history_json(
+            friend_id, limit, before
+        )
+        
+        # Messages are stored pre-serialized; splice them in instead of re-encoding
+        body = (
+            b'{"success":true,"history":' + history_json +
+            b',"friendId":' + json.dumps(friend_id).encode('utf-8') +
+            b',"count":' + str(count).encode('ascii') +
+            b',"nextCursor":' + json.dumps(next_cursor).encode('ascii') + b'}'
+        )
+        return Response(body, mimetype='application/json')
         
     except Exception as e:
         logger.error(f"Error getting conversation history for {friend_id}: {e}")
@@ -167,7 +302,7 @@ def get_conversation_history(friend_id):
 def clear_conversation_history(friend_id):
     """Clear conversation history with an AI friend"""
     try:
-        success = chat_service.clear_conversation_history(friend_id)
+        success = _chat_service().clear_conversation_history(friend_id)
         
         if success:
             return jsonify({
@@ -201,7 +336,7 @@ def initialize_chat_service():
             }), 400
         
         api_keys = data['apiKeys']
-        chat_service.initialize_clients(api_keys)
+        _chat_service().initialize_clients(api_keys)
         
         return jsonify({
             "success": True,
@@ -225,7 +360,7 @@ def set_friend_typing(friend_id):
         typing = data.get('typing', False) if data else False
         
         # Update typing status
-        friends = chat_service.ai_friends
+        friends = _chat_service().ai_friends
         if friend_id in friends:
             friends[friend_id].typing = typing
             return jsonify({
@@ -292,7 +427,7 @@ def upload_file():
 def get_chat_stats():
     """Get chat statistics and usage info"""
     try:
-        friends = chat_service.get_ai_friends()
+        friends = _chat_service().get_ai_friends()
         
         stats = {
             "totalFriends": len(friends),
@@ -300,8 +435,10 @@ def get_chat_stats():
             "providerBreakdown": {},
             "totalUsage": 0,
             "averageUsage": 0,
-            "totalConversations": len(chat_service.conversation_history),
-            "totalMessages": sum(len(msgs) for msgs in chat_service.conversation_history.values())
+            "totalConversations": len(_chat_service().conversation_history),
+            "totalMessages": _chat_service().conversation_history.total_messages(),
+            "historyStore": _chat_service().conversation_history.get_stats(),
+            "fanout": _chat_service().get_fanout_stats()
         }
         
         # Provider breakdown
@@ -9,7 +9,6 @@ from flask_socketio import emit, join_room, leave_room
 import asyncio
 import json
 import logging
-from datetime import datetime
 from typing import Dict, Any, Optional
 import uuid
 
@@ -18,6 +17,7 @@ from services.enhanced_gemini_scout_orchestration import (
     WorkflowStage,
     ModelTier
 )
+from services.job_runner import get_job_runner, JobContext, JobQueueFullError
 from config.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -54,6 +54,33 @@ def get_scout_orchestrator() -> Optional[EnhancedGeminiScoutOrchestrator]:
         initialize_scout_orchestrator()
     return scout_orchestrator
 
+SCOUT_JOB_KIND = 'scout_workflow'
+
+async def run_scout_workflow_job(ctx: JobContext) -> Dict[str, Any]:
+    """Job handler: run a full Scout workflow under the job's id"""
+    orchestrator = get_scout_orchestrator()
+    if not orchestrator:
+        raise RuntimeError('Scout orchestrator not available')
+    
+    result = await orchestrator.execute_full_workflow(
+        ctx.payload['description'],
+        ctx.payload.get('preferences'),
+        workflow_id=ctx.id,
+        progress_callback=ctx.report_progress
+    )
+    if not result['success']:
+        raise RuntimeError(result.get('error', 'Scout workflow failed'))
+    
+    # Stage failures don't abort the workflow, but the job must not count as a
+    # success; the retry reuses the checkpoints of the stages that did succeed
+    failed = result['metadata'].get('failed_stages', [])
+    if failed:
+        errors = '; '.join(f"{name}: {result['results'][name].get('error', 'failed')}" for name in failed)
+        raise RuntimeError(f"Scout workflow stages failed - {errors}")
+    
+    logger.info(f"🎯 Workflow {ctx.id} completed")
+    return result
+
 @scout_bp.route('/api/scout/workflow/start', methods=['POST'])
 def start_scout_workflow():
     """
@@ -89,38 +116,32 @@ def start_scout_workflow():
                 'error': 'Scout orchestrator not available'
             }), 503
         
-        # Generate workflow ID
-        workflow_id = f"scout_{user_id}_{int(datetime.now().timestamp())}"
+        # Generate workflow ID; the job id doubles as the orchestrator's workflow id
+        workflow_id = f"scout_{user_id}_{uuid.uuid4().hex[:12]}"
         
         # Enhance description with preferences
         enhanced_description = description
         if preferences:
             enhanced_description += f"\n\nPreferences: {json.dumps(preferences, indent=2)}"
         
-        # Start the workflow asynchronously
-        def run_workflow():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                result = loop.run_until_complete(
-                    orchestrator.execute_full_workflow(enhanced_description, preferences)
-                )
-                logger.info(f"🎯 Workflow {workflow_id} completed: {result['success']}")
-            except Exception as e:
-                logger.error(f"❌ Workflow {workflow_id} failed: {e}")
-            finally:
-                loop.close()
-        
-        # Run workflow in background thread
-        import threading
-        workflow_thread = threading.Thread(target=run_workflow)
-        workflow_thread.daemon = True
-        workflow_thread.start()
+        # Queue the workflow on the background job runner
+        try:
+            get_job_runner().submit(SCOUT_JOB_KIND, {
+                'description': enhanced_description,
+                'preferences': preferences,
+                'user_id': user_id
+            }, job_id=workflow_id)
+        except JobQueueFullError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 429
         
         return jsonify({
             'success': True,
             'workflow_id': workflow_id,
-            'message': 'Scout workflow started successfully',
+            'job_id': workflow_id,
+            'message': 'Scout workflow queued successfully',
             'estimated_duration': '3-8 minutes'
         })
         
@@ -145,12 +166,27 @@ def get_workflow_status(workflow_id: str):
             }), 503
         
         status = orchestrator.get_workflow_status(workflow_id)
-        if not status:
+        job = get_job_runner().get(workflow_id)
+        if not status and not job:
             return jsonify({
                 'success': False,
                 'error': 'Workflow not found'
             }), 404
         
+        if not status:
+            # Still queued, or finished before a restart cleared the in-memory state
+            status = {
+                'workflow_id': workflow_id,
+                'status': job['status'],
+                'progress': job['progress'] * 100,
+                'results': (job['result'] or {}).get('results', {}),
+                'error': job['error']
+            }
+        if job:
+            job.pop('payload', None)
+            job.pop('result', None)
+            status['job'] = job
+        
         return jsonify({
             'success': True,
             'workflow': status
@@ -391,8 +427,9 @@ def integrate_scout_workflow_api(app, socketio):
             logger.warning("❌ Scout orchestrator initialization failed")
             return False
         
-        # Register the blueprint
+        # Register the blueprint and the background job handler
         app.register_blueprint(scout_bp)
+        get_job_runner().register(SCOUT_JOB_KIND, run_scout_workflow_job)
         
         logger.info("✅ Scout Workflow API integrated successfully")
         return True
@@ -5,11 +5,19 @@ Neurodivergent-friendly development sanctuary with 7 Mama Bear variants,
 """
 
 import os
+import sys
 import logging
 import asyncio
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+# `python app.py --profile-startup` times every import from here on
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+if PROFILE_STARTUP:
+    from utils.startup_profiler import ImportProfiler
+    import_profiler = ImportProfiler()
+    import_profiler.start()
+
 # Load environment variables from .env file
 from dotenv import load_dotenv
 load_dotenv(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
@@ -20,9 +28,6 @@ from flask_socketio import SocketIO, emit
 import json
 
 # Initialize logging first with Windows compatibility
-import sys
-import os
-
 # Import Windows-compatible logging
 from utils.windows_logging import setup_windows_compatible_logging
 
@@ -52,122 +57,141 @@ from routes.memory import memory_bp
 from routes.chat import chat_bp
 from routes.scrape import scrape_bp
 
-# Import Gemini Orchestra
-try:
-    from backend.api.gemini_orchestra_api import gemini_orchestra_bp, init_gemini_orchestra
-    GEMINI_ORCHESTRA_AVAILABLE = True
-    logger.info("✅ Gemini Orchestra API integration available")
-except ImportError as e:
-    logger.warning(f"Gemini Orchestra API integration not available: {e}")
-    GEMINI_ORCHESTRA_AVAILABLE = False
-    gemini_orchestra_bp = None
-    init_gemini_orchestra = None
-
-# Import Enhanced Scout Workflow
-try:
-    from api.scout_workflow_api import integrate_scout_workflow_api
-    SCOUT_WORKFLOW_AVAILABLE = True
-    logger.info("✅ Enhanced Scout Workflow API integration available")
-except ImportError as e:
-    logger.warning(f"Enhanced Scout Workflow API integration not available: {e}")
-    SCOUT_WORKFLOW_AVAILABLE = False
-    integrate_scout_workflow_api = None
-
-# Try to import Mem0 for enhanced memory
-try:
-    from mem0 import MemoryClient
-    MEM0_AVAILABLE = True
-except ImportError:
-    MEM0_AVAILABLE = False
-    MemoryClient = None
-
-# Try to import Deep Research Center (Library)
-try:
-    from api.library_api import integrate_library_api, library_bp
-    LIBRARY_AVAILABLE = True
-    logger.info("✅ Deep Research Center (Library) integration available")
-except ImportError as e:
-    logger.warning(f"Deep Research Center (Library) integration not available: {e}")
-    LIBRARY_AVAILABLE = False
-    integrate_library_api = None
-    library_bp = None
-
-# Try to import Vertex AI Express Mode Production service
-try:
-    from services.vertex_express_production import VertexExpressModeIntegration, create_express_mode_blueprint
-    VERTEX_EXPRESS_AVAILABLE = True
-    logger.info("✅ Vertex AI Express Mode production service available")
-except ImportError as e:
-    logger.warning(f"Vertex AI Express Mode production service not available: {e}")
-    VERTEX_EXPRESS_AVAILABLE = False
-    VertexExpressModeIntegration = None
-    create_express_mode_blueprint = None
-
-# Try to import Express Endpoints Manager
-try:
-    from scripts.create_express_endpoints import ExpressEndpointManager
-    EXPRESS_ENDPOINTS_AVAILABLE = True
-    logger.info("✅ Express Endpoint Manager available")
-except ImportError as e:
-    logger.warning(f"Express Endpoint Manager not available: {e}")
-    EXPRESS_ENDPOINTS_AVAILABLE = False
-    ExpressEndpointManager = None
-
-# Try to import ADK Agent Workbench
-try:
-    from services.adk_agent_workbench import ADKAgentWorkbench, create_adk_blueprint
-    ADK_WORKBENCH_AVAILABLE = True
-    logger.info("✅ ADK Agent Workbench available")
-except ImportError as e:
-    logger.warning(f"ADK Agent Workbench not available: {e}")
-    ADK_WORKBENCH_AVAILABLE = False
-    ADKAgentWorkbench = None
-    create_adk_blueprint = None
-
-# Try to import OpenAI Vertex AI service
-try:
-    from api.openai_vertex_api_simple import integrate_openai_vertex_api
-    OPENAI_VERTEX_AVAILABLE = True
-    logger.info("✅ OpenAI via Vertex AI Model Garden service available")
-except ImportError as e:
-    logger.warning(f"OpenAI via Vertex AI Model Garden service not available: {e}")
-    OPENAI_VERTEX_AVAILABLE = False
-    integrate_openai_vertex_api = None
-except ImportError as e:
-    logger.warning(f"OpenAI Vertex AI service not available: {e}")
-    OPENAI_VERTEX_AVAILABLE = False
-    integrate_openai_vertex_api = None
-
-# Try to import Multi-Modal Chat API
-try:
-    from api.multi_modal_chat_api import multi_modal_chat_bp
-    MULTI_MODAL_CHAT_AVAILABLE = True
-    logger.info("✅ Multi-Modal Chat API integration available")
-except ImportError as e:
-    logger.warning(f"Multi-Modal Chat API integration not available: {e}")
-    MULTI_MODAL_CHAT_AVAILABLE = False
-    multi_modal_chat_bp = None
+from services.job_runner import get_job_runner
+from utils.lazy_components import LazyComponentRegistry, blueprint_prefixes
+
+if PROFILE_STARTUP:
+    import_profiler.mark("core imports (flask, services, core APIs)")
 
 # Initialize Flask app
+CORS_ORIGINS = ["http://localhost:3000", "http://localhost:5173", "http://localhost:5001"]
 app = Flask(__name__)
 settings = get_settings()
 app.config['SECRET_KEY'] = settings.flask_secret_key
-CORS(app, origins=["http://localhost:3000", "http://localhost:5173", "http://localhost:5001"])
+CORS(app, origins=CORS_ORIGINS)
 
 # Initialize SocketIO
 socketio = SocketIO(
     app, 
-    cors_allowed_origins=["http://localhost:3000", "http://localhost:5173", "http://localhost:5001"],
+    cors_allowed_origins=CORS_ORIGINS,
     async_mode='threading'
 )
 
 # Global service status
 services_initialized = False
-gemini_orchestra_initialized = False
+
+# ==============================================================================
+# OPTIONAL COMPONENTS (loaded on first request or by the background warm-up)
+# ==============================================================================
+
+def _create_component_app(name: str) -> Flask:
+    """Each lazy component gets its own Flask app sharing config, CORS and error handlers"""
+    component_app = Flask(f"{__name__}.{name}")
+    component_app.config.update(app.config)
+    CORS(component_app, origins=CORS_ORIGINS)
+    component_app.register_error_handler(404, not_found_error)
+    component_app.register_error_handler(500, internal_error)
+    return component_app
+
+def _load_gemini_orchestra(component_app, socketio):
+    from backend.api.gemini_orchestra_api import gemini_orchestra_bp, init_gemini_orchestra
+    if not init_gemini_orchestra(component_app):
+        logger.warning("❌ Gemini Orchestra initialization failed")
+        return False
+    component_app.register_blueprint(gemini_orchestra_bp)
+    return True
+
+def _load_library(component_app, socketio):
+    from api.library_api import integrate_library_api
+    return integrate_library_api(component_app)
+
+def _load_scout_workflow(component_app, socketio):
+    from api.scout_workflow_api import integrate_scout_workflow_api
+    return integrate_scout_workflow_api(component_app, socketio)
+
+def _load_vertex_express(component_app, socketio):
+    from services.vertex_express_production import VertexExpressModeIntegration, create_express_mode_blueprint
+    express_service = VertexExpressModeIntegration()
+    component_app.register_blueprint(create_express_mode_blueprint(express_service))
+    logger.info("🚀 Express Mode API endpoints available at /api/vertex-express/*")
+    
+    try:
+        test_result = asyncio.run(express_service.test_connectivity())
+        if test_result['success']:
+            logger.info(f"✅ Express Mode connectivity verified: {test_result['latency']:.2f}ms")
+        else:
+            logger.warning(f"⚠️ Express Mode connectivity issue: {test_result['error']}")
+    except Exception as test_e:
+        logger.warning(f"⚠️ Could not test Express Mode connectivity: {test_e}")
+    return True
+
+def _load_express_endpoints(component_app, socketio):
+    from scripts.create_express_endpoints import ExpressEndpointManager
+    express_manager = ExpressEndpointManager()
+    express_validation = asyncio.run(express_manager.validate_express_connectivity())
+    if not express_validation.get("express_ready"):
+        logger.warning(f"❌ Express Endpoints not created: {express_validation.get('error')}")
+        return False
+    component_app.register_blueprint(express_manager.create_express_endpoints())
+    logger.info("🎯 Express speed tiers available at /api/express/*")
+    return True
+
+def _load_adk_workbench(component_app, socketio):
+    from services.adk_agent_workbench import ADKAgentWorkbench, create_adk_blueprint
+    component_app.register_blueprint(create_adk_blueprint(ADKAgentWorkbench()))
+    return True
+
+def _load_openai_vertex(component_app, socketio):
+    from api.openai_vertex_api_simple import integrate_openai_vertex_api
+    return integrate_openai_vertex_api(component_app)
+
+def _load_multi_modal_chat(component_app, socketio):
+    component_app.register_blueprint(multi_modal_chat_bp)
+    return True
+
+components = LazyComponentRegistry(socketio, _create_component_app)
+components.declare('gemini_orchestra', ['/api/orchestra'], _load_gemini_orchestra,
+                   "50+ specialized Gemini models")
+components.declare('library', ['/api/library'], _load_library,
+                   "Deep Research Center", job_kinds=['research'])
+components.declare('scout_workflow', ['/api/scout'], _load_scout_workflow,
+                   "Enhanced Scout workflows", job_kinds=['scout_workflow'])
+components.declare('vertex_express', ['/api/vertex-express'], _load_vertex_express,
+                   "Vertex AI Express Mode",
+                   enabled=bool(os.getenv('VERTEX_AI_EXPRESS_API_KEY')))
+components.declare('express_endpoints', ['/api/express'], _load_express_endpoints,
+                   "Express speed-tier endpoints",
+                   enabled=bool(os.getenv('VERTEX_AI_EXPRESS_API_KEY')))
+components.declare('adk_workbench', ['/api/adk'], _load_adk_workbench,
+                   "ADK Agent Workbench")
+components.declare('openai_vertex', ['/api/openai-vertex'], _load_openai_vertex,
+                   "OpenAI via Vertex AI Model Garden")
+# Shares /api/chat with the chat blueprint, so it claims just its own routes;
+# the blueprint module imports the chat service only when a route runs
+from api.multi_modal_chat_api import multi_modal_chat_bp
+components.declare('multi_modal_chat', blueprint_prefixes(multi_modal_chat_bp),
+                   _load_multi_modal_chat, "AI Friends messenger")
+
+# Requests under a component's prefixes are served by that component's app
+app.wsgi_app = components.wsgi_middleware(app.wsgi_app)
+
+def start_component_warm_up():
+    """
+    Load optional components in the background (LAZY_COMPONENTS=false loads
+    them before serving, as before; COMPONENT_WARM_UP=false loads each one
+    only on its first request)
+    """
+    workers = int(os.getenv('COMPONENT_WARM_UP_WORKERS', '2'))
+    # Jobs persisted by the last run are recovered now, not when their component loads
+    components.register_job_handlers(get_job_runner())
+    if os.getenv('LAZY_COMPONENTS', 'true').lower() != 'true':
+        components.load_all(max_workers=workers)
+    elif os.getenv('COMPONENT_WARM_UP', 'true').lower() == 'true':
+        components.warm_up(max_workers=workers)
 
 async def initialize_sanctuary_services():
     """Initialize all sanctuary services using the service manager"""
-    global services_initialized, gemini_orchestra_initialized
+    global services_initialized
     
     try:
         logger.info("🚀 Initializing Podplay Sanctuary services...")
@@ -175,140 +199,6 @@ async def initialize_sanctuary_services():
         # Initialize basic services through the service manager
         await initialize_all_services()
         
-        # Initialize Gemini Orchestra
-        if GEMINI_ORCHESTRA_AVAILABLE and init_gemini_orchestra:
-            logger.info("🎭 Initializing Gemini Orchestra...")
-            try:
-                gemini_orchestra_initialized = init_gemini_orchestra(app)
-                if gemini_orchestra_initialized:
-                    logger.info("✅ Gemini Orchestra initialized successfully!")
-                    # Register the blueprint
-                    if gemini_orchestra_bp is not None:
-                        app.register_blueprint(gemini_orchestra_bp)
-                        logger.info("✅ Gemini Orchestra API endpoints registered")
-                    else:
-                        logger.warning("❌ Gemini Orchestra blueprint is None")
-                else:
-                    logger.warning("❌ Gemini Orchestra initialization failed")
-            except Exception as e:
-                logger.error(f"Failed to initialize Gemini Orchestra: {e}")
-                gemini_orchestra_initialized = False
-        else:
-            logger.warning("Gemini Orchestra not available")
-        
-        # Initialize Deep Research Center (Library)
-        if LIBRARY_AVAILABLE and integrate_library_api:
-            logger.info("🏛️ Initializing Deep Research Center (Library)...")
-            try:
-                library_initialized = integrate_library_api(app)
-                if library_initialized:
-                    logger.info("✅ Deep Research Center initialized successfully!")
-                    logger.info("✅ Library API endpoints registered")
-                else:
-                    logger.warning("❌ Deep Research Center initialization failed")
-            except Exception as e:
-                logger.error(f"Failed to initialize Deep Research Center: {e}")
-        else:
-            logger.warning("Deep Research Center not available")
-          # Initialize Enhanced Scout Workflow
-        if SCOUT_WORKFLOW_AVAILABLE and integrate_scout_workflow_api:
-            logger.info("🎯 Initializing Enhanced Scout Workflow...")
-            try:
-                scout_success = integrate_scout_workflow_api(app, socketio)
-                if scout_success:
-                    logger.info("✅ Enhanced Scout Workflow initialized!")
-                else:
-                    logger.warning("❌ Scout Workflow initialization failed")
-            except Exception as e:
-                logger.error(f"Failed to initialize Scout Workflow: {e}")
-        else:
-            logger.warning("Enhanced Scout Workflow not available")          # Initialize Vertex AI Express Mode Production Service
-        if VERTEX_EXPRESS_AVAILABLE:
-            logger.info("⚡ Initializing Vertex AI Express Mode Production Service...")
-            try:
-                # Check for Express Mode API key
-                express_api_key = os.getenv('VERTEX_AI_EXPRESS_API_KEY')
-                if express_api_key:
-                    # Initialize Express Mode service
-                    express_service = VertexExpressModeIntegration()
-                    
-                    # Create and register Express Mode blueprint
-                    express_blueprint = create_express_mode_blueprint(express_service)
-                    app.register_blueprint(express_blueprint)
-                    
-                    logger.info("✅ Vertex AI Express Mode production service initialized!")
-                    logger.info("🚀 Express Mode API endpoints available at /api/vertex-express/*")
-                      # Test Express Mode connectivity (synchronous for now)
-                    try:
-                        import asyncio
-                        loop = asyncio.get_event_loop()
-                        test_result = loop.run_until_complete(express_service.test_connectivity())
-                        if test_result['success']:
-                            logger.info(f"✅ Express Mode connectivity verified: {test_result['latency']:.2f}ms")
-                        else:
-                            logger.warning(f"⚠️ Express Mode connectivity issue: {test_result['error']}")
-                    except Exception as test_e:
-                        logger.warning(f"⚠️ Could not test Express Mode connectivity: {test_e}")
-                        
-                else:
-                    logger.warning("❌ VERTEX_AI_EXPRESS_API_KEY not found in environment")
-                    logger.info("💡 Get your Express Mode API key at: https://makersuite.google.com/")
-                    
-            except Exception as e:
-                logger.error(f"Failed to initialize Vertex AI Express Mode: {e}")
-        
-        # Initialize Express Endpoints for 6x faster responses
-        if EXPRESS_ENDPOINTS_AVAILABLE and VERTEX_EXPRESS_AVAILABLE:
-            logger.info("🚀 Creating Express Endpoints for 6x faster responses...")
-            try:
-                # Create Express endpoint manager
-                express_manager = ExpressEndpointManager()
-                
-                # Validate Express connectivity first
-                express_validation = await express_manager.validate_express_connectivity()
-                
-                if express_validation.get("express_ready"):
-                    # Create Express endpoints
-                    express_endpoints_bp = express_manager.create_express_endpoints()
-                    app.register_blueprint(express_endpoints_bp)
-                    
-                    logger.info("✅ Express Endpoints created successfully!")
-                    logger.info("🎯 Speed tiers available:")
-                    logger.info("   • Ultra-fast: <200ms (/api/express/ultra-fast-chat)")
-                    logger.info("   • Fast: <500ms (/api/express/fast-chat)")
-                    logger.info("   • Standard: <1000ms (/api/express/standard-chat)")
-                    logger.info("   • Research: <2000ms (/api/express/research-chat)")
-                    logger.info("   • Smart Route: Auto-optimized (/api/express/smart-route)")
-                    logger.info("💰 Expected cost savings: 75%")
-                else:
-                    logger.warning(f"❌ Express Endpoints not created: {express_validation.get('error')}")
-                    
-            except Exception as e:
-                logger.error(f"Failed to create Express Endpoints: {e}")
-        elif EXPRESS_ENDPOINTS_AVAILABLE and not VERTEX_EXPRESS_AVAILABLE:
-            logger.info("📋 Express Endpoints ready but Vertex AI Express not available")
-        else:
-            logger.info("📋 Express Endpoints in simulation mode")
-        
-        # Initialize ADK Agent Workbench
-        if ADK_WORKBENCH_AVAILABLE:
-            logger.info("🤖 Initializing ADK Agent Workbench...")
-            try:
-                # Initialize ADK Agent Workbench
-                adk_workbench = ADKAgentWorkbench()
-                
-                # Create and register ADK blueprint
-                adk_blueprint = create_adk_blueprint(adk_workbench)
-                app.register_blueprint(adk_blueprint)
-                
-                logger.info("✅ ADK Agent Workbench initialized!")
-                logger.info("🔧 Agent creation endpoints available at /api/adk/*")
-                
-            except Exception as e:
-                logger.error(f"Failed to initialize ADK Agent Workbench: {e}")
-        else:
-            logger.info("📋 ADK Agent Workbench in simulation mode (ADK not yet public)")
-        
         services_initialized = True
         
         # Register API blueprints
@@ -333,33 +223,36 @@ async def initialize_sanctuary_services():
                 logger.info("✅ Agent Creation Workbench API registered")
             except ImportError as e:
                 logger.warning(f"Agent Workbench API not available: {e}")
+
+            # Register request tracing debug API
+            try:
+                from api.debug_api import debug_bp
+                app.register_blueprint(debug_bp)
+                logger.info("✅ Debug traces API registered at /api/debug/traces")
+            except ImportError as e:
+                logger.warning(f"Debug API not available: {e}")
+
+            # Register Prometheus metrics endpoint
+            try:
+                from api.metrics_api import metrics_bp
+                app.register_blueprint(metrics_bp)
+                logger.info("✅ Prometheus metrics available at /metrics")
+            except ImportError as e:
+                logger.warning(f"Metrics API not available: {e}")
+
+            # Register background jobs API and progress websockets
+            try:
+                from api.jobs_api import jobs_bp, setup_job_websockets
+                app.register_blueprint(jobs_bp)
+                setup_job_websockets(socketio)
+                logger.info("✅ Background jobs API registered at /api/jobs")
+            except ImportError as e:
+                logger.warning(f"Jobs API not available: {e}")
               # Register Live API Studio routes
             app.register_blueprint(memory_bp, url_prefix='/api/memory')
             app.register_blueprint(chat_bp, url_prefix='/api/chat')
             app.register_blueprint(scrape_bp, url_prefix='/api/scrape')
             logger.info("✅ Live API Studio routes registered")
-              # Register OpenAI via Vertex AI Model Garden API
-            if OPENAI_VERTEX_AVAILABLE:
-                try:
-                    integrate_openai_vertex_api(app)
-                    logger.info("✅ OpenAI via Vertex AI Model Garden API registered")
-                    logger.info("🤖 OpenAI models now available at /api/openai-vertex/*")
-                except Exception as e:
-                    logger.error(f"Failed to register OpenAI Vertex API: {e}")
-            else:
-                logger.info("📋 OpenAI Vertex AI service not available")
-            
-            # Register Multi-Modal Chat API
-            if MULTI_MODAL_CHAT_AVAILABLE:
-                try:
-                    app.register_blueprint(multi_modal_chat_bp)
-                    logger.info("✅ Multi-Modal Chat API registered")
-                    logger.info("🤖 AI Friends messenger available at /api/chat/*")
-                except Exception as e:
-                    logger.error(f"Failed to register Multi-Modal Chat API: {e}")
-            else:
-                logger.info("📋 Multi-Modal Chat API not available")
-            
             logger.info("✅ API blueprints registered successfully")
         except Exception as e:
             logger.error(f"❌ Failed to register API blueprints: {e}")
@@ -394,17 +287,20 @@ def health_check():
     """Health check endpoint"""
     try:
         status = get_service_status()
+        gemini_orchestra_initialized = components.is_ready('gemini_orchestra')
+        vertex_express_available = components.is_available('vertex_express')
+        adk_workbench_available = components.is_available('adk_workbench')
         return jsonify({
             'success': True,
             'status': 'healthy',
             'services': status,
             'gemini_orchestra': {
-                'available': GEMINI_ORCHESTRA_AVAILABLE,
+                'available': components.is_available('gemini_orchestra'),
                 'initialized': gemini_orchestra_initialized,
                 'models': '50+ specialized Gemini models' if gemini_orchestra_initialized else 'unavailable'
             },
             'vertex_express_mode': {
-                'available': VERTEX_EXPRESS_AVAILABLE,
+                'available': vertex_express_available,
                 'api_key_configured': bool(os.getenv('VERTEX_AI_EXPRESS_API_KEY')),
                 'features': [
                     'Ultra-fast responses (<200ms)',
@@ -412,20 +308,21 @@ def health_check():
                     '75% cost reduction',
                     'Intelligent routing',
                     'Performance tracking'
-                ] if VERTEX_EXPRESS_AVAILABLE else []
+                ] if vertex_express_available else []
             },
             'adk_agent_workbench': {
-                'available': ADK_WORKBENCH_AVAILABLE,
+                'available': adk_workbench_available,
                 'mode': 'simulation' if not os.getenv('GOOGLE_AI_ADK_AVAILABLE') else 'production',
-                'agent_templates': 5 if ADK_WORKBENCH_AVAILABLE else 0
+                'agent_templates': 5 if adk_workbench_available else 0
             },
             'enhanced_features': {
                 'mama_bear_variants': 7,
                 'claude_integration': bool(os.getenv('ANTHROPIC_API_KEY')),
                 'real_time_collaboration': gemini_orchestra_initialized,
-                'express_mode_enabled': VERTEX_EXPRESS_AVAILABLE and bool(os.getenv('VERTEX_AI_EXPRESS_API_KEY')),
+                'express_mode_enabled': vertex_express_available,
                 'neurodivergent_optimized': True
             },
+            'components': components.get_status(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -487,6 +384,7 @@ def create_app():
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     loop.run_until_complete(initialize_sanctuary_services())
+    start_component_warm_up()
     
     return app
 
@@ -503,6 +401,19 @@ if __name__ == '__main__':
     # Run startup
     asyncio.run(startup())
     
+    if PROFILE_STARTUP:
+        # Load everything eagerly so the profile covers the full cold start, then exit
+        import_profiler.mark("core services and blueprints")
+        for component in components.components.values():
+            if component.state == 'declared':
+                components.ensure_loaded(component.name, trigger='profile')
+                import_profiler.mark(f"component: {component.name} ({component.state})")
+        import_profiler.stop()
+        print(import_profiler.report())
+        sys.exit(0)
+    
+    start_component_warm_up()
+    
     # Start the Sanctuary
     socketio.run(
         app,
@@ -12,6 +12,10 @@ from typing import Dict, List, Optional, Generator
 import asyncio
 import threading
 
+from services.context_budget import get_context_budgeter
+from services.provider_adapters import gemini_client_options
+from services.single_flight import get_single_flight, request_key
+
 chat_bp = Blueprint('chat', __name__)
 
 # Comprehensive model configurations with intelligent orchestration
@@ -254,7 +258,7 @@ def get_available_models():
             'models': MODEL_CONFIGS
         })
     except Exception as e:
-        current_app.logger.error(f"Error getting models: {str(e)}")
+        current_app.logger.error("Error getting models: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -339,7 +343,7 @@ def suggest_optimal_model():
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error suggesting optimal model: {str(e)}")
+        current_app.logger.error("Error suggesting optimal model: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -395,19 +399,34 @@ def stream_chat():
         mama_bear_variant = model_config['mama_bear_variant']
         personality = MAMA_BEAR_PERSONALITIES[mama_bear_variant]
         
-        def generate_response():
-            """Generate real streaming response with AI models"""
-            try:
-                # Add Mama Bear personality context
-                system_message = f"""You are {personality['role']} - a caring AI assistant with the following personality: {personality['personality']}
+        # Add Mama Bear personality context
+        system_message = f"""You are {personality['role']} - a caring AI assistant with the following personality: {personality['personality']}
 
 Communication style: {personality['style']}
 Model capabilities: {', '.join(model_config['capabilities'])}
 
 Always maintain a caring, supportive tone while being technically excellent. You're part of the Podplay Sanctuary - a neurodivergent-friendly development platform."""
-
+        
+        # Fit the client's history into the model's budget: recent turns verbatim,
+        # older turns folded into a summary cached per session
+        client_system = [m for m in messages if m.get('role') == 'system']
+        window = get_context_budgeter().fit(
+            [m for m in messages if m.get('role') != 'system'],
+            provider=model_config['provider'],
+            model=model_id,
+            max_output_tokens=model_config['max_tokens'],
+            system_prompt=system_message,
+            conversation_id=session_id,
+            system_messages=client_system
+        )
+        if window.summary:
+            system_message += f"\n\nSummary of the earlier conversation:\n{window.summary}"
+        
+        def generate_response():
+            """Generate real streaming response with AI models"""
+            try:
                 # Prepare messages for AI model
-                full_messages = [{'role': 'system', 'content': system_message}] + messages
+                full_messages = [{'role': 'system', 'content': system_message}] + client_system + window.messages
                 
                 # Route to appropriate AI model with intelligent orchestration
                 provider = model_config['provider']
@@ -423,7 +442,7 @@ Always maintain a caring, supportive tone while being technically excellent. You
                     yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, personality)
                 
             except Exception as e:
-                current_app.logger.error(f"Error in generate_response: {e}")
+                current_app.logger.error("Error in generate_response: %s", e)
                 error_data = {
                     'error': str(e),
                     'model': model_id,
@@ -443,7 +462,7 @@ Always maintain a caring, supportive tone while being technically excellent. You
         )
         
     except Exception as e:
-        current_app.logger.error(f"Error in stream_chat: {str(e)}")
+        current_app.logger.error("Error in stream_chat: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -491,7 +510,7 @@ def save_conversation():
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error saving conversation: {str(e)}")
+        current_app.logger.error("Error saving conversation: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -519,7 +538,7 @@ def get_conversation(conversation_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error getting conversation: {str(e)}")
+        current_app.logger.error("Error getting conversation: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -561,7 +580,7 @@ def get_agent_status():
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error getting agent status: {str(e)}")
+        current_app.logger.error("Error getting agent status: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -595,7 +614,7 @@ def get_model_capabilities(model_id):
         })
         
     except Exception as e:
-        current_app.logger.error(f"Error getting model capabilities: {str(e)}")
+        current_app.logger.error("Error getting model capabilities: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -612,7 +631,7 @@ def _generate_gemini_response(messages, model_id, mama_bear_variant, session_id)
             yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, None)
             return
         
-        genai.configure(api_key=api_key)
+        genai.configure(api_key=api_key, **gemini_client_options())
         
         # Map our model IDs to actual Gemini model names
         model_mapping = {
@@ -633,38 +652,44 @@ def _generate_gemini_response(messages, model_id, mama_bear_variant, session_id)
         }
         
         actual_model_name = model_mapping.get(model_id, 'gemini-2.0-flash-exp')
-        model = genai.GenerativeModel(actual_model_name)
+        system_instruction = '\n\n'.join(msg['content'] for msg in messages if msg['role'] == 'system')
+        model = genai.GenerativeModel(actual_model_name, system_instruction=system_instruction or None)
         
         # Convert messages to Gemini format
         gemini_messages = []
         for msg in messages:
             if msg['role'] == 'system':
-                continue  # System message handled separately
+                continue  # Passed as the system instruction
             gemini_messages.append({
                 'role': 'user' if msg['role'] == 'user' else 'model',
                 'parts': [msg['content']]
             })
         
-        response = model.generate_content(
-            gemini_messages,
-            stream=True,
-            generation_config=genai.types.GenerationConfig(
-                max_output_tokens=8192,
-                temperature=0.7
+        def stream_texts():
+            response = model.generate_content(
+                gemini_messages,
+                stream=True,
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=8192,
+                    temperature=0.7
+                )
             )
-        )
+            return (chunk.text for chunk in response if chunk.text)
         
-        for chunk in response:
-            if chunk.text:
-                chunk_data = {
-                    'id': f"gemini_chunk_{int(time.time() * 1000)}",
-                    'model': model_id,
-                    'chunk': chunk.text,
-                    'finished': False,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'mama_bear_variant': mama_bear_variant
-                }
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+        # Identical concurrent requests share one provider stream
+        texts = get_single_flight('chat_stream').stream(
+            request_key(actual_model_name, system_instruction, gemini_messages), stream_texts)
+        
+        for text in texts:
+            chunk_data = {
+                'id': f"gemini_chunk_{int(time.time() * 1000)}",
+                'model': model_id,
+                'chunk': text,
+                'finished': False,
+                'timestamp': datetime.utcnow().isoformat(),
+                'mama_bear_variant': mama_bear_variant
+            }
+            yield f"data: {json.dumps(chunk_data)}\n\n"
         
         # Send completion signal
         completion_data = {
@@ -677,7 +702,7 @@ def _generate_gemini_response(messages, model_id, mama_bear_variant, session_id)
         yield f"data: {json.dumps(completion_data)}\n\n"
         
     except Exception as e:
-        current_app.logger.error(f"Gemini API error: {e}")
+        current_app.logger.error("Gemini API error: %s", e)
         yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, None)
 
 def _generate_claude_response(messages, model_id, mama_bear_variant, session_id):
@@ -711,22 +736,29 @@ def _generate_claude_response(messages, model_id, mama_bear_variant, session_id)
         
         actual_model_name = claude_model_mapping.get(model_id, 'claude-3-5-sonnet-20241022')
         
-        with client.messages.stream(
-            model=actual_model_name,
-            max_tokens=8192,
-            system=system_message,
-            messages=conversation_messages
-        ) as stream:
-            for text in stream.text_stream:
-                chunk_data = {
-                    'id': f"claude_chunk_{int(time.time() * 1000)}",
-                    'model': model_id,
-                    'chunk': text,
-                    'finished': False,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'mama_bear_variant': mama_bear_variant
-                }
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+        def stream_texts():
+            with client.messages.stream(
+                model=actual_model_name,
+                max_tokens=8192,
+                system=system_message,
+                messages=conversation_messages
+            ) as stream:
+                yield from stream.text_stream
+        
+        # Identical concurrent requests share one provider stream
+        texts = get_single_flight('chat_stream').stream(
+            request_key(actual_model_name, system_message, conversation_messages), stream_texts)
+        
+        for text in texts:
+            chunk_data = {
+                'id': f"claude_chunk_{int(time.time() * 1000)}",
+                'model': model_id,
+                'chunk': text,
+                'finished': False,
+                'timestamp': datetime.utcnow().isoformat(),
+                'mama_bear_variant': mama_bear_variant
+            }
+            yield f"data: {json.dumps(chunk_data)}\n\n"
         
         # Send completion signal
         completion_data = {
@@ -739,7 +771,7 @@ def _generate_claude_response(messages, model_id, mama_bear_variant, session_id)
         yield f"data: {json.dumps(completion_data)}\n\n"
         
     except Exception as e:
-        current_app.logger.error(f"Claude API error: {e}")
+        current_app.logger.error("Claude API error: %s", e)
         yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, None)
 
 def _generate_openai_response(messages, model_id, mama_bear_variant, session_id):
@@ -763,25 +795,30 @@ def _generate_openai_response(messages, model_id, mama_bear_variant, session_id)
         
         actual_model_name = openai_model_mapping.get(model_id, 'gpt-4o')
         
-        response = client.chat.completions.create(
-            model=actual_model_name,
-            messages=messages,
-            stream=True,
-            max_tokens=4096,
-            temperature=0.7
-        )
+        def stream_texts():
+            response = client.chat.completions.create(
+                model=actual_model_name,
+                messages=messages,
+                stream=True,
+                max_tokens=4096,
+                temperature=0.7
+            )
+            return (chunk.choices[0].delta.content for chunk in response if chunk.choices[0].delta.content)
         
-        for chunk in response:
-            if chunk.choices[0].delta.content:
-                chunk_data = {
-                    'id': f"openai_chunk_{int(time.time() * 1000)}",
-                    'model': model_id,
-                    'chunk': chunk.choices[0].delta.content,
-                    'finished': False,
-                    'timestamp': datetime.utcnow().isoformat(),
-                    'mama_bear_variant': mama_bear_variant
-                }
-                yield f"data: {json.dumps(chunk_data)}\n\n"
+        # Identical concurrent requests share one provider stream
+        texts = get_single_flight('chat_stream').stream(
+            request_key(actual_model_name, messages), stream_texts)
+        
+        for text in texts:
+            chunk_data = {
+                'id': f"openai_chunk_{int(time.time() * 1000)}",
+                'model': model_id,
+                'chunk': text,
+                'finished': False,
+                'timestamp': datetime.utcnow().isoformat(),
+                'mama_bear_variant': mama_bear_variant
+            }
+            yield f"data: {json.dumps(chunk_data)}\n\n"
         
         # Send completion signal
         completion_data = {
@@ -794,7 +831,7 @@ def _generate_openai_response(messages, model_id, mama_bear_variant, session_id)
         yield f"data: {json.dumps(completion_data)}\n\n"
         
     except Exception as e:
-        current_app.logger.error(f"OpenAI API error: {e}")
+        current_app.logger.error("OpenAI API error: %s", e)
         yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, None)
 
 def _generate_grok_response(messages, model_id, mama_bear_variant, session_id):
@@ -806,7 +843,7 @@ def _generate_grok_response(messages, model_id, mama_bear_variant, session_id):
         yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, None)
         
     except Exception as e:
-        current_app.logger.error(f"Grok API error: {e}")
+        current_app.logger.error("Grok API error: %s", e)
         yield from _generate_fallback_response(model_id, mama_bear_variant, session_id, None)
 
 def _generate_fallback_response(model_id, mama_bear_variant, session_id, personality):
@@ -853,7 +890,7 @@ def _generate_fallback_response(model_id, mama_bear_variant, session_id, persona
         yield f"data: {json.dumps(completion_data)}\n\n"
         
     except Exception as e:
-        current_app.logger.error(f"Fallback response error: {e}")
+        current_app.logger.error("Fallback response error: %s", e)
         error_data = {
             'error': str(e),
             'model': model_id,
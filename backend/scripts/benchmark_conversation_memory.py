@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+⏱️ Conversation Memory Benchmark
+Measures memory per 1000 stored chat messages and history-page latency:
+list of ChatMessage-style dataclasses (rebuilding dicts on every read) vs the
+ConversationStore ring of __slots__ records with pre-serialized fragments.
+"""
+
+import sys
+import gc
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.conversation_store import ConversationStore
+
+
+@dataclass
+class BaselineMessage:
+    """Same fields as ChatMessage in multi_modal_chat_service"""
+    id: str
+    content: str
+    sender: str
+    timestamp: datetime
+    message_type: str = "text"
+    file_name: Optional[str] = None
+    file_size: Optional[str] = None
+    file_url: Optional[str] = None
+    ai_model: Optional[str] = None
+    reactions: List[str] = field(default_factory=list)
+    edited: bool = False
+    reply_to: Optional[str] = None
+
+
+def make_message(index: int, content_chars: int) -> BaselineMessage:
+    sender = "user" if index % 2 == 0 else "mama-bear"
+    body = (f"Message {index}: " + "lorem ipsum dolor sit amet 🐻 " * (content_chars // 29 + 1))[:content_chars]
+    return BaselineMessage(id=f"msg_{index}", content=body, sender=sender, timestamp=datetime.now(),
+                           ai_model=None if sender == "user" else "gemini-2.5-flash")
+
+
+def baseline_page(history: List[BaselineMessage], limit: int) -> str:
+    """What get_conversation_history + jsonify did before"""
+    return json.dumps([
+        {
+            "id": msg.id,
+            "content": msg.content,
+            "sender": msg.sender,
+            "timestamp": msg.timestamp.isoformat(),
+            "type": msg.message_type,
+            "fileName": msg.file_name,
+            "fileSize": msg.file_size,
+            "fileUrl": msg.file_url,
+            "aiModel": msg.ai_model,
+            "reactions": msg.reactions,
+            "edited": msg.edited,
+            "replyTo": msg.reply_to
+        }
+        for msg in history[-limit:]
+    ])
+
+
+def measure_kb(build: Callable[[], object]) -> float:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    kept = build()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return (after - before) / 1024
+
+
+def time_call(fn: Callable[[], object], repeat: int) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: List[float]):
+    print(f"  {label:<28} median {statistics.median(timings):8.3f} ms   "
+          f"min {min(timings):8.3f} ms   max {max(timings):8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark chat history memory and page reads")
+    parser.add_argument('--messages', type=int, nargs='+', default=[1000, 10000],
+                        help="Messages per conversation")
+    parser.add_argument('--content-chars', type=int, default=200, help="Characters per message")
+    parser.add_argument('--ring-size', type=int, default=500, help="In-memory turns per conversation")
+    parser.add_argument('--limit', type=int, default=50, help="History page size")
+    parser.add_argument('--repeat', type=int, default=20, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    for count in args.messages:
+        print(f"\n📏 {count} messages, {args.content_chars} chars each")
+
+        # Messages are created inside each measurement so both sides own
+        # their strings, as they do in the running service
+        def build_baseline():
+            return [make_message(i, args.content_chars) for i in range(count)]
+
+        with tempfile.TemporaryDirectory() as spill_dir:
+            def build_store(capacity: int):
+                store = ConversationStore(storage_path=spill_dir, ring_capacity=capacity)
+                store.clear("bench")
+                for i in range(count):
+                    store.append("bench", make_message(i, args.content_chars))
+                return store
+
+            per_1000 = 1000 / count
+            print(f"  {'dataclass list':<28} {measure_kb(build_baseline) * per_1000:10.1f} KB / 1000 msgs")
+            print(f"  {'slots ring (no spill)':<28} "
+                  f"{measure_kb(lambda: build_store(count + 1)) * per_1000:10.1f} KB / 1000 msgs")
+            print(f"  {'slots ring + spill':<28} "
+                  f"{measure_kb(lambda: build_store(args.ring_size)) * per_1000:10.1f} KB / 1000 msgs")
+
+            history = build_baseline()
+            store = build_store(args.ring_size)
+            report("baseline newest page", time_call(
+                lambda: baseline_page(history, args.limit), args.repeat))
+            report("store newest page", time_call(
+                lambda: store.page_json("bench", None, args.limit), args.repeat))
+            if count > args.ring_size + args.limit:
+                report("store spilled page", time_call(
+                    lambda: store.page_json("bench", args.limit * 2, args.limit), args.repeat))
+
+
+if __name__ == '__main__':
+    main()
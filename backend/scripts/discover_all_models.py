@@ -7,10 +7,11 @@ Discovers and tests ALL available models across all services for multi-modal cha
 import os
 import sys
 import asyncio
+import argparse
 import json
 import time
 from pathlib import Path
-from typing import Dict, List, Any, Set
+from typing import Dict, List, Any, Set, Optional
 from datetime import datetime
 import traceback
 
@@ -22,8 +23,25 @@ sys.path.append(str(backend_dir))
 from dotenv import load_dotenv
 load_dotenv()
 
+from services.model_benchmark import (
+    ModelBenchmark, StubProvider, GoogleAIProvider, VertexAIProvider, OpenAIProvider, AnthropicProvider,
+    write_results, registry_with_measured_tiers
+)
+
+STUB_MODELS = {
+    'google_ai': ['gemini-2.5-flash-preview-05-20', 'gemini-2.5-pro-preview-06-05', 'gemini-1.5-flash'],
+    'openai': ['gpt-4o', 'gpt-4o-mini'],
+    'anthropic': ['claude-3-5-sonnet-20241022', 'claude-3-5-haiku-20241022']
+}
+
 class ComprehensiveModelDiscovery:
-    def __init__(self):
+    def __init__(self, samples: int = 3, results_path: Optional[str] = None,
+                 registry_out: Optional[str] = None, use_stub: bool = False):
+        self.samples = samples
+        self.results_path = Path(results_path) if results_path else backend_dir / 'data' / 'model_benchmark.json'
+        self.registry_out = registry_out
+        self.use_stub = use_stub
+        self.benchmark_results = {}
         self.all_models = {}
         self.test_results = {}
         self.resource_inventory = {}
@@ -308,287 +326,99 @@ class ComprehensiveModelDiscovery:
         print(f"\n✅ Added {len(self.discovered_models['anthropic'])} Anthropic models")
 
     async def test_all_discovered_models(self):
-        """Test ALL discovered models comprehensively"""
+        """Benchmark ALL discovered models concurrently, rate limited per provider"""
         self.print_section("Testing ALL Discovered Models")
         
         total_models = sum(len(models) for models in self.discovered_models.values())
-        print(f"🚀 Testing {total_models} total models across all services")
-        
-        # Test Google AI models
-        await self._test_google_ai_models()
-        
-        # Test Vertex AI models  
-        await self._test_vertex_ai_models()
-        
-        # Test OpenAI models
-        await self._test_openai_models()
-        
-        # Test Anthropic models
-        await self._test_anthropic_models()
+        print(f"🚀 Testing {total_models} total models across all services "
+              f"({self.samples} samples each, all providers in parallel)")
+        
+        providers = self._build_providers()
+        models = {service: sorted(self.discovered_models[service]) for service in providers}
+        # Image models have no text stream to time
+        models['vertex_ai'] = [name for name in models.get('vertex_ai', [])
+                               if not any(term in name.lower() for term in ['imagen', 'imagegeneration'])]
+        
+        benchmark = ModelBenchmark(providers, samples=self.samples, prompt=self.test_message)
+        self.benchmark_results = await benchmark.run(models)
+        
+        for key, result in sorted(self.benchmark_results['models'].items()):
+            service, model_name = result['provider'], result['model']
+            test_key = f"{service}_{model_name}"
+            if result['status'] == 'success':
+                ttft = f", TTFT p50 {result['ttft_ms']['p50']:.0f}ms" if result['ttft_ms'] else ""
+                print(f"   ✅ {key}: p50 {result['latency_ms']['p50']:.0f}ms{ttft}")
+                self.test_results[test_key] = {
+                    'status': 'success',
+                    'latency': result['latency_ms']['p50'],
+                    'response_length': len(result['response_preview']),
+                    'response_preview': result['response_preview'],
+                    'model_info': self.all_models.get(test_key, {}),
+                    'benchmark': result
+                }
+            else:
+                print(f"   ❌ {key}: {result['errors'][0]}")
+                self.test_results[test_key] = {
+                    'status': 'failed',
+                    'error': result['errors'][0],
+                    'latency': 0,
+                    'model_info': self.all_models.get(test_key, {})
+                }
+        
+        print(f"\n⏱️ Benchmarked {len(self.benchmark_results['models'])} models in "
+              f"{self.benchmark_results['duration_seconds']:.1f}s")
+        write_results(self.benchmark_results, str(self.results_path))
+        print(f"📄 Benchmark results saved to: {self.results_path}")
+        
+        if self.registry_out:
+            self._write_registry_with_measured_tiers()
         
         # Test Express Mode with discovered models
-        await self._test_express_mode_models()
+        if not self.use_stub:
+            await self._test_express_mode_models()
 
-    async def _test_google_ai_models(self):
-        """Test all discovered Google AI models"""
-        if not self.discovered_models['google_ai']:
-            return
-            
-        self.print_subsection("Testing Google AI Models")
-        
-        try:
-            import google.generativeai as genai
-            
-            api_key = os.getenv('GOOGLE_API_KEY') or os.getenv('VERTEX_AI_GEMINI_API_KEY')
-            genai.configure(api_key=api_key)
-            
-            for model_name in self.discovered_models['google_ai']:
-                print(f"\n🔮 Testing {model_name}...")
-                
-                try:
-                    start_time = time.time()
-                    
-                    model = genai.GenerativeModel(model_name)
-                    response = model.generate_content(
-                        self.test_message,
-                        generation_config={
-                            "max_output_tokens": 100,
-                            "temperature": 0.3
-                        }
-                    )
-                    
-                    end_time = time.time()
-                    latency = (end_time - start_time) * 1000
-                    
-                    response_text = response.text if hasattr(response, 'text') else str(response)
-                    
-                    print(f"   ✅ Success! ({latency:.0f}ms)")
-                    print(f"   📝 Response: {response_text[:100]}...")
-                    
-                    self.test_results[f"google_ai_{model_name}"] = {
-                        'status': 'success',
-                        'latency': latency,
-                        'response_length': len(response_text),
-                        'response_preview': response_text[:200],
-                        'model_info': self.all_models.get(f"google_ai_{model_name}", {})
-                    }
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed: {str(e)}")
-                    self.test_results[f"google_ai_{model_name}"] = {
-                        'status': 'failed',
-                        'error': str(e),
-                        'latency': 0,
-                        'model_info': self.all_models.get(f"google_ai_{model_name}", {})
-                    }
-                
-                # Rate limiting
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            print(f"❌ Google AI testing failed: {e}")
-
-    async def _test_vertex_ai_models(self):
-        """Test all discovered Vertex AI models"""
-        if not self.discovered_models['vertex_ai']:
-            return
-            
-        self.print_subsection("Testing Vertex AI Models")
-        
-        try:
-            import vertexai
-            from vertexai.generative_models import GenerativeModel, GenerationConfig
-            from google.oauth2 import service_account
-            
-            # Initialize Vertex AI
-            service_account_path = os.getenv('PRIMARY_SERVICE_ACCOUNT_PATH')
-            project_id = os.getenv('VERTEX_AI_PROJECT_ID', 'podplay-build-beta')
-            location = os.getenv('VERTEX_AI_LOCATION', 'us-central1')
-            
-            credentials = service_account.Credentials.from_service_account_file(
-                service_account_path,
-                scopes=['https://www.googleapis.com/auth/cloud-platform']
-            )
-            
-            vertexai.init(project=project_id, location=location, credentials=credentials)
-            
-            for model_name in self.discovered_models['vertex_ai']:
-                print(f"\n🤖 Testing {model_name}...")
-                
-                try:
-                    start_time = time.time()
-                    
-                    # Skip image models for text generation
-                    if any(img_term in model_name.lower() for img_term in ['imagen', 'imagegeneration']):
-                        print(f"   ⏭️ Skipping image model {model_name}")
-                        continue
-                    
-                    model = GenerativeModel(model_name)
-                    response = model.generate_content(
-                        self.test_message,
-                        generation_config=GenerationConfig(
-                            max_output_tokens=100,
-                            temperature=0.3
-                        )
-                    )
-                    
-                    end_time = time.time()
-                    latency = (end_time - start_time) * 1000
-                    
-                    response_text = response.text if hasattr(response, 'text') else str(response)
-                    
-                    print(f"   ✅ Success! ({latency:.0f}ms)")
-                    print(f"   📝 Response: {response_text[:100]}...")
-                    
-                    self.test_results[f"vertex_ai_{model_name}"] = {
-                        'status': 'success',
-                        'latency': latency,
-                        'response_length': len(response_text),
-                        'response_preview': response_text[:200],
-                        'model_info': self.all_models.get(f"vertex_ai_{model_name}", {})
-                    }
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed: {str(e)}")
-                    self.test_results[f"vertex_ai_{model_name}"] = {
-                        'status': 'failed',
-                        'error': str(e),
-                        'latency': 0,
-                        'model_info': self.all_models.get(f"vertex_ai_{model_name}", {})
-                    }
-                
-                # Rate limiting
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            print(f"❌ Vertex AI testing failed: {e}")
+    def _build_providers(self) -> Dict[str, Any]:
+        """Streaming clients for every service that discovered models"""
+        if self.use_stub:
+            return {service: StubProvider(seed=len(service)) for service in self.discovered_models
+                    if self.discovered_models[service] and service != 'express_mode'}
+        
+        providers = {}
+        factories = {
+            'google_ai': lambda: GoogleAIProvider(os.getenv('GOOGLE_API_KEY') or os.getenv('VERTEX_AI_GEMINI_API_KEY')),
+            'vertex_ai': self._vertex_provider,
+            'openai': lambda: OpenAIProvider(os.getenv('OPENAI_API_KEY')),
+            'anthropic': lambda: AnthropicProvider(os.getenv('ANTHROPIC_API_KEY'))
+        }
+        for service, factory in factories.items():
+            if not self.discovered_models[service]:
+                continue
+            try:
+                providers[service] = factory()
+            except Exception as e:
+                print(f"❌ {service} client setup failed: {e}")
+        return providers
 
-    async def _test_openai_models(self):
-        """Test all discovered OpenAI models"""
-        if not self.discovered_models['openai']:
-            return
-            
-        self.print_subsection("Testing OpenAI Models")
-        
-        try:
-            import openai
-            
-            api_key = os.getenv('OPENAI_API_KEY')
-            client = openai.OpenAI(api_key=api_key)
-            
-            for model_name in self.discovered_models['openai']:
-                print(f"\n🤖 Testing {model_name}...")
-                
-                try:
-                    start_time = time.time()
-                    
-                    response = client.chat.completions.create(
-                        model=model_name,
-                        messages=[
-                            {"role": "user", "content": self.test_message}
-                        ],
-                        max_tokens=100,
-                        temperature=0.3
-                    )
-                    
-                    end_time = time.time()
-                    latency = (end_time - start_time) * 1000
-                    
-                    response_text = response.choices[0].message.content
-                    
-                    print(f"   ✅ Success! ({latency:.0f}ms)")
-                    print(f"   📝 Response: {response_text[:100]}...")
-                    
-                    self.test_results[f"openai_{model_name}"] = {
-                        'status': 'success',
-                        'latency': latency,
-                        'response_length': len(response_text),
-                        'response_preview': response_text[:200],
-                        'model_info': self.all_models.get(f"openai_{model_name}", {}),
-                        'usage': {
-                            'prompt_tokens': response.usage.prompt_tokens,
-                            'completion_tokens': response.usage.completion_tokens,
-                            'total_tokens': response.usage.total_tokens
-                        }
-                    }
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed: {str(e)}")
-                    self.test_results[f"openai_{model_name}"] = {
-                        'status': 'failed',
-                        'error': str(e),
-                        'latency': 0,
-                        'model_info': self.all_models.get(f"openai_{model_name}", {})
-                    }
-                
-                # Rate limiting
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            print(f"❌ OpenAI testing failed: {e}")
+    def _vertex_provider(self) -> VertexAIProvider:
+        from google.oauth2 import service_account
+        
+        credentials = service_account.Credentials.from_service_account_file(
+            os.getenv('PRIMARY_SERVICE_ACCOUNT_PATH'),
+            scopes=['https://www.googleapis.com/auth/cloud-platform']
+        )
+        return VertexAIProvider(os.getenv('VERTEX_AI_PROJECT_ID', 'podplay-build-beta'),
+                                os.getenv('VERTEX_AI_LOCATION', 'us-central1'), credentials)
 
-    async def _test_anthropic_models(self):
-        """Test all discovered Anthropic models"""
-        if not self.discovered_models['anthropic']:
-            return
-            
-        self.print_subsection("Testing Anthropic Models")
-        
-        try:
-            import anthropic
-            
-            api_key = os.getenv('ANTHROPIC_API_KEY')
-            client = anthropic.Anthropic(api_key=api_key)
-            
-            for model_name in self.discovered_models['anthropic']:
-                print(f"\n🧠 Testing {model_name}...")
-                
-                try:
-                    start_time = time.time()
-                    
-                    response = client.messages.create(
-                        model=model_name,
-                        max_tokens=100,
-                        temperature=0.3,
-                        messages=[
-                            {"role": "user", "content": self.test_message}
-                        ]
-                    )
-                    
-                    end_time = time.time()
-                    latency = (end_time - start_time) * 1000
-                    
-                    response_text = response.content[0].text if response.content else ""
-                    
-                    print(f"   ✅ Success! ({latency:.0f}ms)")
-                    print(f"   📝 Response: {response_text[:100]}...")
-                    
-                    self.test_results[f"anthropic_{model_name}"] = {
-                        'status': 'success',
-                        'latency': latency,
-                        'response_length': len(response_text),
-                        'response_preview': response_text[:200],
-                        'model_info': self.all_models.get(f"anthropic_{model_name}", {}),
-                        'usage': {
-                            'input_tokens': response.usage.input_tokens,
-                            'output_tokens': response.usage.output_tokens
-                        }
-                    }
-                    
-                except Exception as e:
-                    print(f"   ❌ Failed: {str(e)}")
-                    self.test_results[f"anthropic_{model_name}"] = {
-                        'status': 'failed',
-                        'error': str(e),
-                        'latency': 0,
-                        'model_info': self.all_models.get(f"anthropic_{model_name}", {})
-                    }
-                
-                # Rate limiting
-                await asyncio.sleep(1)
-                
-        except Exception as e:
-            print(f"❌ Anthropic testing failed: {e}")
+    def _write_registry_with_measured_tiers(self):
+        """Registry file (GEMINI_REGISTRY_FILE format) with latency tiers from this run"""
+        from services.orchestration.model_registry import GEMINI_REGISTRY
+        
+        registry, changes = registry_with_measured_tiers(self.benchmark_results, GEMINI_REGISTRY)
+        for key, (old_tier, new_tier) in sorted(changes.items()):
+            print(f"   🔁 {key}: {old_tier} → {new_tier}")
+        write_results({key: spec.to_dict() for key, spec in registry.items()}, self.registry_out)
+        print(f"🗂️ Registry with measured latency tiers saved to: {self.registry_out} "
+              f"({len(changes)} tiers changed)")
 
     async def _test_express_mode_models(self):
         """Test Express Mode service with all available speed tiers"""
@@ -863,10 +693,17 @@ class ComprehensiveModelDiscovery:
             print(f"{status} {key}: {'Configured' if available else 'Missing'}")
         
         # Discovery phase
-        await self.discover_google_ai_models()
-        await self.discover_vertex_ai_models()
-        await self.discover_openai_models()
-        await self.discover_anthropic_models()
+        if self.use_stub:
+            for service, names in STUB_MODELS.items():
+                self.discovered_models[service].update(names)
+                for name in names:
+                    self.all_models[f"{service}_{name}"] = {'service': service, 'model_name': name,
+                                                            'discovery_method': 'stub'}
+        else:
+            await self.discover_google_ai_models()
+            await self.discover_vertex_ai_models()
+            await self.discover_openai_models()
+            await self.discover_anthropic_models()
         
         # Testing phase
         await self.test_all_discovered_models()
@@ -879,7 +716,15 @@ class ComprehensiveModelDiscovery:
 
 async def main():
     """Main discovery runner"""
-    discoverer = ComprehensiveModelDiscovery()
+    parser = argparse.ArgumentParser(description="Discover and benchmark every available model")
+    parser.add_argument('--samples', type=int, default=3, help="Samples per model (default 3)")
+    parser.add_argument('--results', help="Benchmark results file (default data/model_benchmark.json)")
+    parser.add_argument('--registry-out', help="Also write a GEMINI_REGISTRY_FILE with measured latency tiers")
+    parser.add_argument('--stub', action='store_true', help="Benchmark simulated models, no API calls")
+    args = parser.parse_args()
+    
+    discoverer = ComprehensiveModelDiscovery(samples=args.samples, results_path=args.results,
+                                             registry_out=args.registry_out, use_stub=args.stub)
     await discoverer.run_comprehensive_discovery()
 
 if __name__ == '__main__':
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+🎓 Routing Model Offline Evaluation
+Replays the logged routing decisions in time order (progressive validation):
+each outcome is predicted before the model trains on it, and the learned
+model is compared against the route the heuristics actually picked. Routes
+the live learned model picked (decision_source "learned") are scored
+separately and kept out of the heuristic baseline.
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.routing_model import (
+    OnlineRoutingClassifier, outcome_label, NUMPY_AVAILABLE
+)
+
+
+def load_records(log_path: str) -> List[Dict[str, Any]]:
+    records = []
+    with open(log_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                records.append(json.loads(line))
+    records.sort(key=lambda r: r['timestamp'])
+    return records
+
+
+def evaluate(records: List[Dict[str, Any]],
+             min_samples: int,
+             confidence_threshold: float) -> Dict[str, Any]:
+    classifier = OnlineRoutingClassifier()
+
+    labelled = 0
+    logged = {}   # decision_source -> [labelled, logged route right]
+    covered = 0
+    model_correct_covered = 0
+    covered_heuristic = 0
+    model_correct_on_heuristic = 0
+    heuristic_correct_covered = 0
+    log_loss_sum = 0.0
+    scored = 0
+
+    for record in records:
+        label = outcome_label(record['route'], record['success'], record['execution_time'])
+        if label is None:
+            continue
+        target, weight = label
+        features = record['features']
+        source = record.get('decision_source', 'heuristic')
+        labelled += 1
+
+        logged_right = (1 if record['route'] == 'scrapybara' else 0) == target
+        counts = logged.setdefault(source, [0, 0])
+        counts[0] += 1
+        counts[1] += logged_right
+
+        if classifier.samples >= min_samples:
+            probability = classifier.predict_proba(features)
+            p = min(max(probability, 1e-9), 1 - 1e-9)
+            log_loss_sum += -(target * math.log(p) + (1 - target) * math.log(1 - p))
+            scored += 1
+
+            if max(probability, 1 - probability) >= confidence_threshold:
+                model_right = (1 if probability >= 0.5 else 0) == target
+                covered += 1
+                model_correct_covered += model_right
+                if source == 'heuristic':
+                    covered_heuristic += 1
+                    model_correct_on_heuristic += model_right
+                    heuristic_correct_covered += logged_right
+
+        classifier.partial_fit(features, target, weight)
+
+    heuristic_labelled, heuristic_correct = logged.get('heuristic', (0, 0))
+    return {
+        'records': len(records),
+        'labelled_outcomes': labelled,
+        'labelled_by_source': {source: counts[0] for source, counts in logged.items()},
+        'heuristic_accuracy': heuristic_correct / heuristic_labelled if heuristic_labelled else None,
+        'logged_accuracy_by_source': {source: counts[1] / counts[0] for source, counts in logged.items()},
+        'scored_after_warmup': scored,
+        'model_log_loss': log_loss_sum / scored if scored else None,
+        'confident_coverage': covered / scored if scored else None,
+        'model_accuracy_when_confident': model_correct_covered / covered if covered else None,
+        'heuristic_tasks_covered': covered_heuristic,
+        'model_accuracy_on_heuristic_tasks':
+            model_correct_on_heuristic / covered_heuristic if covered_heuristic else None,
+        'heuristic_accuracy_on_same_tasks':
+            heuristic_correct_covered / covered_heuristic if covered_heuristic else None,
+        'llm_calls_avoided': covered,
+        'final_model': classifier.to_dict()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay logged routing decisions against the learned model")
+    parser.add_argument('--log', default=os.path.join(os.getcwd(), "data", "routing", "routing_decisions.jsonl"),
+                        help="Path to routing_decisions.jsonl")
+    parser.add_argument('--min-samples', type=int, default=50)
+    parser.add_argument('--confidence', type=float, default=0.85)
+    parser.add_argument('--output', help="Optional path for the JSON report")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ NumPy is required for routing model evaluation")
+        sys.exit(1)
+
+    if not os.path.exists(args.log):
+        print(f"❌ No decision log found at {args.log}")
+        sys.exit(1)
+
+    report = evaluate(load_records(args.log), args.min_samples, args.confidence)
+
+    print("🎓 Routing model replay")
+    for key, value in report.items():
+        if key == 'final_model':
+            continue
+        if isinstance(value, float):
+            value = f"{value:.4f}"
+        elif isinstance(value, dict):
+            value = ', '.join(f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}" for k, v in value.items())
+        print(f"  {key:<36} {value}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"💾 Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
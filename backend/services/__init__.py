@@ -3,15 +3,19 @@
 Provides all core services for the Mama Bear sanctuary
 """
 
+import os
 import logging
 import asyncio
 from typing import Dict, Any, Optional
 
+from .service_graph import ServiceGraph
+
 logger = logging.getLogger(__name__)
 
 # Global service instances
 _services = {}
 _initialized = False
+_service_graph: Optional[ServiceGraph] = None
 
 class MockService:
     """Mock service for development"""
@@ -25,76 +29,93 @@ class MockService:
 # === SERVICE INITIALIZATION ===
 
 async def initialize_all_services():
-    """Initialize all sanctuary services"""
-    global _services, _initialized
+    """
+    Initialize all sanctuary services. Importing this package no longer does
+    this as a side effect; app startup calls it once (later calls are no-ops).
+
+    Memory, model and Scrapybara managers have no dependencies on each other
+    and start concurrently; the orchestrator starts once all three are up.
+    Each is optional: one that fails or exceeds its timeout is replaced by a
+    mock and the rest of the sanctuary starts in degraded mode.
+    """
+    global _services, _initialized, _service_graph
+    
+    if _initialized:
+        return
     
     try:
         logger.info("🚀 Initializing Podplay Sanctuary services...")
         
-        # Try to import and initialize real service implementations
-        try:
-            from .mama_bear_orchestration import AgentOrchestrator
-            from .mama_bear_memory_system import MemoryManager
-            from .enhanced_scrapybara_integration import ScrapybaraManager
-            from .mama_bear_model_manager import ModelManager
-            
-            # Initialize real services
-            memory_manager = MemoryManager()
-            model_manager = ModelManager()
-            scrapybara_manager = ScrapybaraManager()
-            
-            # Initialize orchestrator with all services
-            orchestrator = AgentOrchestrator(memory_manager, model_manager, scrapybara_manager)
-            
-            _services = {
-                'mama_bear_agent': orchestrator,
-                'memory_manager': memory_manager,
-                'scrapybara_manager': scrapybara_manager,
-                'theme_manager': MockService('Theme Manager'),  # Keep as mock for now
-                'model_manager': model_manager
-            }
-            
+        graph = ServiceGraph(on_late_ready=_service_ready_late)
+        graph.add('memory_manager', _create_memory_manager, optional=True,
+                  timeout=_init_timeout('MEMORY', 20), fallback=lambda: MockService('Memory Manager'))
+        graph.add('model_manager', _create_model_manager, optional=True, on_loop=True,
+                  timeout=_init_timeout('MODEL', 10))
+        graph.add('scrapybara_manager', _create_scrapybara_manager, optional=True,
+                  timeout=_init_timeout('SCRAPYBARA', 10), fallback=lambda: MockService('Scrapybara Manager'))
+        graph.add('mama_bear_agent', _create_orchestrator,
+                  depends_on=('memory_manager', 'model_manager', 'scrapybara_manager'),
+                  optional=True, timeout=_init_timeout('ORCHESTRATOR', 10),
+                  fallback=lambda: MockService('Mama Bear Agent'))
+        graph.add('theme_manager', lambda: MockService('Theme Manager'))  # Keep as mock for now
+        _service_graph = graph
+        
+        started = await graph.start()
+        _services = {name: service for name, service in started.items() if service is not None}
+        
+        degraded = [name for name, spec in graph.specs.items() if spec.state != 'ready']
+        if degraded:
+            logger.warning(f"⚠️ Running with mock services for {', '.join(degraded)} - some features have limited capabilities")
+        else:
             logger.info("✅ All services initialized successfully with REAL implementations!")
             logger.info("🐻 Mama Bear agents are now fully aware and capable!")
-            
-        except ImportError as e:
-            logger.warning(f"Some services not available, using available implementations: {e}")
-            # Try to initialize what we can
-            try:
-                from .mama_bear_memory_system import initialize_memory_manager
-                memory_manager = initialize_memory_manager()
-                logger.info("✅ Real MemoryManager initialized successfully")
-            except Exception as mem_error:
-                logger.warning(f"MemoryManager initialization failed: {mem_error}")
-                memory_manager = MockService('Memory Manager')
-            
-            _services = {
-                'mama_bear_agent': MockService('Mama Bear Agent'),
-                'memory_manager': memory_manager,
-                'scrapybara_manager': MockService('Scrapybara Manager'),
-                'theme_manager': MockService('Theme Manager')
-            }
-            
-            if isinstance(memory_manager, MockService):
-                logger.warning("⚠️ Running with some mock services - some features have limited capabilities")
-            else:
-                logger.info("✅ Memory system operational - persistent conversations enabled")
         
         _initialized = True
-        logger.info("✅ Service initialization completed")
+        logger.info(f"✅ Service initialization completed in {graph.total_seconds:.2f}s")
         
     except Exception as e:
         logger.error(f"❌ Failed to initialize services: {e}")
         raise
 
+def _init_timeout(service: str, default: float) -> float:
+    return float(os.getenv(f'SERVICE_INIT_TIMEOUT_{service}', str(default)))
+
+def _create_memory_manager():
+    # Constructing the Mem0 client talks to the network; runs on the init thread pool
+    from .mama_bear_memory_system import MemoryManager
+    return MemoryManager()
+
+def _create_model_manager():
+    # Schedules its health monitor on the running loop, so it starts on the loop thread
+    from .mama_bear_model_manager import ModelManager
+    return ModelManager()
+
+def _create_scrapybara_manager():
+    from .enhanced_scrapybara_integration import ScrapybaraManager
+    return ScrapybaraManager()
+
+def _create_orchestrator(memory_manager, model_manager, scrapybara_manager):
+    from .mama_bear_orchestration import AgentOrchestrator
+    if model_manager is None or isinstance(memory_manager, MockService):
+        raise RuntimeError("orchestrator needs the real memory and model managers")
+    return AgentOrchestrator(memory_manager, model_manager, scrapybara_manager)
+
+def _service_ready_late(name: str, service: Any) -> None:
+    """
+    A degraded service finished starting after its timeout, or was rebuilt
+    once the service it depends on did (memory -> mama_bear_agent); swap out the mock
+    """
+    _services[name] = service
+
 async def shutdown_all_services():
     """Shutdown all services"""
-    global _services, _initialized
+    global _services, _initialized, _service_graph
     
     try:
         logger.info("🛑 Shutting down all services...")
         _services.clear()
         _initialized = False
+        _service_graph = None
         logger.info("✅ All services shut down successfully")
         
     except Exception as e:
@@ -126,7 +147,8 @@ def get_service_status():
             name: service.initialized if hasattr(service, 'initialized') else True
             for name, service in _services.items()
         },
-        'total_services': len(_services)
+        'total_services': len(_services),
+        'startup': _service_graph.get_status() if _service_graph else None
     }
 
 # === ASYNC HELPER ===
@@ -143,10 +165,3 @@ def run_async(coro):
     except RuntimeError:
         # No event loop, create one
         return asyncio.run(coro)
-
-# Initialize on import
-if not _initialized:
-    try:
-        run_async(initialize_all_services())
-    except Exception as e:
-        logger.warning(f"Could not initialize services on import: {e}")
\ No newline at end of file
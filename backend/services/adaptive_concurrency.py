@@ -0,0 +1,393 @@
+# backend/services/adaptive_concurrency.py
+"""
+🚦 Adaptive Concurrency - Per (provider, model, account) in-flight limits
+Bursts used to go straight to the provider until 429s came back. Each
+provider/model/account now has a limiter whose limit adapts to what the
+provider sustains:
+
+- AIMD: +1 per limit's worth of successful calls while the limit is in use;
+  halve on rate limiting (429 / RESOURCE_EXHAUSTED) or timeouts, once per
+  window: calls already in flight when the limit was cut don't cut it
+  again, so a burst of concurrent 429s halves it once rather than N times
+- gradient: a gentle decrease (at most once per limit's worth of calls)
+  when the average latency of the last few calls rises well above the
+  average over a long window, before the provider starts rejecting. The
+  baseline is an average rather than the fastest call seen, so a model
+  serving a mix of short and long prompts isn't mistaken for an
+  overloaded one
+- excess calls queue in FIFO order with a deadline; a call is shed at once
+  (LoadShedError) when the queue is full or its expected wait already
+  exceeds the deadline, instead of timing out later
+- snapshots (limit, in flight, queued, load) feed model selection so new
+  work goes to models with headroom
+
+    limiter = get_concurrency_limiter("google_ai", "gemini-2.5-flash", "primary")
+    response = await limiter.run(lambda: model.generate_content_async(prompt))
+
+Limiter keys go through limiter_key(), so "google_ai"/"gemini",
+"models/gemini-2.5-flash"/"gemini-2.5-flash" and a missing account all land
+on the same limiter. Limiters are thread-safe and can be awaited from any
+event loop.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import concurrent.futures
+import logging
+from collections import deque
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple, TypeVar
+
+from .metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+INITIAL_LIMIT = float(os.getenv('ADAPTIVE_CONCURRENCY_INITIAL', '4'))
+MIN_LIMIT = float(os.getenv('ADAPTIVE_CONCURRENCY_MIN', '1'))
+MAX_LIMIT = float(os.getenv('ADAPTIVE_CONCURRENCY_MAX', '64'))
+MAX_QUEUE = int(os.getenv('ADAPTIVE_CONCURRENCY_MAX_QUEUE', '32'))
+QUEUE_TIMEOUT = float(os.getenv('ADAPTIVE_CONCURRENCY_QUEUE_TIMEOUT_SECONDS', '10'))
+LATENCY_WINDOW = int(os.getenv('ADAPTIVE_CONCURRENCY_LATENCY_WINDOW', '200'))
+RECENT_WINDOW = 20
+# Calls made without naming a billing account are charged to this one
+DEFAULT_ACCOUNT = os.getenv('ADAPTIVE_CONCURRENCY_DEFAULT_ACCOUNT', 'primary')
+
+PROVIDER_ALIASES = {'google_ai': 'gemini', 'google': 'gemini', 'anthropic': 'claude'}
+
+try:
+    from google.api_core.exceptions import ResourceExhausted, TooManyRequests
+    RATE_LIMIT_EXCEPTIONS: Tuple[type, ...] = (ResourceExhausted, TooManyRequests)
+except ImportError:
+    RATE_LIMIT_EXCEPTIONS = ()
+
+
+class LoadShedError(Exception):
+    """Raised instead of queueing a call the limiter cannot start in time"""
+
+    def __init__(self, key: Tuple[str, str, str], reason: str, detail: str):
+        self.key = key
+        self.reason = reason
+        provider, model, account = key
+        super().__init__(f"{provider}/{model}@{account} overloaded ({reason}): {detail}")
+
+
+def limiter_key(provider: str, model: str, account: Optional[str] = None) -> Tuple[str, str, str]:
+    """
+    (provider, model, account) with provider aliases folded together, the
+    "models/" prefix and case dropped from the model id and a missing
+    account set to DEFAULT_ACCOUNT
+    """
+    provider = provider.strip().lower()
+    model = model.strip().lower()
+    if model.startswith('models/'):
+        model = model[len('models/'):]
+    account = (account or '').strip().lower()
+    return (PROVIDER_ALIASES.get(provider, provider), model,
+            DEFAULT_ACCOUNT if account in ('', 'default') else account)
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """
+    Rate limiting from the error's type or status only: google.api_core
+    ResourceExhausted / TooManyRequests, an HTTP status of 429
+    (anthropic/openai RateLimitError, google GoogleAPICallError.code) or a
+    grpc RESOURCE_EXHAUSTED status. Messages are not inspected.
+    """
+    if RATE_LIMIT_EXCEPTIONS and isinstance(error, RATE_LIMIT_EXCEPTIONS):
+        return True
+    for attr in ('status_code', 'http_status', 'code'):
+        value = getattr(error, attr, None)
+        if callable(value):
+            try:
+                value = value()  # grpc errors: code() -> StatusCode
+            except Exception:
+                continue
+        if getattr(value, 'name', None) == 'RESOURCE_EXHAUSTED':
+            return True
+        if isinstance(value, int) and not isinstance(value, bool) and value == 429:
+            return True
+    return False
+
+
+class AdaptiveLimiter:
+    """🚦 Concurrency limit for one provider/model/account, adjusted from call outcomes"""
+
+    def __init__(self, key: Tuple[str, str, str],
+                 initial_limit: float = INITIAL_LIMIT,
+                 min_limit: float = MIN_LIMIT,
+                 max_limit: float = MAX_LIMIT,
+                 max_queue: int = MAX_QUEUE,
+                 queue_timeout: float = QUEUE_TIMEOUT,
+                 backoff: float = 0.5,
+                 latency_tolerance: float = 2.0):
+        self.key = key
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self._long = _RunningMean(LATENCY_WINDOW)
+        self._recent = _RunningMean(RECENT_WINDOW)
+        self._since_decrease = 0
+        self._last_backoff = float('-inf')
+        self._waiters: deque = deque()   # (future, deadline)
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'waited': 0, 'shed': 0, 'rate_limited': 0, 'timeouts': 0,
+                      'increases': 0, 'decreases': 0}
+
+    # -- admission --------------------------------------------------------------
+
+    async def acquire(self, deadline: Optional[float] = None) -> None:
+        """
+        Take a slot, waiting in line until `deadline` (time.monotonic()) at
+        the latest. Raises LoadShedError when no slot can be had in time.
+        """
+        now = time.monotonic()
+        deadline = deadline if deadline is not None else now + self.queue_timeout
+        with self._lock:
+            self.stats['calls'] += 1
+            if self.in_flight < self._capacity() and not self._waiters:
+                self.in_flight += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                raise self._shed('queue_full', f"{self.in_flight} in flight, {len(self._waiters)} queued")
+            expected_wait = self._expected_wait(len(self._waiters) + 1)
+            if now + expected_wait > deadline:
+                raise self._shed('deadline', f"expected wait {expected_wait:.2f}s exceeds the "
+                                             f"{max(0.0, deadline - now):.2f}s left")
+            granted: concurrent.futures.Future = concurrent.futures.Future()
+            self._waiters.append((granted, deadline))
+            self.stats['waited'] += 1
+
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(granted)), max(0.0, deadline - now))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                try:
+                    self._waiters.remove((granted, deadline))
+                    slot_granted = False
+                except ValueError:
+                    slot_granted = granted.done() and granted.exception() is None
+            if slot_granted:
+                # Handed a slot just as we gave up; pass it on
+                self.release(None, 'cancelled')
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            with self._lock:
+                raise self._shed('deadline', "no slot freed up before the deadline") from None
+
+    def release(self, latency: Optional[float], outcome: str) -> None:
+        """outcome: ok, rate_limited, timeout, error or cancelled"""
+        with self._lock:
+            in_use = self.in_flight
+            self.in_flight -= 1
+            self._adjust(latency, outcome, in_use)
+            self._grant_waiters()
+
+    async def run(self, fn: Callable[[], Awaitable[T]], deadline: Optional[float] = None) -> T:
+        """Run fn() under the limit, feeding its latency and outcome back"""
+        await self.acquire(deadline)
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            result = await fn()
+            outcome = 'ok'
+            return result
+        except asyncio.TimeoutError:
+            outcome = 'timeout'
+            raise
+        except asyncio.CancelledError:
+            outcome = 'cancelled'
+            raise
+        except Exception as e:
+            if is_rate_limit_error(e):
+                outcome = 'rate_limited'
+            raise
+        finally:
+            self.release(time.perf_counter() - start, outcome)
+
+    # -- internals ----------------------------------------------------------------
+
+    @property
+    def limit(self) -> float:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: float) -> None:
+        self._limit = value
+        self._slots = max(1, int(value))   # read on every routing decision
+
+    @property
+    def latency_baseline(self) -> Optional[float]:
+        return self._long.mean if len(self._long) else None
+
+    def _capacity(self) -> int:
+        return self._slots
+
+    def _expected_wait(self, position: int) -> float:
+        if not self.latency_ewma:
+            return 0.0
+        return position * self.latency_ewma / self._capacity()
+
+    def _shed(self, reason: str, detail: str) -> LoadShedError:
+        self.stats['shed'] += 1
+        _shed_metric().labels(*self.key, reason).inc()
+        return LoadShedError(self.key, reason, detail)
+
+    def _adjust(self, latency: Optional[float], outcome: str, in_use: int) -> None:
+        if outcome in ('rate_limited', 'timeout'):
+            self.stats['rate_limited' if outcome == 'rate_limited' else 'timeouts'] += 1
+            now = time.monotonic()
+            # Only calls started after the last cut saw the reduced limit
+            if latency is None or now - latency >= self._last_backoff:
+                self._last_backoff = now
+                self._set_limit(self.limit * self.backoff)
+            return
+        if outcome != 'ok' or latency is None:
+            return
+
+        self.latency_ewma = latency if self.latency_ewma is None else 0.8 * self.latency_ewma + 0.2 * latency
+        self._long.add(latency)
+        self._recent.add(latency)
+        self._since_decrease += 1
+
+        if len(self._long) >= 2 * RECENT_WINDOW and \
+                self._recent.mean > self.latency_tolerance * self._long.mean:
+            # One decrease per limit's worth of calls, so a slow stretch doesn't compound
+            if self._since_decrease >= self._capacity():
+                self._since_decrease = 0
+                self._set_limit(self.limit * 0.9)
+        elif in_use >= self._capacity() / 2:
+            # Only grow while the current limit is actually being used
+            self._set_limit(self.limit + 1.0 / self.limit)
+
+    def _set_limit(self, limit: float) -> None:
+        limit = min(self.max_limit, max(self.min_limit, limit))
+        if int(limit) > int(self.limit):
+            self.stats['increases'] += 1
+        elif int(limit) < int(self.limit):
+            self.stats['decreases'] += 1
+        self.limit = limit
+
+    def _grant_waiters(self) -> None:
+        now = time.monotonic()
+        while self._waiters and self.in_flight < self._capacity():
+            granted, deadline = self._waiters.popleft()
+            if granted.done():
+                continue
+            if deadline < now:
+                granted.set_exception(self._shed('deadline', "no slot freed up before the deadline"))
+                continue
+            self.in_flight += 1
+            granted.set_result(True)
+
+    # -- reporting ------------------------------------------------------------------
+
+    def load(self) -> float:
+        """(in flight + queued) / limit; above 1 means calls are queueing"""
+        return (self.in_flight + len(self._waiters)) / self._capacity()
+
+    def saturated(self) -> bool:
+        """No free slot right now"""
+        return self.in_flight >= self._capacity()
+
+    def would_shed(self) -> bool:
+        """A new call would be rejected outright"""
+        return len(self._waiters) >= self.max_queue
+
+    def routing_state(self) -> Tuple[bool, bool, float]:
+        """(would_shed, saturated, load) at once, for ranking every model on each request"""
+        queued = len(self._waiters)
+        return queued >= self.max_queue, self.in_flight >= self._slots, (self.in_flight + queued) / self._slots
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'limit': round(self.limit, 2),
+                'in_flight': self.in_flight,
+                'queued': len(self._waiters),
+                'load': round(self.load(), 3),
+                'latency_ewma_ms': round(self.latency_ewma * 1000, 1) if self.latency_ewma else None,
+                'latency_baseline_ms': round(self.latency_baseline * 1000, 1) if self.latency_baseline else None,
+                **self.stats
+            }
+
+
+class _RunningMean:
+    """Mean of the last `size` values"""
+
+    def __init__(self, size: int):
+        self.values: deque = deque(maxlen=size)
+        self.total = 0.0
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def add(self, value: float) -> None:
+        if len(self.values) == self.values.maxlen:
+            self.total -= self.values[0]
+        self.values.append(value)
+        self.total += value
+
+    @property
+    def mean(self) -> float:
+        return self.total / len(self.values)
+
+
+def _shed_metric():
+    return get_metrics_registry().counter(
+        'mama_bear_load_shed_total', "Calls rejected by adaptive concurrency limiters",
+        ('provider', 'model', 'account', 'reason'))
+
+
+_limiters: Dict[Tuple[str, str, str], AdaptiveLimiter] = {}
+_limiters_lock = threading.Lock()
+# The same limiters by the arguments callers pass, so the per-model lookups in
+# model selection skip normalising the key and taking the lock
+_limiters_by_args: Dict[Tuple[str, str, Optional[str]], AdaptiveLimiter] = {}
+
+
+def _collect_metrics() -> None:
+    metrics = get_metrics_registry()
+    limit = metrics.gauge('mama_bear_concurrency_limit', "Adaptive concurrency limit",
+                          ('provider', 'model', 'account'))
+    in_flight = metrics.gauge('mama_bear_concurrency_in_flight', "Calls holding a limiter slot",
+                              ('provider', 'model', 'account'))
+    queued = metrics.gauge('mama_bear_concurrency_queued', "Calls waiting for a limiter slot",
+                           ('provider', 'model', 'account'))
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    for limiter in limiters:
+        limit.labels(*limiter.key).set(limiter.limit)
+        in_flight.labels(*limiter.key).set(limiter.in_flight)
+        queued.labels(*limiter.key).set(len(limiter._waiters))
+
+
+def get_concurrency_limiter(provider: str, model: str, account: Optional[str] = None) -> AdaptiveLimiter:
+    """Process-wide limiter for one provider/model/account (normalised by limiter_key)"""
+    limiter = _limiters_by_args.get((provider, model, account))
+    if limiter is not None:
+        return limiter
+    key = limiter_key(provider, model, account)
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None:
+            if not _limiters:
+                get_metrics_registry().register_collector("adaptive_concurrency", _collect_metrics)
+            limiter = _limiters[key] = AdaptiveLimiter(key)
+        _limiters_by_args[(provider, model, account)] = limiter
+        return limiter
+
+
+def get_limiter_stats() -> Dict[str, Any]:
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {'/'.join(limiter.key): limiter.snapshot() for limiter in limiters}
@@ -8,7 +8,11 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 import logging
 import os
+import time
+import threading
 
+from .record_index import RecordIndex
+from .write_behind_store import WriteBehindStore
 from .enhanced_gemini_scout_orchestration import enhanced_scout_orchestrator
 from .intelligent_execution_router import get_intelligent_router
 
@@ -50,6 +54,23 @@ class AgentCreationWorkbench:
         os.makedirs(self.agents_storage_path, exist_ok=True)
         os.makedirs(self.templates_storage_path, exist_ok=True)
         
+        # In-memory indexes: templates are re-read only when their files change
+        # (directory mtime, plus a per-file mtime rescan every
+        # AGENT_TEMPLATE_RESCAN_SECONDS); agents are indexed write-through
+        self.template_index = RecordIndex(keys=('type',), text_fields=('name', 'description'))
+        self.agent_index = RecordIndex(keys=('owner_id', 'status'), text_fields=('name',))
+        self.template_rescan_seconds = float(os.getenv('AGENT_TEMPLATE_RESCAN_SECONDS', '5'))
+        self._template_mtimes: Dict[str, int] = {}
+        self._templates_dir_mtime: Optional[int] = None
+        self._templates_scanned_at = 0.0
+        self._templates_lock = threading.Lock()
+        
+        # Agent instances live in one SQLite table written behind in batches
+        # (data/agents/*.json from earlier versions is imported once)
+        self.agent_store = WriteBehindStore(
+            os.getenv('AGENT_DB_PATH', os.path.join(os.getcwd(), "data", "agents.db")),
+            'agents', indexed=('owner_id', 'status'))
+        
         # Initialize default templates
         self._initialize_default_templates()
         
@@ -146,8 +167,12 @@ class AgentCreationWorkbench:
             )
         ]
         
-        # Save default templates
+        # Save default templates (unchanged ones are left alone)
+        self._refresh_templates()
         for template in default_templates:
+            existing = self.template_index.get(template.id)
+            if existing and {**existing, 'created_at': template.created_at} == asdict(template):
+                continue
             self._save_template(template)
 
     async def create_custom_agent(self, 
@@ -312,29 +337,44 @@ class AgentCreationWorkbench:
 
     def get_agent_templates(self, template_type: Optional[str] = None) -> List[Dict[str, Any]]:
         """Get available agent templates"""
-        templates = []
-        
-        try:
-            for filename in os.listdir(self.templates_storage_path):
-                if filename.endswith('.json'):
-                    template = self._load_template(filename[:-5])  # Remove .json
-                    if template and (not template_type or template.type == template_type):
-                        templates.append(asdict(template))
-                        
-        except Exception as e:
-            self.logger.error(f"Failed to load templates: {str(e)}")
-        
-        return templates
+        self._refresh_templates()
+        ids = self.template_index.ids_where('type', template_type) if template_type else None
+        return self._sorted_records(self.template_index, ids)
 
     def get_user_agents(self, user_id: str) -> List[Dict[str, Any]]:
         """Get all agents owned by user"""
-        user_agents = []
-        
-        for agent in self.active_agents.values():
-            if agent.owner_id == user_id:
-                user_agents.append(asdict(agent))
-        
-        return user_agents
+        return self._sorted_records(self.agent_index, self.agent_index.ids_where('owner_id', user_id))
+
+    def search(self, query: str = '', template_type: Optional[str] = None,
+               user_id: Optional[str] = None) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Search templates (name and description, optionally by type) and, when
+        user_id is given, that user's agents (by name). The query matches
+        as a case-insensitive substring, as the linear scan did.
+        """
+        self._refresh_templates()
+        templates = self._sorted_records(
+            self.template_index, self.template_index.search(query, type=template_type))
+        agents = []
+        if user_id:
+            agents = self._sorted_records(
+                self.agent_index, self.agent_index.search(query, owner_id=user_id))
+        return {'templates': templates, 'agents': agents}
+
+    def get_workbench_stats(self, user_id: Optional[str] = None) -> Dict[str, Any]:
+        """Template and agent counts, straight from the indexes"""
+        self._refresh_templates()
+        template_types = self.template_index.counts_by('type')
+        return {
+            'total_templates': len(self.template_index),
+            'total_agents': len(self.agent_index),
+            'active_agents': self.agent_index.count_where('status', 'active'),
+            'user_agents': self.agent_index.count_where('owner_id', user_id) if user_id else 0,
+            'template_types': {
+                template_type: template_types.get(template_type, 0)
+                for template_type in ('research', 'ui_design', 'api', 'security', 'custom')
+            }
+        }
 
     async def get_agent_performance(self, agent_id: str) -> Dict[str, Any]:
         """Get detailed performance metrics for agent"""
@@ -450,46 +490,118 @@ class AgentCreationWorkbench:
         """Save agent template to storage"""
         try:
             template_path = os.path.join(self.templates_storage_path, f"{template.id}.json")
-            with open(template_path, 'w') as f:
+            temp_path = f"{template_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w') as f:
                 json.dump(asdict(template), f, indent=2)
+            os.replace(temp_path, template_path)
+            with self._templates_lock:
+                self.template_index.put(template.id, asdict(template))
+                self._template_mtimes[template.id] = os.stat(template_path).st_mtime_ns
         except Exception as e:
             self.logger.error(f"Failed to save template: {str(e)}")
 
     def _load_template(self, template_id: str) -> Optional[AgentTemplate]:
         """Load agent template from storage"""
+        self._refresh_templates()
+        data = self.template_index.get(template_id)
+        return AgentTemplate(**data) if data else None
+
+    def _read_template_file(self, template_id: str) -> Optional[Dict[str, Any]]:
         try:
             template_path = os.path.join(self.templates_storage_path, f"{template_id}.json")
-            if os.path.exists(template_path):
-                with open(template_path, 'r') as f:
-                    data = json.load(f)
-                return AgentTemplate(**data)
+            with open(template_path, 'r') as f:
+                return asdict(AgentTemplate(**json.load(f)))
         except Exception as e:
             self.logger.error(f"Failed to load template: {str(e)}")
         return None
 
+    def _refresh_templates(self):
+        """
+        Bring the template index up to date with the templates directory.
+        Files added or removed change the directory mtime and trigger a
+        rescan at once; edits in place are picked up by the periodic rescan.
+        Only files whose mtime changed are re-parsed.
+        """
+        try:
+            dir_mtime = os.stat(self.templates_storage_path).st_mtime_ns
+        except OSError as e:
+            self.logger.error(f"Failed to load templates: {str(e)}")
+            return
+        now = time.monotonic()
+        if dir_mtime == self._templates_dir_mtime and now - self._templates_scanned_at < self.template_rescan_seconds:
+            return
+        
+        with self._templates_lock:
+            seen = set()
+            with os.scandir(self.templates_storage_path) as entries:
+                for entry in entries:
+                    if not entry.name.endswith('.json'):
+                        continue
+                    template_id = entry.name[:-5]  # Remove .json
+                    seen.add(template_id)
+                    mtime = entry.stat().st_mtime_ns
+                    if self._template_mtimes.get(template_id) == mtime:
+                        continue
+                    data = self._read_template_file(template_id)
+                    if data is None:
+                        self.template_index.remove(template_id)
+                    else:
+                        self.template_index.put(template_id, data)
+                    self._template_mtimes[template_id] = mtime
+            for template_id in set(self._template_mtimes) - seen:
+                self.template_index.remove(template_id)
+                del self._template_mtimes[template_id]
+            self._templates_dir_mtime = dir_mtime
+            self._templates_scanned_at = now
+
     def _save_agent_instance(self, agent: AgentInstance):
-        """Save agent instance to storage"""
+        """Save agent instance to storage (written behind; rapid updates coalesce)"""
+        snapshot = asdict(agent)
+        if agent.id in self.active_agents:
+            self.agent_index.put(agent.id, snapshot)
         try:
-            agent_path = os.path.join(self.agents_storage_path, f"{agent.id}.json")
-            with open(agent_path, 'w') as f:
-                json.dump(asdict(agent), f, indent=2)
+            self.agent_store.put(agent.id, snapshot)
         except Exception as e:
             self.logger.error(f"Failed to save agent instance: {str(e)}")
 
     def _load_active_agents(self):
         """Load active agents from storage"""
         try:
-            for filename in os.listdir(self.agents_storage_path):
-                if filename.endswith('.json'):
-                    agent_path = os.path.join(self.agents_storage_path, filename)
-                    with open(agent_path, 'r') as f:
-                        data = json.load(f)
-                    agent = AgentInstance(**data)
-                    if agent.status in ['active', 'paused']:
-                        self.active_agents[agent.id] = agent
+            self._import_json_agents()
+            for data in self.agent_store.load(status=['active', 'paused']):
+                agent = AgentInstance(**data)
+                self.active_agents[agent.id] = agent
+                self.agent_index.put(agent.id, data)
         except Exception as e:
             self.logger.error(f"Failed to load active agents: {str(e)}")
 
+    def _import_json_agents(self):
+        """One-time import of per-agent JSON files into the agent store"""
+        if self.agent_store.count() > 0:
+            return
+        agents = []
+        for filename in os.listdir(self.agents_storage_path):
+            if filename.endswith('.json'):
+                try:
+                    with open(os.path.join(self.agents_storage_path, filename), 'r') as f:
+                        agents.append(asdict(AgentInstance(**json.load(f))))
+                except Exception as e:
+                    self.logger.error(f"Failed to import agent {filename}: {str(e)}")
+        # The store keeps records in the order they are first put
+        agents.sort(key=lambda data: data.get('created_at') or '')
+        for data in agents:
+            self.agent_store.put(data['id'], data)
+        if agents:
+            self.agent_store.flush()
+            self.logger.info(f"Imported {len(agents)} agents from {self.agents_storage_path} into the agent store")
+
+    @staticmethod
+    def _sorted_records(index: RecordIndex, ids) -> List[Dict[str, Any]]:
+        """Copies of the indexed records, oldest first"""
+        records = index.records(ids)
+        records.sort(key=lambda record: (record.get('created_at') or '', record.get('name') or ''))
+        return [dict(record) for record in records]
+
     def _calculate_uptime(self, agent: AgentInstance) -> float:
         """Calculate agent uptime in hours"""
         if not agent.deployed_at:
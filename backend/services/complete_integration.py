@@ -19,6 +19,7 @@ from services.mama_bear_orchestration import AgentOrchestrator, initialize_orche
 from services.mama_bear_workflow_logic import initialize_workflow_intelligence
 from services.mama_bear_memory_system import initialize_enhanced_memory
 from services.mama_bear_specialized_variants import *
+from services.service_graph import ServiceGraph, DEFAULT_INIT_TIMEOUT
 from api.mama_bear_orchestration_api import integrate_orchestration_with_app
 from utils.mama_bear_monitoring import MamaBearMonitoring
 from config.mama_bear_config_setup import load_config
@@ -66,6 +67,7 @@ class CompleteMamaBearSystem:
         self.mem0_client = None
         
         # System state
+        self.service_graph = None
         self.is_initialized = False
         self.startup_time = None
         
@@ -76,20 +78,9 @@ class CompleteMamaBearSystem:
         start_time = datetime.now()
         
         try:
-            # 1. Initialize external services
-            await self._initialize_external_services()
-            
-            # 2. Initialize core AI components
-            await self._initialize_ai_components()
-            
-            # 3. Initialize Flask application
-            self._initialize_flask_app()
-            
-            # 4. Initialize orchestration system
-            await self._initialize_orchestration()
-            
-            # 5. Initialize monitoring and analytics
-            await self._initialize_monitoring()
+            # 1-5. Bring up components concurrently, each once its dependencies are ready
+            self.service_graph = self._build_service_graph()
+            await self.service_graph.start()
             
             # 6. Start background services
             await self._start_background_services()
@@ -112,12 +103,37 @@ class CompleteMamaBearSystem:
             logger.error(f"❌ Mama Bear System initialization failed: {e}")
             raise
     
-    async def _initialize_external_services(self):
-        """Initialize external services"""
-        
-        logger.info("🔌 Initializing external services...")
+    def _build_service_graph(self) -> ServiceGraph:
+        """
+        Component dependencies. External clients, the model manager and the
+        Flask app don't need each other and start together; model warm-up,
+        Scrapybara, Mem0 and monitoring are optional and fall back to
+        degraded mode if they fail or are slow.
+        """
+        timeout = float(self.config.get('SERVICE_INIT_TIMEOUT_SECONDS', DEFAULT_INIT_TIMEOUT))
+        graph = ServiceGraph()
+        graph.add('scrapybara', lambda: self._initialize_scrapybara(),
+                  optional=True, timeout=timeout)
+        graph.add('mem0', lambda: self._initialize_mem0(),
+                  optional=True, timeout=timeout)
+        graph.add('model_manager', lambda: self._initialize_model_manager(), on_loop=True, timeout=timeout)
+        graph.add('model_warm_up', lambda model_manager: self.model_manager.warm_up_models(),
+                  depends_on=('model_manager',), optional=True, on_loop=True, timeout=timeout)
+        graph.add('memory_manager', lambda mem0: self._initialize_memory_manager(),
+                  depends_on=('mem0',), timeout=timeout)
+        graph.add('workflow_intelligence', lambda model_manager, memory_manager: self._initialize_workflow_intelligence(),
+                  depends_on=('model_manager', 'memory_manager'), timeout=timeout)
+        graph.add('flask_app', lambda: self._initialize_flask_app(), timeout=timeout)
+        graph.add('orchestration', lambda **_: self._initialize_orchestration(),
+                  depends_on=('flask_app', 'memory_manager', 'model_manager', 'scrapybara', 'workflow_intelligence'),
+                  on_loop=True, timeout=timeout)
+        graph.add('monitoring', lambda **_: self._initialize_monitoring(),
+                  depends_on=('flask_app', 'model_manager'), optional=True, on_loop=True, timeout=timeout)
+        return graph
+    
+    def _initialize_scrapybara(self):
+        """Initialize the Scrapybara client"""
         
-        # Initialize Scrapybara
         try:
             api_key = self.config.get('SCRAPYBARA_API_KEY')
             if api_key:
@@ -127,8 +143,11 @@ class CompleteMamaBearSystem:
                 logger.warning("⚠️ Scrapybara API key not found")
         except Exception as e:
             logger.warning(f"⚠️ Scrapybara initialization failed: {e}")
+        return self.scrapybara_client
+    
+    def _initialize_mem0(self):
+        """Initialize the Mem0 client"""
         
-        # Initialize Mem0
         if MEM0_AVAILABLE:
             try:
                 mem0_api_key = self.config.get('MEM0_API_KEY')
@@ -141,27 +160,31 @@ class CompleteMamaBearSystem:
                 logger.warning(f"⚠️ Mem0 initialization failed: {e}")
         else:
             logger.warning("⚠️ Mem0 not available - install mem0ai package")
+        return self.mem0_client
     
-    async def _initialize_ai_components(self):
-        """Initialize core AI components"""
-        
-        logger.info("🤖 Initializing AI components...")
+    def _initialize_model_manager(self):
+        """Initialize model manager with intelligent quota management"""
         
-        # Initialize model manager with intelligent quota management
         self.model_manager = MamaBearModelManager()
-        await self.model_manager.warm_up_models()
         logger.info("✅ Model Manager initialized")
+        return self.model_manager
+    
+    def _initialize_memory_manager(self):
+        """Initialize enhanced memory system"""
         
-        # Initialize enhanced memory system
         self.memory_manager = initialize_enhanced_memory(self.mem0_client)
         logger.info("✅ Memory Manager initialized")
+        return self.memory_manager
+    
+    def _initialize_workflow_intelligence(self):
+        """Initialize workflow intelligence"""
         
-        # Initialize workflow intelligence
         self.workflow_intelligence, self.collaboration_orchestrator = initialize_workflow_intelligence(
             self.model_manager, 
             self.memory_manager
         )
         logger.info("✅ Workflow Intelligence initialized")
+        return self.workflow_intelligence
     
     def _initialize_flask_app(self):
         """Initialize Flask application"""
@@ -187,21 +210,23 @@ class CompleteMamaBearSystem:
                     'orchestrator': self.orchestrator is not None,
                     'scrapybara': self.scrapybara_client is not None,
                     'mem0': self.mem0_client is not None
-                }
+                },
+                'startup': self.service_graph.get_status() if self.service_graph else None
             })
         
-        # Store components in app context
-        self.app.mama_bear_model_manager = self.model_manager
-        self.app.mama_bear_memory_manager = self.memory_manager
-        self.app.mama_bear_scrapybara_client = self.scrapybara_client
-        
         logger.info("✅ Flask application initialized")
+        return self.app
     
     async def _initialize_orchestration(self):
         """Initialize agent orchestration system"""
         
         logger.info("🎭 Initializing orchestration system...")
         
+        # Store components in app context
+        self.app.mama_bear_model_manager = self.model_manager
+        self.app.mama_bear_memory_manager = self.memory_manager
+        self.app.mama_bear_scrapybara_client = self.scrapybara_client
+        
         # Initialize orchestrator with all components
         self.orchestrator = await initialize_orchestration(
             self.app,
@@ -224,6 +249,7 @@ class CompleteMamaBearSystem:
         )
         
         logger.info("✅ Orchestration system initialized")
+        return self.orchestrator
     
     async def _initialize_monitoring(self):
         """Initialize monitoring and analytics"""
@@ -234,6 +260,7 @@ class CompleteMamaBearSystem:
         self.app.mama_bear_monitoring = self.monitoring
         
         logger.info("✅ Monitoring initialized")
+        return self.monitoring
     
     async def _start_background_services(self):
         """Start background services"""
@@ -0,0 +1,448 @@
+# backend/services/context_budget.py
+"""
+📐 Context Budget - Token-accurate history packing
+Counts tokens per provider with a fast local approximation (exact for OpenAI
+when tiktoken is installed), memoizes per-message counts, keeps recent turns
+verbatim and folds older turns into a cached rolling summary so each request
+stays inside the model's window at the lowest input-token cost.
+"""
+
+import os
+import re
+import hashlib
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Approximate tokenizer: word pieces, digit groups, non-ASCII characters and
+# punctuation each cost about one token; a single space merges into the next word.
+_TOKEN_PIECES = re.compile(r"[A-Za-z]+|\d{1,3}|[^\x00-\x7f]|\s{2,}|\n|[^\sA-Za-z\d]")
+
+# Relative to the BPE vocabularies the approximation is tuned on
+PROVIDER_TOKEN_FACTORS = {
+    "openai": 1.0,
+    "anthropic": 1.1,
+    "claude": 1.1,
+    "google": 0.95,
+    "gemini": 0.95
+}
+
+# Per-message framing (role markers, separators)
+PROVIDER_MESSAGE_OVERHEAD = {
+    "openai": 4,
+    "anthropic": 3,
+    "claude": 3,
+    "google": 2,
+    "gemini": 2
+}
+
+# Known input windows, matched by model-name prefix (longest prefix wins)
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o": 128000,
+    "gpt-4-turbo": 128000,
+    "gpt-4": 8192,
+    "gpt-3.5-turbo": 16385,
+    "claude-3": 200000,
+    "claude-sonnet-4": 200000,
+    "claude-opus-4": 200000,
+    "gemini-1.5-pro": 2097152,
+    "gemini-1.5-flash": 1048576,
+    "gemini-2.0": 1048576,
+    "gemini-2.5": 1048576
+}
+DEFAULT_CONTEXT_WINDOW = 32768
+
+# Cut into the middle of an oversized recent turn
+_TRUNCATION_MARKER = " … [truncated] … "
+# A recent turn that would shrink below this is folded into the summary instead
+_MIN_TRUNCATED_TOKENS = 32
+
+
+def approximate_tokens(text: str) -> int:
+    """Provider-neutral token approximation"""
+    count = 0
+    for piece in _TOKEN_PIECES.findall(text):
+        length = len(piece)
+        if length > 7 and piece[0].isalpha():
+            count += 1 + (length - 1) // 7
+        else:
+            count += 1
+    return count
+
+
+def context_window_for(model: str) -> int:
+    name = model.split('/')[-1]
+    best = None
+    for prefix in MODEL_CONTEXT_WINDOWS:
+        if name.startswith(prefix) and (best is None or len(prefix) > len(best)):
+            best = prefix
+    return MODEL_CONTEXT_WINDOWS[best] if best else DEFAULT_CONTEXT_WINDOW
+
+
+def _content_text(content: Any) -> str:
+    """Flatten multi-part message content (text + image parts) to its text"""
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return ' '.join(
+            part.get('text', '') if isinstance(part, dict) else str(part) for part in content
+        )
+    return str(content or '')
+
+
+class TokenCounter:
+    """
+    🔢 Memoized per-provider token counts
+
+    Counts are cached by content hash, so re-sending the same history costs
+    one hash per message instead of a re-tokenization.
+    """
+
+    def __init__(self, max_entries: int = 20000):
+        self.max_entries = max_entries
+        self._cache: 'OrderedDict[Tuple[str, bytes], int]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._encoding = None
+        if TIKTOKEN_AVAILABLE:
+            try:
+                self._encoding = tiktoken.get_encoding("o200k_base")
+            except Exception as e:
+                logger.debug(f"tiktoken encoding unavailable, using approximation: {e}")
+        self.hits = 0
+        self.misses = 0
+
+    def count(self, text: str, provider: str = "openai") -> int:
+        if not text:
+            return 0
+        key = (provider, hashlib.blake2b(text.encode('utf-8', 'surrogatepass'), digest_size=16).digest())
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return cached
+
+        if provider == "openai" and self._encoding is not None:
+            tokens = len(self._encoding.encode(text, disallowed_special=()))
+        else:
+            tokens = int(round(approximate_tokens(text) * PROVIDER_TOKEN_FACTORS.get(provider, 1.0)))
+
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = tokens
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: Dict[str, Any], provider: str = "openai") -> int:
+        return (self.count(_content_text(message.get('content')), provider)
+                + PROVIDER_MESSAGE_OVERHEAD.get(provider, 3))
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._cache),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'exact_openai': self._encoding is not None
+        }
+
+
+def extractive_summary(turns: List[Dict[str, Any]], previous: str = "", max_chars_per_turn: int = 160) -> str:
+    """Cheap local summarizer: the opening sentence of each folded turn"""
+    lines = [previous] if previous else []
+    for turn in turns:
+        text = ' '.join(_content_text(turn.get('content')).split())
+        if not text:
+            continue
+        sentence_end = re.search(r'[.!?](\s|$)', text)
+        snippet = text[:sentence_end.end()].strip() if sentence_end else text
+        if len(snippet) > max_chars_per_turn:
+            snippet = snippet[:max_chars_per_turn - 1].rstrip() + '…'
+        lines.append(f"- {turn.get('role', 'user')}: {snippet}")
+    return '\n'.join(lines)
+
+
+@dataclass
+class _RollingSummary:
+    start: int     # position of the first message the chain covers
+    covered: int   # position one past the last summarized message
+    chain: bytes   # hash chain of messages [start, covered)
+    last: bytes    # hash of message covered - 1
+    text: str
+
+
+@dataclass
+class ContextWindow:
+    """Result of packing a conversation into a budget"""
+    messages: List[Dict[str, Any]]
+    summary: str
+    input_tokens: int
+    budget_tokens: int
+    verbatim_turns: int
+    summarized_turns: int
+    dropped_tokens: int = 0
+    truncated_turns: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'input_tokens': self.input_tokens,
+            'budget_tokens': self.budget_tokens,
+            'verbatim_turns': self.verbatim_turns,
+            'summarized_turns': self.summarized_turns,
+            'truncated_turns': self.truncated_turns,
+            'summary_tokens_saved': self.dropped_tokens
+        }
+
+
+class ContextBudgeter:
+    """
+    📐 Packs conversation history into a token budget
+
+    The budget is the smaller of the model window (minus the output reserve
+    and system prompt) and a cost cap. Recent turns are kept verbatim; turns
+    that no longer fit are folded into a rolling summary that is cached per
+    conversation and only extended as new turns age out. The last
+    `min_recent_turns` are always sent, but cut down in the middle when they
+    alone exceed the budget; an older one that would shrink to almost
+    nothing is folded instead.
+    """
+
+    def __init__(self,
+                 counter: Optional[TokenCounter] = None,
+                 max_input_tokens: Optional[int] = None,
+                 summary_share: float = 0.2,
+                 min_recent_turns: int = 2,
+                 summarizer: Callable[[List[Dict[str, Any]], str], str] = extractive_summary,
+                 max_conversations: int = 1000):
+        self.counter = counter or TokenCounter()
+        self.max_input_tokens = max_input_tokens or int(os.getenv('CHAT_CONTEXT_MAX_INPUT_TOKENS', '16000'))
+        self.summary_share = summary_share
+        self.min_recent_turns = min_recent_turns
+        self.summarizer = summarizer
+        self.max_conversations = max_conversations
+
+        self._summaries: 'OrderedDict[str, _RollingSummary]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.metrics = {
+            'requests': 0,
+            'compacted_requests': 0,
+            'summary_cache_hits': 0,
+            'truncated_turns': 0,
+            'tokens_saved': 0
+        }
+
+    def budget_for(self, model: str, max_output_tokens: int, system_tokens: int = 0) -> int:
+        window_budget = context_window_for(model) - max_output_tokens - system_tokens
+        return max(0, min(window_budget, self.max_input_tokens - system_tokens))
+
+    def fit(self,
+            messages: List[Dict[str, Any]],
+            provider: str,
+            model: str,
+            max_output_tokens: int = 4096,
+            system_prompt: str = "",
+            conversation_id: Optional[str] = None,
+            system_messages: Optional[List[Dict[str, Any]]] = None,
+            first_position: int = 0) -> ContextWindow:
+        """
+        Pack `messages` (oldest first, system messages excluded) into the budget.
+        `system_messages` are sent as-is alongside `system_prompt` (e.g. ones the
+        client supplied); they are never folded but count against the budget.
+        `first_position` is where messages[0] sits in the full conversation when
+        the caller only holds its tail (older turns spilled to disk), so the
+        cached summary survives the window moving on.
+        """
+        self._count('requests')
+        system_tokens = self.counter.count(system_prompt, provider) if system_prompt else 0
+        system_tokens += sum(self.counter.count_message(message, provider) for message in system_messages or ())
+        budget = self.budget_for(model, max_output_tokens, system_tokens)
+
+        costs = [self.counter.count_message(message, provider) for message in messages]
+        total = sum(costs)
+        if total <= budget:
+            return ContextWindow(list(messages), "", total, budget, len(messages), 0)
+
+        # Walk back from the newest turn until the verbatim share is spent
+        verbatim_budget = budget - int(budget * self.summary_share)
+        used = 0
+        split = len(messages)
+        while split > 0:
+            cost = costs[split - 1]
+            must_keep = len(messages) - split < self.min_recent_turns
+            if used + cost > verbatim_budget and not must_keep:
+                break
+            used += cost
+            split -= 1
+
+        # The turns that must be kept may not fit on their own
+        keep_from = split
+        recent = list(messages[split:])
+        truncated = 0
+        for i, position in enumerate(range(keep_from, len(messages))):
+            excess = used - budget
+            if excess <= 0:
+                break
+            allowed = costs[position] - excess
+            if position < len(messages) - 1 and allowed < _MIN_TRUNCATED_TOKENS:
+                used -= costs[position]
+                split = position + 1
+                continue
+            recent[i] = self._truncate_message(recent[i], allowed, provider)
+            used += self.counter.count_message(recent[i], provider) - costs[position]
+            truncated += 1
+        recent = recent[split - keep_from:]
+
+        folded = messages[:split]
+        summary = self._rolling_summary(conversation_id, folded, first_position) if folded else ""
+        summary_tokens = self.counter.count(summary, provider)
+
+        # Trim the oldest summary lines if the summary outgrew its share
+        summary_budget = max(0, budget - used)
+        if summary_tokens > summary_budget:
+            lines = summary.split('\n')
+            line_costs = [self.counter.count(line, provider) + 1 for line in lines]
+            start = 0
+            while start < len(lines) and summary_tokens > summary_budget:
+                summary_tokens -= line_costs[start]
+                start += 1
+            summary = '\n'.join(lines[start:])
+            summary_tokens = self.counter.count(summary, provider)
+            # Keep the cached summary bounded too
+            with self._lock:
+                cached = self._summaries.get(conversation_id) if conversation_id else None
+                if cached is not None:
+                    cached.text = summary
+
+        input_tokens = used + summary_tokens
+        saved = sum(costs[:split]) - summary_tokens
+        self._count('compacted_requests')
+        self._count('tokens_saved', max(0, saved))
+        self._count('truncated_turns', truncated)
+
+        return ContextWindow(recent, summary, input_tokens, budget, len(recent), len(folded),
+                             dropped_tokens=max(0, saved), truncated_turns=truncated)
+
+    def _truncate_message(self, message: Dict[str, Any], max_tokens: int, provider: str) -> Dict[str, Any]:
+        """Copy of `message` cut down in the middle to at most `max_tokens`"""
+        content = message.get('content')
+        full_text = _content_text(content)
+        text_budget = max_tokens - PROVIDER_MESSAGE_OVERHEAD.get(provider, 3)
+        while True:
+            text = self._truncate_text(full_text, text_budget, provider)
+            if isinstance(content, list):
+                # Keep the non-text parts (images) as they are
+                truncated = {**message, 'content': [{'type': 'text', 'text': text}] + [
+                    part for part in content if not (isinstance(part, dict) and 'text' in part)]}
+            else:
+                truncated = {**message, 'content': text}
+            # Joining the parts back can cost a token or two more than the text alone
+            over = self.counter.count_message(truncated, provider) - max_tokens
+            if over <= 0 or not text:
+                return truncated
+            text_budget -= over
+
+    def _truncate_text(self, text: str, max_tokens: int, provider: str) -> str:
+        """Longest head + marker + tail of `text` that fits in `max_tokens`"""
+        if self.counter.count(text, provider) <= max_tokens:
+            return text
+        if self.counter.count(_TRUNCATION_MARKER, provider) > max_tokens:
+            return ""
+        low, high = 0, len(text) // 2
+        while low < high:
+            keep = (low + high + 1) // 2
+            if self.counter.count(text[:keep] + _TRUNCATION_MARKER + text[-keep:], provider) <= max_tokens:
+                low = keep
+            else:
+                high = keep - 1
+        return text[:low] + _TRUNCATION_MARKER + text[len(text) - low:]
+
+    def _rolling_summary(self, conversation_id: Optional[str], folded: List[Dict[str, Any]],
+                         first: int = 0) -> str:
+        """Summary of `folded`, whose first message is at position `first` in the conversation"""
+        hashes = [
+            hashlib.blake2b(
+                f"{m.get('role')}\x00{_content_text(m.get('content'))}".encode('utf-8', 'surrogatepass'),
+                digest_size=16
+            ).digest()
+            for m in folded
+        ]
+
+        with self._lock:
+            cached = self._summaries.get(conversation_id) if conversation_id else None
+
+        usable = False
+        if cached is not None and first <= cached.covered <= first + len(folded):
+            overlap = cached.covered - first
+            if cached.start == first:
+                usable = self._chain(hashes[:overlap]) == cached.chain
+            elif cached.start < first:
+                # Turns before `first` left the window (spilled history is
+                # append-only); check the part that is still visible
+                usable = overlap == 0 or hashes[overlap - 1] == cached.last
+
+        if usable:
+            if cached.covered == first + len(folded):
+                self._count('summary_cache_hits')
+                text = cached.text
+            else:
+                text = self.summarizer(folded[cached.covered - first:], cached.text)
+        else:
+            # History was edited or is new to us - summarize from scratch
+            text = self.summarizer(folded, "")
+
+        if conversation_id:
+            with self._lock:
+                self._summaries[conversation_id] = _RollingSummary(
+                    first, first + len(folded), self._chain(hashes), hashes[-1], text)
+                self._summaries.move_to_end(conversation_id)
+                if len(self._summaries) > self.max_conversations:
+                    self._summaries.popitem(last=False)
+        return text
+
+    @staticmethod
+    def _chain(hashes: List[bytes]) -> bytes:
+        digest = hashlib.blake2b(digest_size=16)
+        for h in hashes:
+            digest.update(h)
+        return digest.digest()
+
+    def _count(self, metric: str, amount: int = 1) -> None:
+        with self._lock:
+            self.metrics[metric] += amount
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            metrics = dict(self.metrics)
+        return {
+            **metrics,
+            'max_input_tokens': self.max_input_tokens,
+            'cached_summaries': len(self._summaries),
+            'token_counter': self.counter.get_stats()
+        }
+
+
+_default_budgeter: Optional[ContextBudgeter] = None
+_default_lock = threading.Lock()
+
+
+def get_context_budgeter() -> ContextBudgeter:
+    """Process-wide budgeter so summaries and token counts are shared"""
+    global _default_budgeter
+    with _default_lock:
+        if _default_budgeter is None:
+            _default_budgeter = ContextBudgeter()
+        return _default_budgeter
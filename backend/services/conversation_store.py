@@ -0,0 +1,343 @@
+# backend/services/conversation_store.py
+"""
+💬 Conversation Store - Compact chat history
+Messages are kept as __slots__ records carrying their pre-serialized JSON
+fragment. Each conversation holds a bounded in-memory ring of recent turns;
+older turns spill to an append-only JSONL file (line N is message N), so
+cursor pagination can reach the whole history without keeping it in RAM.
+
+The in-memory tail is written to the same file at interpreter exit (and by
+flush()) and reloaded when the conversation is next opened, so a clean
+restart loses nothing; a hard kill loses at most the unspilled tail of each
+conversation (CHAT_HISTORY_RING_SIZE plus one spill batch of turns).
+"""
+
+import os
+import re
+import json
+import atexit
+import weakref
+import threading
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, Tuple, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Byte offset of every Nth spilled line is indexed for seeking
+SPILL_INDEX_STRIDE = 64
+
+
+def _flush_at_exit(store_ref: 'weakref.ref') -> None:
+    store = store_ref()
+    if store is not None:
+        store.flush()
+
+
+class MessageRecord:
+    """
+    Compact stored form of a ChatMessage
+
+    Only what context building needs is kept as attributes; the full message
+    lives in its UTF-8 JSON fragment, serialized once on write so history
+    reads just splice fragments together.
+    """
+
+    __slots__ = ('seq', 'sender', 'content', 'fragment')
+
+    def __init__(self, seq: int, sender: str, content: str, fragment: bytes):
+        self.seq = seq
+        self.sender = sender
+        self.content = content
+        self.fragment = fragment
+
+    @classmethod
+    def from_message(cls, seq: int, message: Any) -> 'MessageRecord':
+        payload = {
+            "id": message.id,
+            "content": message.content,
+            "sender": message.sender,
+            "timestamp": message.timestamp.isoformat(),
+            "type": message.message_type,
+            "fileName": message.file_name,
+            "fileSize": message.file_size,
+            "fileUrl": message.file_url,
+            "aiModel": message.ai_model,
+            "reactions": list(message.reactions or []),
+            "edited": message.edited,
+            "replyTo": message.reply_to
+        }
+        fragment = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        return cls(seq, message.sender, message.content, fragment)
+
+    @classmethod
+    def from_fragment(cls, seq: int, fragment: bytes) -> 'MessageRecord':
+        payload = json.loads(fragment)
+        return cls(seq, payload.get('sender', ''), payload.get('content', ''), fragment)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return json.loads(self.fragment)
+
+
+class ConversationRing:
+    """
+    Recent turns in memory, older turns in a JSONL spill file
+
+    Records in memory cover seqs [spilled, total); the file holds seqs
+    [0, persisted). flush() writes the in-memory tail too, so persisted can
+    run ahead of spilled, and a ring reopened from its file reloads the
+    newest `capacity` lines into memory.
+    """
+
+    def __init__(self, conversation_id: str, spill_path: Optional[str],
+                 capacity: int = 500, spill_batch: int = 64):
+        self.conversation_id = conversation_id
+        self.spill_path = spill_path
+        self.capacity = capacity
+        self.spill_batch = spill_batch
+
+        self.records: deque = deque()
+        self.spilled = 0
+        self.persisted = 0
+        self._offsets: List[int] = []   # byte offset of line k * SPILL_INDEX_STRIDE
+        self._spill_size = 0
+        self._lock = threading.Lock()      # ring state; never held during file I/O
+        self._io_lock = threading.Lock()   # spill file writes, in seq order
+        self._writing = False
+
+        if spill_path and os.path.exists(spill_path):
+            self._load_existing_spill()
+
+    @property
+    def total(self) -> int:
+        return self.spilled + len(self.records)
+
+    def append(self, message: Any) -> MessageRecord:
+        with self._lock:
+            record = MessageRecord.from_message(self.total, message)
+            self.records.append(record)
+            spill = len(self.records) > self.capacity + self.spill_batch and not self._writing
+        if spill:
+            self._write(evict=True)
+        return record
+
+    def recent(self) -> List[MessageRecord]:
+        with self._lock:
+            return list(self.records)
+
+    def flush(self) -> None:
+        """Write in-memory turns the spill file doesn't have yet, keeping them in memory"""
+        self._write(evict=False)
+
+    def _write(self, evict: bool) -> None:
+        """
+        Append unpersisted records to the spill file; with `evict`, then drop
+        everything but the newest `capacity` from memory. Records stay
+        readable from memory until their write has landed.
+        """
+        with self._io_lock:
+            with self._lock:
+                count = max(0, len(self.records) - self.capacity) if evict else len(self.records)
+                first = max(0, self.persisted - self.spilled)
+                pending = [self.records[i] for i in range(first, count)]
+                offset = self._spill_size
+                self._writing = True
+
+            written = True
+            offsets = []
+            if self.spill_path and pending:
+                chunk = []
+                for record in pending:
+                    if record.seq % SPILL_INDEX_STRIDE == 0:
+                        offsets.append(offset)
+                    chunk.append(record.fragment)
+                    chunk.append(b'\n')
+                    offset += len(record.fragment) + 1
+                try:
+                    with open(self.spill_path, 'ab') as f:
+                        f.write(b''.join(chunk))
+                except OSError as e:
+                    # Keep the turns in memory and try again on the next spill
+                    logger.warning(f"💬 Failed to spill history for {self.conversation_id}: {e}")
+                    written = False
+
+            with self._lock:
+                if written and self.spill_path:
+                    self._offsets.extend(offsets)
+                    self._spill_size = offset
+                    self.persisted += len(pending)
+                if evict and written:
+                    # Without a spill path this is a plain bounded ring
+                    for _ in range(count):
+                        self.records.popleft()
+                    self.spilled += count
+                self._writing = False
+
+    def _load_existing_spill(self) -> None:
+        offset = 0
+        tail: deque = deque(maxlen=self.capacity)
+        with open(self.spill_path, 'rb') as f:
+            for line in f:
+                if self.persisted % SPILL_INDEX_STRIDE == 0:
+                    self._offsets.append(offset)
+                offset += len(line)
+                tail.append((self.persisted, line.rstrip(b'\n')))
+                self.persisted += 1
+        self._spill_size = offset
+        self.records.extend(MessageRecord.from_fragment(seq, fragment) for seq, fragment in tail)
+        self.spilled = self.persisted - len(self.records)
+
+    def _read_spilled(self, start: int, end: int, offset: int) -> List[bytes]:
+        """Fragments for spilled seqs [start, end); `offset` is where start's index block begins"""
+        fragments = []
+        try:
+            with open(self.spill_path, 'rb') as f:
+                f.seek(offset)
+                seq = start - start % SPILL_INDEX_STRIDE
+                for line in f:
+                    if seq >= end:
+                        break
+                    if seq >= start:
+                        fragments.append(line.rstrip(b'\n'))
+                    seq += 1
+        except OSError as e:
+            logger.warning(f"💬 Failed to read spilled history for {self.conversation_id}: {e}")
+        return fragments
+
+    def page(self, before: Optional[int], limit: int) -> Tuple[List[bytes], Optional[int]]:
+        """
+        Fragments for the `limit` messages preceding seq `before` (newest page
+        when None), oldest first, plus the cursor for the next older page.
+        """
+        if limit <= 0:
+            raise ValueError(f"limit must be positive, got {limit}")
+        with self._lock:
+            end = self.total if before is None else max(0, min(before, self.total))
+            start = max(0, end - limit)
+            disk_end = min(end, self.spilled)
+            block = start // SPILL_INDEX_STRIDE
+            offset = self._offsets[block] if start < disk_end and block < len(self._offsets) else None
+            memory = []
+            if end > self.spilled:
+                records = self.records
+                memory = [records[i].fragment for i in range(max(start, self.spilled) - self.spilled,
+                                                            end - self.spilled)]
+
+        # Spilled lines are append-only, so they can be read without the lock
+        fragments = self._read_spilled(start, disk_end, offset) if offset is not None and self.spill_path else []
+        fragments.extend(memory)
+        return fragments, (start if start > 0 else None)
+
+    def clear(self) -> None:
+        with self._io_lock, self._lock:
+            self.records.clear()
+            self.spilled = 0
+            self.persisted = 0
+            self._offsets = []
+            self._spill_size = 0
+            if self.spill_path and os.path.exists(self.spill_path):
+                try:
+                    os.remove(self.spill_path)
+                except OSError as e:
+                    logger.warning(f"💬 Failed to remove spilled history for {self.conversation_id}: {e}")
+
+
+class ConversationStore:
+    """
+    💬 Bounded, paginated chat history for all conversations
+
+    Usage:
+        store.append(friend_id, chat_message)
+        payload, next_cursor = store.page_json(friend_id, before=None, limit=50)
+    """
+
+    def __init__(self, storage_path: Optional[str] = None, ring_capacity: Optional[int] = None):
+        self.storage_path = storage_path or os.getenv(
+            'CHAT_HISTORY_DIR', os.path.join(os.getcwd(), "data", "conversations"))
+        self.ring_capacity = ring_capacity or int(os.getenv('CHAT_HISTORY_RING_SIZE', '500'))
+        self._rings: Dict[str, ConversationRing] = {}
+        self._lock = threading.Lock()
+
+        try:
+            os.makedirs(self.storage_path, exist_ok=True)
+        except OSError as e:
+            logger.warning(f"💬 History spill disabled, cannot create {self.storage_path}: {e}")
+            self.storage_path = None
+
+        # Turns still only in memory would otherwise be missing after a restart
+        atexit.register(_flush_at_exit, weakref.ref(self))
+
+    def _spill_path(self, conversation_id: str) -> Optional[str]:
+        if not self.storage_path:
+            return None
+        safe_id = re.sub(r'[^A-Za-z0-9_.-]', '_', conversation_id)
+        return os.path.join(self.storage_path, f"{safe_id}.jsonl")
+
+    def ring(self, conversation_id: str) -> ConversationRing:
+        ring = self._rings.get(conversation_id)
+        if ring is None:
+            with self._lock:
+                ring = self._rings.get(conversation_id)
+                if ring is None:
+                    ring = self._rings[conversation_id] = ConversationRing(
+                        conversation_id, self._spill_path(conversation_id), self.ring_capacity)
+        return ring
+
+    def __contains__(self, conversation_id: str) -> bool:
+        return conversation_id in self._rings
+
+    def __len__(self) -> int:
+        return len(self._rings)
+
+    def append(self, conversation_id: str, message: Any) -> MessageRecord:
+        return self.ring(conversation_id).append(message)
+
+    def recent(self, conversation_id: str) -> List[MessageRecord]:
+        """In-memory turns, oldest first"""
+        ring = self._rings.get(conversation_id)
+        return ring.recent() if ring is not None else []
+
+    def page(self, conversation_id: str, before: Optional[int] = None,
+             limit: int = 50) -> Tuple[List[bytes], Optional[int]]:
+        """Raises ValueError when `limit` is not positive"""
+        ring = self._rings.get(conversation_id)
+        if ring is None:
+            if limit <= 0:
+                raise ValueError(f"limit must be positive, got {limit}")
+            return [], None
+        return ring.page(before, limit)
+
+    def page_json(self, conversation_id: str, before: Optional[int] = None,
+                  limit: int = 50) -> Tuple[bytes, int, Optional[int]]:
+        """(JSON array bytes, message count, next cursor) without building dicts"""
+        fragments, next_cursor = self.page(conversation_id, before, limit)
+        return b'[' + b','.join(fragments) + b']', len(fragments), next_cursor
+
+    def clear(self, conversation_id: str) -> bool:
+        ring = self._rings.get(conversation_id)
+        if ring is None:
+            return False
+        ring.clear()
+        return True
+
+    def flush(self) -> None:
+        """Persist every ring's in-memory turns (runs at interpreter exit)"""
+        for ring in list(self._rings.values()):
+            ring.flush()
+
+    def total_messages(self) -> int:
+        return sum(ring.total for ring in self._rings.values())
+
+    def iter_conversations(self) -> Iterator[str]:
+        return iter(list(self._rings))
+
+    def get_stats(self) -> Dict[str, Any]:
+        rings = list(self._rings.values())
+        return {
+            'conversations': len(rings),
+            'total_messages': sum(r.total for r in rings),
+            'in_memory_messages': sum(len(r.records) for r in rings),
+            'spilled_messages': sum(r.spilled for r in rings),
+            'ring_capacity': self.ring_capacity,
+            'spill_enabled': self.storage_path is not None
+        }
@@ -5,16 +5,23 @@ Autonomous quota management and intelligent routing for production workflows
 """
 
 import asyncio
+import hashlib
 import logging
+import os
+import tempfile
+import threading
 import time
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 import json
 import google.generativeai as genai
 from collections import defaultdict, deque
 
+from .metrics_registry import get_metrics_registry
+from .quota_forecaster import QuotaForecaster
+
 logger = logging.getLogger(__name__)
 
 class WorkflowStage(Enum):
@@ -24,6 +31,110 @@ class WorkflowStage(Enum):
     TESTING = "testing"
     DEPLOYMENT = "deployment"
 
+# Upstream stages whose output each stage's prompt builds on. Stages whose
+# dependencies are done run concurrently: environment || coding, then
+# testing, then deployment (which gets the test results). Coding deliberately
+# works from the plan alone rather than the environment stage's output: its
+# prompt asks for the application, not setup steps, and the environment
+# setup reaches deployment directly.
+STAGE_DEPENDENCIES: Dict[WorkflowStage, Tuple[WorkflowStage, ...]] = {
+    WorkflowStage.PLANNING: (),
+    WorkflowStage.ENVIRONMENT: (WorkflowStage.PLANNING,),
+    WorkflowStage.CODING: (WorkflowStage.PLANNING,),
+    WorkflowStage.TESTING: (WorkflowStage.PLANNING, WorkflowStage.CODING),
+    WorkflowStage.DEPLOYMENT: (WorkflowStage.ENVIRONMENT, WorkflowStage.CODING, WorkflowStage.TESTING),
+}
+
+class StageCheckpointStore:
+    """
+    💾 Successful stage results on disk, content-addressed: the key hashes the
+    description, preferences, stage and the outputs of its upstream stages.
+    A rerun of the same workflow (job retry, restart, resubmission) resumes
+    from the first stage whose inputs changed or that never succeeded.
+    """
+    
+    VERSION = 1
+    
+    def __init__(self, directory: Optional[str] = None, ttl_hours: Optional[float] = None,
+                 enabled: Optional[bool] = None):
+        self.enabled = enabled if enabled is not None else \
+            os.getenv('SCOUT_CHECKPOINTS_ENABLED', 'true').lower() == 'true'
+        self.directory = directory or os.getenv(
+            'SCOUT_CHECKPOINT_DIR', os.path.join(os.getcwd(), 'data', 'scout_checkpoints'))
+        self.ttl_seconds = (ttl_hours if ttl_hours is not None else
+                            float(os.getenv('SCOUT_CHECKPOINT_TTL_HOURS', '168'))) * 3600
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+        if self.enabled:
+            os.makedirs(self.directory, exist_ok=True)
+    
+    @staticmethod
+    def _digest(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+    
+    def stage_key(self, stage: WorkflowStage, description: str, preferences: Dict[str, Any],
+                  upstream: Dict[str, Dict[str, Any]]) -> str:
+        """Upstream stages that did not succeed are keyed as missing"""
+        material = {
+            'version': self.VERSION,
+            'stage': stage.value,
+            'description': description,
+            'preferences': preferences,
+            'upstream': {
+                dep.value: self._digest(upstream[dep.value]['content']) if dep.value in upstream else None
+                for dep in STAGE_DEPENDENCIES[stage]
+            }
+        }
+        return self._digest(json.dumps(material, sort_keys=True, default=str))
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+    
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl_seconds:
+                os.remove(path)
+                raise FileNotFoundError(path)
+            with open(path, 'r', encoding='utf-8') as f:
+                result = json.load(f)['result']
+        except (OSError, ValueError, KeyError):
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return result
+    
+    def save(self, key: str, result: Dict[str, Any]) -> None:
+        if not self.enabled or not result.get('success'):
+            return
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'key': key, 'saved_at': datetime.now().isoformat(), 'result': result},
+                          f, ensure_ascii=False, default=str)
+            os.replace(tmp_path, self._path(key))
+            with self._lock:
+                self.writes += 1
+        except OSError as e:
+            logger.warning(f"Failed to checkpoint stage {result.get('stage')}: {e}")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'enabled': self.enabled,
+            'directory': self.directory,
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
 class ModelTier(Enum):
     PRIMARY = "primary"
     SECONDARY = "secondary"
@@ -75,6 +186,7 @@ class EnhancedGeminiScoutOrchestrator:
         
         # Quota management
         self.quota_status: Dict[str, QuotaStatus] = {}
+        self.quota_forecaster = QuotaForecaster()
         self.request_history = deque(maxlen=10000)
         
         # Scout workflow state
@@ -84,6 +196,13 @@ class EnhancedGeminiScoutOrchestrator:
         # Autonomous routing configuration
         self.routing_preferences = self._configure_routing_preferences()
         
+        # Stage checkpoints for resuming and deduplicating workflows
+        self.checkpoints = StageCheckpointStore()
+        get_metrics_registry().register_collector(
+            'scout_stage_checkpoints',
+            lambda: get_metrics_registry().observe_cache(
+                'scout_stage_checkpoints', self.checkpoints.hits, self.checkpoints.misses))
+        
         # Initialize quota tracking
         self._initialize_quota_tracking()
         
@@ -242,6 +361,7 @@ class EnhancedGeminiScoutOrchestrator:
                 requests_per_minute=config["rpm_limit"],
                 requests_per_day=config["rpd_limit"]
             )
+            self.quota_forecaster.register(model_id, config["rpm_limit"], config["rpd_limit"])
     
     def _update_quota_tracking(self, model_id: str, success: bool = True):
         """Update quota tracking after a request"""
@@ -263,6 +383,7 @@ class EnhancedGeminiScoutOrchestrator:
         # Update counts
         status.current_minute_count += 1
         status.current_day_count += 1
+        self.quota_forecaster.record(model_id)
         
         # Update health status
         if success:
@@ -290,9 +411,22 @@ class EnhancedGeminiScoutOrchestrator:
         if len(self.model_performance_cache[model_id]) > 1000:
             self.model_performance_cache[model_id] = self.model_performance_cache[model_id][-500:]
     
+    def _quota_forecast(self) -> Dict[str, Dict[str, Any]]:
+        """Forecast time-to-exhaustion per model; day counters past their window count as reset"""
+        now = datetime.now()
+        return self.quota_forecaster.forecast(lambda: {
+            model_id: status.current_day_count if now - status.last_reset_day < timedelta(days=1) else 0
+            for model_id, status in self.quota_status.items()
+        })
+    
     def get_best_model_for_stage(self, stage: WorkflowStage) -> Optional[str]:
-        """Get the best available model for a specific workflow stage"""
+        """
+        Get the best available model for a specific workflow stage. Health is
+        discounted by forecast quota pressure, so stages spread to other
+        models while the preferred one still has quota left.
+        """
         stage_preferences = self.routing_preferences.get(stage.value, [])
+        forecast = self._quota_forecast()
         
         # Score and rank available models
         model_scores = []
@@ -301,7 +435,8 @@ class EnhancedGeminiScoutOrchestrator:
                 continue
                 
             status = self.quota_status[model_id]
-            health_score = status.overall_health_score
+            pressure = forecast.get(model_id, {}).get('pressure', 0.0)
+            health_score = status.overall_health_score * (1 - pressure)
             
             if health_score > 0:
                 model_scores.append((model_id, health_score))
@@ -525,81 +660,125 @@ Please provide a detailed, actionable response that leverages your specific capa
                 'failed_fallback_model': fallback_model
             }
     
-    async def execute_full_workflow(self, description: str, preferences: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Execute a complete Scout workflow from planning to deployment"""
-        workflow_id = f"scout_{int(datetime.now().timestamp())}"
+    async def execute_full_workflow(self, description: str, preferences: Dict[str, Any] = None,
+                                    workflow_id: Optional[str] = None,
+                                    progress_callback: Optional[Callable[[float, str], None]] = None) -> Dict[str, Any]:
+        """
+        Execute a complete Scout workflow from planning to deployment.
+        Pass the caller's `workflow_id` so status lookups use the id the API
+        returned; `progress_callback(fraction, message)` is called per stage.
+        
+        Stages run as soon as their STAGE_DEPENDENCIES are done, and each
+        successful stage is checkpointed, so a rerun with the same inputs
+        skips straight to the first stage that has not succeeded yet.
+        """
+        workflow_id = workflow_id or f"scout_{int(datetime.now().timestamp())}"
+        preferences = preferences or {}
         
         # Initialize workflow tracking
-        self.active_workflows[workflow_id] = {
+        workflow = self.active_workflows[workflow_id] = {
             'description': description,
-            'preferences': preferences or {},
+            'preferences': preferences,
             'started_at': datetime.now(),
             'stages': {},
             'current_stage': None,
+            'running_stages': [],
             'status': 'running'
         }
         
-        workflow_context = {
-            'description': description,
-            'preferences': preferences or {},
-            'workflow_id': workflow_id,
-            'completed_stages': {}
-        }
-        
-        stages = [
-            WorkflowStage.PLANNING,
-            WorkflowStage.ENVIRONMENT,
-            WorkflowStage.CODING,
-            WorkflowStage.TESTING,
-            WorkflowStage.DEPLOYMENT
-        ]
+        stages = list(STAGE_DEPENDENCIES)
+        results: Dict[str, Dict[str, Any]] = {}
+        completed: Dict[str, Dict[str, Any]] = {}  # successful stages, visible to dependents
         
-        results = {}
-        
-        try:
-            for stage in stages:
+        async def run_stage(stage: WorkflowStage) -> None:
+            deps = STAGE_DEPENDENCIES[stage]
+            if deps:
+                await asyncio.gather(*(tasks[dep] for dep in deps))
+            
+            upstream = {dep.value: completed[dep.value] for dep in deps if dep.value in completed}
+            key = self.checkpoints.stage_key(stage, description, preferences, upstream)
+            # Checkpoints are files; keep their I/O off the event loop
+            result = await asyncio.to_thread(self.checkpoints.load, key)
+            
+            if result is not None:
+                result['from_checkpoint'] = True
+                logger.info(f"💾 {stage.value} served from checkpoint for workflow {workflow_id}")
+            else:
                 logger.info(f"🎯 Starting {stage.value} phase for workflow {workflow_id}")
+                workflow['current_stage'] = stage.value
+                workflow['running_stages'].append(stage.value)
+                if progress_callback:
+                    progress_callback(len(results) / len(stages), f"Starting {stage.value}")
                 
-                # Update current stage
-                self.active_workflows[workflow_id]['current_stage'] = stage.value
-                
-                # Create stage-specific prompt
-                stage_prompt = self._create_workflow_stage_prompt(stage, description, workflow_context)
-                
-                # Execute stage
-                result = await self.execute_workflow_stage(stage, stage_prompt, workflow_context)
-                
-                # Store results
-                results[stage.value] = result
-                self.active_workflows[workflow_id]['stages'][stage.value] = result
-                
-                if result['success']:
-                    workflow_context['completed_stages'][stage.value] = result
-                    logger.info(f"✅ {stage.value} completed successfully")
-                else:
-                    logger.error(f"❌ {stage.value} failed: {result.get('error', 'Unknown error')}")
-                    # Continue with other stages even if one fails
+                stage_context = {
+                    'description': description,
+                    'preferences': preferences,
+                    'workflow_id': workflow_id,
+                    'completed_stages': upstream
+                }
+                stage_prompt = self._create_workflow_stage_prompt(stage, description, stage_context)
+                try:
+                    result = await self.execute_workflow_stage(stage, stage_prompt, stage_context)
+                finally:
+                    workflow['running_stages'].remove(stage.value)
+                await asyncio.to_thread(self.checkpoints.save, key, result)
+            
+            # Store results
+            results[stage.value] = result
+            workflow['stages'][stage.value] = result
+            
+            if result['success']:
+                completed[stage.value] = result
+                logger.info(f"✅ {stage.value} completed successfully")
+            else:
+                logger.error(f"❌ {stage.value} failed: {result.get('error', 'Unknown error')}")
+                # Continue with other stages even if one fails
+            if progress_callback:
+                progress_callback(len(results) / len(stages),
+                                  f"{stage.value} {'completed' if result['success'] else 'failed'}")
+        
+        tasks: Dict[WorkflowStage, asyncio.Task] = {}
+        for stage in stages:
+            tasks[stage] = asyncio.ensure_future(run_stage(stage))
+        
+        try:
+            try:
+                await asyncio.gather(*tasks.values())
+            except BaseException:
+                for task in tasks.values():
+                    task.cancel()
+                raise
             
             # Mark workflow as completed
-            self.active_workflows[workflow_id]['status'] = 'completed'
-            self.active_workflows[workflow_id]['completed_at'] = datetime.now()
+            workflow['status'] = 'completed'
+            workflow['completed_at'] = datetime.now()
+            ordered_results = {stage.value: results[stage.value] for stage in stages}
+            resumed = [r for r in ordered_results.values() if r.get('from_checkpoint')]
             
             return {
                 'success': True,
                 'workflow_id': workflow_id,
-                'results': results,
+                'results': ordered_results,
                 'metadata': {
-                    'started_at': self.active_workflows[workflow_id]['started_at'].isoformat(),
-                    'completed_at': self.active_workflows[workflow_id]['completed_at'].isoformat(),
+                    'started_at': workflow['started_at'].isoformat(),
+                    'completed_at': workflow['completed_at'].isoformat(),
                     'total_stages': len(stages),
-                    'successful_stages': sum(1 for r in results.values() if r['success']),
-                    'models_used': list(set(r.get('model_used') for r in results.values() if r.get('model_used')))
+                    'successful_stages': sum(1 for r in ordered_results.values() if r['success']),
+                    'failed_stages': [name for name, r in ordered_results.items() if not r['success']],
+                    'stages_from_checkpoint': len(resumed),
+                    'checkpoint_time_saved': sum(r.get('duration', 0) for r in resumed),
+                    'models_used': list(set(r.get('model_used') for r in ordered_results.values() if r.get('model_used')))
                 }
             }
             
+        except asyncio.CancelledError:
+            workflow['status'] = 'cancelled'
+            logger.info(f"🛑 Workflow {workflow_id} cancelled")
+            raise
+            
         except Exception as e:
-            self.active_workflows[workflow_id]['status'] = 'failed'
-            self.active_workflows[workflow_id]['error'] = str(e)
+            workflow['status'] = 'failed'
+            workflow['error'] = str(e)
             
             logger.error(f"❌ Workflow {workflow_id} failed: {e}")
             
@@ -707,6 +886,7 @@ Provide complete deployment instructions and monitoring setup.
     def get_orchestration_status(self) -> Dict[str, Any]:
         """Get current orchestration status and model health"""
         healthy_models = sum(1 for status in self.quota_status.values() if status.is_healthy)
+        forecast = self._quota_forecast()
         
         model_status = {}
         for model_id, status in self.quota_status.items():
@@ -720,6 +900,7 @@ Provide complete deployment instructions and monitoring setup.
                     'minute': f"{status.current_minute_count}/{status.requests_per_minute}",
                     'day': f"{status.current_day_count}/{status.requests_per_day}"
                 },
+                'quota_forecast': forecast.get(model_id),
                 'performance': {
                     'success_rate': self._calculate_success_rate(model_id),
                     'consecutive_errors': status.consecutive_errors
@@ -734,7 +915,8 @@ Provide complete deployment instructions and monitoring setup.
             'total_models': len(self.gemini_models),
             'healthy_models': healthy_models,
             'model_status': model_status,
-            'routing_preferences': self.routing_preferences
+            'routing_preferences': self.routing_preferences,
+            'stage_checkpoints': self.checkpoints.get_stats()
         }
     
     def _calculate_success_rate(self, model_id: str) -> float:
@@ -774,6 +956,7 @@ Provide complete deployment instructions and monitoring setup.
                 'status': 'completed' if stage_info.get('success') else 'failed' if stage_name in workflow['stages'] else 'pending',
                 'model_used': stage_info.get('model_used'),
                 'duration': stage_info.get('duration'),
+                'from_checkpoint': stage_info.get('from_checkpoint', False),
                 'completed_at': stage_info.get('metadata', {}).get('timestamp')
             })
         
@@ -788,7 +971,8 @@ Provide complete deployment instructions and monitoring setup.
                 'total_requests': len(workflow['stages']),
                 'quota_switches': self._count_quota_switches(workflow)
             },
-            'current_stage': workflow.get('current_stage')
+            'current_stage': workflow.get('current_stage'),
+            'running_stages': list(workflow.get('running_stages', []))
         }
     
     def _count_quota_switches(self, workflow: Dict[str, Any]) -> int:
@@ -798,7 +982,6 @@ Provide complete deployment instructions and monitoring setup.
         return fallbacks_used
 
 # Global instance for the application
-import os
 from dotenv import load_dotenv
 
 # Load environment variables
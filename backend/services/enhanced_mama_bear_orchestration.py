@@ -13,6 +13,7 @@ import json
 from .orchestration.orchestra_manager import GeminiOrchestra
 from .orchestration.task_analyzer import TaskAnalyzer
 from .orchestration.model_registry import MAMA_BEAR_MODEL_PREFERENCES
+from .tracing import get_tracer
 
 logger = logging.getLogger(__name__)
 
@@ -29,6 +30,8 @@ class EnhancedMamaBearAgent:
         # Initialize task analyzer
         self.task_analyzer = TaskAnalyzer()
         
+        self.tracer = get_tracer()
+        
         # Mama Bear personality configurations
         self.mama_bear_personalities = self._initialize_personalities()
         
@@ -132,67 +135,72 @@ class EnhancedMamaBearAgent:
         
         personality = self.mama_bear_personalities[variant]
         
-        try:
-            logger.info(f"🐻 {personality['name']} processing message: {message[:100]}...")
-            
-            # Step 1: Analyze the task
-            task_analysis = await self.task_analyzer.analyze_request({
-                "message": message,
-                "context": context or {},
-                "mama_bear_variant": variant,
-                "user_id": user_id,
-                "request_id": request_id
-            })
-            
-            # Step 2: Build enhanced request for orchestra
-            orchestra_request = self._build_orchestra_request(
-                message, variant, personality, task_analysis, context, user_id, request_id
-            )
-            
-            # Step 3: Process through Gemini Orchestra
-            orchestra_response = await self.orchestra.process_request(orchestra_request)
-            
-            # Step 4: Post-process response with Mama Bear personality
-            final_response = await self._apply_mama_bear_personality(
-                orchestra_response, personality, task_analysis, message
-            )
-            
-            # Step 5: Update conversation memory
-            if user_id:
-                await self._update_conversation_memory(user_id, variant, message, final_response)
-            
-            processing_time = (datetime.now() - start_time).total_seconds() * 1000
-            
-            logger.info(f"✅ {personality['name']} completed response in {processing_time:.0f}ms")
-            
-            return {
-                "response": final_response["response"],
-                "mama_bear_variant": variant,
-                "personality": personality,
-                "task_analysis": task_analysis,
-                "orchestra_metadata": orchestra_response.get("orchestra_metadata", {}),
-                "processing_time_ms": processing_time,
-                "request_id": request_id,
-                "timestamp": start_time.isoformat(),
-                "success": True
-            }
-            
-        except Exception as e:
-            logger.error(f"❌ {personality['name']} failed to process message: {e}")
-            
-            # Graceful fallback response
-            fallback_response = await self._generate_fallback_response(variant, message, str(e))
-            
-            return {
-                "response": fallback_response,
-                "mama_bear_variant": variant,
-                "personality": personality,
-                "error": str(e),
-                "fallback_used": True,
-                "request_id": request_id,
-                "timestamp": start_time.isoformat(),
-                "success": False
-            }
+        with self.tracer.start_trace("mama_bear.process_message", request_id=request_id,
+                                     variant=variant, user_id=user_id) as trace_span:
+            try:
+                logger.info(f"🐻 {personality['name']} processing message: {message[:100]}...")
+                
+                # Step 1: Analyze the task
+                task_analysis = await self.task_analyzer.analyze_request({
+                    "message": message,
+                    "context": context or {},
+                    "mama_bear_variant": variant,
+                    "user_id": user_id,
+                    "request_id": request_id
+                })
+                
+                # Step 2: Build enhanced request for orchestra
+                orchestra_request = self._build_orchestra_request(
+                    message, variant, personality, task_analysis, context, user_id, request_id
+                )
+                
+                # Step 3: Process through Gemini Orchestra
+                orchestra_response = await self.orchestra.process_request(orchestra_request)
+                
+                with self.tracer.span("mama_bear.post_process", stage="post_processing"):
+                    # Step 4: Post-process response with Mama Bear personality
+                    final_response = await self._apply_mama_bear_personality(
+                        orchestra_response, personality, task_analysis, message
+                    )
+                    
+                    # Step 5: Update conversation memory
+                    if user_id:
+                        await self._update_conversation_memory(user_id, variant, message, final_response)
+                
+                processing_time = (datetime.now() - start_time).total_seconds() * 1000
+                
+                logger.info(f"✅ {personality['name']} completed response in {processing_time:.0f}ms")
+                
+                return {
+                    "response": final_response["response"],
+                    "mama_bear_variant": variant,
+                    "personality": personality,
+                    "task_analysis": task_analysis,
+                    "orchestra_metadata": orchestra_response.get("orchestra_metadata", {}),
+                    "processing_time_ms": processing_time,
+                    "request_id": request_id,
+                    "timestamp": start_time.isoformat(),
+                    "success": True
+                }
+                
+            except Exception as e:
+                trace_span.record_error(e)
+                logger.error(f"❌ {personality['name']} failed to process message: {e}")
+                
+                # Graceful fallback response
+                fallback_response = await self._generate_fallback_response(variant, message, str(e))
+                
+                return {
+                    "response": fallback_response,
+                    "mama_bear_variant": variant,
+                    "personality": personality,
+                    "error": str(e),
+                    "fallback_used": True,
+                    "request_id": request_id,
+                    "timestamp": start_time.isoformat(),
+                    "success": False
+                }
+        
     
     def _build_orchestra_request(self, message: str, variant: str, personality: Dict[str, Any],
                                task_analysis: Dict[str, Any], context: Dict[str, Any],
@@ -5,18 +5,21 @@ Routes tasks between E2B (quick/cheap) and Scrapybara (full/robust) based on com
 """
 
 import asyncio
-import ast
-import re
 import logging
 from typing import Dict, Any, List, Optional, Tuple
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 
 from .enhanced_gemini_scout_orchestration import EnhancedGeminiScoutOrchestrator
 from .enhanced_code_execution import EnhancedMamaBearCodeExecution, CodeExecutionResult
 from .enhanced_scrapybara_integration import EnhancedScrapybaraManager
+from .routing_analytics import RoutingAnalytics, RoutingAggregate, parse_time_range
+from .snippet_analyzer import SnippetAnalysisCache
+from .routing_model import LearnedRoutingModel, extract_routing_features
+from .metrics_registry import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +45,10 @@ class TaskComplexityAnalysis:
     system_operations: List[str]
     language_complexity: float
     mama_bear_assessment: Dict[str, Any]
+    
+    # Learned routing inputs
+    features: List[float] = field(default_factory=list)
+    decision_source: str = "heuristic"  # "heuristic" or "learned"
 
 class IntelligentExecutionRouter:
     """
@@ -57,9 +64,22 @@ class IntelligentExecutionRouter:
         self.e2b = e2b_execution
         self.scrapybara = scrapybara_manager
         
-        # Routing metrics
-        self.routing_history = []
+        # Routing metrics - analytics are aggregated incrementally, history is bounded
+        self.routing_history = deque(maxlen=1000)
         self.performance_cache = {}
+        self.analytics = RoutingAnalytics()
+        self.snippet_cache = SnippetAnalysisCache()
+        self.routing_model = LearnedRoutingModel()
+        
+        self.metrics_registry = get_metrics_registry()
+        self.route_decisions = self.metrics_registry.counter(
+            'mama_bear_execution_routes_total',
+            "Execution routing decisions by route and decision source",
+            ('route', 'source'))
+        self.analysis_latency = self.metrics_registry.histogram(
+            'mama_bear_execution_routing_analysis_seconds',
+            "Time to analyze a task and pick an execution route")
+        self.metrics_registry.register_collector("execution_router", self._collect_metrics)
         
         # Cost constants (per hour)
         self.E2B_COST_PER_HOUR = 0.10
@@ -71,7 +91,8 @@ class IntelligentExecutionRouter:
                                     task_description: str,
                                     code_snippets: Optional[List[str]] = None,
                                     file_paths: Optional[List[str]] = None,
-                                    user_context: Optional[Dict[str, Any]] = None) -> TaskComplexityAnalysis:
+                                    user_context: Optional[Dict[str, Any]] = None,
+                                    user_id: Optional[str] = None) -> TaskComplexityAnalysis:
         """
         🔍 Comprehensive task complexity analysis using Mama Bear intelligence
         """
@@ -102,23 +123,37 @@ class IntelligentExecutionRouter:
                 complexity_factors.extend(analysis['complexity_factors'])
                 risk_factors.extend(analysis['risk_factors'])
         
-        # 2. Mama Bear NLP analysis of task description
-        mama_bear_assessment = await self._mama_bear_task_analysis(task_description, user_context)
-        
-        # 3. Calculate complexity score
+        # 2. Calculate complexity score
         base_score = self._calculate_base_complexity_score(
             code_lines, file_count, dependency_count, system_operations
         )
         
+        # 3. Ask the learned model first - a confident answer skips the LLM call
+        features = extract_routing_features(
+            task_description, code_lines, file_count, dependency_count,
+            system_operations, risk_factors, base_score
+        )
+        learned_decision = self.routing_model.decide(features)
+        
+        if learned_decision:
+            decision_source = "learned"
+            mama_bear_assessment = self._fallback_task_analysis(task_description, user_context)
+        else:
+            decision_source = "heuristic"
+            mama_bear_assessment = await self._mama_bear_task_analysis(task_description, user_context)
+        
         # 4. Apply Mama Bear intelligence boost
         final_score = self._apply_mama_bear_intelligence(
             base_score, mama_bear_assessment, complexity_factors
         )
         
         # 5. Determine routing recommendation
-        route, confidence = self._determine_optimal_route(
-            final_score, complexity_factors, risk_factors
-        )
+        if learned_decision:
+            route, confidence = ExecutionRoute(learned_decision[0]), learned_decision[1]
+        else:
+            route, confidence = self._determine_optimal_route(
+                final_score, complexity_factors, risk_factors
+            )
         
         # 6. Cost and duration estimation
         estimated_duration, estimated_cost = self._estimate_execution_metrics(
@@ -129,6 +164,8 @@ class IntelligentExecutionRouter:
         reasoning = self._generate_routing_reasoning(
             final_score, route, complexity_factors, mama_bear_assessment
         )
+        if learned_decision:
+            reasoning.append(f"Learned routing model chose {route.value} with {confidence:.0%} confidence")
         
         analysis = TaskComplexityAnalysis(
             score=final_score,
@@ -143,82 +180,39 @@ class IntelligentExecutionRouter:
             dependency_count=dependency_count,
             system_operations=system_operations,
             language_complexity=mama_bear_assessment.get('language_complexity', 0.5),
-            mama_bear_assessment=mama_bear_assessment
+            mama_bear_assessment=mama_bear_assessment,
+            features=features,
+            decision_source=decision_source
         )
         
         # Store for learning
+        timestamp = datetime.now()
         self.routing_history.append({
-            'timestamp': datetime.now(),
+            'timestamp': timestamp,
+            'user_id': user_id,
             'analysis': analysis,
             'task_description': task_description,
             'processing_time': time.time() - start_time
         })
+        self.route_decisions.labels(route.value, decision_source).inc()
+        self.analysis_latency.observe(time.time() - start_time)
+        self.analytics.record_decision(
+            route=route.value,
+            score=final_score,
+            confidence=confidence,
+            estimated_cost=estimated_cost,
+            scrapybara_only_cost=(estimated_duration / 3600) * self.SCRAPYBARA_COST_PER_HOUR,
+            user_id=user_id,
+            timestamp=timestamp
+        )
         
         logger.info(f"🧠 Task complexity analysis completed: Score={final_score:.2f}, Route={route.value}, Confidence={confidence:.2f}")
         
         return analysis
     
     def _analyze_code_snippet(self, code: str) -> Dict[str, Any]:
-        """Analyze individual code snippet for complexity indicators"""
-        
-        lines = len([line for line in code.split('\n') if line.strip()])
-        complexity_factors = []
-        risk_factors = []
-        system_ops = []
-        dependencies = 0
-        
-        try:
-            # Parse Python AST for detailed analysis
-            tree = ast.parse(code)
-            
-            # Count imports (dependencies)
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.Import, ast.ImportFrom)):
-                    dependencies += 1
-                    
-                # Check for system operations
-                if isinstance(node, ast.Call):
-                    if hasattr(node.func, 'attr'):
-                        if node.func.attr in ['system', 'run', 'call', 'Popen']:
-                            system_ops.append(f"subprocess.{node.func.attr}")
-                            risk_factors.append("System command execution detected")
-                    
-                    if hasattr(node.func, 'id'):
-                        if node.func.id in ['exec', 'eval', 'compile']:
-                            risk_factors.append(f"Dynamic code execution: {node.func.id}")
-            
-            # Complexity indicators
-            if lines > 50:
-                complexity_factors.append("High line count")
-            if dependencies > 5:
-                complexity_factors.append("Many dependencies")
-                
-        except SyntaxError:
-            # Not Python code, use regex analysis
-            dependencies = len(re.findall(r'(?:import|require|include)\s+', code))
-            
-            # Check for system operations in other languages
-            system_patterns = [
-                r'os\.system\(',
-                r'subprocess\.',
-                r'exec\(',
-                r'shell_exec\(',
-                r'system\(',
-                r'Runtime\.getRuntime\(\)\.exec\(',
-            ]
-            
-            for pattern in system_patterns:
-                if re.search(pattern, code):
-                    system_ops.append("System operation detected")
-                    risk_factors.append("System operation in non-Python code")
-        
-        return {
-            'lines': lines,
-            'dependencies': dependencies,
-            'system_ops': system_ops,
-            'complexity_factors': complexity_factors,
-            'risk_factors': risk_factors
-        }
+        """Analyze individual code snippet for complexity indicators (memoized by content hash)"""
+        return self.snippet_cache.analyze(code)
     
     async def _mama_bear_task_analysis(self, 
                                      task_description: str, 
@@ -520,7 +514,7 @@ class IntelligentExecutionRouter:
         
         # 1. Analyze task complexity
         analysis = await self.analyze_task_complexity(
-            task_description, code_snippets, user_context=user_context
+            task_description, code_snippets, user_context=user_context, user_id=user_id
         )
         
         # 2. Execute using recommended route
@@ -538,7 +532,7 @@ class IntelligentExecutionRouter:
         )
         
         # 3. Update learning metrics
-        self._update_routing_performance(analysis, result, execution_time, actual_cost)
+        await self._update_routing_performance(analysis, result, execution_time, actual_cost, user_id)
         
         return {
             'success': result.success,
@@ -610,7 +604,8 @@ class IntelligentExecutionRouter:
         analysis = await self.analyze_task_complexity(
             task_description=task_description,
             code_snippets=code_snippets or [],
-            user_context=user_context or {}
+            user_context=user_context or {},
+            user_id=user_id
         )
         
         # Return routing decision
@@ -621,6 +616,7 @@ class IntelligentExecutionRouter:
             'estimated_cost': analysis.estimated_cost,
             'estimated_duration': analysis.estimated_duration,
             'complexity_score': analysis.score,
+            'decision_source': analysis.decision_source,
             'analysis': analysis
         }
     
@@ -632,18 +628,27 @@ class IntelligentExecutionRouter:
         📊 Log execution results for learning and optimization
         """
         
-        log_entry = {
-            'timestamp': datetime.now(),
-            'user_id': user_id,
-            'routing_decision': routing_decision,
-            'execution_result': execution_result,
-            'success': execution_result.get('success', False),
-            'execution_time': execution_result.get('execution_time', 0),
-            'actual_cost': execution_result.get('cost', 0)
-        }
+        route = routing_decision.get('platform', ExecutionRoute.E2B.value)
+        success = execution_result.get('success', False)
+        execution_time = execution_result.get('execution_time', 0)
+        actual_cost = execution_result.get('cost', 0)
+        
+        # Fold into the rolling per-route / per-user / per-bucket aggregates
+        self.analytics.record_execution(
+            route=route,
+            success=success,
+            execution_time=execution_time,
+            actual_cost=actual_cost,
+            user_id=user_id
+        )
         
-        # Store in performance cache for learning
-        self.performance_cache[f"{user_id}_{datetime.now().isoformat()}"] = log_entry
+        # Train the learned routing model on the outcome
+        analysis = routing_decision.get('analysis')
+        if isinstance(analysis, TaskComplexityAnalysis):
+            await self.routing_model.record_outcome(
+                analysis.features, route, success, execution_time, actual_cost,
+                analysis.decision_source
+            )
         
         logger.info(f"📊 Logged execution result for user {user_id}: {execution_result.get('success', False)}")
     
@@ -654,57 +659,47 @@ class IntelligentExecutionRouter:
         📈 Get execution metrics and analytics
         """
         
-        # Parse time range
-        if time_range == "24h":
-            hours = 24
-        elif time_range == "7d":
-            hours = 24 * 7
-        else:
-            hours = 24
-        
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        cutoff_time = datetime.now() - parse_time_range(time_range)
         
-        # Filter relevant entries
-        relevant_entries = []
-        for entry in self.routing_history:
-            if entry['timestamp'] >= cutoff_time:
-                if user_id is None or entry.get('user_id') == user_id:
-                    relevant_entries.append(entry)
+        # Combine the pre-aggregated time buckets inside the range
+        summary = self.analytics.summarize(since=cutoff_time, user_id=user_id)
         
-        if not relevant_entries:
+        if not summary.decisions and not summary.executions:
             return {
                 'message': 'No metrics available for the specified time range',
                 'time_range': time_range,
                 'user_id': user_id
             }
         
-        # Calculate metrics
-        total_tasks = len(relevant_entries)
-        e2b_tasks = sum(1 for e in relevant_entries 
-                       if e['analysis'].route_recommendation == ExecutionRoute.E2B)
+        total_tasks = summary.decisions
+        e2b_tasks = summary.route_counts.get(ExecutionRoute.E2B.value, 0)
         scrapybara_tasks = total_tasks - e2b_tasks
         
-        avg_complexity = sum(e['analysis'].score for e in relevant_entries) / total_tasks
-        total_cost = sum(e['analysis'].estimated_cost for e in relevant_entries)
-        
         return {
             'time_range': time_range,
             'user_id': user_id,
             'total_tasks': total_tasks,
             'routing_distribution': {
-                'e2b': {'count': e2b_tasks, 'percentage': (e2b_tasks / total_tasks) * 100},
-                'scrapybara': {'count': scrapybara_tasks, 'percentage': (scrapybara_tasks / total_tasks) * 100}
+                'e2b': {'count': e2b_tasks, 'percentage': (e2b_tasks / total_tasks) * 100 if total_tasks else 0},
+                'scrapybara': {'count': scrapybara_tasks, 'percentage': (scrapybara_tasks / total_tasks) * 100 if total_tasks else 0}
+            },
+            'average_complexity': summary.average_complexity,
+            'total_estimated_cost': summary.estimated_cost_sum,
+            'executions': {
+                'count': summary.executions,
+                'success_rate': summary.success_rate,
+                'average_execution_time': summary.average_execution_time,
+                'total_actual_cost': summary.actual_cost_sum
             },
-            'average_complexity': avg_complexity,
-            'total_estimated_cost': total_cost,
-            'cost_optimization': self._calculate_cost_savings()
+            'cost_optimization': self._calculate_cost_savings(summary)
         }
     
-    def _update_routing_performance(self, 
+    async def _update_routing_performance(self, 
                                   analysis: TaskComplexityAnalysis,
                                   result: CodeExecutionResult,
                                   actual_execution_time: float,
-                                  actual_cost: float):
+                                  actual_cost: float,
+                                  user_id: Optional[str] = None):
         """Update performance metrics for learning"""
         
         performance_data = {
@@ -730,22 +725,35 @@ class IntelligentExecutionRouter:
         if len(self.performance_cache[route_key]) > 1000:
             self.performance_cache[route_key] = self.performance_cache[route_key][-500:]
         
+        self.analytics.record_execution(
+            route=route_key,
+            success=result.success,
+            execution_time=actual_execution_time,
+            actual_cost=actual_cost,
+            user_id=user_id
+        )
+        await self.routing_model.record_outcome(
+            analysis.features, route_key, result.success, actual_execution_time, actual_cost,
+            analysis.decision_source
+        )
+        
         logger.info(f"📊 Performance updated: Predicted={analysis.estimated_duration}s, Actual={actual_execution_time:.1f}s")
     
+    def _collect_metrics(self):
+        stats = self.snippet_cache.get_stats()
+        self.metrics_registry.observe_cache("snippet_analysis", stats['hits'], stats['misses'])
+    
     def get_routing_analytics(self) -> Dict[str, Any]:
         """Get comprehensive routing analytics"""
         
-        total_routes = len(self.routing_history)
+        totals = self.analytics.totals_snapshot()
+        total_routes = totals.decisions
         if total_routes == 0:
             return {'message': 'No routing data available'}
         
-        # Calculate metrics
-        e2b_routes = sum(1 for r in self.routing_history if r['analysis'].route_recommendation == ExecutionRoute.E2B)
+        e2b_routes = totals.route_counts.get(ExecutionRoute.E2B.value, 0)
         scrapybara_routes = total_routes - e2b_routes
         
-        avg_complexity = sum(r['analysis'].score for r in self.routing_history) / total_routes
-        avg_confidence = sum(r['analysis'].confidence for r in self.routing_history) / total_routes
-        
         return {
             'total_routes': total_routes,
             'e2b_usage': {
@@ -756,21 +764,21 @@ class IntelligentExecutionRouter:
                 'count': scrapybara_routes,
                 'percentage': (scrapybara_routes / total_routes) * 100
             },
-            'average_complexity': avg_complexity,
-            'average_confidence': avg_confidence,
-            'cost_optimization': self._calculate_cost_savings()
+            'average_complexity': totals.average_complexity,
+            'average_confidence': totals.average_confidence,
+            'route_performance': self.analytics.route_summary(),
+            'learned_routing': self.routing_model.get_stats(),
+            'cost_optimization': self._calculate_cost_savings(totals)
         }
     
-    def _calculate_cost_savings(self) -> Dict[str, float]:
+    def _calculate_cost_savings(self, aggregate: Optional[RoutingAggregate] = None) -> Dict[str, float]:
         """Calculate cost savings from intelligent routing"""
         
-        total_estimated_cost = sum(r['analysis'].estimated_cost for r in self.routing_history)
+        aggregate = aggregate or self.analytics.totals_snapshot()
+        total_estimated_cost = aggregate.estimated_cost_sum
         
-        # Calculate what cost would be if everything used Scrapybara
-        scrapybara_cost = sum(
-            (r['analysis'].estimated_duration / 3600) * self.SCRAPYBARA_COST_PER_HOUR 
-            for r in self.routing_history
-        )
+        # What the cost would have been if everything used Scrapybara
+        scrapybara_cost = aggregate.scrapybara_only_cost_sum
         
         savings = scrapybara_cost - total_estimated_cost
         savings_percentage = (savings / scrapybara_cost) * 100 if scrapybara_cost > 0 else 0
@@ -0,0 +1,532 @@
+# backend/services/job_runner.py
+"""
+🧵 Background Job Runner - Durable, bounded execution for long workflows
+Scout workflows and Library research sessions used to run on a fresh daemon
+thread with its own event loop per request: unbounded, invisible, and lost on
+restart. Jobs now go through one runner:
+
+- a SQLite job table (JOB_DB_PATH) so queued and interrupted jobs survive a
+  restart and finished results stay queryable
+- a fixed pool of worker threads (JOB_WORKERS), each with one long-lived
+  event loop, fed from a bounded queue (JOB_QUEUE_LIMIT)
+- retries with exponential backoff (JOB_MAX_ATTEMPTS, JOB_RETRY_BACKOFF_SECONDS)
+- cancellation of queued and running jobs
+- progress and status events over SocketIO (room "job_<id>")
+- queue depth, wait time and run time in the metrics registry
+
+Handlers are registered per job kind:
+
+    runner = get_job_runner()
+    runner.register("research", run_research)      # async def run_research(ctx: JobContext)
+    job = runner.submit("research", {"query": ...})
+"""
+
+import os
+import json
+import time
+import queue
+import sqlite3
+import asyncio
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+from .metrics_registry import get_metrics_registry
+from .loop_monitor import monitor_loop
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFullError(Exception):
+    """Raised by submit() when the queue is at JOB_QUEUE_LIMIT"""
+
+
+class JobExistsError(Exception):
+    """Raised by submit() when a job with the requested id already exists"""
+
+
+class JobCancelledError(Exception):
+    """Raised inside a handler by JobContext.check_cancelled()"""
+
+
+class JobStore:
+    """SQLite-backed job table; one connection guarded by a lock"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 1,
+                    progress REAL NOT NULL DEFAULT 0,
+                    progress_message TEXT,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    updated_at REAL NOT NULL,
+                    not_before REAL NOT NULL DEFAULT 0
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_kind ON jobs (kind, created_at)")
+
+    def insert(self, job_id: str, kind: str, payload: Dict[str, Any], max_attempts: int) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, max_attempts, created_at, updated_at) "
+                "VALUES (?, ?, ?, 'queued', ?, ?, ?)",
+                (job_id, kind, json.dumps(payload, default=str), max_attempts, now, now))
+
+    def runnable_since(self, job_id: str) -> Optional[float]:
+        """When a queued job became runnable: when it was (re)queued, or when its retry backoff ended"""
+        with self._lock:
+            row = self._conn.execute("SELECT MAX(updated_at, not_before) FROM jobs WHERE id = ?",
+                                     (job_id,)).fetchone()
+        return row[0] if row else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        fields['updated_at'] = time.time()
+        if fields.get('result') is not None:
+            fields['result'] = json.dumps(fields['result'], default=str)
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        with self._lock:
+            self._conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+
+    def transition(self, job_id: str, from_statuses: Tuple[str, ...], **fields: Any) -> bool:
+        """Update only if the job is still in one of `from_statuses`; returns whether it was"""
+        fields['updated_at'] = time.time()
+        assignments = ', '.join(f"{key} = ?" for key in fields)
+        placeholders = ', '.join('?' for _ in from_statuses)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ? AND status IN ({placeholders})",
+                (*fields.values(), job_id, *from_statuses))
+            return cursor.rowcount == 1
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        if kind:
+            clauses.append("kind = ?")
+            params.append(kind)
+        if status:
+            clauses.append("status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT * FROM jobs {where} ORDER BY created_at DESC LIMIT ?", (*params, limit)).fetchall()
+        return [self._row_to_dict(row) for row in rows]
+
+    def pending(self) -> List[Tuple[str, str, str, float]]:
+        """(id, kind, status, not_before) of jobs that still need to run, oldest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, status, not_before FROM jobs WHERE status IN ('queued', 'running') "
+                "ORDER BY created_at").fetchall()
+        return [tuple(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    @staticmethod
+    def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['payload'] = json.loads(job['payload']) if job['payload'] else {}
+        job['result'] = json.loads(job['result']) if job['result'] else None
+        job['cancel_requested'] = bool(job['cancel_requested'])
+        for key in ('created_at', 'started_at', 'finished_at', 'updated_at'):
+            if job[key]:
+                job[key] = datetime.fromtimestamp(job[key]).isoformat()
+        job.pop('not_before', None)
+        return job
+
+
+class JobContext:
+    """What a handler sees: the job id, payload, attempt number and a progress hook"""
+
+    def __init__(self, runner: 'JobRunner', job_id: str, kind: str, payload: Dict[str, Any], attempt: int):
+        self.runner = runner
+        self.id = job_id
+        self.kind = kind
+        self.payload = payload
+        self.attempt = attempt
+
+    def report_progress(self, progress: float, message: str = '', **data: Any) -> None:
+        """progress is 0..1; extra keyword data is forwarded in the SocketIO event"""
+        self.runner._report_progress(self, max(0.0, min(1.0, progress)), message, data)
+
+    def check_cancelled(self) -> None:
+        """For handlers with long synchronous sections between awaits"""
+        if self.runner.is_cancel_requested(self.id):
+            raise JobCancelledError(self.id)
+
+
+JobHandler = Callable[[JobContext], Awaitable[Any]]
+
+
+class JobRunner:
+    """🧵 Bounded worker pool over the persistent job table"""
+
+    def __init__(self,
+                 db_path: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 queue_limit: Optional[int] = None,
+                 max_attempts: Optional[int] = None,
+                 retry_backoff_seconds: Optional[float] = None):
+        db_path = db_path or os.getenv('JOB_DB_PATH', os.path.join(os.getcwd(), 'data', 'jobs.db'))
+        self.store = JobStore(db_path)
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', '4'))
+        self.queue_limit = queue_limit or int(os.getenv('JOB_QUEUE_LIMIT', '100'))
+        self.default_max_attempts = max_attempts or int(os.getenv('JOB_MAX_ATTEMPTS', '2'))
+        self.retry_backoff_seconds = retry_backoff_seconds if retry_backoff_seconds is not None else \
+            float(os.getenv('JOB_RETRY_BACKOFF_SECONDS', '10'))
+
+        self.socketio = None
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._queued: Dict[str, str] = {}  # job id -> kind, for queue depth
+        self._reserved = 0                 # submits between the limit check and _enqueue
+        self._running: Dict[str, Tuple[asyncio.AbstractEventLoop, asyncio.Task]] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._workers: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._started = False
+        self._stopping = threading.Event()
+
+        metrics = get_metrics_registry()
+        self.queue_depth_metric = metrics.gauge(
+            'mama_bear_jobs_queued', "Background jobs waiting for a worker", ('kind',))
+        self.running_metric = metrics.gauge(
+            'mama_bear_jobs_running', "Background jobs currently executing", ('kind',))
+        self.wait_metric = metrics.histogram(
+            'mama_bear_job_wait_seconds', "Time from enqueue to a worker picking the job up", ('kind',))
+        self.duration_metric = metrics.histogram(
+            'mama_bear_job_duration_seconds', "Job run time per attempt", ('kind',))
+        self.outcome_metric = metrics.counter(
+            'mama_bear_jobs_total', "Finished job attempts by kind and outcome", ('kind', 'outcome'))
+
+    # -- setup ----------------------------------------------------------------
+
+    def attach_socketio(self, socketio) -> None:
+        self.socketio = socketio
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        """Register the coroutine that runs jobs of `kind`; requeues its unfinished jobs"""
+        with self._lock:
+            self._handlers[kind] = handler
+            started = self._started
+        if started:
+            self._recover(kind)
+
+    def get_handler(self, kind: str) -> Optional[JobHandler]:
+        with self._lock:
+            return self._handlers.get(kind)
+
+    def start(self) -> None:
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            self._stopping.clear()
+            for i in range(self.max_workers):
+                worker = threading.Thread(target=self._worker, name=f"job-worker-{i}", daemon=True)
+                worker.start()
+                self._workers.append(worker)
+        self._recover()
+        logger.info(f"🧵 Job runner started with {self.max_workers} workers ({self.store.db_path})")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stopping.set()
+        with self._lock:
+            for timer in self._timers.values():
+                timer.cancel()
+            self._timers.clear()
+            for loop, task in self._running.values():
+                loop.call_soon_threadsafe(task.cancel)
+            workers = list(self._workers)
+            self._workers.clear()
+            self._started = False
+        for _ in workers:
+            self._queue.put(None)
+        for worker in workers:
+            worker.join(timeout)
+
+    def _recover(self, kind: Optional[str] = None) -> None:
+        """Requeue jobs left queued or running (interrupted by a restart)"""
+        recovered = 0
+        for job_id, job_kind, status, not_before in self.store.pending():
+            if (kind and job_kind != kind) or job_kind not in self._handlers:
+                continue
+            with self._lock:
+                if job_id in self._queued or job_id in self._running or job_id in self._timers:
+                    continue
+            if status == 'running':
+                self.store.update(job_id, status='queued', progress_message='Requeued after restart')
+            self._enqueue(job_id, job_kind, delay=max(0.0, not_before - time.time()))
+            recovered += 1
+        if recovered:
+            logger.info(f"🧵 Recovered {recovered} unfinished job(s)")
+
+    # -- public API -----------------------------------------------------------
+
+    def submit(self, kind: str, payload: Dict[str, Any], job_id: Optional[str] = None,
+               max_attempts: Optional[int] = None) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        with self._lock:
+            # Hold a place in the queue until the job is in it, so concurrent
+            # submits can't all pass the check before any of them is counted
+            if len(self._queued) + self._reserved >= self.queue_limit:
+                raise JobQueueFullError(f"Job queue is full ({self.queue_limit} waiting)")
+            self._reserved += 1
+        job_id = job_id or f"{kind}_{os.urandom(6).hex()}"
+        try:
+            try:
+                self.store.insert(job_id, kind, payload, max_attempts or self.default_max_attempts)
+            except sqlite3.IntegrityError:
+                raise JobExistsError(f"Job {job_id} already exists") from None
+            self._enqueue(job_id, kind)
+        finally:
+            with self._lock:
+                self._reserved -= 1
+        self._emit_status(job_id)
+        return self.store.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def list(self, kind: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        return self.store.list(kind, status, limit)
+
+    def is_cancel_requested(self, job_id: str) -> bool:
+        job = self.store.get(job_id)
+        return bool(job and job['cancel_requested'])
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it is unknown or already finished"""
+        if self.store.transition(job_id, ('queued',), status='cancelled', cancel_requested=1,
+                                 finished_at=time.time()):
+            with self._lock:
+                kind = self._queued.pop(job_id, None)
+                timer = self._timers.pop(job_id, None)
+            if timer:
+                timer.cancel()
+            if kind:
+                self.queue_depth_metric.labels(kind).dec()
+                self.outcome_metric.labels(kind, 'cancelled').inc()
+            self._emit_status(job_id)
+            return True
+
+        if self.store.transition(job_id, ('running',), cancel_requested=1):
+            with self._lock:
+                running = self._running.get(job_id)
+            if running:
+                loop, task = running
+                loop.call_soon_threadsafe(task.cancel)
+            return True
+        return False
+
+    def retry(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Re-run a failed or cancelled job with a fresh attempt budget"""
+        job = self.store.get(job_id)
+        if not job or job['kind'] not in self._handlers:
+            return None
+        if not self.store.transition(job_id, ('failed', 'cancelled'), status='queued', attempts=0,
+                                     cancel_requested=0, error=None, progress=0, finished_at=None):
+            return None
+        self._enqueue(job_id, job['kind'])
+        self._emit_status(job_id)
+        return self.store.get(job_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            queued = len(self._queued)
+            running = len(self._running)
+            delayed = len(self._timers)
+        return {
+            'workers': self.max_workers,
+            'queue_limit': self.queue_limit,
+            'queued': queued,
+            'running': running,
+            'retry_scheduled': delayed,
+            'utilization': running / self.max_workers if self.max_workers else 0.0,
+            'job_counts': self.store.counts(),
+            'handlers': sorted(self._handlers)
+        }
+
+    # -- execution ------------------------------------------------------------
+
+    def _enqueue(self, job_id: str, kind: str, delay: float = 0.0) -> None:
+        if delay > 0:
+            timer = threading.Timer(delay, self._enqueue_after_delay, args=(job_id, kind))
+            timer.daemon = True
+            with self._lock:
+                self._timers[job_id] = timer
+            timer.start()
+            return
+        with self._lock:
+            self._queued[job_id] = kind
+        self.queue_depth_metric.labels(kind).inc()
+        self._queue.put(job_id)
+
+    def _enqueue_after_delay(self, job_id: str, kind: str) -> None:
+        with self._lock:
+            if self._timers.pop(job_id, None) is None:
+                return  # cancelled meanwhile
+        self._enqueue(job_id, kind)
+
+    def _worker(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        monitor = monitor_loop(threading.current_thread().name, loop)
+        try:
+            while not self._stopping.is_set():
+                job_id = self._queue.get()
+                if job_id is None:
+                    break
+                with self._lock:
+                    kind = self._queued.pop(job_id, None)
+                if kind is None:
+                    continue  # cancelled while queued
+                self.queue_depth_metric.labels(kind).dec()
+                monitor.resume()
+                try:
+                    loop.run_until_complete(self._run_job(loop, job_id))
+                except Exception as e:
+                    logger.error(f"❌ Job runner error on {job_id}: {e}")
+        finally:
+            monitor.stop()
+            # Let the heartbeat task finish cancelling before the loop closes
+            loop.run_until_complete(asyncio.gather(*asyncio.all_tasks(loop), return_exceptions=True))
+            loop.close()
+
+    async def _run_job(self, loop: asyncio.AbstractEventLoop, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if not job or job['status'] != 'queued':
+            return
+        kind = job['kind']
+        handler = self._handlers.get(kind)
+        if handler is None:
+            self.store.update(job_id, status='failed', error=f"No handler for job kind '{kind}'",
+                              finished_at=time.time())
+            self._emit_status(job_id)
+            return
+
+        attempt = job['attempts'] + 1
+        # Wait time excludes a retry's backoff, during which the job wasn't runnable
+        runnable_since = self.store.runnable_since(job_id)
+        started = time.time()
+        if not self.store.transition(job_id, ('queued',), status='running', attempts=attempt,
+                                     started_at=started, error=None):
+            return
+        self.wait_metric.labels(kind).observe(max(0.0, started - (runnable_since or started)))
+        self._emit_status(job_id)
+
+        ctx = JobContext(self, job_id, kind, job['payload'], attempt)
+        task = loop.create_task(handler(ctx))
+        with self._lock:
+            self._running[job_id] = (loop, task)
+        self.running_metric.labels(kind).inc()
+        try:
+            result = await task
+        except (asyncio.CancelledError, JobCancelledError):
+            if self._stopping.is_set() and not self.is_cancel_requested(job_id):
+                # Shutdown, not a user cancel: leave it for recovery on the next start
+                self.store.update(job_id, status='queued', progress_message='Interrupted by shutdown')
+                self.duration_metric.labels(kind).observe(time.time() - started)
+            else:
+                self._finish(job_id, kind, started, 'cancelled', error='Cancelled')
+        except Exception as e:
+            logger.error(f"❌ Job {job_id} attempt {attempt} failed: {e}")
+            if attempt < job['max_attempts'] and not self._stopping.is_set() \
+                    and not self.is_cancel_requested(job_id):
+                delay = self.retry_backoff_seconds * (2 ** (attempt - 1))
+                self.store.update(job_id, status='queued', error=str(e), not_before=time.time() + delay,
+                                  progress_message=f"Retrying in {delay:.0f}s after: {e}")
+                self.duration_metric.labels(kind).observe(time.time() - started)
+                self.outcome_metric.labels(kind, 'retried').inc()
+                self._emit_status(job_id)
+                self._enqueue(job_id, kind, delay=delay)
+            else:
+                self._finish(job_id, kind, started, 'failed', error=str(e))
+        else:
+            self._finish(job_id, kind, started, 'succeeded', result=result)
+        finally:
+            with self._lock:
+                self._running.pop(job_id, None)
+            self.running_metric.labels(kind).dec()
+
+    def _finish(self, job_id: str, kind: str, started: float, status: str,
+                result: Any = None, error: Optional[str] = None) -> None:
+        fields = {'status': status, 'finished_at': time.time(), 'error': error}
+        if status == 'succeeded':
+            fields.update(progress=1.0, result=result)
+        self.store.update(job_id, **fields)
+        self.duration_metric.labels(kind).observe(time.time() - started)
+        self.outcome_metric.labels(kind, status).inc()
+        self._emit_status(job_id)
+        logger.info(f"🧵 Job {job_id} {status} in {time.time() - started:.1f}s")
+
+    # -- progress -------------------------------------------------------------
+
+    def _report_progress(self, ctx: JobContext, progress: float, message: str, data: Dict[str, Any]) -> None:
+        self.store.update(ctx.id, progress=progress, progress_message=message)
+        self._emit('job_progress', ctx.id, {
+            'job_id': ctx.id,
+            'kind': ctx.kind,
+            'attempt': ctx.attempt,
+            'progress': progress,
+            'message': message,
+            **data
+        })
+
+    def _emit_status(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job:
+            job.pop('payload', None)
+            job.pop('result', None)
+            self._emit('job_status', job_id, job)
+
+    def _emit(self, event: str, job_id: str, data: Dict[str, Any]) -> None:
+        if self.socketio is None:
+            return
+        try:
+            self.socketio.emit(event, data, room=f"job_{job_id}")
+        except Exception as e:
+            logger.debug(f"Failed to emit {event} for {job_id}: {e}")
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Process-wide job runner; workers start on first use"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner()
+            _runner.start()
+        return _runner
@@ -0,0 +1,154 @@
+# backend/services/loop_monitor.py
+"""
+⏱️ Event Loop Lag Monitor
+A heartbeat coroutine runs on the watched loop and a watchdog thread checks
+that it keeps beating. When the loop stalls past the threshold, the watchdog
+logs the loop thread's stack - which points straight at the blocking call.
+
+Every long-lived loop registers through monitor_loop(): the provider I/O loop
+and each job-runner worker loop. Loops that only live for one request
+(asyncio.run / new_event_loop inside a Flask handler) are not watched; a
+stall there blocks that request alone and shows up in its trace duration.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+import traceback
+import os
+import logging
+from typing import Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LoopLagMonitor:
+    """
+    ⏱️ Flags blocking calls made from coroutine code
+
+    Usage (from inside the loop being watched):
+        monitor = LoopLagMonitor(threshold_ms=100)
+        monitor.attach(asyncio.get_running_loop())
+    """
+
+    def __init__(self,
+                 threshold_ms: float = 100.0,
+                 interval_ms: float = 25.0,
+                 capture_stacks: bool = True):
+        self.threshold_ms = threshold_ms
+        self.interval_ms = interval_ms
+        self.capture_stacks = capture_stacks
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._last_beat = time.monotonic()
+        self._stall_reported = False
+        self._resumed_at = 0.0
+
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self.total_lag_ms = 0.0
+        self.last_stall_stack: Optional[str] = None
+
+    def attach(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start watching `loop`. Must be called from the loop's own thread."""
+        self._loop = loop
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+
+        # asyncio's own slow-callback warning names the offending task when
+        # debug mode is on; keep it aligned with our threshold.
+        loop.slow_callback_duration = self.threshold_ms / 1000.0
+
+        self._heartbeat_task = loop.create_task(self._heartbeat())
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def _heartbeat(self) -> None:
+        interval = self.interval_ms / 1000.0
+        while not self._stopped.is_set():
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            # Time the loop sat stopped between run_until_complete() calls isn't lag
+            lag_ms = max(0.0, (now - max(expected, self._resumed_at)) * 1000)
+            self._last_beat = now
+
+            if lag_ms >= self.threshold_ms:
+                self.stalls += 1
+                self.total_lag_ms += lag_ms
+                self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+                logger.warning(f"⏱️ Event loop blocked for {lag_ms:.0f}ms "
+                               f"(threshold {self.threshold_ms:.0f}ms)")
+            self._stall_reported = False
+
+    def _watch(self) -> None:
+        interval = self.interval_ms / 1000.0
+        while not self._stopped.wait(interval):
+            if self._loop is None or not self._loop.is_running():
+                continue
+            stalled_ms = (time.monotonic() - self._last_beat) * 1000
+            if stalled_ms < self.threshold_ms + self.interval_ms or self._stall_reported:
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self._stall_reported = True
+            self.last_stall_stack = ''.join(traceback.format_stack(frame))
+            logger.warning(f"⏱️ Event loop stalled for {stalled_ms:.0f}ms, blocking call:\n"
+                           f"{self.last_stall_stack}")
+
+    def resume(self) -> None:
+        """
+        Call before each run_until_complete() on a loop that is stopped
+        between runs, so the idle time isn't counted as lag.
+        """
+        self._resumed_at = self._last_beat = time.monotonic()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._heartbeat_task is not None and self._loop is not None and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._heartbeat_task.cancel)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'threshold_ms': self.threshold_ms,
+            'stalls': self.stalls,
+            'max_lag_ms': round(self.max_lag_ms, 2),
+            'avg_stall_ms': round(self.total_lag_ms / self.stalls, 2) if self.stalls else 0.0,
+            'last_stall_stack': self.last_stall_stack
+        }
+
+
+_monitors: Dict[str, LoopLagMonitor] = {}
+_monitors_lock = threading.Lock()
+
+
+def monitor_loop(name: str, loop: asyncio.AbstractEventLoop,
+                 monitor: Optional[LoopLagMonitor] = None) -> LoopLagMonitor:
+    """
+    Attach `monitor` (a new one at ASYNC_LOOP_LAG_WARN_MS if not given) to a
+    long-lived loop and list it in get_loop_lag_stats(). Must be called from
+    the loop's own thread.
+    """
+    monitor = monitor or LoopLagMonitor(threshold_ms=float(os.getenv('ASYNC_LOOP_LAG_WARN_MS', '100')))
+    monitor.attach(loop)
+    with _monitors_lock:
+        previous = _monitors.get(name)
+        _monitors[name] = monitor
+    if previous is not None:
+        previous.stop()
+    return monitor
+
+
+def get_loop_lag_stats() -> Dict[str, Dict[str, Any]]:
+    """Lag stats for every monitored loop, by loop name"""
+    with _monitors_lock:
+        monitors = dict(_monitors)
+    return {name: monitor.get_stats() for name, monitor in monitors.items()}
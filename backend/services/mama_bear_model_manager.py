@@ -1,14 +1,23 @@
 # backend/services/mama_bear_model_manager.py
 import asyncio
+import os
 import time
 import logging
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
-from enum import Enum
+from functools import cached_property
+from enum import Enum, IntEnum
 import google.generativeai as genai
 from datetime import datetime, timedelta
 import json
 
+from .request_hedging import RequestHedger
+from .provider_adapters import gemini_client_options
+from .metrics_registry import get_metrics_registry
+from .single_flight import get_single_flight, request_key
+from .adaptive_concurrency import LoadShedError, get_concurrency_limiter, is_rate_limit_error
+from .quota_forecaster import QuotaForecaster
+
 # Import specialized variants
 try:
     from .mama_bear_specialized_variants import (
@@ -25,7 +34,8 @@ except ImportError:
     class IntegrationArchitect: pass
     class LiveAPISpecialist: pass
 
-class ModelPriority(Enum):
+class ModelPriority(IntEnum):
+    """Lower ranks first; an IntEnum so ranking compares members directly"""
     PRIMARY = 1
     SECONDARY = 2
     FALLBACK = 3
@@ -57,6 +67,23 @@ class ModelConfig:
     consecutive_errors: int = 0
     is_healthy: bool = True
     last_error: Optional[str] = None
+    
+    # Looked up once per model rather than on every routing decision
+    @cached_property
+    def quota_key(self) -> str:
+        return f"{self.name}@{self.billing_account}"
+    
+    @cached_property
+    def limiter(self):
+        return get_concurrency_limiter("google_ai", self.name, self.billing_account)
+    
+    @cached_property
+    def is_pro(self) -> bool:
+        return 'pro' in self.name.lower()
+    
+    @cached_property
+    def is_flash(self) -> bool:
+        return 'flash' in self.name.lower()
 
 @dataclass
 class MamaBearResponse:
@@ -85,6 +112,29 @@ class MamaBearModelManager:
         self.max_fallback_delay = 30.0
         self.health_check_interval = 300  # 5 minutes
         
+        # Opt-in speculative hedging (per call via hedge=True)
+        self.hedging_enabled = os.getenv('MAMA_BEAR_HEDGING_ENABLED', 'False').lower() == 'true'
+        self.hedger = RequestHedger()
+        self.single_flight = get_single_flight("model_manager")
+        
+        # Forecast time-to-exhaustion from per-minute usage so load moves before limits hit
+        self.quota_forecaster = QuotaForecaster()
+        self.forecast_pressure_threshold = float(os.getenv('QUOTA_FORECAST_PENALTY_PRESSURE', '0.5'))
+        for config in self.models.values():
+            self.quota_forecaster.register(self._quota_key(config), config.requests_per_minute,
+                                           config.requests_per_day)
+        
+        self.metrics_registry = get_metrics_registry()
+        self.model_healthy = self.metrics_registry.gauge(
+            'mama_bear_model_healthy',
+            "1 if the model/account pair is currently considered healthy",
+            ('model', 'account'))
+        self.quota_pressure = self.metrics_registry.gauge(
+            'mama_bear_quota_pressure',
+            "Forecast quota pressure: 0 = not expected to run out within the horizon, 1 = out now",
+            ('model', 'account'))
+        self.metrics_registry.register_collector("model_manager", self._collect_metrics)
+        
         # Start background health monitoring
         asyncio.create_task(self._background_health_monitor())
     
@@ -178,6 +228,19 @@ class MamaBearModelManager:
         model_config.current_requests_minute += 1
         model_config.current_requests_day += 1
         model_config.last_request_time = current_time
+        self.quota_forecaster.record(self._quota_key(model_config), now=current_time)
+    
+    @staticmethod
+    def _quota_key(config: ModelConfig) -> str:
+        return config.quota_key
+    
+    def _quota_forecast(self) -> Dict[str, Dict[str, Any]]:
+        """Forecast per model/account; day counters past their window count as reset"""
+        now = time.time()
+        return self.quota_forecaster.forecast(lambda: {
+            self._quota_key(config): config.current_requests_day if now - config.last_day_reset < 86400 else 0
+            for config in self.models.values()
+        }, now=now)
     
     def _get_quota_status(self, model_config: ModelConfig) -> QuotaStatus:
         """Check current quota status for a model"""
@@ -197,58 +260,95 @@ class MamaBearModelManager:
         
         return QuotaStatus.AVAILABLE
     
-    def _select_optimal_model(self, message_context: Dict[str, Any]) -> Optional[ModelConfig]:
+    def _select_optimal_model(self, message_context: Dict[str, Any],
+                              exclude: Optional[List[ModelConfig]] = None) -> Optional[ModelConfig]:
         """
         Intelligently select the best model based on:
-        - Current quota status
+        - Current quota status and forecast time-to-exhaustion
         - Model capabilities
         - Message complexity
         - Priority levels
         """
         available_models = []
+        exclude = exclude or []
+        forecast = self._quota_forecast()
+        pressure_threshold = self.forecast_pressure_threshold
         
         # First pass: collect available models by priority
         for model_id, config in self.models.items():
-            quota_status = self._get_quota_status(config)
+            if exclude and any(config is excluded for excluded in exclude):
+                continue
             
+            quota_status = self._get_quota_status(config)
             if quota_status == QuotaStatus.AVAILABLE:
-                available_models.append((config, 0))  # No penalty
+                penalty = 0  # No penalty
             elif quota_status == QuotaStatus.LIMITED:
-                available_models.append((config, 1))  # Small penalty
-            # Skip EXHAUSTED and ERROR models
+                penalty = 1  # Small penalty
+            else:
+                continue  # Skip EXHAUSTED and ERROR models
+            
+            would_shed, saturated, load = config.limiter.routing_state()
+            if would_shed:
+                continue  # Queue already full; the call would be shed
+            
+            # Saturated models (every slot in flight) and models forecast to run out
+            # of quota soon rank behind ones with headroom
+            if saturated:
+                penalty += 1
+            forecast_entry = forecast.get(config.quota_key) if forecast else None
+            pressure = forecast_entry['pressure'] if forecast_entry else 0.0
+            if pressure >= pressure_threshold:
+                penalty += 1
+            # The position breaks ties so configs are never compared
+            available_models.append((config.priority, penalty, pressure, load,
+                                     len(available_models), config))
         
         if not available_models:
             self.logger.warning("No models available, will attempt emergency fallback")
             return None
         
-        # Sort by priority and penalty
-        available_models.sort(key=lambda x: (x[0].priority.value, x[1]))
+        # Sort by priority and penalty, then by forecast pressure and concurrency load
+        available_models.sort()
+        ranked = [entry[-1] for entry in available_models]
         
         # Select based on message complexity
         message_length = len(str(message_context.get('message', '')))
         
         # For complex requests, prefer Pro models
         if message_length > 1000 or message_context.get('requires_reasoning', False):
-            for config, penalty in available_models:
-                if 'pro' in config.name.lower():
+            for config in ranked:
+                if config.is_pro:
                     return config
         
         # For quick responses, prefer Flash models
         if message_length < 500:
-            for config, penalty in available_models:
-                if 'flash' in config.name.lower():
+            for config in ranked:
+                if config.is_flash:
                     return config
         
         # Default: return the highest priority available model
-        return available_models[0][0]
+        return ranked[0]
+    
+    @staticmethod
+    def _limiter(config: ModelConfig):
+        return config.limiter
+    
+    @staticmethod
+    async def _generate(model_config: ModelConfig, content: str, generation_config: Dict[str, Any]):
+        """
+        Call the model under its own account's key. genai.configure() is
+        process-wide and the SDK builds its client inside generate_content_async,
+        so the key is set only once this call holds its limiter slot, with no
+        await before the client is built; a call still queued for another
+        account can't swap the key out from under it.
+        """
+        genai.configure(api_key=model_config.api_key, **gemini_client_options())
+        model = genai.GenerativeModel(model_config.name)
+        return await model.generate_content_async(content, generation_config=generation_config)
     
     async def _make_api_call(self, model_config: ModelConfig, messages: List[Dict], **kwargs) -> str:
         """Make actual API call with proper error handling"""
         try:
-            # Configure the API client
-            genai.configure(api_key=model_config.api_key)
-            model = genai.GenerativeModel(model_config.name)
-            
             # Prepare the message content
             message_content = messages[-1].get('content', '') if messages else ''
             
@@ -260,24 +360,35 @@ class MamaBearModelManager:
                 'top_k': kwargs.get('top_k', 64),
             }
             
-            # Make the API call
-            response = await model.generate_content_async(
-                message_content,
-                generation_config=generation_config
+            # Make the API call; identical concurrent requests to this model share one call,
+            # and only that call takes a slot under the model/account's concurrency limit
+            call_start = time.perf_counter()
+            response = await self.single_flight.run(
+                request_key(model_config.name, model_config.billing_account, message_content, generation_config),
+                lambda: self._limiter(model_config).run(
+                    lambda: self._generate(model_config, message_content, generation_config))
             )
             
+            self.metrics_registry.model_latency.labels(
+                "google_ai", model_config.name, model_config.priority.name).observe(time.perf_counter() - call_start)
+            self.metrics_registry.model_requests.labels("google_ai", model_config.name, "success").inc()
             return response.text
             
-        except Exception as e:
-            error_msg = str(e).lower()
+        except LoadShedError:
+            # Rejected before reaching the provider; not a model error
+            self.metrics_registry.model_requests.labels("google_ai", model_config.name, "shed").inc()
+            raise
             
-            # Handle specific quota errors
-            if any(quota_term in error_msg for quota_term in ['quota', 'limit', 'rate', 'exceeded']):
+        except Exception as e:
+            # Handle specific quota errors (429 / RESOURCE_EXHAUSTED)
+            if is_rate_limit_error(e):
+                self.metrics_registry.model_requests.labels("google_ai", model_config.name, "quota_exceeded").inc()
                 self.logger.warning(f"Quota exceeded for {model_config.name}: {e}")
                 model_config.current_requests_day = model_config.requests_per_day  # Mark as exhausted
                 raise QuotaExceededException(f"Quota exceeded: {e}")
             
             # Handle other API errors
+            self.metrics_registry.model_requests.labels("google_ai", model_config.name, "error").inc()
             model_config.consecutive_errors += 1
             if model_config.consecutive_errors >= 3:
                 model_config.is_healthy = False
@@ -297,6 +408,7 @@ class MamaBearModelManager:
         start_time = time.time()
         fallback_count = 0
         quota_warnings = []
+        hedge = kwargs.pop('hedge', self.hedging_enabled)
         
         # Prepare message context for model selection
         message_context = {
@@ -324,8 +436,29 @@ class MamaBearModelManager:
                 # Log the attempt
                 self.logger.info(f"Attempting request with {selected_model.name} (account: {selected_model.billing_account})")
                 
-                # Make the API call
-                response_content = await self._make_api_call(selected_model, messages, **kwargs)
+                # Make the API call, hedged against the next-best model if enabled
+                hedge_model = self._select_optimal_model(message_context, exclude=[selected_model]) if hedge else None
+                
+                if hedge_model:
+                    async def call_hedge_model():
+                        self._update_quota_counters(hedge_model)
+                        return await self._make_api_call(hedge_model, messages, **kwargs)
+                    
+                    response_content, outcome = await self.hedger.run(
+                        self._hedge_key(selected_model),
+                        lambda: self._make_api_call(selected_model, messages, **kwargs),
+                        self._hedge_key(hedge_model),
+                        call_hedge_model,
+                        tier=selected_model.priority.name
+                    )
+                    if outcome.winner_key == self._hedge_key(hedge_model):
+                        selected_model = hedge_model
+                else:
+                    call_start = time.perf_counter()
+                    response_content = await self._make_api_call(selected_model, messages, **kwargs)
+                    # Keeps the hedge delay tuned for when hedging is asked for
+                    self.hedger.record_latency(self._hedge_key(selected_model),
+                                               (time.perf_counter() - call_start) * 1000)
                 
                 # Success! Reset error counters
                 selected_model.consecutive_errors = 0
@@ -344,6 +477,12 @@ class MamaBearModelManager:
                     quota_warnings=quota_warnings
                 )
                 
+            except LoadShedError as e:
+                # Overloaded rather than failing: move straight on to a model with headroom
+                quota_warnings.append(str(e))
+                self.logger.warning(f"Load shed, attempting fallback: {e}")
+                fallback_count += 1
+                
             except QuotaExceededException as e:
                 model_name = selected_model.name if selected_model else 'unknown model'
                 quota_warnings.append(f"Quota exceeded for {model_name}")
@@ -368,6 +507,17 @@ class MamaBearModelManager:
         # If we get here, all models failed
         raise AllModelsFailedException("All Gemini models are currently unavailable")
     
+    @staticmethod
+    def _hedge_key(config: ModelConfig) -> str:
+        return f"{config.name}@{config.billing_account}"
+    
+    def get_hedging_stats(self) -> Dict[str, Any]:
+        """Hedge rate, win rate and estimated tail latency saved"""
+        return {
+            'enabled_by_default': self.hedging_enabled,
+            **self.hedger.get_stats()
+        }
+    
     async def _background_health_monitor(self):
         """Background task to monitor and recover model health"""
         while True:
@@ -394,9 +544,26 @@ class MamaBearModelManager:
             except Exception as e:
                 self.logger.error(f"Health monitor error: {e}")
     
+    def _collect_metrics(self):
+        """Quota headroom and forecast pressure per model/account; counters past their window count as reset"""
+        now = time.time()
+        forecast = self._quota_forecast()
+        for config in self.models.values():
+            used_minute = config.current_requests_minute if now - config.last_minute_reset < 60 else 0
+            used_day = config.current_requests_day if now - config.last_day_reset < 86400 else 0
+            self.metrics_registry.quota_headroom.labels(config.name, config.billing_account, "minute").set(
+                max(0.0, 1 - used_minute / config.requests_per_minute))
+            self.metrics_registry.quota_headroom.labels(config.name, config.billing_account, "day").set(
+                max(0.0, 1 - used_day / config.requests_per_day))
+            self.model_healthy.labels(config.name, config.billing_account).set(1 if config.is_healthy else 0)
+            if self._quota_key(config) in forecast:
+                self.quota_pressure.labels(config.name, config.billing_account).set(
+                    forecast[self._quota_key(config)]['pressure'])
+    
     def get_model_status(self) -> Dict[str, Any]:
         """Get current status of all models for monitoring"""
         status = {}
+        forecast = self._quota_forecast()
         
         for model_id, config in self.models.items():
             quota_status = self._get_quota_status(config)
@@ -410,24 +577,46 @@ class MamaBearModelManager:
                 'requests_this_minute': config.current_requests_minute,
                 'is_healthy': config.is_healthy,
                 'consecutive_errors': config.consecutive_errors,
-                'last_error': config.last_error
+                'last_error': config.last_error,
+                'concurrency': self._limiter(config).snapshot(),
+                'quota_forecast': forecast.get(self._quota_key(config))
             }
         
         return status
     
-    async def warm_up_models(self):
-        """Warm up all models with test requests to check availability"""
-        self.logger.info("Starting model warm-up...")
+    async def warm_up_models(self, concurrency: Optional[int] = None, timeout: Optional[float] = None) -> Dict[str, bool]:
+        """
+        Warm up all models with test requests to check availability. Models
+        are probed concurrently (MODEL_WARM_UP_CONCURRENCY at a time) and a
+        probe that exceeds MODEL_WARM_UP_TIMEOUT_SECONDS counts as a failure.
+        Returns model_id -> ready.
+        """
+        concurrency = concurrency or int(os.getenv('MODEL_WARM_UP_CONCURRENCY', '4'))
+        timeout = timeout or float(os.getenv('MODEL_WARM_UP_TIMEOUT_SECONDS', '15'))
+        self.logger.info("Starting model warm-up (%d models, %d at a time)...", len(self.models), concurrency)
         
         test_message = [{'role': 'user', 'content': 'Hello, this is a test. Please respond with "Ready".'}]
+        semaphore = asyncio.Semaphore(concurrency)
+        start = time.time()
         
-        for model_id, config in self.models.items():
-            try:
-                await self._make_api_call(config, test_message)
-                self.logger.info(f"✓ {config.name} is ready")
-            except Exception as e:
-                self.logger.warning(f"✗ {config.name} failed warm-up: {e}")
+        async def warm_up(config: ModelConfig) -> bool:
+            async with semaphore:
+                try:
+                    await asyncio.wait_for(self._make_api_call(config, test_message), timeout)
+                    self.logger.info(f"✓ {config.name} is ready")
+                    return True
+                except asyncio.TimeoutError:
+                    self.logger.warning(f"✗ {config.name} failed warm-up: no response in {timeout:.0f}s")
+                except Exception as e:
+                    self.logger.warning(f"✗ {config.name} failed warm-up: {e}")
                 config.is_healthy = False
+                return False
+        
+        results = await asyncio.gather(*(warm_up(config) for config in self.models.values()))
+        ready = dict(zip(self.models.keys(), results))
+        self.logger.info("Model warm-up finished in %.2fs: %d/%d ready",
+                         time.time() - start, sum(results), len(results))
+        return ready
 
 # Custom exceptions
 class QuotaExceededException(Exception):
@@ -542,6 +731,7 @@ class EnhancedMamaBearAgent:
         """Get comprehensive system status"""
         return {
             'model_status': self.model_manager.get_model_status(),
+            'hedging': self.model_manager.get_hedging_stats(),
             'memory_status': await self.memory.get_status(),
             'active_variants': list(self.variants.keys()),
             'timestamp': datetime.now().isoformat()
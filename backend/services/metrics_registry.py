@@ -0,0 +1,319 @@
+# backend/services/metrics_registry.py
+"""
+📈 Metrics Registry - One place for counters, gauges and histograms
+Express mode, the supercharged agent, the performance tracker, the execution
+router and the model manager each kept numbers in their own `metrics` dict
+with their own JSON endpoint. They now also record into this registry, which
+renders everything at /metrics in the Prometheus text format (0.0.4).
+
+Hot-path updates are a dict lookup for the label set plus a short locked
+increment; nothing is formatted until /metrics is scraped. State that
+already lives elsewhere (quota counters, cache stats, tracker history) is
+pulled at scrape time by registered collectors instead of being mirrored on
+every request.
+
+    metrics = get_metrics_registry()
+    metrics.model_latency.labels("google_ai", "gemini-2.5-flash", "fast").observe(0.42)
+    metrics.register_collector("model_manager", self._collect_metrics)
+"""
+
+import math
+import bisect
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Tuple, Callable, Sequence, Iterator
+
+logger = logging.getLogger(__name__)
+
+# Seconds; model calls range from ~100ms express responses to multi-minute research
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+QUEUE_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return '+Inf' if value > 0 else '-Inf'
+    if math.isnan(value):
+        return 'NaN'
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+    def set_total(self, total: float) -> None:
+        """
+        Mirror a running total kept elsewhere, from a collector. A total lower
+        than the last one (the source was reset) reads as a counter reset.
+        """
+        with self._lock:
+            self.value = float(total)
+
+
+class _GaugeChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ('upper_bounds', 'counts', 'sum', '_lock')
+
+    def __init__(self, upper_bounds: Tuple[float, ...]):
+        self.upper_bounds = upper_bounds
+        # Per-bucket (non-cumulative) counts; the last slot is +Inf
+        self.counts = [0] * (len(upper_bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.upper_bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class Metric:
+    """A metric family: one child per distinct label set"""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: Any, **kwargs: Any):
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def clear(self) -> None:
+        """Drop all label sets (for collector-driven gauges whose label sets change)"""
+        with self._lock:
+            self._children = {}
+
+    def _items(self) -> List[Tuple[Tuple[str, ...], Any]]:
+        with self._lock:
+            return list(self._children.items())
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {_escape(self.documentation)}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        for key, child in self._items():
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.upper_bounds = tuple(sorted(float(b) for b in buckets if not math.isinf(b)))
+
+    def _new_child(self):
+        return _HistogramChild(self.upper_bounds)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {_escape(self.documentation)}"
+        yield f"# TYPE {self.name} {self.type_name}"
+        for key, child in self._items():
+            with child._lock:
+                counts = list(child.counts)
+                total_sum = child.sum
+            cumulative = 0
+            for bound, count in zip(self.upper_bounds + (math.inf,), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total_sum)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+
+class MetricsRegistry:
+    """📈 Metric families plus scrape-time collectors"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: Dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self.collector_errors = 0
+
+        # Shared families used across services
+        self.model_latency = self.histogram(
+            'mama_bear_model_request_duration_seconds',
+            "Model call latency by provider, model and speed/cost tier",
+            ('provider', 'model', 'tier'))
+        self.model_requests = self.counter(
+            'mama_bear_model_requests_total',
+            "Model calls by provider, model and outcome",
+            ('provider', 'model', 'outcome'))
+        self.request_latency = self.histogram(
+            'mama_bear_request_duration_seconds',
+            "End-to-end request latency by component and processing path",
+            ('component', 'path'))
+        self.requests = self.counter(
+            'mama_bear_requests_total',
+            "Requests handled by component and outcome",
+            ('component', 'outcome'))
+        self.provider_queue_depth = self.gauge(
+            'mama_bear_provider_queue_depth',
+            "Provider calls waiting for a concurrency slot",
+            ('provider', 'pool'))
+        self.provider_in_flight = self.gauge(
+            'mama_bear_provider_in_flight',
+            "Provider calls currently executing",
+            ('provider', 'pool'))
+        self.provider_queue_wait = self.histogram(
+            'mama_bear_provider_queue_wait_seconds',
+            "Time spent waiting for a provider concurrency slot",
+            ('provider', 'pool'), buckets=QUEUE_WAIT_BUCKETS)
+        self.quota_headroom = self.gauge(
+            'mama_bear_quota_headroom_ratio',
+            "Unused fraction of a model's quota window (1 = untouched, 0 = exhausted)",
+            ('model', 'account', 'window'))
+        self.cache_hit_ratio = self.gauge(
+            'mama_bear_cache_hit_ratio',
+            "Hit ratio of in-process caches since start",
+            ('cache',))
+        self.cache_lookups = self.counter(
+            'mama_bear_cache_lookups_total',
+            "Lookups served by in-process caches, by result",
+            ('cache', 'result'))
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered as {metric.type_name}{metric.labelnames}")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def register_collector(self, key: str, collector: Callable[[], None]) -> None:
+        """
+        Run `collector` before every scrape. Re-registering a key replaces the
+        previous collector, so re-created services don't pile up.
+        """
+        with self._lock:
+            self._collectors[key] = collector
+
+    def observe_cache(self, cache: str, hits: int, misses: int) -> None:
+        """Collector helper for caches that expose hit/miss counts"""
+        total = hits + misses
+        self.cache_lookups.labels(cache, 'hit').set_total(hits)
+        self.cache_lookups.labels(cache, 'miss').set_total(misses)
+        self.cache_hit_ratio.labels(cache).set(hits / total if total else 0.0)
+
+    def collect(self) -> None:
+        with self._lock:
+            collectors = list(self._collectors.items())
+        for key, collector in collectors:
+            try:
+                collector()
+            except Exception as e:
+                self.collector_errors += 1
+                logger.warning(f"Metrics collector {key} failed: {e}")
+
+    def render(self) -> str:
+        """Prometheus text exposition of every registered family"""
+        self.collect()
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+_registry: Optional[MetricsRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Process-wide registry shared by every instrumented service"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
@@ -0,0 +1,374 @@
+# backend/services/model_benchmark.py
+"""
+⏱️ Model Benchmark - Concurrent discovery probes and latency benchmarks
+Sends N streamed samples to every model of every provider at once, bounded
+per provider by a rate limiter (requests per minute plus a concurrency cap),
+and measures per sample:
+
+- TTFT: time to the first streamed text chunk
+- total latency: until the stream ends
+- output tokens per second after the first token
+
+Each model gets one probe first; only models that answer receive the
+remaining samples, so unavailable models cost a single request. Results
+carry p50/p90/p95/p99 per metric and a latency tier using the thresholds of
+the multi-modal chat config (<500ms ultra_fast, <1s fast, <2s medium), and
+are written as JSON that `registry_with_measured_tiers` turns into a
+GEMINI_REGISTRY_FILE override.
+
+    benchmark = ModelBenchmark({'openai': OpenAIProvider(api_key)}, samples=5)
+    results = await benchmark.run({'openai': ['gpt-4o-mini', 'gpt-4o']})
+    write_results(results, 'data/model_benchmark.json')
+
+StubProvider simulates streaming models without network access for tests
+and dry runs.
+"""
+
+import os
+import json
+import math
+import time
+import random
+import asyncio
+import logging
+import tempfile
+import dataclasses
+from datetime import datetime
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, AsyncIterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (0.5, 0.9, 0.95, 0.99)
+LATENCY_TIERS = ((500, "ultra_fast"), (1000, "fast"), (2000, "medium"))
+
+DEFAULT_PROMPT = "Hello! Please respond with exactly: 'I am [model_name] and I can help you.' Nothing more."
+
+# Requests per minute and concurrent requests per provider
+DEFAULT_PROVIDER_LIMITS = {
+    'google_ai': (60, 8),
+    'vertex_ai': (60, 8),
+    'openai': (60, 8),
+    'anthropic': (50, 4),
+    'stub': (6000, 32),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) when a provider reports no usage"""
+    return max(1, round(len(text) / 4)) if text else 0
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values: List[float]) -> Optional[Dict[str, float]]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    summary = {f"p{round(fraction * 100)}": round(percentile(ordered, fraction), 2) for fraction in PERCENTILES}
+    summary['mean'] = round(sum(ordered) / len(ordered), 2)
+    summary['min'] = round(ordered[0], 2)
+    summary['max'] = round(ordered[-1], 2)
+    return summary
+
+
+def latency_tier(latency_ms: float) -> str:
+    for threshold, tier in LATENCY_TIERS:
+        if latency_ms < threshold:
+            return tier
+    return "slow"
+
+
+class RateLimiter:
+    """
+    Token bucket (requests per minute, bursting up to the concurrency cap)
+    plus a cap on requests in flight, shared by all samples of one provider.
+    """
+
+    def __init__(self, requests_per_minute: float, max_concurrency: int):
+        self.rate = requests_per_minute / 60
+        self.capacity = float(max(1, max_concurrency))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self._lock = asyncio.Lock()
+        self.waited_seconds = 0.0
+
+    async def _take_token(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+
+    async def __aenter__(self) -> 'RateLimiter':
+        await self.semaphore.acquire()
+        try:
+            await self._take_token()
+        except BaseException:
+            self.semaphore.release()
+            raise
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.semaphore.release()
+
+
+@dataclass
+class Sample:
+    ttft_ms: Optional[float] = None
+    latency_ms: Optional[float] = None
+    output_tokens: int = 0
+    text: str = ""
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        if self.ttft_ms is None or self.latency_ms is None or self.output_tokens <= 1:
+            return None
+        generation_seconds = (self.latency_ms - self.ttft_ms) / 1000
+        # Tokens after the first, over the time spent producing them
+        return (self.output_tokens - 1) / generation_seconds if generation_seconds > 0 else None
+
+
+# -- providers -------------------------------------------------------------------
+#
+# A provider streams a completion as (text, output_tokens) pairs; output_tokens
+# is the provider-reported count for that chunk, or None to estimate from text.
+
+class StubProvider:
+    """Simulated streaming models: lognormal TTFT, fixed decode speed, optional failures"""
+
+    name = "stub"
+
+    def __init__(self, profiles: Optional[Dict[str, Tuple[float, float]]] = None,
+                 default_profile: Tuple[float, float] = (300.0, 80.0), jitter: float = 0.2,
+                 error_rate: float = 0.0, unavailable: Tuple[str, ...] = (), output_tokens: int = 24,
+                 seed: Optional[int] = None):
+        self.profiles = profiles or {}      # model -> (median TTFT ms, tokens per second)
+        self.default_profile = default_profile
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.unavailable = set(unavailable)
+        self.output_tokens = output_tokens
+        self.rng = random.Random(seed)
+        self.calls = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if model in self.unavailable:
+                raise LookupError(f"404 model {model} not found")
+            if self.rng.random() < self.error_rate:
+                raise RuntimeError("503 stub provider overloaded")
+            ttft_ms, tokens_per_second = self.profiles.get(model, self.default_profile)
+            await asyncio.sleep(ttft_ms * math.exp(self.jitter * self.rng.gauss(0.0, 1.0)) / 1000)
+            tokens = min(max_tokens, self.output_tokens)
+            chunk = 4
+            for sent in range(0, tokens, chunk):
+                if sent:
+                    await asyncio.sleep(chunk / tokens_per_second)
+                count = min(chunk, tokens - sent)
+                yield " ".join(["token"] * count) + " ", count
+        finally:
+            self.in_flight -= 1
+
+
+class GoogleAIProvider:
+    name = "google_ai"
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self.genai = genai
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        response = await self.genai.GenerativeModel(model).generate_content_async(
+            prompt, generation_config={"max_output_tokens": max_tokens, "temperature": 0.3}, stream=True)
+        async for chunk in response:
+            yield getattr(chunk, 'text', '') or '', None
+
+
+class VertexAIProvider:
+    name = "vertex_ai"
+
+    def __init__(self, project_id: str, location: str, credentials: Any = None):
+        import vertexai
+        from vertexai.generative_models import GenerativeModel, GenerationConfig
+        vertexai.init(project=project_id, location=location, credentials=credentials)
+        self.model_class = GenerativeModel
+        self.config_class = GenerationConfig
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        response = await self.model_class(model).generate_content_async(
+            prompt, generation_config=self.config_class(max_output_tokens=max_tokens, temperature=0.3), stream=True)
+        async for chunk in response:
+            yield getattr(chunk, 'text', '') or '', None
+
+
+class OpenAIProvider:
+    name = "openai"
+
+    def __init__(self, api_key: str):
+        from openai import AsyncOpenAI
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        stream = await self.client.chat.completions.create(
+            model=model, messages=[{"role": "user", "content": prompt}],
+            max_tokens=max_tokens, temperature=0.3, stream=True)
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content, None
+
+
+class AnthropicProvider:
+    name = "anthropic"
+
+    def __init__(self, api_key: str):
+        from anthropic import AsyncAnthropic
+        self.client = AsyncAnthropic(api_key=api_key)
+
+    async def stream(self, model: str, prompt: str, max_tokens: int) -> AsyncIterator[Tuple[str, Optional[int]]]:
+        async with self.client.messages.stream(
+                model=model, max_tokens=max_tokens, temperature=0.3,
+                messages=[{"role": "user", "content": prompt}]) as stream:
+            streamed = 0
+            async for text in stream.text_stream:
+                streamed += estimate_tokens(text)
+                yield text, None
+            final = await stream.get_final_message()
+            # Correct the running estimate with the reported total
+            yield '', final.usage.output_tokens - streamed
+
+
+# -- engine ----------------------------------------------------------------------
+
+class ModelBenchmark:
+    """⏱️ Probes and benchmarks many models concurrently under per-provider limits"""
+
+    def __init__(self, providers: Dict[str, Any], samples: int = 3, prompt: str = DEFAULT_PROMPT,
+                 max_tokens: int = 100, timeout_seconds: float = 60.0,
+                 limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.providers = providers
+        self.samples = max(1, samples)
+        self.prompt = prompt
+        self.max_tokens = max_tokens
+        self.timeout_seconds = timeout_seconds
+        limits = {**DEFAULT_PROVIDER_LIMITS, **(limits or {})}
+        self.limiters = {name: RateLimiter(*limits.get(name, (60, 4))) for name in providers}
+
+    async def _sample(self, provider_name: str, model: str) -> Sample:
+        provider = self.providers[provider_name]
+        sample = Sample()
+        async with self.limiters[provider_name]:
+            start = time.perf_counter()
+
+            async def consume() -> None:
+                async for text, tokens in provider.stream(model, self.prompt, self.max_tokens):
+                    if text and sample.ttft_ms is None:
+                        sample.ttft_ms = (time.perf_counter() - start) * 1000
+                    sample.text += text
+                    sample.output_tokens += tokens if tokens is not None else estimate_tokens(text)
+
+            try:
+                await asyncio.wait_for(consume(), self.timeout_seconds)
+                sample.latency_ms = (time.perf_counter() - start) * 1000
+            except asyncio.TimeoutError:
+                sample.error = f"no complete response in {self.timeout_seconds:g}s"
+            except Exception as e:
+                sample.error = f"{type(e).__name__}: {e}"
+        return sample
+
+    async def _benchmark_model(self, provider_name: str, model: str) -> Dict[str, Any]:
+        probe = await self._sample(provider_name, model)
+        samples = [probe]
+        if probe.error is None and self.samples > 1:
+            samples += await asyncio.gather(*(self._sample(provider_name, model)
+                                              for _ in range(self.samples - 1)))
+        return self._model_result(provider_name, model, samples)
+
+    def _model_result(self, provider_name: str, model: str, samples: List[Sample]) -> Dict[str, Any]:
+        succeeded = [s for s in samples if s.error is None]
+        latency = summarize([s.latency_ms for s in succeeded])
+        return {
+            'provider': provider_name,
+            'model': model,
+            'status': 'success' if succeeded else 'failed',
+            'samples': len(samples),
+            'succeeded': len(succeeded),
+            'errors': [s.error for s in samples if s.error is not None],
+            'ttft_ms': summarize([s.ttft_ms for s in succeeded if s.ttft_ms is not None]),
+            'latency_ms': latency,
+            'tokens_per_second': summarize([s.tokens_per_second for s in succeeded
+                                            if s.tokens_per_second is not None]),
+            'output_tokens': summarize([float(s.output_tokens) for s in succeeded]),
+            'latency_tier': latency_tier(latency['p50']) if latency else None,
+            'response_preview': succeeded[0].text[:200] if succeeded else ''
+        }
+
+    async def run(self, models: Dict[str, List[str]]) -> Dict[str, Any]:
+        """Benchmark provider -> model names; returns the results document"""
+        start = time.perf_counter()
+        jobs = [(provider_name, model) for provider_name, names in models.items()
+                if provider_name in self.providers for model in names]
+        outcomes = await asyncio.gather(*(self._benchmark_model(p, m) for p, m in jobs))
+        return {
+            'generated_at': datetime.now().isoformat(),
+            'duration_seconds': round(time.perf_counter() - start, 2),
+            'samples_per_model': self.samples,
+            'max_tokens': self.max_tokens,
+            'prompt': self.prompt,
+            'rate_limit_wait_seconds': {name: round(limiter.waited_seconds, 2)
+                                        for name, limiter in self.limiters.items()},
+            'models': {f"{result['provider']}/{result['model']}": result for result in outcomes}
+        }
+
+
+def write_results(results: Dict[str, Any], path: str) -> None:
+    """Write the results document atomically"""
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def registry_with_measured_tiers(results: Dict[str, Any], registry: Dict[str, Any],
+                                 providers: Tuple[str, ...] = ('google_ai', 'vertex_ai')
+                                 ) -> Tuple[Dict[str, Any], Dict[str, Tuple[str, str]]]:
+    """
+    Copy of a GEMINI_REGISTRY-style dict (dataclass entries with id and
+    latency_tier) with tiers replaced by the measured ones of models
+    benchmarked through `providers`. Returns (registry, {key: (old, new)}).
+    """
+    measured = {}
+    for result in results.get('models', {}).values():
+        if result['provider'] in providers and result.get('latency_tier'):
+            measured.setdefault(result['model'].split('/')[-1], result['latency_tier'])
+
+    updated, changes = {}, {}
+    for key, spec in registry.items():
+        tier = measured.get(spec.id.split('/')[-1])
+        if tier and tier != spec.latency_tier:
+            changes[key] = (spec.latency_tier, tier)
+            spec = dataclasses.replace(spec, latency_tier=tier)
+        updated[key] = spec
+    return updated, changes
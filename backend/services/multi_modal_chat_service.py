@@ -3,17 +3,23 @@ Multi-Modal AI Chat Service
 Handles all AI model integrations for the messenger app
 """
 
+import time
 import asyncio
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, AsyncIterator, Tuple
 import openai
 import anthropic
 import google.generativeai as genai
 from dataclasses import dataclass
 from enum import Enum
 
+from .context_budget import get_context_budgeter
+from .conversation_store import ConversationStore
+from .provider_adapters import get_provider_loop, gemini_client_options, ThreadedClientAdapter
+from .tracing import get_tracer
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -64,6 +70,10 @@ class ChatMessage:
     edited: bool = False
     reply_to: Optional[str] = None
 
+class ProviderCallError(Exception):
+    """A provider call failed; the message is safe to show in the chat"""
+
+
 class MultiModalChatService:
     """
     Service to handle all AI model interactions for the multi-modal chat
@@ -71,13 +81,30 @@ class MultiModalChatService:
     
     def __init__(self):
         self.ai_friends: Dict[str, AIFriend] = {}
-        self.conversation_history: Dict[str, List[ChatMessage]] = {}
+        self.conversation_history = ConversationStore()
+        self.context_budgeter = get_context_budgeter()
         
         # Initialize AI clients
         self.openai_client = None
         self.anthropic_client = None
         self.google_client = None
         
+        # Blocking SDK calls run on worker threads under per-provider limits
+        # (CHAT_<PROVIDER>_CONCURRENCY / CHAT_<PROVIDER>_TIMEOUT)
+        provider_loop = get_provider_loop()
+        self.provider_adapters: Dict[str, ThreadedClientAdapter] = {
+            provider.value: ThreadedClientAdapter(provider.value, provider_loop)
+            for provider in (AIProvider.OPENAI, AIProvider.ANTHROPIC, AIProvider.GOOGLE)
+        }
+        self.fanout_metrics = {
+            'requests': 0,
+            'friends_requested': 0,
+            'responses': 0,
+            'errors': 0,
+            'cancelled': 0
+        }
+        self.tracer = get_tracer()
+        
         # Load default AI friends
         self._initialize_default_friends()
     
@@ -226,7 +253,7 @@ class MultiModalChatService:
         
         for friend in default_friends:
             self.ai_friends[friend.id] = friend
-            self.conversation_history[friend.id] = []
+            self.conversation_history.ring(friend.id)
     
     def initialize_clients(self, api_keys: Dict[str, str]):
         """Initialize AI service clients with API keys"""
@@ -240,7 +267,7 @@ class MultiModalChatService:
                 logger.info("Anthropic client initialized")
             
             if "google" in api_keys:
-                genai.configure(api_key=api_keys["google"])
+                genai.configure(api_key=api_keys["google"], **gemini_client_options())
                 self.google_client = genai
                 logger.info("Google AI client initialized")
                 
@@ -256,6 +283,18 @@ class MultiModalChatService:
     ) -> ChatMessage:
         """Send a message to an AI friend and get response"""
         
+        ai_message, _ = await self._exchange(friend_id, message, files, message_type)
+        return ai_message
+    
+    async def _exchange(
+        self, 
+        friend_id: str, 
+        message: str, 
+        files: List[Dict] = None,
+        message_type: str = "text"
+    ) -> Tuple[ChatMessage, bool]:
+        """Record the user message, generate the reply; returns (reply, succeeded)"""
+        
         if friend_id not in self.ai_friends:
             raise ValueError(f"AI friend {friend_id} not found")
         
@@ -271,14 +310,13 @@ class MultiModalChatService:
         )
         
         # Add to conversation history
-        if friend_id not in self.conversation_history:
-            self.conversation_history[friend_id] = []
-        
-        self.conversation_history[friend_id].append(user_message)
+        self.conversation_history.append(friend_id, user_message)
         
         # Generate AI response based on provider
         try:
-            ai_response_content = await self._generate_ai_response(friend, message, files)
+            with self.tracer.start_trace("chat.exchange", friend_id=friend_id,
+                                         provider=friend.provider.value, model=friend.model):
+                ai_response_content = await self._generate_ai_response(friend, message, files)
             
             # Create AI response message
             ai_message = ChatMessage(
@@ -290,14 +328,23 @@ class MultiModalChatService:
                 ai_model=friend.name
             )
             
-            self.conversation_history[friend_id].append(ai_message)
+            self.conversation_history.append(friend_id, ai_message)
             
             # Update friend usage
             friend.usage = min(100, friend.usage + 1)
             friend.last_active = "Now"
             
-            return ai_message
+            return ai_message, True
             
+        except ProviderCallError as e:
+            return ChatMessage(
+                id=f"error_{datetime.now().timestamp()}",
+                content=str(e),
+                sender="ai",
+                timestamp=datetime.now(),
+                message_type="text",
+                ai_model=friend.name
+            ), False
         except Exception as e:
             logger.error(f"Error generating AI response: {e}")
             # Return error message
@@ -309,7 +356,94 @@ class MultiModalChatService:
                 message_type="text",
                 ai_model=friend.name
             )
-            return error_message
+            return error_message, False
+    
+    async def fan_out_message(
+        self,
+        friend_ids: List[str],
+        message: str,
+        files: List[Dict] = None,
+        message_type: str = "text",
+        first_k: Optional[int] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Send one message to several AI friends concurrently and yield each
+        result as soon as that friend answers. With `first_k`, the remaining
+        calls are cancelled once k friends have answered successfully.
+        Provider concurrency limits still apply, so fanning out to many
+        friends on one provider queues rather than floods it.
+        """
+        
+        unknown = [friend_id for friend_id in friend_ids if friend_id not in self.ai_friends]
+        if unknown:
+            raise ValueError(f"AI friend(s) not found: {', '.join(unknown)}")
+        # Preserve order, drop duplicates
+        friend_ids = list(dict.fromkeys(friend_ids))
+        
+        self.fanout_metrics['requests'] += 1
+        self.fanout_metrics['friends_requested'] += len(friend_ids)
+        
+        async def _ask(friend_id: str) -> Dict[str, Any]:
+            start = time.perf_counter()
+            ai_message, succeeded = await self._exchange(friend_id, message, files, message_type)
+            friend = self.ai_friends[friend_id]
+            return {
+                "friendId": friend_id,
+                "provider": friend.provider.value,
+                "model": friend.model,
+                "success": succeeded,
+                "latencyMs": round((time.perf_counter() - start) * 1000, 1),
+                "response": self._message_to_dict(ai_message)
+            }
+        
+        tasks = [asyncio.ensure_future(_ask(friend_id)) for friend_id in friend_ids]
+        succeeded = 0
+        try:
+            for next_result in asyncio.as_completed(tasks):
+                result = await next_result
+                self.fanout_metrics['responses'] += 1
+                if result["success"]:
+                    succeeded += 1
+                else:
+                    self.fanout_metrics['errors'] += 1
+                yield result
+                if first_k and succeeded >= first_k:
+                    break
+        finally:
+            # first-k reached or the consumer went away: stop the stragglers
+            pending = [task for task in tasks if not task.done()]
+            for task in pending:
+                task.cancel()
+            if pending:
+                self.fanout_metrics['cancelled'] += len(pending)
+                await asyncio.gather(*pending, return_exceptions=True)
+    
+    @staticmethod
+    def _message_to_dict(message: ChatMessage) -> Dict[str, Any]:
+        return {
+            "id": message.id,
+            "content": message.content,
+            "sender": message.sender,
+            "timestamp": message.timestamp.isoformat(),
+            "type": message.message_type,
+            "fileName": message.file_name,
+            "fileSize": message.file_size,
+            "fileUrl": message.file_url,
+            "aiModel": message.ai_model,
+            "reactions": message.reactions or [],
+            "edited": message.edited,
+            "replyTo": message.reply_to
+        }
+    
+    def get_fanout_stats(self) -> Dict[str, Any]:
+        """Fan-out counters plus per-provider concurrency and latency"""
+        return {
+            **self.fanout_metrics,
+            "providers": {
+                provider: adapter.get_stats()
+                for provider, adapter in self.provider_adapters.items()
+            }
+        }
     
     async def _generate_ai_response(
         self, 
@@ -321,10 +455,14 @@ class MultiModalChatService:
         
         # Get conversation context if memory enabled
         context_messages = []
+        history = []
         if friend.memory_enabled and friend.id in self.conversation_history:
-            # Get last 10 messages for context
-            recent_messages = self.conversation_history[friend.id][-10:]
-            for msg in recent_messages:
+            # Recent in-memory turns; older ones have spilled to disk
+            history = self.conversation_history.recent(friend.id)
+            # send_message has already recorded the current message
+            if history and history[-1].sender == "user" and history[-1].content == message:
+                history = history[:-1]
+            for msg in history:
                 role = "user" if msg.sender == "user" else "assistant"
                 context_messages.append({
                     "role": role,
@@ -337,6 +475,23 @@ class MultiModalChatService:
             "content": message
         })
         
+        # Keep recent turns verbatim and fold older ones into a rolling summary
+        window = self.context_budgeter.fit(
+            context_messages,
+            provider=friend.provider.value,
+            model=friend.model,
+            max_output_tokens=friend.max_tokens,
+            system_prompt=friend.system_prompt,
+            conversation_id=friend.id,
+            first_position=history[0].seq if history else 0
+        )
+        context_messages = window.messages
+        if window.summary:
+            context_messages.insert(0, {
+                "role": "system",
+                "content": f"Summary of the earlier conversation:\n{window.summary}"
+            })
+        
         # Generate response based on provider
         if friend.provider == AIProvider.OPENAI:
             return await self._generate_openai_response(friend, context_messages, files)
@@ -358,7 +513,7 @@ class MultiModalChatService:
         """Generate response using OpenAI models"""
         
         if not self.openai_client:
-            return "OpenAI client not initialized. Please check API key configuration."
+            raise ProviderCallError("OpenAI client not initialized. Please check API key configuration.")
         
         try:
             # Prepare messages with system prompt
@@ -375,7 +530,8 @@ class MultiModalChatService:
                             {"type": "image_url", "image_url": {"url": file_info.get("url", "")}}
                         ]
             
-            response = self.openai_client.chat.completions.create(
+            response = await self.provider_adapters["openai"].run_sync(
+                self.openai_client.chat.completions.create,
                 model=friend.model,
                 messages=api_messages,
                 temperature=friend.temperature,
@@ -386,7 +542,7 @@ class MultiModalChatService:
             
         except Exception as e:
             logger.error(f"OpenAI API error: {e}")
-            return f"Sorry, I'm having trouble connecting to OpenAI right now. ({str(e)})"
+            raise ProviderCallError(f"Sorry, I'm having trouble connecting to OpenAI right now. ({str(e)})") from e
     
     async def _generate_anthropic_response(
         self, 
@@ -397,18 +553,22 @@ class MultiModalChatService:
         """Generate response using Anthropic models"""
         
         if not self.anthropic_client:
-            return "Anthropic client not initialized. Please check API key configuration."
+            raise ProviderCallError("Anthropic client not initialized. Please check API key configuration.")
         
         try:
             # Anthropic has different message format
             api_messages = []
+            system_parts = [friend.system_prompt] if friend.system_prompt else []
             for msg in messages:
-                if msg["role"] != "system":  # Anthropic handles system separately
+                if msg["role"] == "system":  # Anthropic handles system separately
+                    system_parts.append(msg["content"])
+                else:
                     api_messages.append(msg)
             
-            response = self.anthropic_client.messages.create(
+            response = await self.provider_adapters["anthropic"].run_sync(
+                self.anthropic_client.messages.create,
                 model=friend.model,
-                system=friend.system_prompt,
+                system="\n\n".join(system_parts),
                 messages=api_messages,
                 temperature=friend.temperature,
                 max_tokens=friend.max_tokens
@@ -418,7 +578,7 @@ class MultiModalChatService:
             
         except Exception as e:
             logger.error(f"Anthropic API error: {e}")
-            return f"Sorry, I'm having trouble connecting to Anthropic right now. ({str(e)})"
+            raise ProviderCallError(f"Sorry, I'm having trouble connecting to Anthropic right now. ({str(e)})") from e
     
     async def _generate_google_response(
         self, 
@@ -429,7 +589,7 @@ class MultiModalChatService:
         """Generate response using Google models"""
         
         if not self.google_client:
-            return "Google AI client not initialized. Please check API key configuration."
+            raise ProviderCallError("Google AI client not initialized. Please check API key configuration.")
         
         try:
             model = self.google_client.GenerativeModel(friend.model)
@@ -437,7 +597,8 @@ class MultiModalChatService:
             # Combine system prompt with user message
             prompt = f"{friend.system_prompt}\n\nUser: {messages[-1]['content']}"
             
-            response = model.generate_content(
+            response = await self.provider_adapters["google"].run_sync(
+                model.generate_content,
                 prompt,
                 generation_config=self.google_client.types.GenerationConfig(
                     temperature=friend.temperature,
@@ -449,7 +610,7 @@ class MultiModalChatService:
             
         except Exception as e:
             logger.error(f"Google AI API error: {e}")
-            return f"Sorry, I'm having trouble connecting to Google AI right now. ({str(e)})"
+            raise ProviderCallError(f"Sorry, I'm having trouble connecting to Google AI right now. ({str(e)})") from e
     
     async def _generate_meta_response(
         self, 
@@ -521,39 +682,25 @@ class MultiModalChatService:
         
         return True
     
-    def get_conversation_history(self, friend_id: str, limit: int = 50) -> List[Dict]:
+    def get_conversation_history(self, friend_id: str, limit: int = 50,
+                                 before: Optional[int] = None) -> List[Dict]:
         """Get conversation history with an AI friend"""
         
-        if friend_id not in self.conversation_history:
-            return []
-        
-        messages = self.conversation_history[friend_id][-limit:]
-        
-        return [
-            {
-                "id": msg.id,
-                "content": msg.content,
-                "sender": msg.sender,
-                "timestamp": msg.timestamp.isoformat(),
-                "type": msg.message_type,
-                "fileName": msg.file_name,
-                "fileSize": msg.file_size,
-                "fileUrl": msg.file_url,
-                "aiModel": msg.ai_model,
-                "reactions": msg.reactions or [],
-                "edited": msg.edited,
-                "replyTo": msg.reply_to
-            }
-            for msg in messages
-        ]
+        fragments, _ = self.conversation_history.page(friend_id, before, limit)
+        return [json.loads(fragment) for fragment in fragments]
+    
+    def get_conversation_history_json(self, friend_id: str, limit: int = 50,
+                                      before: Optional[int] = None):
+        """
+        History page as a ready-made JSON array (UTF-8 bytes), plus its size and the cursor
+        for the next older page (None when the start has been reached)
+        """
+        return self.conversation_history.page_json(friend_id, before, limit)
     
     def clear_conversation_history(self, friend_id: str) -> bool:
         """Clear conversation history with an AI friend"""
         
-        if friend_id in self.conversation_history:
-            self.conversation_history[friend_id] = []
-            return True
-        return False
+        return self.conversation_history.clear(friend_id)
 
 # Global service instance
 chat_service = MultiModalChatService()
@@ -12,8 +12,10 @@ from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import google.generativeai as genai
-from anthropic import Anthropic
-from openai import OpenAI
+
+from .provider_adapters import (
+    get_provider_loop, gemini_client_options, ProviderAdapter, AnthropicAdapter, GeminiAdapter, OpenAIAdapter
+)
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +52,13 @@ class FunctionDefinition:
     parameters: Dict[str, Any]
     provider_specific: Dict[str, Any] = field(default_factory=dict)
 
+# Computer Use tool set sent to Claude - identical for every request
+CLAUDE_COMPUTER_USE_TOOLS = (
+    {"type": "bash_20250124", "name": "bash"},
+    {"type": "text_editor_20250124", "name": "str_replace_editor"},
+    {"type": "web_search_20250305", "name": "web_search"}
+)
+
 class MultiModelOrchestrator:
     """
     Orchestrates multiple AI models with unified interface
@@ -58,8 +67,9 @@ class MultiModelOrchestrator:
     
     def __init__(self):
         self.models: Dict[ModelProvider, ModelConfig] = {}
-        self.clients: Dict[ModelProvider, Any] = {}
+        self.adapters: Dict[ModelProvider, ProviderAdapter] = {}
         self.function_registry: Dict[str, FunctionDefinition] = {}
+        self._compiled_tools: Dict[ModelProvider, List[Dict[str, Any]]] = {}
         
         # Initialize model configurations
         self._initialize_models()
@@ -72,6 +82,10 @@ class MultiModelOrchestrator:
     def _initialize_models(self):
         """Initialize all available AI models"""
         
+        # Async clients share one background loop so their connection pools,
+        # semaphores and timeouts survive Flask's per-request event loops
+        self.provider_loop = get_provider_loop()
+        
         # Claude 3.5 Sonnet (Primary for Computer Use)
         if os.getenv('ANTHROPIC_API_KEY'):
             self.models[ModelProvider.CLAUDE] = ModelConfig(
@@ -88,12 +102,12 @@ class MultiModelOrchestrator:
                 supports_cua=True,
                 function_calling_format="anthropic"
             )
-            self.clients[ModelProvider.CLAUDE] = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+            self.adapters[ModelProvider.CLAUDE] = AnthropicAdapter(os.getenv('ANTHROPIC_API_KEY'), self.provider_loop)
             logger.info("✅ Claude 3.5 Sonnet initialized with Computer Use API support")
         
         # Gemini 2.5 Pro (Advanced Function Calling Specialist)
         if os.getenv('GOOGLE_API_KEY'):
-            genai.configure(api_key=os.getenv('GOOGLE_API_KEY'))
+            genai.configure(api_key=os.getenv('GOOGLE_API_KEY'), **gemini_client_options())
             self.models[ModelProvider.GEMINI] = ModelConfig(
                 provider=ModelProvider.GEMINI,
                 model_name="gemini-2.5-pro-preview-06-05",  # Latest 2.5 model with 65K output
@@ -108,7 +122,7 @@ class MultiModelOrchestrator:
                 supports_cua=False,  # Will route CUA requests to Claude
                 function_calling_format="gemini"
             )
-            self.clients[ModelProvider.GEMINI] = genai.GenerativeModel('gemini-2.5-pro-preview-06-05')
+            self.adapters[ModelProvider.GEMINI] = GeminiAdapter('gemini-2.5-pro-preview-06-05', self.provider_loop)
             logger.info("✅ Gemini 2.5 Pro initialized with advanced function calling support")
         
         # OpenAI GPT-4 (Backup and Specialized Tasks)
@@ -127,7 +141,7 @@ class MultiModelOrchestrator:
                 supports_cua=False,
                 function_calling_format="openai"
             )
-            self.clients[ModelProvider.OPENAI] = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.adapters[ModelProvider.OPENAI] = OpenAIAdapter(os.getenv('OPENAI_API_KEY'), self.provider_loop)
             logger.info("✅ OpenAI GPT-4 initialized")
     
     def _register_sanctuary_functions(self):
@@ -197,8 +211,14 @@ class MultiModelOrchestrator:
             }
         )
         
+        self._compiled_tools.clear()
         logger.info(f"📚 Registered {len(self.function_registry)} Sanctuary functions")
     
+    def register_function(self, func_def: FunctionDefinition):
+        """Register an additional function and invalidate the compiled tool schemas"""
+        self.function_registry[func_def.name] = func_def
+        self._compiled_tools.clear()
+    
     async def route_request(self, 
                           prompt: str, 
                           user_id: str,
@@ -279,7 +299,7 @@ class MultiModelOrchestrator:
         
         try:
             model_config = self.models[provider]
-            client = self.clients[provider]
+            client = self.adapters[provider]
             
             # Prepare functions for the request
             functions = self._prepare_functions_for_provider(provider, capabilities_needed)
@@ -291,6 +311,14 @@ class MultiModelOrchestrator:
             elif provider == ModelProvider.OPENAI:
                 return await self._execute_openai(client, model_config, prompt, user_id, functions)
             
+        except asyncio.TimeoutError as e:
+            logger.warning(f"⏰ {provider.value} request timed out: {e}")
+            return {
+                "success": False,
+                "error": str(e) or "Provider request timed out",
+                "provider": provider.value,
+                "timed_out": True
+            }
         except Exception as e:
             logger.error(f"Error executing with {provider.value}: {e}")
             return {
@@ -302,7 +330,15 @@ class MultiModelOrchestrator:
     def _prepare_functions_for_provider(self, 
                                       provider: ModelProvider, 
                                       capabilities_needed: List[CapabilityType]) -> List[Dict[str, Any]]:
-        """Prepare function definitions in provider-specific format"""
+        """Function definitions in provider-specific format, compiled once per provider"""
+        
+        functions = self._compiled_tools.get(provider)
+        if functions is None:
+            functions = self._compiled_tools[provider] = self._compile_functions_for_provider(provider)
+        return functions
+    
+    def _compile_functions_for_provider(self, provider: ModelProvider) -> List[Dict[str, Any]]:
+        """Convert the function registry to a provider's tool schema format"""
         
         functions = []
         
@@ -347,20 +383,7 @@ class MultiModelOrchestrator:
         tools = []
         if config.supports_cua:
             # Use the correct Claude tool names - Computer Use API only
-            tools.extend([
-                {
-                    "type": "bash_20250124",
-                    "name": "bash"
-                },
-                {
-                    "type": "text_editor_20250124",
-                    "name": "str_replace_editor"
-                },
-                {
-                    "type": "web_search_20250305",
-                    "name": "web_search"
-                }
-            ])
+            tools.extend(CLAUDE_COMPUTER_USE_TOOLS)
         else:
             # Add function tools only if not using Computer Use API
             for func in functions:
@@ -369,13 +392,16 @@ class MultiModelOrchestrator:
                     "function": func
                 })
         
-        response = client.messages.create(
-            model=config.model_name,
-            max_tokens=config.max_tokens,
-            temperature=config.temperature,
-            messages=messages,
-            tools=tools if tools else None
-        )
+        request = {
+            "model": config.model_name,
+            "max_tokens": config.max_tokens,
+            "temperature": config.temperature,
+            "messages": messages
+        }
+        if tools:
+            request["tools"] = tools
+        
+        response = await client.create_message(**request)
         
         return {
             "success": True,
@@ -392,7 +418,7 @@ class MultiModelOrchestrator:
             # Simplified approach - use basic generation without complex function calling for now
             sanctuary_prompt = f"🌟 Podplay Sanctuary Request from {user_id}: {prompt}\n\nPlease respond with empathy and consideration for neurodivergent users."
             
-            response = client.generate_content(
+            response = await client.generate_content(
                 sanctuary_prompt,
                 generation_config=genai.types.GenerationConfig(
                     temperature=config.temperature,
@@ -423,6 +449,8 @@ class MultiModelOrchestrator:
                 "sanctuary_note": "🌟 Gemini response optimized for neurodivergent users"
             }
             
+        except asyncio.TimeoutError:
+            raise
         except Exception as e:
             logger.error(f"Gemini execution error: {e}")
             return {
@@ -446,14 +474,17 @@ class MultiModelOrchestrator:
             }
         ]
         
-        response = client.chat.completions.create(
-            model=config.model_name,
-            messages=messages,
-            max_tokens=config.max_tokens,
-            temperature=config.temperature,
-            tools=functions if functions else None,
-            tool_choice="auto" if functions else None
-        )
+        request = {
+            "model": config.model_name,
+            "messages": messages,
+            "max_tokens": config.max_tokens,
+            "temperature": config.temperature
+        }
+        if functions:
+            request["tools"] = functions
+            request["tool_choice"] = "auto"
+        
+        response = await client.create_chat_completion(**request)
         
         return {
             "success": True,
@@ -480,7 +511,15 @@ class MultiModelOrchestrator:
             "available_models": models_info,
             "total_models": len(self.models),
             "cua_capable_models": [p.value for p, c in self.models.items() if c.supports_cua],
-            "function_calling_models": [p.value for p, c in self.models.items() if CapabilityType.FUNCTION_CALLING in c.capabilities]
+            "function_calling_models": [p.value for p, c in self.models.items() if CapabilityType.FUNCTION_CALLING in c.capabilities],
+            "runtime": self.get_runtime_stats()
+        }
+    
+    def get_runtime_stats(self) -> Dict[str, Any]:
+        """Per-provider concurrency/timeout counters and event loop lag"""
+        return {
+            "providers": {p.value: adapter.get_stats() for p, adapter in self.adapters.items()},
+            "event_loop": self.provider_loop.monitor.get_stats()
         }
 
 # Factory function for easy initialization
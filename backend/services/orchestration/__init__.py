@@ -5,7 +5,7 @@ The world's most sophisticated AI model routing and management system
 
 from .conductor import GeminiConductor
 from .orchestra_manager import GeminiOrchestra
-from .model_registry import GEMINI_REGISTRY, ModelCapability
+from .model_registry import GEMINI_REGISTRY, ModelCapability, get_registry
 from .performance_tracker import PerformanceTracker
 from .task_analyzer import TaskAnalyzer
 
@@ -14,6 +14,7 @@ __all__ = [
     'GeminiOrchestra', 
     'GEMINI_REGISTRY',
     'ModelCapability',
+    'get_registry',
     'PerformanceTracker',
     'TaskAnalyzer'
 ]
\ No newline at end of file
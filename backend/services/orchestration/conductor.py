@@ -10,20 +10,28 @@ import asyncio
 import logging
 from datetime import datetime
 
-from .model_registry import GEMINI_REGISTRY, ModelCapability, MAMA_BEAR_MODEL_PREFERENCES
+from .model_registry import ModelCapability, MAMA_BEAR_MODEL_PREFERENCES, get_registry
+from ..prompt_compiler import PromptPrefixCache, GeminiContextCache, CompiledPrompt
+from ..provider_adapters import gemini_client_options
+from ..tracing import traced
 
 logger = logging.getLogger(__name__)
 
 class GeminiConductor:
     """The maestro that orchestrates all other models"""
     
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
+    def __init__(self, api_key: str,
+                 prompt_cache: Optional[PromptPrefixCache] = None,
+                 context_cache: Optional[GeminiContextCache] = None):
+        genai.configure(api_key=api_key, **gemini_client_options())
         self.conductor_model = genai.GenerativeModel(
-            GEMINI_REGISTRY["conductor"].id
+            get_registry()["conductor"].id
         )
         self.routing_history = []
+        self.prompt_cache = prompt_cache or PromptPrefixCache()
+        self.context_cache = context_cache or GeminiContextCache()
         
+    @traced("conductor.analyze_and_route", stage="routing")
     async def analyze_and_route(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Use the conductor model to analyze and route requests"""
         
@@ -39,20 +47,27 @@ class GeminiConductor:
         max_tokens_needed = request.get("max_tokens_needed", 1000)
         
         # Build the routing prompt
-        routing_prompt = self._build_routing_prompt(
+        routing_prompt = self._compile_routing_prompt(
             message, task_type, mama_bear_variant, context_size,
             urgency, require_speed, require_creativity, require_reasoning,
             max_tokens_needed
         )
         
         try:
-            # Get routing decision from conductor
-            response = await self.conductor_model.generate_content_async(routing_prompt)
+            # Get routing decision from conductor, reusing the cached prefix when possible
+            cached_model = await self.context_cache.model_for(get_registry()["conductor"], routing_prompt)
+            if cached_model is not None:
+                response = await cached_model.generate_content_async(routing_prompt.suffix)
+            else:
+                response = await self.conductor_model.generate_content_async(routing_prompt.text)
             routing_decision = self._parse_routing_response(response.text)
             
             # Add metadata
             routing_decision["timestamp"] = datetime.now().isoformat()
             routing_decision["request_id"] = request.get("request_id", "unknown")
+            routing_decision["prompt_tokens"] = self.context_cache.record(
+                routing_prompt, response, used_cache=cached_model is not None
+            )
             
             # Store in history for learning
             self.routing_history.append({
@@ -74,9 +89,16 @@ class GeminiConductor:
                             require_creativity: bool, require_reasoning: bool,
                             max_tokens_needed: int) -> str:
         """Build the comprehensive routing prompt for the conductor"""
-        
-        # Get available models summary
-        models_summary = self._get_models_summary()
+        return self._compile_routing_prompt(
+            message, task_type, mama_bear_variant, context_size, urgency,
+            require_speed, require_creativity, require_reasoning, max_tokens_needed
+        ).text
+    
+    def _compile_routing_prompt(self, message: str, task_type: str, mama_bear_variant: Optional[str],
+                              context_size: int, urgency: str, require_speed: bool,
+                              require_creativity: bool, require_reasoning: bool,
+                              max_tokens_needed: int) -> CompiledPrompt:
+        """Static orchestra briefing (rendered once) + per-request analysis"""
         
         # Get Mama Bear preferences if applicable
         mama_bear_prefs = ""
@@ -84,12 +106,7 @@ class GeminiConductor:
             preferred_models = MAMA_BEAR_MODEL_PREFERENCES[mama_bear_variant]
             mama_bear_prefs = f"\nMama Bear Variant '{mama_bear_variant}' prefers: {', '.join(preferred_models)}"
         
-        return f"""
-🎼 GEMINI ORCHESTRA CONDUCTOR ANALYSIS
-
-You are the conductor of a sophisticated AI orchestra with 50+ specialized Gemini models.
-Your job is to analyze this request and route it to the perfect specialist(s).
-
+        suffix = f"""
 📋 REQUEST ANALYSIS:
 Message: "{message}"
 Task Type: {task_type}
@@ -101,9 +118,39 @@ Reasoning Required: {require_reasoning}
 Max Output Tokens: {max_tokens_needed}
 {mama_bear_prefs}
 
+📊 RETURN FORMAT (JSON only):
+{{
+    "primary_model": "model_key_from_registry",
+    "fallback_models": ["backup1", "backup2"],
+    "reasoning": "detailed explanation of why these models were chosen",
+    "estimated_tokens": {max_tokens_needed},
+    "routing_confidence": 0.95,
+    "special_instructions": "any model-specific prompting guidance",
+    "orchestra_section": "which section this belongs to",
+    "performance_prediction": {{
+        "latency_estimate": "fast/medium/slow",
+        "cost_estimate": "low/medium/high",
+        "success_probability": 0.95
+    }},
+    "mama_bear_personality": "caring guidance for response tone"
+}}
+
+Analyze the request and provide the optimal routing decision as JSON.
+"""
+        return self.prompt_cache.compile(("conductor", "routing"), self._render_routing_briefing, suffix)
+    
+    def _render_routing_briefing(self) -> str:
+        """The request-independent part of the routing prompt"""
+        
+        return f"""
+🎼 GEMINI ORCHESTRA CONDUCTOR ANALYSIS
+
+You are the conductor of a sophisticated AI orchestra with 50+ specialized Gemini models.
+Your job is to analyze each request and route it to the perfect specialist(s).
+
 🎭 AVAILABLE ORCHESTRA SECTIONS:
 
-{models_summary}
+{self._get_models_summary()}
 
 🎯 ROUTING CRITERIA:
 1. **Task Complexity**: Simple queries → Speed Demons, Complex analysis → Deep Thinkers
@@ -121,25 +168,6 @@ Max Output Tokens: {max_tokens_needed}
 - Podplay Sanctuary requires empathetic, caring AI interactions
 - Code generation should prioritize accessibility and clean patterns
 - Always consider cognitive load reduction
-
-📊 RETURN FORMAT (JSON only):
-{{
-    "primary_model": "model_key_from_registry",
-    "fallback_models": ["backup1", "backup2"],
-    "reasoning": "detailed explanation of why these models were chosen",
-    "estimated_tokens": {max_tokens_needed},
-    "routing_confidence": 0.95,
-    "special_instructions": "any model-specific prompting guidance",
-    "orchestra_section": "which section this belongs to",
-    "performance_prediction": {{
-        "latency_estimate": "fast/medium/slow",
-        "cost_estimate": "low/medium/high",
-        "success_probability": 0.95
-    }},
-    "mama_bear_personality": "caring guidance for response tone"
-}}
-
-Analyze the request and provide the optimal routing decision as JSON.
 """
 
     def _get_models_summary(self) -> str:
@@ -197,11 +225,12 @@ Analyze the request and provide the optimal routing decision as JSON.
                     raise ValueError(f"Missing required field: {field}")
             
             # Ensure models exist in registry
-            if routing_decision["primary_model"] not in GEMINI_REGISTRY:
+            registry = get_registry()
+            if routing_decision["primary_model"] not in registry:
                 raise ValueError(f"Unknown primary model: {routing_decision['primary_model']}")
             
             for fallback in routing_decision["fallback_models"]:
-                if fallback not in GEMINI_REGISTRY:
+                if fallback not in registry:
                     logger.warning(f"Unknown fallback model: {fallback}")
             
             return routing_decision
@@ -5,8 +5,13 @@ Comprehensive registry of all available Gemini models with their capabilities
 
 from enum import Enum
 from dataclasses import dataclass
-from typing import Set, Dict, List, Optional
+from typing import Set, Dict, List, Optional, Iterable, Tuple, Callable
 import json
+import os
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
 
 class ModelCapability(Enum):
     """Model capabilities for intelligent routing"""
@@ -55,7 +60,7 @@ class GeminiModel:
             "notes": self.notes
         }
 
-# 🎭 THE GEMINI ORCHESTRA REGISTRY
+# 🎭 THE GEMINI ORCHESTRA REGISTRY (built-in defaults; read the live registry via get_registry())
 GEMINI_REGISTRY = {
     # 🎼 THE CONDUCTOR - Ultimate Task Router
     "conductor": GeminiModel(
@@ -358,51 +363,174 @@ ORCHESTRA_SECTIONS = {
     "specialists": ["embedding_specialist", "vision_specialist", "batch_processor"]
 }
 
+LATENCY_TIER_ORDER = {"ultra_fast": 0, "fast": 1, "medium": 2, "slow": 3}
+COST_TIER_ORDER = {"free": 0, "low": 1, "medium": 2, "high": 3}
+
+
+class RegistryIndex:
+    """
+    🗂️ Immutable lookup structures compiled from a registry snapshot
+
+    Every model gets a bit position; each capability maps to a bitmask of the
+    models that have it. Latency and cost orderings are sorted once here
+    (ties keep registry order), so lookups never sort.
+    """
+
+    def __init__(self, registry: Dict[str, GeminiModel]):
+        self.registry = dict(registry)
+        self.keys = tuple(self.registry)
+        self.bit_for_key = {key: 1 << position for position, key in enumerate(self.keys)}
+
+        self.capability_masks: Dict[ModelCapability, int] = {cap: 0 for cap in ModelCapability}
+        for key, model in self.registry.items():
+            for capability in model.capabilities:
+                self.capability_masks[capability] |= self.bit_for_key[key]
+
+        self.by_latency = tuple(sorted(
+            self.keys, key=lambda k: LATENCY_TIER_ORDER.get(self.registry[k].latency_tier, 4)))
+        self.by_cost = tuple(sorted(
+            self.keys, key=lambda k: COST_TIER_ORDER.get(self.registry[k].cost_tier, 4)))
+
+        self.models_by_capability = {
+            cap: tuple(key for key in self.keys if mask & self.bit_for_key[key])
+            for cap, mask in self.capability_masks.items()
+        }
+        self.fastest_by_capability = {
+            cap: self.first_matching(self.by_latency, mask) for cap, mask in self.capability_masks.items()
+        }
+        self.cheapest_by_capability = {
+            cap: self.first_matching(self.by_cost, mask) for cap, mask in self.capability_masks.items()
+        }
+
+        self.registry_json = json.dumps(
+            {key: model.to_dict() for key, model in self.registry.items()}, indent=2
+        )
+
+    def mask_for(self, capabilities: Iterable[ModelCapability]) -> int:
+        mask = (1 << len(self.keys)) - 1
+        for capability in capabilities:
+            mask &= self.capability_masks.get(capability, 0)
+        return mask
+
+    def first_matching(self, ordering: Tuple[str, ...], mask: int) -> Optional[str]:
+        if not mask:
+            return None
+        for key in ordering:
+            if mask & self.bit_for_key[key]:
+                return key
+        return None
+
+
+_registry_index = RegistryIndex(GEMINI_REGISTRY)
+_reload_lock = threading.Lock()
+_registry_source_mtime: Optional[float] = None
+_reload_listeners: List[Callable[[RegistryIndex], None]] = []
+
+
+def get_registry_index() -> RegistryIndex:
+    """Current compiled index (replaced wholesale on reload, never mutated)"""
+    return _registry_index
+
+def get_registry() -> Dict[str, GeminiModel]:
+    """
+    Current model registry. GEMINI_REGISTRY holds the built-in defaults; a
+    registry file reload publishes a new dict, so always read through here
+    and keep the returned dict for lookups that must agree with each other.
+    """
+    return _registry_index.registry
+
+def add_registry_reload_listener(listener: Callable[[RegistryIndex], None]) -> None:
+    """Call `listener(new_index)` after every reload, e.g. to drop caches built from model entries"""
+    with _reload_lock:
+        _reload_listeners.append(listener)
+
 def get_models_by_capability(capability: ModelCapability) -> List[str]:
     """Get all model keys that have a specific capability"""
-    return [
-        key for key, model in GEMINI_REGISTRY.items()
-        if capability in model.capabilities
-    ]
+    return list(_registry_index.models_by_capability.get(capability, ()))
+
+def get_models_with_capabilities(*capabilities: ModelCapability) -> List[str]:
+    """Get all model keys that have every one of the given capabilities"""
+    index = _registry_index
+    mask = index.mask_for(capabilities)
+    return [key for key in index.keys if mask & index.bit_for_key[key]]
 
 def get_fastest_model_for_capability(capability: ModelCapability) -> Optional[str]:
     """Get the fastest model that has a specific capability"""
-    capable_models = [
-        (key, model) for key, model in GEMINI_REGISTRY.items()
-        if capability in model.capabilities
-    ]
-    
-    if not capable_models:
-        return None
-    
-    # Sort by latency tier (ultra_fast > fast > medium > slow)
-    tier_order = {"ultra_fast": 0, "fast": 1, "medium": 2, "slow": 3}
-    capable_models.sort(key=lambda x: tier_order.get(x[1].latency_tier, 4))
-    
-    return capable_models[0][0]
+    return _registry_index.fastest_by_capability.get(capability)
 
 def get_cheapest_model_for_capability(capability: ModelCapability) -> Optional[str]:
     """Get the most cost-effective model that has a specific capability"""
-    capable_models = [
-        (key, model) for key, model in GEMINI_REGISTRY.items()
-        if capability in model.capabilities
-    ]
-    
-    if not capable_models:
-        return None
-    
-    # Sort by cost tier (free > low > medium > high)
-    tier_order = {"free": 0, "low": 1, "medium": 2, "high": 3}
-    capable_models.sort(key=lambda x: tier_order.get(x[1].cost_tier, 4))
-    
-    return capable_models[0][0]
+    return _registry_index.cheapest_by_capability.get(capability)
+
+def get_fastest_model_with_capabilities(*capabilities: ModelCapability) -> Optional[str]:
+    """Fastest model having all of the given capabilities"""
+    index = _registry_index
+    return index.first_matching(index.by_latency, index.mask_for(capabilities))
+
+def get_cheapest_model_with_capabilities(*capabilities: ModelCapability) -> Optional[str]:
+    """Cheapest model having all of the given capabilities"""
+    index = _registry_index
+    return index.first_matching(index.by_cost, index.mask_for(capabilities))
 
 def export_registry_json() -> str:
     """Export the entire registry as JSON for external tools"""
-    registry_dict = {
-        key: model.to_dict() for key, model in GEMINI_REGISTRY.items()
-    }
-    return json.dumps(registry_dict, indent=2)
+    return _registry_index.registry_json
+
+def load_registry_file(path: str) -> Dict[str, GeminiModel]:
+    """Parse a registry file in the export_registry_json format"""
+    with open(path, 'r') as f:
+        raw = json.load(f)
+
+    registry = {}
+    for key, spec in raw.items():
+        spec = dict(spec)
+        spec["capabilities"] = {ModelCapability(cap) for cap in spec.get("capabilities", [])}
+        registry[key] = GeminiModel(**spec)
+    return registry
+
+def reload_registry(path: str) -> RegistryIndex:
+    """
+    Load a registry file and swap it in atomically. The new index and its
+    registry dict are fully built before one assignment publishes them, so
+    readers holding the previous get_registry() dict keep a consistent
+    snapshot and nothing is mutated under a running iteration. Reload
+    listeners run afterwards to drop anything derived from the old entries.
+    """
+    global _registry_index, _registry_source_mtime
+
+    new_index = RegistryIndex(load_registry_file(path))
+
+    with _reload_lock:
+        _registry_index = new_index
+        _registry_source_mtime = os.path.getmtime(path)
+        listeners = list(_reload_listeners)
+
+    for listener in listeners:
+        try:
+            listener(new_index)
+        except Exception as e:
+            logger.error(f"Registry reload listener {listener!r} failed: {e}")
+
+    logger.info(f"🗂️ Reloaded Gemini registry from {path}: {len(new_index.registry)} models")
+    return new_index
+
+def reload_registry_if_changed(path: str) -> bool:
+    """Hot-reload hook: reload when the file's mtime has moved on"""
+    global _registry_source_mtime
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return False
+    if _registry_source_mtime is not None and mtime <= _registry_source_mtime:
+        return False
+    try:
+        reload_registry(path)
+        return True
+    except Exception as e:
+        logger.error(f"Registry reload from {path} failed, keeping current registry: {e}")
+        # Don't retry a broken file until it changes again
+        _registry_source_mtime = mtime
+        return False
 
 # 🎼 MAMA BEAR VARIANT MAPPINGS
 MAMA_BEAR_MODEL_PREFERENCES = {
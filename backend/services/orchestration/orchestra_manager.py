@@ -11,11 +11,20 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any, List, Optional, Union
 import json
+import os
 import time
 
 from .conductor import GeminiConductor
-from .model_registry import GEMINI_REGISTRY, ModelCapability
+from .model_registry import (
+    ModelCapability, add_registry_reload_listener, get_registry, reload_registry_if_changed
+)
 from .performance_tracker import PerformanceTracker
+from ..request_hedging import RequestHedger
+from ..prompt_compiler import PromptPrefixCache, GeminiContextCache, CompiledPrompt
+from ..provider_adapters import gemini_client_options
+from ..tracing import get_tracer
+from ..single_flight import get_single_flight, request_key
+from ..adaptive_concurrency import get_concurrency_limiter, get_limiter_stats
 
 logger = logging.getLogger(__name__)
 
@@ -24,15 +33,20 @@ class GeminiOrchestra:
     
     def __init__(self, gemini_api_key: str, anthropic_api_key: str = None):
         # Initialize API clients
-        genai.configure(api_key=gemini_api_key)
+        genai.configure(api_key=gemini_api_key, **gemini_client_options())
         self.anthropic_client = anthropic.Anthropic(api_key=anthropic_api_key) if anthropic_api_key else None
         
+        # Shared prompt prefix rendering and Gemini context caching
+        self.prompt_cache = PromptPrefixCache()
+        self.context_cache = GeminiContextCache()
+        
         # Initialize orchestra components
-        self.conductor = GeminiConductor(gemini_api_key)
+        self.conductor = GeminiConductor(gemini_api_key, self.prompt_cache, self.context_cache)
         self.performance_tracker = PerformanceTracker()
         
         # Initialize model instances
         self.gemini_models = {}
+        add_registry_reload_listener(self._on_registry_reload)
         self._initialize_gemini_models()
         
         # Orchestra state
@@ -40,17 +54,35 @@ class GeminiOrchestra:
         self.request_queue = asyncio.Queue()
         self.is_running = False
         
+        # Opt-in speculative hedging across fallbacks (per request via "hedge": True)
+        self.hedging_enabled = os.getenv('ORCHESTRA_HEDGING_ENABLED', 'False').lower() == 'true'
+        self.hedger = RequestHedger()
+        
+        self.tracer = get_tracer()
+        
+        # Identical concurrent requests (same model, prompt and config) share one call
+        self.single_flight = get_single_flight("gemini_orchestra")
+        
         logger.info("🎭 Gemini Orchestra initialized with 50+ models!")
     
     def _initialize_gemini_models(self):
         """Initialize all Gemini model instances"""
         
-        for model_key, model_config in GEMINI_REGISTRY.items():
+        # Optional registry override file, hot-reloaded when it changes
+        self.registry_file = os.getenv('GEMINI_REGISTRY_FILE')
+        if self.registry_file:
+            reload_registry_if_changed(self.registry_file)
+        
+        for model_key, model_config in get_registry().items():
             try:
                 self.gemini_models[model_key] = genai.GenerativeModel(model_config.id)
-                logger.debug(f"Initialized {model_key}: {model_config.name}")
+                logger.debug("Initialized %s: %s", model_key, model_config.name)
             except Exception as e:
-                logger.error(f"Failed to initialize {model_key}: {e}")
+                logger.error("Failed to initialize %s: %s", model_key, e)
+    
+    def _on_registry_reload(self, index) -> None:
+        """Preambles embed model entries; re-render them from the reloaded registry"""
+        self.prompt_cache.clear()
     
     async def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Main entry point for processing requests through the orchestra"""
@@ -58,59 +90,68 @@ class GeminiOrchestra:
         request_id = request.get("request_id", str(uuid.uuid4()))
         request["request_id"] = request_id
         
-        start_time = time.time()
-        
-        try:
-            logger.info(f"🎼 Processing request {request_id}")
+        with self.tracer.start_trace("orchestra.process_request", request_id=request_id,
+                                     variant=request.get("mama_bear_variant")) as trace_span:
+            start_time = time.time()
             
-            # Step 1: Conductor analyzes and routes the request
-            routing_decision = await self.conductor.analyze_and_route(request)
-            
-            # Step 2: Performance tracker adjusts routing if needed
-            optimized_routing = await self.performance_tracker.get_performance_adjusted_routing(routing_decision)
+            try:
+                logger.debug("🎼 Processing request %s", request_id)
             
-            # Step 3: Determine if Claude should handle this request
-            if self._should_use_claude(request, optimized_routing):
-                return await self._process_with_claude(request, optimized_routing)
+                if self.registry_file:
+                    reload_registry_if_changed(self.registry_file)
             
-            # Step 4: Process with Gemini orchestra
-            result = await self._process_with_gemini_orchestra(request, optimized_routing)
+                # Step 1: Conductor analyzes and routes the request
+                routing_decision = await self.conductor.analyze_and_route(request)
             
-            # Step 5: Record success metrics
-            processing_time = (time.time() - start_time) * 1000  # Convert to ms
-            await self.performance_tracker.record_success(
-                optimized_routing["primary_model"],
-                request_id,
-                processing_time,
-                result
-            )
+                # Step 2: Performance tracker adjusts routing if needed
+                optimized_routing = await self.performance_tracker.get_performance_adjusted_routing(routing_decision)
             
-            result["orchestra_metadata"] = {
-                "request_id": request_id,
-                "routing_decision": optimized_routing,
-                "processing_time_ms": processing_time,
-                "timestamp": datetime.now().isoformat()
-            }
+                # Step 3: Determine if Claude should handle this request
+                if self._should_use_claude(request, optimized_routing):
+                    return await self._process_with_claude(request, optimized_routing)
             
-            logger.info(f"✅ Request {request_id} completed in {processing_time:.0f}ms")
-            return result
-            
-        except Exception as e:
-            # Record failure and attempt fallback
-            processing_time = (time.time() - start_time) * 1000
+                # Step 4: Process with Gemini orchestra
+                result = await self._process_with_gemini_orchestra(request, optimized_routing)
             
-            if 'optimized_routing' in locals():
-                await self.performance_tracker.record_failure(
-                    optimized_routing["primary_model"],
+                # Step 5: Record success metrics against the model that answered
+                # (a winning hedge or a fallback, not necessarily the primary)
+                processing_time = (time.time() - start_time) * 1000  # Convert to ms
+                await self.performance_tracker.record_success(
+                    result.get("model_used", optimized_routing["primary_model"]),
                     request_id,
-                    type(e).__name__,
-                    str(e)
+                    processing_time,
+                    result
                 )
             
-            logger.error(f"❌ Request {request_id} failed: {e}")
+                result["orchestra_metadata"] = {
+                    "request_id": request_id,
+                    "routing_decision": optimized_routing,
+                    "processing_time_ms": processing_time,
+                    "timestamp": datetime.now().isoformat()
+                }
+            
+                trace_span.set_attribute("model_used", result.get("model_used"))
+                trace_span.set_attribute("fallback_used", bool(result.get("fallback_used")))
+                logger.info("✅ Request %s completed in %.0fms", request_id, processing_time)
+                return result
+            
+            except Exception as e:
+                # Record failure and attempt fallback
+                processing_time = (time.time() - start_time) * 1000
             
-            # Attempt fallback processing
-            return await self._handle_request_failure(request, e, processing_time)
+                if 'optimized_routing' in locals():
+                    await self.performance_tracker.record_failure(
+                        optimized_routing["primary_model"],
+                        request_id,
+                        type(e).__name__,
+                        str(e)
+                    )
+            
+                trace_span.record_error(e)
+                logger.error("❌ Request %s failed: %s", request_id, e)
+            
+                # Attempt fallback processing
+                return await self._handle_request_failure(request, e, processing_time)
     
     def _should_use_claude(self, request: Dict[str, Any], routing: Dict[str, Any]) -> bool:
         """Determine if Claude should handle this request instead of Gemini"""
@@ -165,7 +206,7 @@ class GeminiOrchestra:
     async def _process_with_claude(self, request: Dict[str, Any], routing: Dict[str, Any]) -> Dict[str, Any]:
         """Process request using Claude as a guest performer"""
         
-        logger.info(f"🎭 Routing to Claude guest performer for request {request['request_id']}")
+        logger.info("🎭 Routing to Claude guest performer for request %s", request['request_id'])
         
         # Determine which Claude model to use
         claude_model = self._select_claude_model(request, routing)
@@ -175,12 +216,13 @@ class GeminiOrchestra:
         
         try:
             # Make request to Claude
-            response = await asyncio.to_thread(
-                self.anthropic_client.messages.create,
-                model=claude_model,
-                max_tokens=request.get("max_tokens_needed", 4096),
-                messages=[{"role": "user", "content": claude_prompt}]
-            )
+            with self.tracer.span("anthropic.messages.create", stage="model_call", model=claude_model):
+                response = await asyncio.to_thread(
+                    self.anthropic_client.messages.create,
+                    model=claude_model,
+                    max_tokens=request.get("max_tokens_needed", 4096),
+                    messages=[{"role": "user", "content": claude_prompt}]
+                )
             
             return {
                 "response": response.content[0].text,
@@ -191,7 +233,7 @@ class GeminiOrchestra:
             }
             
         except Exception as e:
-            logger.error(f"Claude processing failed: {e}")
+            logger.error("Claude processing failed: %s", e)
             # Fallback to Gemini if Claude fails
             return await self._process_with_gemini_orchestra(request, routing)
     
@@ -265,27 +307,69 @@ Please provide a helpful, caring response that embodies the Podplay Sanctuary va
         fallback_models = routing.get("fallback_models", [])
         request_id = request["request_id"]
         
+        # A primary whose queue is full would shed the call; lead with a fallback that has room
+        if self._limiter(primary_model_key).would_shed():
+            registry = get_registry()
+            open_fallback = next((key for key in fallback_models
+                                  if key in registry and not self._limiter(key).would_shed()), None)
+            if open_fallback:
+                logger.info("Primary model %s is overloaded, leading with %s", primary_model_key, open_fallback)
+                fallback_models = [primary_model_key] + [key for key in fallback_models if key != open_fallback]
+                primary_model_key = open_fallback
+        
         # Track request start
         await self.performance_tracker.record_request_start(
             primary_model_key, request_id, request
         )
         
-        # Try primary model first
+        # Hedge against the best fallback when enabled; otherwise try primary first
+        hedge_key = None
+        hedge_fired = False
+        if fallback_models and request.get("hedge", self.hedging_enabled):
+            hedge_key = self.performance_tracker._find_best_alternative(
+                [key for key in fallback_models if key in self.gemini_models]
+            )
+        
+        async def execute_hedge():
+            nonlocal hedge_fired
+            hedge_fired = True
+            return await self._execute_gemini_request(hedge_key, request, routing)
+        
         try:
-            result = await self._execute_gemini_request(primary_model_key, request, routing)
-            result["model_used"] = primary_model_key
+            if hedge_key:
+                result, outcome = await self.hedger.run(
+                    primary_model_key,
+                    lambda: self._execute_gemini_request(primary_model_key, request, routing),
+                    hedge_key,
+                    execute_hedge,
+                    tier=get_registry()[primary_model_key].cost_tier
+                )
+                result["model_used"] = outcome.winner_key
+                result["hedged"] = outcome.hedged
+                if outcome.winner_key != primary_model_key:
+                    result["fallback_used"] = True
+            else:
+                call_start = time.perf_counter()
+                result = await self._execute_gemini_request(primary_model_key, request, routing)
+                # Keeps the hedge delay tuned for when hedging is asked for
+                self.hedger.record_latency(primary_model_key, (time.perf_counter() - call_start) * 1000)
+                result["model_used"] = primary_model_key
             result["provider"] = "google_gemini"
             result["success"] = True
             return result
             
         except Exception as primary_error:
-            logger.warning(f"Primary model {primary_model_key} failed: {primary_error}")
+            logger.warning("Primary model %s failed: %s", primary_model_key, primary_error)
             
             # Try fallback models
             for fallback_key in fallback_models:
+                if hedge_fired and fallback_key == hedge_key:
+                    continue
                 try:
-                    logger.info(f"Trying fallback model: {fallback_key}")
+                    logger.info("Trying fallback model: %s", fallback_key)
+                    call_start = time.perf_counter()
                     result = await self._execute_gemini_request(fallback_key, request, routing)
+                    self.hedger.record_latency(fallback_key, (time.perf_counter() - call_start) * 1000)
                     result["model_used"] = fallback_key
                     result["provider"] = "google_gemini"
                     result["success"] = True
@@ -294,7 +378,7 @@ Please provide a helpful, caring response that embodies the Podplay Sanctuary va
                     return result
                     
                 except Exception as fallback_error:
-                    logger.warning(f"Fallback model {fallback_key} failed: {fallback_error}")
+                    logger.warning("Fallback model %s failed: %s", fallback_key, fallback_error)
                     continue
             
             # All Gemini models failed
@@ -303,38 +387,79 @@ Please provide a helpful, caring response that embodies the Podplay Sanctuary va
     async def _execute_gemini_request(self, model_key: str, request: Dict[str, Any], routing: Dict[str, Any]) -> Dict[str, Any]:
         """Execute a request on a specific Gemini model"""
         
-        model = self.gemini_models[model_key]
-        model_config = GEMINI_REGISTRY[model_key]
+        model_config = get_registry()[model_key]
+        model = self.gemini_models.get(model_key)
+        if model is None or model.model_name.split('/')[-1] != model_config.id.split('/')[-1]:
+            # Added or changed by a registry reload
+            model = self.gemini_models[model_key] = genai.GenerativeModel(model_config.id)
         
         # Build prompt for Gemini
-        prompt = self._build_gemini_prompt(request, routing, model_config)
+        prompt = self._compile_gemini_prompt(request, routing, model_config, model_key)
         
         # Configure generation parameters
         generation_config = self._get_generation_config(request, model_config)
         
         # Execute the request
-        if ModelCapability.BIDIRECTIONAL in model_config.capabilities:
-            # Use bidirectional generation for real-time models
-            response = await self._execute_bidirectional_request(model, prompt, generation_config)
-        else:
-            # Standard generation
-            response = await model.generate_content_async(prompt, generation_config=generation_config)
+        async def generate():
+            if ModelCapability.BIDIRECTIONAL in model_config.capabilities:
+                # Use bidirectional generation for real-time models
+                return await self._execute_bidirectional_request(model, prompt.text, generation_config), False
+            # Standard generation, sending only the suffix when the prefix is cached
+            cached_model = await self.context_cache.model_for(model_config, prompt)
+            if cached_model is not None:
+                return await cached_model.generate_content_async(prompt.suffix, generation_config=generation_config), True
+            return await model.generate_content_async(prompt.text, generation_config=generation_config), False
+        
+        with self.tracer.span("gemini.generate_content", stage="model_call", model=model_key) as span:
+            response, used_cache = await self.single_flight.run(
+                request_key(model_config.id, prompt.text, generation_config),
+                lambda: self._limiter(model_key).run(generate))
+            span.set_attribute("context_cache_hit", used_cache)
         
         return {
             "response": response.text,
             "model_config": model_config.to_dict(),
             "generation_config": generation_config.__dict__ if hasattr(generation_config, '__dict__') else str(generation_config),
-            "routing_metadata": routing
+            "routing_metadata": routing,
+            "prompt_tokens": self.context_cache.record(prompt, response, used_cache=used_cache)
         }
     
+    @staticmethod
+    def _limiter(model_key: str):
+        return get_concurrency_limiter("gemini", get_registry()[model_key].id)
+    
     def _build_gemini_prompt(self, request: Dict[str, Any], routing: Dict[str, Any], model_config) -> str:
         """Build an optimized prompt for Gemini models"""
+        return self._compile_gemini_prompt(request, routing, model_config).text
+    
+    def _compile_gemini_prompt(self, request: Dict[str, Any], routing: Dict[str, Any],
+                               model_config, model_key: Optional[str] = None) -> CompiledPrompt:
+        """Sanctuary/personality/model preamble (rendered once per model + variant) + the request"""
         
         base_message = request.get("message", "")
         mama_bear_variant = request.get("mama_bear_variant")
         task_type = request.get("task_type", "general")
         special_instructions = routing.get("special_instructions", "")
         
+        suffix = f"""
+🎯 TASK TYPE: {task_type}
+📝 SPECIAL INSTRUCTIONS: {special_instructions}
+
+👤 USER REQUEST:
+{base_message}
+
+Please provide a helpful response optimized for this model's capabilities while maintaining the Podplay Sanctuary values.
+"""
+        
+        return self.prompt_cache.compile(
+            ("orchestra", model_key or model_config.id, mama_bear_variant),
+            lambda: self._render_gemini_preamble(model_config, mama_bear_variant),
+            suffix
+        )
+    
+    def _render_gemini_preamble(self, model_config, mama_bear_variant: Optional[str]) -> str:
+        """The request-independent part of a specialist prompt"""
+        
         # Add model-specific optimizations
         model_optimizations = {
             "thinking": "Think step by step and show your reasoning process.",
@@ -369,23 +494,13 @@ You are part of Podplay Sanctuary - a neurodivergent-friendly AI development pla
         if mama_bear_variant:
             mama_bear_context = f"\n🎭 MAMA BEAR VARIANT: {mama_bear_variant}\n"
         
-        # Combine all elements
-        full_prompt = f"""
+        return f"""
 {sanctuary_context}
 {mama_bear_context}
 
-🎯 TASK TYPE: {task_type}
 🎼 MODEL SPECIALIZATION: {model_config.specialty}
 🔧 OPTIMIZATION HINTS: {' '.join(optimization_hints)}
-📝 SPECIAL INSTRUCTIONS: {special_instructions}
-
-👤 USER REQUEST:
-{base_message}
-
-Please provide a helpful response optimized for this model's capabilities while maintaining the Podplay Sanctuary values.
 """
-        
-        return full_prompt.strip()
     
     def _get_generation_config(self, request: Dict[str, Any], model_config) -> Any:
         """Get optimized generation configuration for the model"""
@@ -426,7 +541,7 @@ Please provide a helpful response optimized for this model's capabilities while
     async def _handle_request_failure(self, request: Dict[str, Any], error: Exception, processing_time: float) -> Dict[str, Any]:
         """Handle request failure with graceful fallback"""
         
-        logger.error(f"Request {request.get('request_id')} failed completely: {error}")
+        logger.error("Request %s failed completely: %s", request.get('request_id'), error)
         
         # Try Claude as final fallback if available
         if self.anthropic_client and not request.get("claude_attempted"):
@@ -456,7 +571,7 @@ Please provide a helpful response optimized for this model's capabilities while
                 }
                 
             except Exception as claude_error:
-                logger.error(f"Claude fallback also failed: {claude_error}")
+                logger.error("Claude fallback also failed: %s", claude_error)
         
         # Return error response
         return {
@@ -482,7 +597,7 @@ Please provide a helpful response optimized for this model's capabilities while
         available_models = []
         unavailable_models = []
         
-        for model_key in GEMINI_REGISTRY.keys():
+        for model_key in get_registry().keys():
             if model_key in self.gemini_models:
                 available_models.append(model_key)
             else:
@@ -495,6 +610,16 @@ Please provide a helpful response optimized for this model's capabilities while
             "unavailable_models": len(unavailable_models),
             "claude_available": self.anthropic_client is not None,
             "active_requests": len(self.active_requests),
+            "hedging": {
+                "enabled_by_default": self.hedging_enabled,
+                **self.hedger.get_stats()
+            },
+            "prompt_caching": {
+                "prefixes": self.prompt_cache.get_stats(),
+                "context_cache": self.context_cache.get_stats()
+            },
+            "request_coalescing": self.single_flight.get_stats(),
+            "concurrency_limits": get_limiter_stats(),
             "performance_summary": performance_report,
             "conductor_analytics": conductor_analytics,
             "model_sections": {
@@ -512,8 +637,10 @@ Please provide a helpful response optimized for this model's capabilities while
         }
     
     async def optimize_orchestra(self) -> Dict[str, Any]:
-        """Run optimization analysis and apply improvements"""
-        
+        """Run optimization analysis and apply improvements (concurrent runs share one)"""
+        return await self.single_flight.run("optimize_orchestra", self._optimize_orchestra)
+    
+    async def _optimize_orchestra(self) -> Dict[str, Any]:
         logger.info("🔧 Running orchestra optimization...")
         
         # Get performance insights
@@ -539,6 +666,6 @@ Please provide a helpful response optimized for this model's capabilities while
             "recommendations": performance_report.get("optimization_suggestions", [])
         }
         
-        logger.info(f"✅ Orchestra optimization complete: {len(optimizations_applied)} optimizations applied")
+        logger.info("✅ Orchestra optimization complete: %s optimizations applied", len(optimizations_applied))
         
         return optimization_summary
\ No newline at end of file
@@ -11,6 +11,10 @@ from collections import defaultdict, deque
 import json
 import statistics
 
+from ..tracing import traced
+from ..metrics_registry import get_metrics_registry
+from .model_registry import get_registry
+
 logger = logging.getLogger(__name__)
 
 class PerformanceTracker:
@@ -35,6 +39,17 @@ class PerformanceTracker:
         self.model_rankings = {}
         self.optimization_suggestions = []
         
+        self.metrics_registry = get_metrics_registry()
+        self.success_ratio = self.metrics_registry.gauge(
+            'mama_bear_model_success_ratio',
+            "Orchestra success ratio per model since start",
+            ('model',))
+        self.recent_latency = self.metrics_registry.gauge(
+            'mama_bear_model_recent_latency_seconds',
+            "Mean latency of the last 100 orchestra requests per model",
+            ('model',))
+        self.metrics_registry.register_collector("performance_tracker", self._collect_metrics)
+        
     async def record_request_start(self, model_key: str, request_id: str, 
                                  request_data: Dict[str, Any]) -> None:
         """Record the start of a request"""
@@ -52,7 +67,7 @@ class PerformanceTracker:
         self.request_history.append(request_record)
         self.performance_data[model_key]["total_requests"] += 1
         
-        logger.debug(f"Started tracking request {request_id} for model {model_key}")
+        logger.debug("Started tracking request %s for model %s", request_id, model_key)
     
     async def record_success(self, model_key: str, request_id: str, 
                            latency_ms: float, response_data: Dict[str, Any] = None) -> None:
@@ -65,6 +80,11 @@ class PerformanceTracker:
         perf_data["recent_latencies"].append(latency_ms)
         perf_data["last_success"] = timestamp
         
+        model_config = get_registry().get(model_key)
+        tier = model_config.cost_tier if model_config else "unknown"
+        self.metrics_registry.model_latency.labels("google_gemini", model_key, tier).observe(latency_ms / 1000)
+        self.metrics_registry.model_requests.labels("google_gemini", model_key, "success").inc()
+        
         # Recalculate average latency
         if perf_data["recent_latencies"]:
             perf_data["avg_latency"] = statistics.mean(perf_data["recent_latencies"])
@@ -83,7 +103,7 @@ class PerformanceTracker:
                 record["response_data"] = response_data
                 break
         
-        logger.debug(f"Recorded success for {model_key}: {latency_ms}ms latency")
+        logger.debug("Recorded success for %s: %sms latency", model_key, latency_ms)
         
         # Trigger optimization analysis
         await self._analyze_performance_trends(model_key)
@@ -100,6 +120,8 @@ class PerformanceTracker:
         perf_data["error_types"][error_type] += 1
         perf_data["last_failure"] = timestamp
         
+        self.metrics_registry.model_requests.labels("google_gemini", model_key, "failure").inc()
+        
         # Recalculate success rate
         total_requests = perf_data["total_requests"]
         failures = perf_data["failures"]
@@ -114,12 +136,13 @@ class PerformanceTracker:
                 record["error_details"] = error_details
                 break
         
-        logger.warning(f"Recorded failure for {model_key}: {error_type}")
+        logger.warning("Recorded failure for %s: %s", model_key, error_type)
         
         # Trigger immediate optimization if failure rate is high
         if perf_data["success_rate"] < 0.8:
             await self._generate_optimization_suggestions(model_key)
     
+    @traced("performance_tracker.adjust_routing", stage="routing")
     async def get_performance_adjusted_routing(self, base_routing: Dict[str, Any]) -> Dict[str, Any]:
         """Adjust routing based on recent performance data"""
         
@@ -138,7 +161,7 @@ class PerformanceTracker:
             best_fallback = self._find_best_alternative(fallback_models)
             
             if best_fallback and best_fallback != primary_model:
-                logger.info(f"Performance adjustment: {primary_model} → {best_fallback}")
+                logger.info("Performance adjustment: %s → %s", primary_model, best_fallback)
                 
                 # Promote best fallback to primary
                 base_routing["primary_model"] = best_fallback
@@ -300,6 +323,11 @@ class PerformanceTracker:
             if datetime.fromisoformat(s["timestamp"]) > cutoff_time
         ]
     
+    def _collect_metrics(self):
+        for model_key, perf_data in list(self.performance_data.items()):
+            self.success_ratio.labels(model_key).set(perf_data["success_rate"])
+            self.recent_latency.labels(model_key).set(perf_data["avg_latency"] / 1000)
+    
     async def get_performance_report(self) -> Dict[str, Any]:
         """Generate comprehensive performance report"""
         
@@ -10,6 +10,8 @@ from datetime import datetime
 import json
 
 from .model_registry import ModelCapability
+from ..context_budget import get_context_budgeter
+from ..tracing import traced
 
 logger = logging.getLogger(__name__)
 
@@ -169,6 +171,7 @@ class TaskAnalyzer:
             ]
         }
     
+    @traced("task_analyzer.analyze_request", stage="analysis")
     async def analyze_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """Comprehensive analysis of an incoming request"""
         
@@ -236,7 +239,9 @@ class TaskAnalyzer:
             "low": 0
         }
         
-        for complexity_level, patterns in self.complexity_indicators.items():
+        for indicator, patterns in self.complexity_indicators.items():
+            # Indicator groups are named "<level>_complexity"
+            complexity_level = indicator[:-len("_complexity")]
             for pattern in patterns:
                 matches = len(re.findall(pattern, message_lower, re.IGNORECASE))
                 complexity_scores[complexity_level] += matches
@@ -289,9 +294,11 @@ class TaskAnalyzer:
     def _estimate_token_requirements(self, message: str, request: Dict[str, Any]) -> Dict[str, int]:
         """Estimate token requirements for input and output"""
         
-        # Rough token estimation (1 token ≈ 4 characters for English)
-        input_chars = len(message) + len(str(request.get("context", "")))
-        estimated_input_tokens = input_chars // 4
+        # Memoized local tokenizer approximation, calibrated for Gemini
+        counter = get_context_budgeter().counter
+        context = request.get("context", "")
+        estimated_input_tokens = counter.count(message, "google") + counter.count(
+            context if isinstance(context, str) else str(context), "google")
         
         # Estimate output tokens based on task type and complexity
         base_output = 500  # Base response length
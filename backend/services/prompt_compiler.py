@@ -0,0 +1,242 @@
+# backend/services/prompt_compiler.py
+"""
+🧩 Prompt Compiler - Render static prompt parts once
+Prompts are split into a stable prefix (personality preambles, model
+summaries, routing criteria) and a per-request suffix. Prefixes are rendered
+once per provider/variant key; long prefixes are additionally uploaded as
+Gemini cached content so the provider bills them at the cached rate.
+"""
+
+import os
+import time
+import hashlib
+import asyncio
+import threading
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Dict, Any, Callable, Hashable, Optional, Tuple
+
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English/code)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN if text else 0
+
+
+@dataclass
+class CompiledPrompt:
+    """A prompt split into a cacheable prefix and a per-request suffix"""
+    prefix: str
+    suffix: str
+    prefix_key: str
+    prefix_tokens: int
+
+    @property
+    def text(self) -> str:
+        return f"{self.prefix}\n\n{self.suffix}" if self.prefix else self.suffix
+
+
+class PromptPrefixCache:
+    """
+    🧩 Memoizes rendered prompt prefixes
+
+    Keys identify everything the prefix depends on, e.g.
+    ("orchestra", model_key, mama_bear_variant).
+    """
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[str, str, int]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def prefix(self, key: Hashable, render: Callable[[], str]) -> Tuple[str, str, int]:
+        """Return (prefix, content hash, token estimate), rendering on first use"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        text = render().strip()
+        entry = (text, hashlib.blake2b(text.encode('utf-8'), digest_size=12).hexdigest(), estimate_tokens(text))
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = entry
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def clear(self) -> None:
+        """Drop every rendered prefix, e.g. after the data they were rendered from changed"""
+        with self._lock:
+            self._entries.clear()
+
+    def compile(self, key: Hashable, render_prefix: Callable[[], str], suffix: str) -> CompiledPrompt:
+        prefix, prefix_hash, prefix_tokens = self.prefix(key, render_prefix)
+        return CompiledPrompt(prefix, suffix.strip(), prefix_hash, prefix_tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+
+@dataclass
+class _CachedContentEntry:
+    model: Any
+    cache_name: str
+    expires_at: float
+
+
+class GeminiContextCache:
+    """
+    💾 Gemini context caching for long, stable prompt prefixes
+
+    The prefix becomes the cached system instruction and only the suffix is
+    sent per request. Prefixes below the provider's minimum cacheable size
+    are sent inline as before. Concurrent misses for the same prefix share
+    one createCachedContent call. A failed cache creation is retried after
+    GEMINI_CONTEXT_CACHE_RETRY_SECONDS, doubling on each further failure up
+    to the cache TTL, so a transient error doesn't disable caching for good.
+    """
+
+    def __init__(self,
+                 enabled: Optional[bool] = None,
+                 min_tokens: Optional[int] = None,
+                 ttl_seconds: Optional[int] = None,
+                 retry_seconds: Optional[float] = None):
+        self.enabled = enabled if enabled is not None else \
+            os.getenv('GEMINI_CONTEXT_CACHE_ENABLED', 'true').lower() == 'true'
+        self.min_tokens = min_tokens or int(os.getenv('GEMINI_CONTEXT_CACHE_MIN_TOKENS', '4096'))
+        self.ttl_seconds = ttl_seconds or int(os.getenv('GEMINI_CONTEXT_CACHE_TTL', '3600'))
+        self.retry_seconds = retry_seconds if retry_seconds is not None else \
+            float(os.getenv('GEMINI_CONTEXT_CACHE_RETRY_SECONDS', '300'))
+
+        self._entries: Dict[Tuple[str, str], _CachedContentEntry] = {}
+        self._failed: Dict[Tuple[str, str], Tuple[float, int]] = {}   # key -> (retry at, failures)
+        self._lock = threading.Lock()
+        self._creating = SingleFlight("gemini_context_cache", enabled=True)
+
+        self.metrics = {
+            'requests': 0,
+            'cached_requests': 0,
+            'caches_created': 0,
+            'cache_failures': 0,
+            'prefix_tokens_sent': 0,
+            'tokens_saved': 0
+        }
+
+    def eligible(self, model_config: Any, prompt: CompiledPrompt) -> bool:
+        return (self.enabled
+                and prompt.prefix_tokens >= self.min_tokens
+                and "createCachedContent" in getattr(model_config, 'features', ()))
+
+    async def model_for(self, model_config: Any, prompt: CompiledPrompt) -> Optional[Any]:
+        """Return a model bound to cached content for this prefix, or None"""
+        if not self.eligible(model_config, prompt):
+            return None
+
+        key = (model_config.id, prompt.prefix_key)
+        model, backing_off = self._lookup(key)
+        if model is not None or backing_off:
+            return model
+        # Concurrent misses wait for one creation instead of each paying for their own
+        return await self._creating.run(f"{model_config.id}\x00{prompt.prefix_key}",
+                                        lambda: self._create_once(key, model_config, prompt))
+
+    def _lookup(self, key: Tuple[str, str]) -> Tuple[Optional[Any], bool]:
+        """(cached model or None, whether creation is backing off after a failure)"""
+        now = time.time()
+        with self._lock:
+            failed = self._failed.get(key)
+            if failed is not None and failed[0] > now:
+                return None, True
+            entry = self._entries.get(key)
+            # Leave a margin so an in-flight request never races the expiry
+            if entry is not None and entry.expires_at - 60 > now:
+                return entry.model, False
+        return None, False
+
+    async def _create_once(self, key: Tuple[str, str], model_config: Any, prompt: CompiledPrompt) -> Optional[Any]:
+        # Another creation may have finished between our miss and taking the lead
+        model, backing_off = self._lookup(key)
+        if model is not None or backing_off:
+            return model
+
+        try:
+            entry = await asyncio.to_thread(self._create, model_config.id, prompt.prefix)
+        except Exception as e:
+            logger.warning(f"💾 Context cache creation failed for {model_config.id}: {e}")
+            with self._lock:
+                failures = self._failed.get(key, (0.0, 0))[1] + 1
+                backoff = min(self.retry_seconds * 2 ** (failures - 1), self.ttl_seconds)
+                self._failed[key] = (time.time() + backoff, failures)
+                self.metrics['cache_failures'] += 1
+            return None
+
+        with self._lock:
+            self._failed.pop(key, None)
+            self._entries[key] = entry
+            self.metrics['caches_created'] += 1
+        logger.info(f"💾 Cached {prompt.prefix_tokens} prefix tokens for {model_config.id}")
+        return entry.model
+
+    def _create(self, model_id: str, prefix: str) -> _CachedContentEntry:
+        import google.generativeai as genai
+        from google.generativeai import caching
+
+        cached = caching.CachedContent.create(
+            model=model_id,
+            system_instruction=prefix,
+            ttl=timedelta(seconds=self.ttl_seconds)
+        )
+        return _CachedContentEntry(
+            model=genai.GenerativeModel.from_cached_content(cached_content=cached),
+            cache_name=cached.name,
+            expires_at=time.time() + self.ttl_seconds
+        )
+
+    def record(self, prompt: CompiledPrompt, response: Any = None, used_cache: bool = False) -> Dict[str, Any]:
+        """Account one request and return its per-request token report"""
+        tokens_saved = 0
+        if used_cache:
+            usage = getattr(response, 'usage_metadata', None)
+            tokens_saved = getattr(usage, 'cached_content_token_count', 0) or prompt.prefix_tokens
+
+        with self._lock:
+            self.metrics['requests'] += 1
+            if used_cache:
+                self.metrics['cached_requests'] += 1
+                self.metrics['tokens_saved'] += tokens_saved
+            else:
+                self.metrics['prefix_tokens_sent'] += prompt.prefix_tokens
+
+        return {
+            'prefix_tokens': prompt.prefix_tokens,
+            'context_cache_used': used_cache,
+            'tokens_saved': tokens_saved
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.metrics,
+                'enabled': self.enabled,
+                'min_tokens': self.min_tokens,
+                'active_caches': sum(1 for e in self._entries.values() if e.expires_at > time.time())
+            }
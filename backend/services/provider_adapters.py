@@ -0,0 +1,307 @@
+# backend/services/provider_adapters.py
+"""
+🔌 Provider Adapters - Event-loop-safe model clients
+Wraps the native async SDK clients (AsyncAnthropic, AsyncOpenAI, Gemini's
+generate_content_async) with per-provider concurrency limits, timeouts and
+cancellation. Identical concurrent requests share one call (single-flight),
+and calls naming a model also pass through that model's adaptive
+concurrency limiter, which sheds load before the provider starts returning
+429s.
+
+Flask handlers spin up a fresh event loop per request, but async HTTP/gRPC
+clients and asyncio semaphores are bound to the loop they first run on. All
+provider calls therefore run on one long-lived background loop; callers on
+any loop await them through a thread-safe future, and cancelling the caller
+cancels the provider call.
+"""
+
+import os
+import time
+import asyncio
+import threading
+import logging
+from typing import Dict, Any, Callable, Awaitable, Optional, TypeVar
+
+from .loop_monitor import LoopLagMonitor, monitor_loop
+from .tracing import get_tracer
+from .metrics_registry import get_metrics_registry
+from .single_flight import get_single_flight, request_key
+from .adaptive_concurrency import get_concurrency_limiter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+
+class ProviderEventLoop:
+    """🔁 Dedicated event loop thread shared by all provider adapters"""
+
+    def __init__(self, name: str = "provider-io", lag_threshold_ms: Optional[float] = None):
+        self.name = name
+        self.monitor = LoopLagMonitor(
+            threshold_ms=lag_threshold_ms or float(os.getenv('ASYNC_LOOP_LAG_WARN_MS', '100'))
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        if os.getenv('ASYNC_LOOP_DEBUG', 'false').lower() == 'true':
+            loop.set_debug(True)
+        self._loop = loop
+        monitor_loop(self.name, loop, self.monitor)
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._ready.clear()
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        self._ready.wait()
+        return self._loop
+
+    async def run(self, coro: Awaitable[T]) -> T:
+        """Run `coro` on the provider loop and await it from the caller's loop"""
+        loop = self.start()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def stop(self) -> None:
+        self.monitor.stop()
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+def gemini_client_options() -> Dict[str, Any]:
+    """
+    Extra genai.configure() arguments. GEMINI_API_ENDPOINT points the Gemini
+    SDK at another host (e.g. the load-testing fake provider server); the
+    OpenAI and Anthropic SDKs honour OPENAI_BASE_URL / ANTHROPIC_BASE_URL.
+    """
+    endpoint = os.getenv('GEMINI_API_ENDPOINT')
+    if not endpoint:
+        return {}
+    return {'client_options': {'api_endpoint': endpoint}, 'transport': 'rest'}
+
+
+_shared_loop: Optional[ProviderEventLoop] = None
+_shared_loop_lock = threading.Lock()
+
+
+def get_provider_loop() -> ProviderEventLoop:
+    """Process-wide provider loop, so every service shares one I/O thread"""
+    global _shared_loop
+    with _shared_loop_lock:
+        if _shared_loop is None:
+            _shared_loop = ProviderEventLoop()
+        return _shared_loop
+
+
+class ProviderAdapter:
+    """
+    Base adapter: bounded concurrency, a per-call deadline covering both the
+    wait for a slot and the call itself, and simple counters.
+    """
+
+    provider = "base"
+    env_namespace = "MULTI_MODEL"
+
+    def __init__(self,
+                 provider_loop: ProviderEventLoop,
+                 max_concurrency: Optional[int] = None,
+                 timeout_seconds: Optional[float] = None):
+        env_prefix = f"{self.env_namespace}_{self.provider.upper()}"
+        self.provider_loop = provider_loop
+        self.max_concurrency = max_concurrency or int(os.getenv(f"{env_prefix}_CONCURRENCY", '8'))
+        self.timeout_seconds = timeout_seconds or float(os.getenv(f"{env_prefix}_TIMEOUT", '120'))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        self.metrics = {
+            'calls': 0,
+            'in_flight': 0,
+            'completed': 0,
+            'errors': 0,
+            'timeouts': 0,
+            'cancelled': 0,
+            'total_latency_ms': 0.0
+        }
+
+        # Label children resolved once so the per-call cost is a locked add
+        metrics = get_metrics_registry()
+        pool = self.env_namespace.lower()
+        self._queue_depth = metrics.provider_queue_depth.labels(self.provider, pool)
+        self._in_flight = metrics.provider_in_flight.labels(self.provider, pool)
+        self._queue_wait = metrics.provider_queue_wait.labels(self.provider, pool)
+
+    async def _invoke(self, call: Callable[[], Awaitable[T]], timings: Dict[str, int]) -> T:
+        # Only ever touched from the provider loop, so one semaphore suffices
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _bounded() -> T:
+            queued_ns = time.perf_counter_ns()
+            self._queue_depth.inc()
+            try:
+                await self._semaphore.acquire()
+            finally:
+                self._queue_depth.dec()
+            try:
+                timings['acquired'] = time.perf_counter_ns()
+                self._queue_wait.observe((timings['acquired'] - queued_ns) / 1e9)
+                self.metrics['in_flight'] += 1
+                self._in_flight.inc()
+                try:
+                    return await call()
+                finally:
+                    self.metrics['in_flight'] -= 1
+                    self._in_flight.dec()
+            finally:
+                self._semaphore.release()
+
+        self.metrics['calls'] += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(_bounded(), timeout=self.timeout_seconds)
+        except asyncio.TimeoutError:
+            self.metrics['timeouts'] += 1
+            raise asyncio.TimeoutError(
+                f"{self.provider} call exceeded {self.timeout_seconds:g}s deadline"
+            ) from None
+        except asyncio.CancelledError:
+            self.metrics['cancelled'] += 1
+            raise
+        except Exception:
+            self.metrics['errors'] += 1
+            raise
+
+        self.metrics['completed'] += 1
+        self.metrics['total_latency_ms'] += (time.perf_counter() - start) * 1000
+        return result
+
+    async def call(self, call: Callable[[], Awaitable[T]], coalesce_key: Optional[str] = None,
+                   model: Optional[str] = None) -> T:
+        """
+        Run `call` on the provider loop; callers passing the same coalesce_key
+        at once share it. With `model`, the call also waits for a slot under
+        that model's adaptive limit (raising LoadShedError when overloaded).
+        """
+        if coalesce_key is not None:
+            return await get_single_flight(self.provider).run(coalesce_key, lambda: self._call(call, model))
+        return await self._call(call, model)
+
+    async def _call(self, call: Callable[[], Awaitable[T]], model: Optional[str] = None) -> T:
+        # Spans are recorded here, in the caller's context, because the
+        # provider loop does not inherit the caller's contextvars
+        timings: Dict[str, int] = {}
+        start_ns = time.perf_counter_ns()
+        outcome = 'ok'
+        try:
+            if model is not None:
+                return await get_concurrency_limiter(self.provider, model).run(
+                    lambda: self.provider_loop.run(self._invoke(call, timings)))
+            return await self.provider_loop.run(self._invoke(call, timings))
+        except BaseException as e:
+            outcome = type(e).__name__
+            raise
+        finally:
+            self._record_spans(start_ns, timings.get('acquired'), outcome)
+
+    def _record_spans(self, start_ns: int, acquired_ns: Optional[int], outcome: str) -> None:
+        tracer = get_tracer()
+        end_ns = time.perf_counter_ns()
+        tracer.record_span(f"{self.provider}.queue", start_ns, acquired_ns or end_ns,
+                           stage="queueing", provider=self.provider)
+        if acquired_ns is not None:
+            tracer.record_span(f"{self.provider}.call", acquired_ns, end_ns,
+                               stage="model_call", provider=self.provider, outcome=outcome)
+
+    def get_stats(self) -> Dict[str, Any]:
+        completed = self.metrics['completed']
+        return {
+            **self.metrics,
+            'max_concurrency': self.max_concurrency,
+            'timeout_seconds': self.timeout_seconds,
+            'avg_latency_ms': self.metrics['total_latency_ms'] / completed if completed else 0.0,
+            'single_flight': get_single_flight(self.provider).get_stats()
+        }
+
+
+def _coalesce_key(method: str, kwargs: Dict[str, Any], *args: Any) -> Optional[str]:
+    # A stream object can only be read once, so streaming calls are never shared
+    if kwargs.get('stream'):
+        return None
+    return request_key(method, *args, **kwargs)
+
+
+class AnthropicAdapter(ProviderAdapter):
+    provider = "claude"
+
+    def __init__(self, api_key: str, provider_loop: ProviderEventLoop, **kwargs):
+        super().__init__(provider_loop, **kwargs)
+        from anthropic import AsyncAnthropic
+        self.client = AsyncAnthropic(api_key=api_key)
+
+    async def create_message(self, **kwargs) -> Any:
+        return await self.call(lambda: self.client.messages.create(**kwargs),
+                               coalesce_key=_coalesce_key('messages.create', kwargs),
+                               model=kwargs.get('model'))
+
+
+class OpenAIAdapter(ProviderAdapter):
+    provider = "openai"
+
+    def __init__(self, api_key: str, provider_loop: ProviderEventLoop, **kwargs):
+        super().__init__(provider_loop, **kwargs)
+        from openai import AsyncOpenAI
+        self.client = AsyncOpenAI(api_key=api_key)
+
+    async def create_chat_completion(self, **kwargs) -> Any:
+        return await self.call(lambda: self.client.chat.completions.create(**kwargs),
+                               coalesce_key=_coalesce_key('chat.completions.create', kwargs),
+                               model=kwargs.get('model'))
+
+
+class GeminiAdapter(ProviderAdapter):
+    provider = "gemini"
+
+    def __init__(self, model_name: str, provider_loop: ProviderEventLoop, **kwargs):
+        super().__init__(provider_loop, **kwargs)
+        import google.generativeai as genai
+        self.client = genai.GenerativeModel(model_name)
+
+    async def generate_content(self, contents: Any, **kwargs) -> Any:
+        return await self.call(lambda: self.client.generate_content_async(contents, **kwargs),
+                               coalesce_key=_coalesce_key(self.client.model_name, kwargs, contents),
+                               model=self.client.model_name)
+
+
+class ThreadedClientAdapter(ProviderAdapter):
+    """
+    Adapter for blocking SDK clients: calls run in worker threads so they
+    never stall an event loop, under the same limits and deadline. A call
+    that times out frees its slot immediately; the worker thread finishes
+    in the background.
+    """
+
+    def __init__(self, provider: str, provider_loop: ProviderEventLoop,
+                 env_namespace: str = "CHAT", **kwargs):
+        self.provider = provider
+        self.env_namespace = env_namespace
+        super().__init__(provider_loop, **kwargs)
+
+    async def run_sync(self, fn: Callable[..., T], *args, **kwargs) -> T:
+        return await self.call(lambda: asyncio.to_thread(fn, *args, **kwargs))
@@ -0,0 +1,205 @@
+# backend/services/quota_forecaster.py
+"""
+📈 Quota Forecaster - Predicted time-to-exhaustion per model/account
+Keeps per-minute request counts for every tracked model/account in one NumPy
+ring buffer and fits Holt's linear trend (exponential smoothing with a trend
+term, as in the advanced quota manager) to all of them at once. From the
+smoothed rate and trend it projects when each model runs out of its
+per-minute and per-day quota, so routing can move load away from a model
+while it still has headroom instead of after it reports LIMITED or 429s.
+
+    forecaster = QuotaForecaster()
+    forecaster.register("gemini-2.5-flash@primary", requests_per_minute=60, requests_per_day=1500)
+    forecaster.record("gemini-2.5-flash@primary")
+    forecast = forecaster.forecast({"gemini-2.5-flash@primary": used_today})
+    forecast["gemini-2.5-flash@primary"]["time_to_exhaustion"]   # seconds, None if not in the horizon
+
+Forecasts are recomputed at most every QUOTA_FORECAST_REFRESH_SECONDS.
+Without NumPy the forecaster is disabled and returns no forecasts.
+"""
+
+import os
+import math
+import time
+import threading
+import logging
+from typing import Dict, Any, Callable, List, Mapping, Optional, Union
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def _seconds(value: float) -> Optional[float]:
+    return None if math.isinf(value) else round(float(value), 1)
+
+
+class QuotaForecaster:
+    """📈 Holt-smoothed request rates and exhaustion times for many models at once"""
+
+    def __init__(self, window_minutes: Optional[int] = None, horizon_minutes: Optional[int] = None,
+                 refresh_seconds: Optional[float] = None, alpha: float = 0.3, beta: float = 0.1):
+        self.window = window_minutes or int(os.getenv('QUOTA_FORECAST_WINDOW_MINUTES', '60'))
+        self.horizon = horizon_minutes or int(os.getenv('QUOTA_FORECAST_HORIZON_MINUTES', '60'))
+        self.refresh_seconds = refresh_seconds if refresh_seconds is not None else \
+            float(os.getenv('QUOTA_FORECAST_REFRESH_SECONDS', '5'))
+        self.alpha = alpha
+        self.beta = beta
+        self.enabled = NUMPY_AVAILABLE
+
+        self.keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._started_minute: Optional[int] = None
+        self._current_minute: Optional[int] = None
+        self._forecast: Dict[str, Dict[str, Any]] = {}
+        self._forecast_at = 0.0
+        if self.enabled:
+            self._counts = np.zeros((0, self.window))   # ring buffer, column = minute % window
+            self._limits = np.zeros((0, 2))             # requests per minute, per day
+
+    def register(self, key: str, requests_per_minute: int, requests_per_day: int) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            if key in self._rows:
+                self._limits[self._rows[key]] = (requests_per_minute, requests_per_day)
+                return
+            self._rows[key] = len(self.keys)
+            self.keys.append(key)
+            self._counts = np.vstack([self._counts, np.zeros((1, self.window))])
+            self._limits = np.vstack([self._limits, [(requests_per_minute, requests_per_day)]])
+            self._forecast_at = 0.0
+
+    def record(self, key: str, count: int = 1, now: Optional[float] = None) -> None:
+        """Count `count` requests against `key` in the current minute"""
+        if not self.enabled:
+            return
+        with self._lock:
+            row = self._rows.get(key)
+            if row is None:
+                return
+            minute = self._advance(now if now is not None else time.time())
+            self._counts[row, minute % self.window] += count
+
+    def _advance(self, now: float) -> int:
+        """Clear the buckets of minutes that passed with no requests"""
+        minute = int(now // 60)
+        if self._current_minute is None:
+            self._started_minute = self._current_minute = minute
+        elif minute > self._current_minute:
+            stale = min(minute - self._current_minute, self.window)
+            columns = [(minute - i) % self.window for i in range(stale)]
+            self._counts[:, columns] = 0
+            self._current_minute = minute
+        return minute
+
+    def forecast(self, day_usage: Union[Mapping[str, float], Callable[[], Mapping[str, float]]],
+                 now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Per key: predicted requests per minute, trend, and seconds until the
+        minute and day quotas run out (None when not within the horizon), and
+        a 0-1 pressure score for ranking.
+        `day_usage` is the caller's count of requests so far today, or a
+        function returning it that is only called when the forecast is
+        recomputed, so callers on the routing path don't build it per request.
+        """
+        if not self.enabled or not self.keys:
+            return {}
+        now = now if now is not None else time.time()
+        # Routing asks on every request; a fresh forecast needs no lock
+        if now - self._forecast_at < self.refresh_seconds:
+            return self._forecast
+        with self._lock:
+            if now - self._forecast_at < self.refresh_seconds:
+                return self._forecast
+            minute = self._advance(now)
+            observed = min(minute - self._started_minute, self.window)
+            # Completed minutes, oldest first; the current minute is still filling
+            columns = [(minute - observed + i) % self.window for i in range(observed)]
+            history = self._counts[:, columns]
+            current = self._counts[:, minute % self.window].copy()
+            limits = self._limits.copy()
+            keys = list(self.keys)
+
+        if callable(day_usage):
+            day_usage = day_usage()
+        used_day = np.array([float(day_usage.get(key, 0.0)) for key in keys])
+        level, trend = self._holt(history, current, now % 60 / 60)
+
+        # Projected requests per minute over the horizon, then cumulative usage
+        steps = np.arange(1, self.horizon + 1)
+        projected = np.maximum(level[:, None] + trend[:, None] * steps[None, :], 0.0)
+        cumulative = np.cumsum(projected, axis=1)
+
+        remaining_day = np.maximum(limits[:, 1] - used_day, 0.0)
+        exhausted = cumulative >= remaining_day[:, None]
+        reached = exhausted.any(axis=1)
+        first = exhausted.argmax(axis=1)
+        # Linear interpolation inside the minute the quota runs out in
+        before = np.where(first > 0, cumulative[np.arange(len(keys)), first - 1], 0.0)
+        during = projected[np.arange(len(keys)), first]
+        fraction = np.divide(remaining_day - before, during, out=np.zeros_like(during), where=during > 0)
+        day_seconds = np.where(remaining_day <= 0, 0.0,
+                               np.where(reached, (first + np.clip(fraction, 0, 1)) * 60, np.inf))
+
+        # Minute quota: does the projected pace fill what is left of this minute?
+        rate_per_second = np.maximum(level, 0.0) / 60
+        remaining_minute = np.maximum(limits[:, 0] - current, 0.0)
+        seconds_left = 60 - now % 60
+        to_minute_limit = np.divide(remaining_minute, rate_per_second,
+                                    out=np.full(len(keys), np.inf), where=rate_per_second > 0)
+        minute_seconds = np.where(to_minute_limit <= seconds_left, to_minute_limit, np.inf)
+
+        horizon_seconds = self.horizon * 60
+        forecast = {}
+        for i, key in enumerate(keys):
+            time_to_exhaustion = float(min(day_seconds[i], minute_seconds[i]))
+            forecast[key] = {
+                'predicted_rpm': round(float(level[i]), 2),
+                'trend_per_minute': round(float(trend[i]), 3),
+                'minute_exhaustion_seconds': _seconds(minute_seconds[i]),
+                'day_exhaustion_seconds': _seconds(day_seconds[i]),
+                'time_to_exhaustion': _seconds(time_to_exhaustion),
+                # 0 = not expected to run out within the horizon, 1 = out now
+                'pressure': 0.0 if math.isinf(time_to_exhaustion) else
+                round(max(0.0, 1 - time_to_exhaustion / horizon_seconds), 4)
+            }
+
+        with self._lock:
+            self._forecast = forecast
+            self._forecast_at = now
+        return forecast
+
+    def _holt(self, history: 'np.ndarray', current: 'np.ndarray', elapsed: float):
+        """Level and trend for every row, smoothing one minute (column) at a time"""
+        n, minutes = history.shape
+        if minutes == 0:
+            # Nothing completed yet: extrapolate the current minute's pace
+            return current / max(elapsed, 0.25), np.zeros(n)
+        level = history[:, 0].copy()
+        trend = np.zeros(n)
+        for column in range(1, minutes):
+            previous = level
+            level = self.alpha * history[:, column] + (1 - self.alpha) * (level + trend)
+            trend = self.beta * (level - previous) + (1 - self.beta) * trend
+        if elapsed >= 0.25:
+            # A burst in the current minute raises the level straight away; a
+            # quiet partial minute waits until it completes
+            pace = current / elapsed
+            level = np.maximum(level, (1 - self.alpha * elapsed) * level + self.alpha * elapsed * pace)
+        return level, trend
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'enabled': self.enabled,
+            'tracked': len(self.keys),
+            'window_minutes': self.window,
+            'horizon_minutes': self.horizon,
+            'forecast_age_seconds': round(time.time() - self._forecast_at, 1) if self._forecast_at else None
+        }
@@ -0,0 +1,146 @@
+# backend/services/record_index.py
+"""
+🗂️ Record Index - In-memory lookup for small JSON-backed stores
+Holds records (plain dicts) by id with secondary indexes on chosen fields
+and a trigram index over text fields, so listing by owner/type, counting and
+name search cost O(result) instead of a scan over every record (or every
+file) per call.
+
+    index = RecordIndex(keys=("owner_id", "status"), text_fields=("name",))
+    index.put(agent["id"], agent)
+    index.ids_where("owner_id", "user_1")
+    index.counts_by("status")            # {"active": 3, "paused": 1}
+    index.search("search agent")         # case-insensitive substring of a text field
+
+Callers keep the index current by calling put()/remove() alongside their
+own writes (write-through).
+"""
+
+import threading
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Sequence, Set, Iterable
+
+GRAM = 3
+_FIELD_SEPARATOR = "\x00"  # keeps a query from matching across two fields
+
+
+def trigrams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+
+class RecordIndex:
+    """🗂️ Records by id, plus per-field value -> ids and trigram -> ids maps"""
+
+    def __init__(self, keys: Sequence[str] = (), text_fields: Sequence[str] = ()):
+        self.keys = tuple(keys)
+        self.text_fields = tuple(text_fields)
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._by_key: Dict[str, Dict[Any, Set[str]]] = {key: defaultdict(set) for key in self.keys}
+        self._texts: Dict[str, str] = {}   # lower-cased text fields, joined, for the substring check
+        self._postings: Dict[str, Set[str]] = defaultdict(set)
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __contains__(self, record_id: str) -> bool:
+        return record_id in self._records
+
+    def put(self, record_id: str, record: Dict[str, Any]) -> None:
+        """Insert or replace a record, re-indexing only what it touches"""
+        with self._lock:
+            self._unindex(record_id)
+            self._records[record_id] = record
+            for key in self.keys:
+                self._by_key[key][record.get(key)].add(record_id)
+            text = self._text_of(record)
+            self._texts[record_id] = text
+            for gram in trigrams(text):
+                self._postings[gram].add(record_id)
+
+    def remove(self, record_id: str) -> None:
+        with self._lock:
+            self._unindex(record_id)
+            self._records.pop(record_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._records.clear()
+            for values in self._by_key.values():
+                values.clear()
+            self._texts.clear()
+            self._postings.clear()
+
+    def get(self, record_id: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(record_id)
+
+    def ids(self) -> List[str]:
+        return list(self._records)
+
+    def records(self, ids: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            if ids is None:
+                return list(self._records.values())
+            return [self._records[i] for i in ids if i in self._records]
+
+    def ids_where(self, key: str, value: Any) -> Set[str]:
+        with self._lock:
+            return set(self._by_key[key].get(value, ()))
+
+    def count_where(self, key: str, value: Any) -> int:
+        return len(self._by_key[key].get(value, ()))
+
+    def counts_by(self, key: str) -> Dict[Any, int]:
+        with self._lock:
+            return {value: len(ids) for value, ids in self._by_key[key].items() if ids}
+
+    def search(self, query: str, **filters: Any) -> Set[str]:
+        """
+        Ids with a text field containing `query` (case-insensitive substring).
+        Records holding the query's rarest trigram are the candidates, each
+        then checked directly; queries shorter than a trigram check every
+        (filtered) record. Keyword filters (indexed keys only, None ignored)
+        narrow the result; an empty query matches everything.
+        """
+        query = query.lower()
+        if _FIELD_SEPARATOR in query:
+            return set()
+        with self._lock:
+            result: Optional[Set[str]] = None
+            for key, value in filters.items():
+                if value is not None:
+                    result = self._intersect(result, self._by_key[key].get(value, set()))
+            grams = trigrams(query)
+            if grams:
+                rarest = min(grams, key=lambda g: len(self._postings.get(g, ())))
+                result = self._intersect(result, self._postings.get(rarest, set()))
+            candidates = self._records if result is None else result
+            if not query:
+                return set(candidates)
+            return {record_id for record_id in candidates if query in self._texts[record_id]}
+
+    # -- internals -------------------------------------------------------------
+
+    def _text_of(self, record: Dict[str, Any]) -> str:
+        return _FIELD_SEPARATOR.join(str(record[field]).lower() for field in self.text_fields if record.get(field))
+
+    def _unindex(self, record_id: str) -> None:
+        previous = self._records.get(record_id)
+        if previous is None:
+            return
+        for key in self.keys:
+            ids = self._by_key[key].get(previous.get(key))
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._by_key[key][previous.get(key)]
+        for gram in trigrams(self._texts.pop(record_id, '')):
+            ids = self._postings.get(gram)
+            if ids is not None:
+                ids.discard(record_id)
+                if not ids:
+                    del self._postings[gram]
+
+    @staticmethod
+    def _intersect(current: Optional[Set[str]], ids: Set[str]) -> Set[str]:
+        return set(ids) if current is None else current & ids
@@ -0,0 +1,224 @@
+# backend/services/request_hedging.py
+"""
+🏁 Request Hedging - Speculative requests across model fallbacks
+If the primary model hasn't answered within its recent p95 latency, the same
+request is fired at the best fallback. Whichever answers first wins and the
+other call is cancelled. Per-tier budgets cap how much extra quota hedging
+may spend.
+
+The p95 comes from every call to a model, not just hedged ones: callers
+report the latency of calls they make without hedging via record_latency(),
+so the hedge delay is tuned before the first hedged request.
+"""
+
+import asyncio
+import time
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, Awaitable, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Share of primary requests that may be hedged, per cost/priority tier
+DEFAULT_TIER_BUDGETS = {
+    "free": 0.20,
+    "low": 0.15,
+    "medium": 0.10,
+    "high": 0.05,
+    "PRIMARY": 0.10,
+    "SECONDARY": 0.10,
+    "FALLBACK": 0.05
+}
+
+
+class LatencyTracker:
+    """Rolling latency samples per model, used to pick hedge delays"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, latency_ms: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self.window)
+            samples.append(latency_ms)
+
+    def percentile(self, key: str, percentile: float) -> Optional[float]:
+        with self._lock:
+            samples = self._samples.get(key)
+            if not samples or len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """
+    Token bucket per tier: every primary request earns `ratio` tokens and
+    every hedge spends one, so hedges stay below that share of traffic.
+    """
+
+    def __init__(self, ratios: Optional[Dict[str, float]] = None,
+                 default_ratio: float = 0.05, burst: float = 5.0):
+        self.ratios = dict(DEFAULT_TIER_BUDGETS if ratios is None else ratios)
+        self.default_ratio = default_ratio
+        self.burst = burst
+        self._tokens: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def earn(self, tier: str) -> None:
+        ratio = self.ratios.get(tier, self.default_ratio)
+        with self._lock:
+            self._tokens[tier] = min(self.burst, self._tokens.get(tier, 0.0) + ratio)
+
+    def try_spend(self, tier: str) -> bool:
+        with self._lock:
+            tokens = self._tokens.get(tier, 0.0)
+            if tokens < 1.0:
+                return False
+            self._tokens[tier] = tokens - 1.0
+            return True
+
+    def snapshot(self) -> Dict[str, float]:
+        with self._lock:
+            return dict(self._tokens)
+
+
+@dataclass
+class HedgeOutcome:
+    winner_key: str
+    hedged: bool
+    latency_ms: float
+
+
+class RequestHedger:
+    """
+    🏁 Fires a backup request when the primary is slower than its p95
+
+    Usage:
+        result, outcome = await hedger.run(
+            "speed_demon_primary", lambda: call(primary),
+            "speed_demon_backup", lambda: call(backup),
+            tier="low"
+        )
+    """
+
+    def __init__(self,
+                 budget: Optional[HedgeBudget] = None,
+                 latency_tracker: Optional[LatencyTracker] = None,
+                 hedge_percentile: float = 95.0,
+                 default_delay_ms: float = 3000.0,
+                 min_delay_ms: float = 50.0):
+        self.budget = budget or HedgeBudget()
+        self.latencies = latency_tracker or LatencyTracker()
+        self.hedge_percentile = hedge_percentile
+        self.default_delay_ms = default_delay_ms
+        self.min_delay_ms = min_delay_ms
+
+        self.metrics = {
+            "requests": 0,
+            "hedges_fired": 0,
+            "hedge_wins": 0,
+            "budget_denied": 0,
+            "estimated_tail_latency_saved_ms": 0.0
+        }
+
+    def record_latency(self, key: str, latency_ms: float) -> None:
+        """Latency of a successful call made without hedging"""
+        self.latencies.record(key, latency_ms)
+
+    def hedge_delay_ms(self, key: str) -> float:
+        p95 = self.latencies.percentile(key, self.hedge_percentile)
+        return max(self.min_delay_ms, p95 if p95 is not None else self.default_delay_ms)
+
+    async def run(self,
+                  primary_key: str,
+                  primary: Callable[[], Awaitable[T]],
+                  fallback_key: Optional[str],
+                  fallback: Optional[Callable[[], Awaitable[T]]],
+                  tier: str = "medium") -> Tuple[T, HedgeOutcome]:
+        """
+        Run `primary`, hedging with `fallback` after the primary's p95 delay.
+        Errors from the primary before the hedge fires are re-raised so the
+        caller's normal fallback chain still applies.
+        """
+        self.metrics["requests"] += 1
+        self.budget.earn(tier)
+        start = time.perf_counter()
+
+        primary_task = asyncio.ensure_future(primary())
+        tasks = {primary_task: primary_key}
+        started = {primary_task: start}
+
+        delay_ms = self.hedge_delay_ms(primary_key)
+        done, _ = await asyncio.wait({primary_task}, timeout=delay_ms / 1000.0)
+
+        if not done and fallback is not None and fallback_key is not None:
+            if self.budget.try_spend(tier):
+                self.metrics["hedges_fired"] += 1
+                logger.info(f"🏁 Hedging {primary_key} with {fallback_key} after {delay_ms:.0f}ms")
+                hedge_task = asyncio.ensure_future(fallback())
+                tasks[hedge_task] = fallback_key
+                started[hedge_task] = time.perf_counter()
+            else:
+                self.metrics["budget_denied"] += 1
+
+        pending = set(tasks)
+        last_error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+
+                    winner_key = tasks[task]
+                    finished = time.perf_counter()
+                    latency_ms = (finished - start) * 1000
+                    # Each model's sample runs from its own start; a winning hedge
+                    # started later than the primary
+                    self.latencies.record(winner_key, (finished - started[task]) * 1000)
+                    hedged = len(tasks) > 1
+
+                    if hedged and winner_key != primary_key:
+                        self.metrics["hedge_wins"] += 1
+                        primary_p99 = self.latencies.percentile(primary_key, 99.0)
+                        if primary_p99 is not None:
+                            self.metrics["estimated_tail_latency_saved_ms"] += max(0.0, primary_p99 - latency_ms)
+
+                    # The cancelled loser took at least this long - keep it as a
+                    # lower-bound sample so slow models don't look fast.
+                    for loser in pending:
+                        self.latencies.record(tasks[loser], (finished - started[loser]) * 1000)
+
+                    return task.result(), HedgeOutcome(winner_key, hedged, latency_ms)
+        finally:
+            # Cancel the loser and wait for it to unwind so its provider call
+            # is really gone before we return
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+        raise last_error
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self.metrics["requests"]
+        hedges = self.metrics["hedges_fired"]
+        return {
+            **self.metrics,
+            "hedge_rate": hedges / requests if requests else 0.0,
+            "hedge_win_rate": self.metrics["hedge_wins"] / hedges if hedges else 0.0,
+            "budget_tokens": self.budget.snapshot()
+        }
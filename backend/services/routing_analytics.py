@@ -0,0 +1,243 @@
+# backend/services/routing_analytics.py
+"""
+📈 Routing Analytics - Rolling aggregates for the Intelligent Execution Router
+Keeps per-route, per-user and per-time-bucket totals up to date on every
+routing decision and execution, so analytics reads never rescan history.
+"""
+
+import math
+import bisect
+import threading
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RoutingAggregate:
+    """Running totals for a slice of routing activity"""
+    decisions: int = 0
+    score_sum: float = 0.0
+    confidence_sum: float = 0.0
+    estimated_cost_sum: float = 0.0
+    scrapybara_only_cost_sum: float = 0.0
+    route_counts: Dict[str, int] = field(default_factory=dict)
+
+    executions: int = 0
+    successes: int = 0
+    execution_time_sum: float = 0.0
+    actual_cost_sum: float = 0.0
+
+    def add_decision(self, route: str, score: float, confidence: float,
+                     estimated_cost: float, scrapybara_only_cost: float) -> None:
+        self.decisions += 1
+        self.score_sum += score
+        self.confidence_sum += confidence
+        self.estimated_cost_sum += estimated_cost
+        self.scrapybara_only_cost_sum += scrapybara_only_cost
+        self.route_counts[route] = self.route_counts.get(route, 0) + 1
+
+    def add_execution(self, success: bool, execution_time: float, actual_cost: float) -> None:
+        self.executions += 1
+        if success:
+            self.successes += 1
+        self.execution_time_sum += execution_time
+        self.actual_cost_sum += actual_cost
+
+    def merge(self, other: 'RoutingAggregate') -> None:
+        self.decisions += other.decisions
+        self.score_sum += other.score_sum
+        self.confidence_sum += other.confidence_sum
+        self.estimated_cost_sum += other.estimated_cost_sum
+        self.scrapybara_only_cost_sum += other.scrapybara_only_cost_sum
+        for route, count in other.route_counts.items():
+            self.route_counts[route] = self.route_counts.get(route, 0) + count
+        self.executions += other.executions
+        self.successes += other.successes
+        self.execution_time_sum += other.execution_time_sum
+        self.actual_cost_sum += other.actual_cost_sum
+
+    @property
+    def average_complexity(self) -> float:
+        return self.score_sum / self.decisions if self.decisions else 0.0
+
+    @property
+    def average_confidence(self) -> float:
+        return self.confidence_sum / self.decisions if self.decisions else 0.0
+
+    @property
+    def success_rate(self) -> float:
+        return self.successes / self.executions if self.executions else 0.0
+
+    @property
+    def average_execution_time(self) -> float:
+        return self.execution_time_sum / self.executions if self.executions else 0.0
+
+
+class RoutingAnalytics:
+    """
+    📈 Incremental routing analytics
+
+    Every decision and execution is folded into a global aggregate, a
+    per-route aggregate, a per-user aggregate and a five-minute time bucket
+    (globally and per user). Time-range queries bisect a sorted index of
+    bucket keys, so they cost O(buckets in range) rather than O(history).
+    A range only takes whole buckets that start at or after its start, so
+    it never includes older events and misses at most one bucket's worth.
+    """
+
+    def __init__(self, bucket_seconds: int = 300, retention_hours: int = 24 * 30):
+        self.bucket_seconds = bucket_seconds
+        self.retention_hours = retention_hours
+
+        self.totals = RoutingAggregate()
+        self.by_route: Dict[str, RoutingAggregate] = {}
+        self.by_user: Dict[str, RoutingAggregate] = {}
+
+        # bucket_key -> aggregate, plus a sorted index of bucket keys
+        self._buckets: Dict[int, RoutingAggregate] = {}
+        self._bucket_keys: List[int] = []
+        self._user_buckets: Dict[str, Dict[int, RoutingAggregate]] = {}
+        self._user_bucket_keys: Dict[str, List[int]] = {}
+
+        self._lock = threading.Lock()
+
+    def _bucket_key(self, timestamp: datetime) -> int:
+        return int(timestamp.timestamp()) // self.bucket_seconds
+
+    def _first_bucket_after(self, since: datetime) -> int:
+        """Key of the first bucket that starts at or after `since`"""
+        return -(-math.ceil(since.timestamp()) // self.bucket_seconds)
+
+    def _slices(self, route: str, user_id: Optional[str],
+                timestamp: datetime) -> List[RoutingAggregate]:
+        """Return every aggregate an event at `timestamp` must update"""
+        key = self._bucket_key(timestamp)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = RoutingAggregate()
+            bisect.insort(self._bucket_keys, key)
+            self._prune(key)
+
+        slices = [
+            self.totals,
+            self.by_route.setdefault(route, RoutingAggregate()),
+            bucket
+        ]
+
+        if user_id is not None:
+            slices.append(self.by_user.setdefault(user_id, RoutingAggregate()))
+            user_buckets = self._user_buckets.setdefault(user_id, {})
+            user_bucket = user_buckets.get(key)
+            if user_bucket is None:
+                user_bucket = user_buckets[key] = RoutingAggregate()
+                bisect.insort(self._user_bucket_keys.setdefault(user_id, []), key)
+            slices.append(user_bucket)
+
+        return slices
+
+    def _prune(self, newest_key: int) -> None:
+        """Drop time buckets that fell out of the retention window"""
+        oldest_allowed = newest_key - (self.retention_hours * 3600) // self.bucket_seconds
+        cut = bisect.bisect_left(self._bucket_keys, oldest_allowed)
+        if not cut:
+            return
+
+        for key in self._bucket_keys[:cut]:
+            del self._buckets[key]
+        del self._bucket_keys[:cut]
+
+        for user_id, keys in list(self._user_bucket_keys.items()):
+            user_cut = bisect.bisect_left(keys, oldest_allowed)
+            if user_cut:
+                user_buckets = self._user_buckets[user_id]
+                for key in keys[:user_cut]:
+                    del user_buckets[key]
+                del keys[:user_cut]
+            if not keys:
+                del self._user_bucket_keys[user_id]
+                del self._user_buckets[user_id]
+
+    def record_decision(self,
+                        route: str,
+                        score: float,
+                        confidence: float,
+                        estimated_cost: float,
+                        scrapybara_only_cost: float,
+                        user_id: Optional[str] = None,
+                        timestamp: Optional[datetime] = None) -> None:
+        """Fold a routing decision into all matching aggregates"""
+        timestamp = timestamp or datetime.now()
+        with self._lock:
+            for aggregate in self._slices(route, user_id, timestamp):
+                aggregate.add_decision(route, score, confidence, estimated_cost, scrapybara_only_cost)
+
+    def record_execution(self,
+                         route: str,
+                         success: bool,
+                         execution_time: float,
+                         actual_cost: float,
+                         user_id: Optional[str] = None,
+                         timestamp: Optional[datetime] = None) -> None:
+        """Fold an execution outcome into all matching aggregates"""
+        timestamp = timestamp or datetime.now()
+        with self._lock:
+            for aggregate in self._slices(route, user_id, timestamp):
+                aggregate.add_execution(success, execution_time, actual_cost)
+
+    def summarize(self,
+                  since: Optional[datetime] = None,
+                  user_id: Optional[str] = None) -> RoutingAggregate:
+        """Combine the buckets that start at or after `since`, optionally for one user"""
+        with self._lock:
+            if user_id is None:
+                buckets, keys = self._buckets, self._bucket_keys
+            else:
+                buckets = self._user_buckets.get(user_id, {})
+                keys = self._user_bucket_keys.get(user_id, [])
+
+            start = bisect.bisect_left(keys, self._first_bucket_after(since)) if since else 0
+
+            summary = RoutingAggregate()
+            for key in keys[start:]:
+                summary.merge(buckets[key])
+            return summary
+
+    def totals_snapshot(self) -> RoutingAggregate:
+        """A consistent copy of the all-time totals"""
+        with self._lock:
+            snapshot = RoutingAggregate()
+            snapshot.merge(self.totals)
+            return snapshot
+
+    def route_summary(self) -> Dict[str, Dict[str, Any]]:
+        """Per-route execution outcomes"""
+        with self._lock:
+            return {
+                route: {
+                    'decisions': aggregate.decisions,
+                    'executions': aggregate.executions,
+                    'success_rate': aggregate.success_rate,
+                    'average_execution_time': aggregate.average_execution_time,
+                    'actual_cost': aggregate.actual_cost_sum
+                }
+                for route, aggregate in self.by_route.items()
+            }
+
+
+def parse_time_range(time_range: str, default_hours: int = 24) -> timedelta:
+    """Parse strings like '1h', '24h', '7d' into a timedelta"""
+    try:
+        value, unit = int(time_range[:-1]), time_range[-1].lower()
+    except (ValueError, IndexError):
+        return timedelta(hours=default_hours)
+
+    if unit == 'h':
+        return timedelta(hours=value)
+    if unit == 'd':
+        return timedelta(days=value)
+    return timedelta(hours=default_hours)
@@ -0,0 +1,291 @@
+# backend/services/routing_model.py
+"""
+🎓 Learned Routing Model - Online E2B vs Scrapybara classifier
+A small NumPy logistic regression trained from recorded execution outcomes.
+When it is confident, the router uses it instead of asking Mama Bear (an LLM
+call) to assess the task.
+"""
+
+import os
+import json
+import math
+import asyncio
+import threading
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+HIGH_COMPLEXITY_KEYWORDS = ('database', 'network', 'deploy', 'install', 'system', 'server')
+LOW_COMPLEXITY_KEYWORDS = ('print', 'hello', 'simple', 'basic', 'calculate')
+
+FEATURE_NAMES = [
+    'log_code_lines',
+    'log_file_count',
+    'log_dependency_count',
+    'system_operation_count',
+    'risk_factor_count',
+    'high_complexity_keywords',
+    'low_complexity_keywords',
+    'base_score',
+    'log_description_length'
+]
+
+# Scrapybara runs that finish inside this budget could most likely have run on E2B
+E2B_TIME_BUDGET_SECONDS = 30.0
+
+
+def extract_routing_features(task_description: str,
+                             code_lines: int,
+                             file_count: int,
+                             dependency_count: int,
+                             system_operations: List[str],
+                             risk_factors: List[str],
+                             base_score: float) -> List[float]:
+    """Build the feature vector from signals available before any LLM call"""
+    desc_lower = task_description.lower()
+    return [
+        math.log1p(code_lines),
+        math.log1p(file_count),
+        math.log1p(dependency_count),
+        float(len(system_operations)),
+        float(len(risk_factors)),
+        float(sum(1 for keyword in HIGH_COMPLEXITY_KEYWORDS if keyword in desc_lower)),
+        float(sum(1 for keyword in LOW_COMPLEXITY_KEYWORDS if keyword in desc_lower)),
+        base_score / 10.0,
+        math.log1p(len(task_description))
+    ]
+
+
+def outcome_label(route: str, success: bool, execution_time: float) -> Optional[Tuple[int, float]]:
+    """
+    Turn an execution outcome into a (label, weight) pair, where label 1 means
+    Scrapybara was the right call. Returns None when the outcome says nothing
+    about which route would have been better.
+    """
+    if route == 'e2b':
+        return (0, 1.0) if success else (1, 1.0)
+
+    if route == 'scrapybara':
+        if not success:
+            return None
+        if execution_time > E2B_TIME_BUDGET_SECONDS:
+            return 1, 1.0
+        # Quick Scrapybara success is weaker evidence that E2B would have done
+        return 0, 0.5
+
+    return None
+
+
+class OnlineRoutingClassifier:
+    """Logistic regression with running feature standardization and SGD updates"""
+
+    def __init__(self,
+                 n_features: int = len(FEATURE_NAMES),
+                 learning_rate: float = 0.05,
+                 l2: float = 1e-4):
+        self.n_features = n_features
+        self.learning_rate = learning_rate
+        self.l2 = l2
+
+        self.weights = np.zeros(n_features)
+        self.bias = 0.0
+        self.samples = 0
+
+        # Welford running mean / variance for standardization
+        self._mean = np.zeros(n_features)
+        self._m2 = np.zeros(n_features)
+
+    def _standardize(self, x: 'np.ndarray') -> 'np.ndarray':
+        if self.samples < 2:
+            return x - self._mean
+        std = np.sqrt(self._m2 / (self.samples - 1))
+        return (x - self._mean) / np.where(std > 1e-9, std, 1.0)
+
+    def predict_proba(self, features: List[float]) -> float:
+        """Probability that Scrapybara is the right route"""
+        z = float(self._standardize(np.asarray(features, dtype=float)) @ self.weights) + self.bias
+        return 1.0 / (1.0 + math.exp(-max(min(z, 35.0), -35.0)))
+
+    def partial_fit(self, features: List[float], label: int, weight: float = 1.0) -> None:
+        x = np.asarray(features, dtype=float)
+
+        self.samples += 1
+        delta = x - self._mean
+        self._mean += delta / self.samples
+        self._m2 += delta * (x - self._mean)
+
+        x_std = self._standardize(x)
+        z = float(x_std @ self.weights) + self.bias
+        error = (1.0 / (1.0 + math.exp(-max(min(z, 35.0), -35.0)))) - label
+
+        step = self.learning_rate * weight
+        self.weights -= step * (error * x_std + self.l2 * self.weights)
+        self.bias -= step * error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'weights': self.weights.tolist(),
+            'bias': self.bias,
+            'samples': self.samples,
+            'mean': self._mean.tolist(),
+            'm2': self._m2.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], **kwargs) -> 'OnlineRoutingClassifier':
+        model = cls(n_features=len(data['weights']), **kwargs)
+        model.weights = np.asarray(data['weights'], dtype=float)
+        model.bias = float(data['bias'])
+        model.samples = int(data['samples'])
+        model._mean = np.asarray(data['mean'], dtype=float)
+        model._m2 = np.asarray(data['m2'], dtype=float)
+        return model
+
+
+class LearnedRoutingModel:
+    """
+    🎓 Online routing model with a replayable decision log
+
+    Outcomes are appended to a JSONL log (for offline evaluation with
+    scripts/evaluate_routing_model.py) and used to update the classifier.
+    Training happens in memory; the log append and the periodic model save
+    run on a worker thread so they never block the event loop. Without
+    NumPy the model stays inert and the router keeps its heuristics.
+    """
+
+    def __init__(self,
+                 storage_path: Optional[str] = None,
+                 min_samples: int = 50,
+                 confidence_threshold: float = 0.85,
+                 save_every: int = 25):
+        self.storage_path = storage_path or os.path.join(os.getcwd(), "data", "routing")
+        self.log_path = os.path.join(self.storage_path, "routing_decisions.jsonl")
+        self.model_path = os.path.join(self.storage_path, "routing_model.json")
+        self.min_samples = min_samples
+        self.confidence_threshold = confidence_threshold
+        self.save_every = save_every
+
+        self.enabled = NUMPY_AVAILABLE
+        self.classifier: Optional[OnlineRoutingClassifier] = None
+        self.learned_decisions = 0
+        self.heuristic_decisions = 0
+        self._saved_samples = 0
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+
+        if not self.enabled:
+            logger.warning("NumPy not available - learned routing disabled, using heuristics")
+            return
+
+        os.makedirs(self.storage_path, exist_ok=True)
+        self.classifier = self._load_classifier()
+        self._saved_samples = self.classifier.samples
+
+    def _load_classifier(self) -> 'OnlineRoutingClassifier':
+        try:
+            if os.path.exists(self.model_path):
+                with open(self.model_path, 'r') as f:
+                    classifier = OnlineRoutingClassifier.from_dict(json.load(f))
+                if classifier.n_features == len(FEATURE_NAMES):
+                    logger.info(f"🎓 Loaded routing model trained on {classifier.samples} outcomes")
+                    return classifier
+        except Exception as e:
+            logger.warning(f"Failed to load routing model, starting fresh: {e}")
+        return OnlineRoutingClassifier()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.enabled and self.classifier.samples >= self.min_samples
+
+    def decide(self, features: List[float]) -> Optional[Tuple[str, float]]:
+        """Return (route, confidence) when the model is trusted, otherwise None"""
+        with self._lock:
+            if not self.is_ready:
+                self.heuristic_decisions += 1
+                return None
+
+            probability = self.classifier.predict_proba(features)
+            confidence = max(probability, 1.0 - probability)
+            if confidence < self.confidence_threshold:
+                self.heuristic_decisions += 1
+                return None
+
+            self.learned_decisions += 1
+        return ('scrapybara' if probability >= 0.5 else 'e2b'), confidence
+
+    async def record_outcome(self,
+                             features: Optional[List[float]],
+                             route: str,
+                             success: bool,
+                             execution_time: float,
+                             actual_cost: float,
+                             decision_source: str = 'heuristic') -> None:
+        """Train on an execution outcome and log it"""
+        if not self.enabled or not features:
+            return
+
+        record = {
+            'timestamp': datetime.now().isoformat(),
+            'features': features,
+            'route': route,
+            'decision_source': decision_source,
+            'success': success,
+            'execution_time': execution_time,
+            'actual_cost': actual_cost
+        }
+
+        snapshot = None
+        with self._lock:
+            label = outcome_label(route, success, execution_time)
+            if label is not None:
+                self.classifier.partial_fit(features, *label)
+                if self.classifier.samples % self.save_every == 0:
+                    snapshot = self.classifier.to_dict()
+
+        await asyncio.to_thread(self._persist, record, snapshot)
+
+    def _persist(self, record: Dict[str, Any], snapshot: Optional[Dict[str, Any]]) -> None:
+        with self._io_lock:
+            try:
+                with open(self.log_path, 'a') as f:
+                    f.write(json.dumps(record) + '\n')
+            except Exception as e:
+                logger.warning(f"Failed to append routing decision log: {e}")
+
+            # Saves can finish out of order; never replace a newer model with an older one
+            if snapshot is not None and snapshot['samples'] > self._saved_samples:
+                self._save_classifier(snapshot)
+
+    def _save_classifier(self, snapshot: Dict[str, Any]) -> None:
+        try:
+            tmp_path = self.model_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.model_path)
+            self._saved_samples = snapshot['samples']
+        except Exception as e:
+            logger.warning(f"Failed to save routing model: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            learned, heuristic = self.learned_decisions, self.heuristic_decisions
+            samples = self.classifier.samples if self.classifier else 0
+        total = learned + heuristic
+        return {
+            'enabled': self.enabled,
+            'ready': self.enabled and samples >= self.min_samples,
+            'training_samples': samples,
+            'learned_decisions': learned,
+            'heuristic_decisions': heuristic,
+            'learned_share': learned / total if total else 0.0,
+            'confidence_threshold': self.confidence_threshold
+        }
@@ -0,0 +1,283 @@
+# backend/services/service_graph.py
+"""
+🕸️ Service Graph - Concurrent startup in dependency order
+Startup used to bring services up one after another even when they had
+nothing to do with each other. Services are now declared with the services
+they need, and each one starts as soon as its dependencies are ready:
+
+- independent services initialize concurrently; plain init functions
+  (network clients, disk loads) run on a small thread pool so they don't
+  hold up the event loop, coroutine functions and inits marked `on_loop`
+  (ones that schedule tasks on the running loop or return an awaitable)
+  run on the loop itself
+- per-service init timings, exported as mama_bear_service_init_seconds
+- a timeout per service (SERVICE_INIT_TIMEOUT_SECONDS by default)
+- optional services that fail or run past their timeout are replaced by
+  their fallback so startup continues in degraded mode; a slow threaded
+  init that finishes later is handed to `on_late_ready`, and degraded
+  services that depend on it are rebuilt and handed over the same way
+- a required service that fails fails startup (after the rest settle)
+
+    graph = ServiceGraph()
+    graph.add("memory", MemoryManager)
+    graph.add("models", ModelManager, on_loop=True)
+    graph.add("orchestrator", lambda memory, models: AgentOrchestrator(memory, models),
+              depends_on=("memory", "models"))
+    services = await graph.start()
+
+Init callables receive their dependencies as keyword arguments and may be
+plain functions or coroutine functions. Rebuilding a dependant after a late
+start happens on the thread that finished the init, so only plain inits not
+marked `on_loop` are rebuilt; the others stay degraded until restart.
+"""
+
+import os
+import time
+import asyncio
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Sequence
+
+from .metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INIT_TIMEOUT = float(os.getenv('SERVICE_INIT_TIMEOUT_SECONDS', '30'))
+INIT_WORKERS = int(os.getenv('SERVICE_INIT_WORKERS', '4'))
+
+
+class ServiceInitError(Exception):
+    """Raised by ServiceGraph.start() when a required service could not start"""
+
+
+class ServiceSpec:
+    """One service: how to build it, what it needs, and how to degrade without it"""
+
+    def __init__(self, name: str, init: Callable[..., Any], depends_on: Sequence[str] = (),
+                 optional: bool = False, timeout: Optional[float] = None, on_loop: bool = False,
+                 fallback: Optional[Callable[[], Any]] = None):
+        self.name = name
+        self.init = init
+        self.depends_on = tuple(depends_on)
+        self.optional = optional
+        self.timeout = timeout if timeout is not None else DEFAULT_INIT_TIMEOUT
+        self.on_loop = on_loop or inspect.iscoroutinefunction(init)
+        self.fallback = fallback
+
+        self.state = 'pending'   # pending -> starting -> ready | degraded | failed | skipped
+        self.instance: Any = None
+        self.error: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.seconds: Optional[float] = None
+        self.late_seconds: Optional[float] = None
+
+
+class ServiceGraph:
+    """🕸️ Declares services with their dependencies and starts them concurrently"""
+
+    def __init__(self, on_late_ready: Optional[Callable[[str, Any], None]] = None):
+        self.specs: Dict[str, ServiceSpec] = {}
+        self.on_late_ready = on_late_ready
+        self.total_seconds: Optional[float] = None
+        self._lock = threading.Lock()
+
+        metrics = get_metrics_registry()
+        self.init_metric = metrics.histogram(
+            'mama_bear_service_init_seconds', "Service initialization time at startup", ('service', 'outcome'))
+
+    def add(self, name: str, init: Callable[..., Any], depends_on: Sequence[str] = (),
+            optional: bool = False, timeout: Optional[float] = None, on_loop: bool = False,
+            fallback: Optional[Callable[[], Any]] = None) -> ServiceSpec:
+        if name in self.specs:
+            raise ValueError(f"Service {name} is already declared")
+        spec = ServiceSpec(name, init, depends_on, optional, timeout, on_loop, fallback)
+        self.specs[name] = spec
+        return spec
+
+    def topological_order(self) -> List[str]:
+        """Declared services in dependency order; raises on unknown or cyclic dependencies"""
+        order: List[str] = []
+        visiting: set = set()
+
+        def visit(name: str, path: tuple) -> None:
+            if name in order:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle: {' -> '.join(path + (name,))}")
+            if name not in self.specs:
+                raise ValueError(f"{path[-1]} depends on undeclared service {name}")
+            visiting.add(name)
+            for dependency in self.specs[name].depends_on:
+                visit(dependency, path + (name,))
+            visiting.discard(name)
+            order.append(name)
+
+        for name in self.specs:
+            visit(name, ())
+        return order
+
+    async def start(self) -> Dict[str, Any]:
+        """
+        Start every service as soon as its dependencies are up. Returns
+        name -> instance (fallbacks for degraded services, None for services
+        that have neither).
+        """
+        order = self.topological_order()
+        start = time.perf_counter()
+        done: Dict[str, asyncio.Event] = {name: asyncio.Event() for name in order}
+        executor = ThreadPoolExecutor(max_workers=INIT_WORKERS, thread_name_prefix='service-init')
+
+        async def run(spec: ServiceSpec) -> None:
+            try:
+                for dependency in spec.depends_on:
+                    await done[dependency].wait()
+                await self._start_one(spec, executor)
+            finally:
+                done[spec.name].set()
+
+        try:
+            await asyncio.gather(*(run(self.specs[name]) for name in order))
+        finally:
+            # Timed-out inits keep their thread; don't wait for them here
+            executor.shutdown(wait=False)
+        self.total_seconds = time.perf_counter() - start
+
+        summary = ', '.join(f"{name} {self.specs[name].state} {self.specs[name].seconds or 0:.2f}s"
+                            for name in order)
+        logger.info("🕸️ Services started in %.2fs: %s", self.total_seconds, summary)
+
+        failed = [name for name in order if self.specs[name].state in ('failed', 'skipped')
+                  and not self.specs[name].optional]
+        if failed:
+            raise ServiceInitError(
+                "Required services failed to start: " +
+                ', '.join(f"{name} ({self.specs[name].error})" for name in failed))
+        return {name: self.specs[name].instance for name in order}
+
+    async def _start_one(self, spec: ServiceSpec, executor: ThreadPoolExecutor) -> None:
+        unavailable = [d for d in spec.depends_on if self.specs[d].state in ('failed', 'skipped')]
+        if unavailable:
+            self._settle(spec, 'skipped', error=f"dependencies unavailable: {', '.join(unavailable)}")
+            return
+
+        kwargs = {d: self.specs[d].instance for d in spec.depends_on}
+        spec.state = 'starting'
+        spec.started_at = time.perf_counter()
+        future = None
+        try:
+            if spec.on_loop:
+                result = spec.init(**kwargs)
+                if inspect.isawaitable(result):
+                    result = await asyncio.wait_for(result, spec.timeout)
+                instance = result
+            else:
+                future = executor.submit(spec.init, **kwargs)
+                future.add_done_callback(lambda f, spec=spec: self._thread_done(spec, f))
+                instance = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), spec.timeout)
+            spec.instance = instance
+            self._settle(spec, 'ready')
+        except asyncio.TimeoutError:
+            self._settle(spec, 'failed', error=f"timed out after {spec.timeout:g}s")
+            if future is not None and future.done():
+                # Finished between the timeout firing and the fallback going in
+                self._thread_done(spec, future)
+        except Exception as e:
+            self._settle(spec, 'failed', error=str(e))
+
+    def _settle(self, spec: ServiceSpec, state: str, error: Optional[str] = None) -> None:
+        with self._lock:
+            spec.error = error
+            if state == 'ready':
+                spec.state = 'ready'
+            elif spec.optional:
+                spec.state = 'degraded'
+                spec.instance = self._make_fallback(spec)
+            else:
+                spec.state = state
+            if spec.started_at is not None:
+                spec.seconds = time.perf_counter() - spec.started_at
+        self.init_metric.labels(service=spec.name, outcome=spec.state).observe(spec.seconds or 0.0)
+        if spec.state == 'ready':
+            logger.info("✅ %s ready in %.2fs", spec.name, spec.seconds)
+        elif spec.state == 'degraded':
+            logger.warning("⚠️ %s unavailable (%s); continuing in degraded mode", spec.name, error)
+        else:
+            logger.error("❌ %s %s: %s", spec.name, spec.state, error)
+
+    def _make_fallback(self, spec: ServiceSpec) -> Any:
+        if spec.fallback is None:
+            return None
+        try:
+            return spec.fallback()
+        except Exception as e:
+            logger.error("❌ Fallback for %s failed: %s", spec.name, e)
+            return None
+
+    def _thread_done(self, spec: ServiceSpec, future) -> None:
+        """Thread-pool callback: picks up inits that finish after their timeout"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        with self._lock:
+            if spec.state != 'degraded':
+                return
+            spec.instance = future.result()
+            spec.state = 'ready'
+            spec.error = None
+            spec.late_seconds = time.perf_counter() - spec.started_at
+        self._ready_late(spec)
+
+    def _ready_late(self, spec: ServiceSpec) -> None:
+        logger.info("✅ %s became ready late (%.2fs); leaving degraded mode", spec.name, spec.late_seconds)
+        if self.on_late_ready is not None:
+            try:
+                self.on_late_ready(spec.name, spec.instance)
+            except Exception as e:
+                logger.error("❌ on_late_ready failed for %s: %s", spec.name, e)
+        self._rebuild_dependants(spec)
+
+    def _rebuild_dependants(self, spec: ServiceSpec) -> None:
+        """Rebuild degraded services that were running on `spec`'s fallback"""
+        for dependant in self.specs.values():
+            if spec.name not in dependant.depends_on:
+                continue
+            with self._lock:
+                if dependant.state != 'degraded' or \
+                        any(self.specs[d].state != 'ready' for d in dependant.depends_on):
+                    continue
+                kwargs = {d: self.specs[d].instance for d in dependant.depends_on}
+            if dependant.on_loop:
+                logger.warning("⚠️ %s must start on the event loop; it stays degraded until restart",
+                               dependant.name)
+                continue
+            try:
+                instance = dependant.init(**kwargs)
+            except Exception as e:
+                logger.warning("⚠️ %s still unavailable after %s became ready: %s", dependant.name, spec.name, e)
+                continue
+            with self._lock:
+                if dependant.state != 'degraded':
+                    continue
+                dependant.instance = instance
+                dependant.state = 'ready'
+                dependant.error = None
+                dependant.late_seconds = time.perf_counter() - dependant.started_at
+            self._ready_late(dependant)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'total_seconds': round(self.total_seconds, 3) if self.total_seconds is not None else None,
+            'services': {
+                name: {
+                    'state': spec.state,
+                    'optional': spec.optional,
+                    'depends_on': list(spec.depends_on),
+                    'init_seconds': round(spec.seconds, 3) if spec.seconds is not None else None,
+                    'late_ready_seconds': round(spec.late_seconds, 3) if spec.late_seconds is not None else None,
+                    'timeout_seconds': spec.timeout,
+                    'error': spec.error
+                }
+                for name, spec in self.specs.items()
+            }
+        }
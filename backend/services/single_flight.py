@@ -0,0 +1,318 @@
+# backend/services/single_flight.py
+"""
+🛬 Single-Flight - Coalesce identical concurrent provider calls
+When several callers send the same request at the same time (a dashboard
+widget polled from many tabs, a health probe, a retried prompt), only the
+first caller - the leader - reaches the provider. Everyone who arrives while
+that call is in flight waits for it and gets the same result, exception or
+stream. Nothing is cached: once the call finishes, the next identical
+request starts a new one.
+
+Flask handlers each run on their own event loop, so followers wait on a
+thread-safe future rather than an asyncio one and may sit on any loop.
+
+    flight = get_single_flight("gemini")
+    key = request_key(model_name, prompt, generation_config)
+    response = await flight.run(key, lambda: model.generate_content_async(prompt))
+
+    for text in flight.stream(key, lambda: iter_provider_stream(...)):  # blocking streams
+        ...
+
+Each group reports its coalescing ratio (followers / requests).
+SINGLE_FLIGHT_ENABLED=false turns coalescing off everywhere.
+"""
+
+import os
+import re
+import json
+import asyncio
+import hashlib
+import threading
+import concurrent.futures
+import logging
+from typing import Dict, Any, Callable, Awaitable, Iterator, Iterable, Optional, TypeVar
+
+from .metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, str):
+        return _WHITESPACE.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    if hasattr(value, 'to_dict'):
+        return _normalize(value.to_dict())
+    if hasattr(value, '__dict__'):
+        return _normalize({k: v for k, v in vars(value).items() if not k.startswith('_')})
+    return str(value)
+
+
+def request_key(*parts: Any, **config: Any) -> str:
+    """
+    Stable key for a provider request: prompt text with whitespace runs
+    collapsed, model and config (dicts, lists and config objects compared by
+    value, key order ignored).
+    """
+    payload = json.dumps([_normalize(parts), _normalize(config)], sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _LeaderCancelled(Exception):
+    """The leader's caller went away before the call finished; a follower takes over"""
+
+
+class _SharedStream:
+    """
+    One provider stream read by several consumers. Whichever consumer needs
+    the next chunk pulls it from the source; chunks are buffered so late
+    joiners replay from the start. The source is closed once every consumer
+    has gone, even mid-stream; an abandoned stream takes no new consumers, so
+    a caller arriving after that starts a fresh one instead of replaying a
+    truncated buffer.
+    """
+
+    _PULL = object()
+
+    def __init__(self, source: Iterator[Any], on_finished: Callable[[], None]):
+        self.source = source
+        self.on_finished = on_finished
+        self.buffer = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.pulling = False
+        self.consumers = 0
+        self.abandoned = False
+        self._cond = threading.Condition()
+
+    def join(self) -> bool:
+        """Register a consumer; False once the stream has been abandoned"""
+        with self._cond:
+            if self.abandoned:
+                return False
+            self.consumers += 1
+            return True
+
+    def consume(self) -> Iterator[Any]:
+        """Iterate the stream; the caller must have join()ed first"""
+        index = 0
+        try:
+            while True:
+                with self._cond:
+                    while index >= len(self.buffer) and not self.done and self.pulling:
+                        self._cond.wait()
+                    if index < len(self.buffer):
+                        item = self.buffer[index]
+                    elif self.done:
+                        if self.error is not None:
+                            raise self.error
+                        return
+                    else:
+                        self.pulling = True
+                        item = self._PULL
+                if item is self._PULL:
+                    try:
+                        item = next(self.source)
+                    except StopIteration:
+                        self._finish(None)
+                        return
+                    except BaseException as e:
+                        self._finish(e)
+                        raise
+                    with self._cond:
+                        self.buffer.append(item)
+                        self.pulling = False
+                        self._cond.notify_all()
+                index += 1
+                yield item
+        finally:
+            with self._cond:
+                self.consumers -= 1
+                abandoned = self.consumers == 0 and not self.done
+                if abandoned:
+                    self.abandoned = True
+                    self.done = True
+                    self.pulling = False
+                    self._cond.notify_all()
+            if abandoned:
+                self.on_finished()
+                close = getattr(self.source, 'close', None)
+                if close is not None:
+                    close()
+
+    def _finish(self, error: Optional[BaseException]) -> None:
+        with self._cond:
+            self.done = True
+            self.error = error
+            self.pulling = False
+            self._cond.notify_all()
+        self.on_finished()
+
+
+class SingleFlight:
+    """🛬 In-flight calls by key; concurrent callers with the same key share one"""
+
+    def __init__(self, name: str, enabled: Optional[bool] = None):
+        self.name = name
+        self.enabled = enabled if enabled is not None else \
+            os.getenv('SINGLE_FLIGHT_ENABLED', 'true').lower() == 'true'
+        self._calls: Dict[str, concurrent.futures.Future] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'leaders': 0, 'followers': 0, 'stream_requests': 0, 'stream_followers': 0}
+
+        metrics = get_metrics_registry()
+        requests = metrics.counter(
+            'mama_bear_single_flight_requests_total',
+            "Requests through single-flight groups; role=follower shared an in-flight call", ('group', 'role'))
+        self._leader_metric = requests.labels(group=name, role='leader')
+        self._follower_metric = requests.labels(group=name, role='follower')
+        ratio = metrics.gauge(
+            'mama_bear_single_flight_coalescing_ratio', "Share of requests served by another caller's call", ('group',))
+        metrics.register_collector(f"single_flight_{name}", lambda: ratio.labels(group=name).set(self.coalescing_ratio))
+
+    @property
+    def coalescing_ratio(self) -> float:
+        total = self.stats['requests'] + self.stats['stream_requests']
+        followers = self.stats['followers'] + self.stats['stream_followers']
+        return followers / total if total else 0.0
+
+    async def run(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Await fn() unless an identical call is already in flight, then share its outcome"""
+        if not self.enabled:
+            return await fn()
+
+        while True:
+            with self._lock:
+                self.stats['requests'] += 1
+                shared = self._calls.get(key)
+                if shared is None:
+                    shared = self._calls[key] = concurrent.futures.Future()
+                    leader = True
+                    self.stats['leaders'] += 1
+                else:
+                    leader = False
+                    self.stats['followers'] += 1
+
+            if leader:
+                self._leader_metric.inc()
+                return await self._lead(key, shared, fn)
+
+            self._follower_metric.inc()
+            try:
+                # shield: a follower giving up must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(shared))
+            except _LeaderCancelled:
+                with self._lock:
+                    self.stats['requests'] -= 1
+                    self.stats['followers'] -= 1
+                continue
+
+    async def _lead(self, key: str, shared: concurrent.futures.Future, fn: Callable[[], Awaitable[T]]) -> T:
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            self._settle(key, shared, error=_LeaderCancelled(key))
+            raise
+        except BaseException as e:
+            self._settle(key, shared, error=e)
+            raise
+        self._settle(key, shared, result=result)
+        return result
+
+    def _settle(self, key: str, shared: concurrent.futures.Future, result: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._calls.get(key) is shared:
+                del self._calls[key]
+        if error is not None:
+            shared.set_exception(error)
+        else:
+            shared.set_result(result)
+        # Nobody may be waiting; don't let an unobserved exception get logged
+        shared.exception()
+
+    def stream(self, key: str, factory: Callable[[], Iterable[Any]]) -> Iterator[Any]:
+        """
+        Iterate a blocking provider stream, sharing it with identical
+        concurrent requests. `factory` opens the stream and is only called
+        by the first caller.
+        """
+        if not self.enabled:
+            yield from factory()
+            return
+
+        with self._lock:
+            self.stats['stream_requests'] += 1
+            shared = self._streams.get(key)
+            if shared is not None and shared.join():
+                self.stats['stream_followers'] += 1
+                self._follower_metric.inc()
+            else:
+                # None in flight, or abandoned and not yet dropped: start a new one
+                shared = self._streams[key] = _SharedStream(
+                    _LazyIterator(factory), on_finished=lambda: self._drop_stream(key, shared))
+                shared.join()
+                self._leader_metric.inc()
+        yield from shared.consume()
+
+    def _drop_stream(self, key: str, shared: _SharedStream) -> None:
+        with self._lock:
+            if self._streams.get(key) is shared:
+                del self._streams[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            in_flight = len(self._calls) + len(self._streams)
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'in_flight': in_flight,
+            'coalescing_ratio': round(self.coalescing_ratio, 4)
+        }
+
+
+class _LazyIterator:
+    """Opens the underlying stream on the first next(), from the consumer that pulls it"""
+
+    def __init__(self, factory: Callable[[], Iterable[Any]]):
+        self.factory = factory
+        self.iterator: Optional[Iterator[Any]] = None
+
+    def __next__(self) -> Any:
+        if self.iterator is None:
+            self.iterator = iter(self.factory())
+        return next(self.iterator)
+
+    def close(self) -> None:
+        close = getattr(self.iterator, 'close', None)
+        if close is not None:
+            close()
+
+
+_groups: Dict[str, SingleFlight] = {}
+_groups_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """Process-wide single-flight group, one per provider or call site"""
+    with _groups_lock:
+        group = _groups.get(name)
+        if group is None:
+            group = _groups[name] = SingleFlight(name)
+        return group
+
+
+def get_single_flight_stats() -> Dict[str, Any]:
+    with _groups_lock:
+        groups = list(_groups.values())
+    return {group.name: group.get_stats() for group in groups}
@@ -0,0 +1,229 @@
+# backend/services/snippet_analyzer.py
+"""
+🔍 Snippet Analyzer - Memoized code complexity analysis
+Single-pass AST feature collection with a content-hash keyed cache, so
+resubmitting the same snippet while iterating costs a dictionary lookup.
+"""
+
+import ast
+import hashlib
+import re
+import threading
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_CALL_ATTRS = frozenset(['system', 'run', 'call', 'Popen'])
+DYNAMIC_EXEC_NAMES = frozenset(['exec', 'eval', 'compile'])
+
+# One alternation replaces the per-pattern regex loop used for non-Python code.
+# System-call anchors are matched once and expanded into the original patterns
+# (os.system( also counts as system(, shell_exec( also counts as exec(, ...).
+_NON_PYTHON_SCANNER = re.compile(
+    r'(?P<dependency>(?:import|require|include)\s+)'
+    r'|(?P<system>system\()'
+    r'|(?P<subprocess>subprocess\.)'
+    r'|(?P<exec>exec\()'
+)
+_NON_PYTHON_SYSTEM_PATTERNS = 6
+
+
+class SnippetFeatureCollector:
+    """Collects imports, system calls and dynamic-exec calls in one tree walk"""
+
+    def __init__(self):
+        self.dependencies = 0
+        self.system_ops: List[str] = []
+        self.risk_factors: List[str] = []
+
+    def collect(self, tree: ast.AST) -> 'SnippetFeatureCollector':
+        for node in ast.walk(tree):
+            node_type = type(node)
+
+            if node_type is ast.Import or node_type is ast.ImportFrom:
+                self.dependencies += 1
+
+            elif node_type is ast.Call:
+                func = node.func
+                attr = getattr(func, 'attr', None)
+                if attr in SYSTEM_CALL_ATTRS:
+                    self.system_ops.append(f"subprocess.{attr}")
+                    self.risk_factors.append("System command execution detected")
+
+                name = getattr(func, 'id', None)
+                if name in DYNAMIC_EXEC_NAMES:
+                    self.risk_factors.append(f"Dynamic code execution: {name}")
+
+        return self
+
+
+def _scan_non_python(code: str) -> Tuple[int, int]:
+    """Single regex pass returning (dependency count, distinct system patterns)"""
+    dependencies = 0
+    system_patterns = set()
+
+    for match in _NON_PYTHON_SCANNER.finditer(code):
+        kind = match.lastgroup
+        if kind == 'dependency':
+            dependencies += 1
+            continue
+
+        if len(system_patterns) == _NON_PYTHON_SYSTEM_PATTERNS:
+            continue
+
+        start = match.start()
+        if kind == 'system':
+            system_patterns.add('system(')
+            if code.endswith('os.', 0, start):
+                system_patterns.add('os.system(')
+        elif kind == 'subprocess':
+            system_patterns.add('subprocess.')
+        else:
+            system_patterns.add('exec(')
+            if code.endswith('shell_', 0, start):
+                system_patterns.add('shell_exec(')
+            elif code.endswith('Runtime.getRuntime().', 0, start):
+                system_patterns.add('Runtime.getRuntime().exec(')
+
+    return dependencies, len(system_patterns)
+
+
+_CONTINUATION_PREFIXES = ('#', ')', ']', '}', 'else', 'elif', 'except', 'finally')
+
+
+def _is_statement_start(line: str) -> bool:
+    return bool(line) and not line[0].isspace() and not line.startswith(_CONTINUATION_PREFIXES)
+
+
+def _sample_large_code(lines: List[str], max_lines: int, window: int) -> str:
+    """
+    Keep evenly spaced windows of the file, starting with its head (where the
+    imports live). Windows are aligned to top-level statements so the sample
+    still parses in the common case.
+    """
+    total = len(lines)
+    windows = max(1, max_lines // window)
+    stride = max(window, total // windows)
+
+    sampled: List[str] = []
+    for start in range(0, total, stride):
+        begin = start
+        while begin < start + window and begin < total and not _is_statement_start(lines[begin]):
+            begin += 1
+        if begin >= total or begin == start + window:
+            continue
+
+        end = min(total, begin + window)
+        while end < total and end < begin + 2 * window and not _is_statement_start(lines[end]):
+            end += 1
+
+        sampled.extend(lines[begin:end])
+        if len(sampled) >= max_lines:
+            break
+
+    return '\n'.join(sampled)
+
+
+def analyze_code_snippet(code: str,
+                         max_parse_lines: int = 5000,
+                         sample_window: int = 250) -> Dict[str, Any]:
+    """Analyze a code snippet for complexity indicators (uncached)"""
+
+    all_lines = code.split('\n')
+    lines = sum(1 for line in all_lines if line.strip())
+    complexity_factors = []
+    sampled = len(all_lines) > max_parse_lines
+
+    source = _sample_large_code(all_lines, max_parse_lines, sample_window) if sampled else code
+
+    try:
+        features = SnippetFeatureCollector().collect(ast.parse(source))
+        dependencies = features.dependencies
+        system_ops = features.system_ops
+        risk_factors = features.risk_factors
+
+        # Complexity indicators
+        if lines > 50:
+            complexity_factors.append("High line count")
+        if dependencies > 5:
+            complexity_factors.append("Many dependencies")
+
+    except SyntaxError:
+        # Not Python code (or a sample window split a statement), use regex analysis
+        dependencies, system_pattern_count = _scan_non_python(source)
+        system_ops = ["System operation detected"] * system_pattern_count
+        risk_factors = ["System operation in non-Python code"] * system_pattern_count
+
+    if sampled:
+        complexity_factors.append("Very large file (sampled analysis)")
+
+    return {
+        'lines': lines,
+        'dependencies': dependencies,
+        'system_ops': system_ops,
+        'complexity_factors': complexity_factors,
+        'risk_factors': risk_factors,
+        'sampled': sampled
+    }
+
+
+class SnippetAnalysisCache:
+    """
+    🗄️ LRU cache of snippet analyses keyed by a content hash
+
+    Results are copied on the way out so callers can't mutate cached entries.
+    """
+
+    def __init__(self, max_entries: int = 2048, max_parse_lines: int = 5000):
+        self.max_entries = max_entries
+        self.max_parse_lines = max_parse_lines
+        self._entries: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def content_key(code: str) -> str:
+        return hashlib.blake2b(code.encode('utf-8', 'surrogatepass'), digest_size=16).hexdigest()
+
+    def analyze(self, code: str) -> Dict[str, Any]:
+        key = self.content_key(code)
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._copy(cached)
+
+        analysis = analyze_code_snippet(code, max_parse_lines=self.max_parse_lines)
+
+        with self._lock:
+            self.misses += 1
+            self._entries[key] = analysis
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return self._copy(analysis)
+
+    @staticmethod
+    def _copy(analysis: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: list(value) if isinstance(value, list) else value
+            for key, value in analysis.items()
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
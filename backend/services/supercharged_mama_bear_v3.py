@@ -17,6 +17,8 @@ from services.enhanced_mama_bear_orchestration import EnhancedMamaBearAgent
 # Import new Express Mode and ADK capabilities
 from services.vertex_express_integration import VertexExpressIntegration
 from services.adk_agent_workbench import ADKAgentWorkbench, AgentSpec, AgentTemplate
+from services.tracing import get_tracer
+from services.metrics_registry import get_metrics_registry
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +52,8 @@ class SuperchargedMamaBearAgent:
             "user_satisfaction": 0.0,
             "autonomous_actions": 0
         }
+        self.tracer = get_tracer()
+        self.metrics_registry = get_metrics_registry()
         
         # Conversation memory and learning
         self.conversation_history = {}
@@ -105,65 +109,73 @@ class SuperchargedMamaBearAgent:
         request_id = str(uuid.uuid4())
         self.metrics["total_requests"] += 1
         
-        try:
-            # Step 1: Analyze request for optimal routing
-            routing_analysis = await self._analyze_request_intelligence(
-                message, user_id, variant, context, speed_priority
-            )
-            
-            # Step 2: Route to optimal processing path
-            if routing_analysis["use_express_mode"]:
-                response = await self._process_with_express_mode(
-                    message, user_id, variant, context, routing_analysis
-                )
-                self.metrics["express_requests"] += 1
-            else:
-                response = await self._process_with_enhanced_mama_bear(
-                    message, user_id, variant, context, routing_analysis
-                )
-            
-            # Step 3: Post-process and enhance response
-            enhanced_response = await self._enhance_response(
-                response, routing_analysis, user_id, request_id
-            )
-            
-            # Step 4: Learning and adaptation
-            await self._learn_from_interaction(
-                message, enhanced_response, user_id, routing_analysis
-            )
-            
-            # Step 5: Autonomous actions (if enabled)
-            if allow_autonomous_actions:
-                await self._consider_autonomous_actions(
-                    message, enhanced_response, user_id, context
-                )
-            
-            # Update metrics
-            response_time_ms = (datetime.now() - start_time).total_seconds() * 1000
-            self._update_performance_metrics(response_time_ms, routing_analysis)
-            
-            # Add metadata to response
-            enhanced_response.update({
-                "request_id": request_id,
-                "processing_path": routing_analysis["processing_path"],
-                "response_time_ms": round(response_time_ms, 1),
-                "performance_tier": routing_analysis.get("performance_tier", "standard"),
-                "mama_bear_version": "3.0_supercharged"
-            })
-            
-            return enhanced_response
-            
-        except Exception as e:
-            logger.error(f"Error in supercharged message processing: {e}")
-            
-            # Fallback response
-            return {
-                "success": False,
-                "response": "🐻 I'm experiencing some technical difficulties, but I'm still here for you! Let me try a different approach.",
-                "error": str(e),
-                "fallback_used": True,
-                "request_id": request_id
-            }
+        with self.tracer.start_trace("supercharged.process_message", request_id=request_id,
+                                     variant=variant, user_id=user_id) as trace_span:
+            try:
+                # Step 1: Analyze request for optimal routing
+                with self.tracer.span("supercharged.analyze_request", stage="analysis"):
+                    routing_analysis = await self._analyze_request_intelligence(
+                        message, user_id, variant, context, speed_priority
+                    )
+                trace_span.set_attribute("processing_path", routing_analysis["processing_path"])
+                
+                # Step 2: Route to optimal processing path
+                if routing_analysis["use_express_mode"]:
+                    response = await self._process_with_express_mode(
+                        message, user_id, variant, context, routing_analysis
+                    )
+                    self.metrics["express_requests"] += 1
+                else:
+                    response = await self._process_with_enhanced_mama_bear(
+                        message, user_id, variant, context, routing_analysis
+                    )
+                
+                with self.tracer.span("supercharged.post_process", stage="post_processing"):
+                    # Step 3: Post-process and enhance response
+                    enhanced_response = await self._enhance_response(
+                        response, routing_analysis, user_id, request_id
+                    )
+                    
+                    # Step 4: Learning and adaptation
+                    await self._learn_from_interaction(
+                        message, enhanced_response, user_id, routing_analysis
+                    )
+                    
+                    # Step 5: Autonomous actions (if enabled)
+                    if allow_autonomous_actions:
+                        await self._consider_autonomous_actions(
+                            message, enhanced_response, user_id, context
+                        )
+                
+                # Update metrics
+                response_time_ms = (datetime.now() - start_time).total_seconds() * 1000
+                self._update_performance_metrics(response_time_ms, routing_analysis)
+                
+                # Add metadata to response
+                enhanced_response.update({
+                    "request_id": request_id,
+                    "processing_path": routing_analysis["processing_path"],
+                    "response_time_ms": round(response_time_ms, 1),
+                    "performance_tier": routing_analysis.get("performance_tier", "standard"),
+                    "mama_bear_version": "3.0_supercharged"
+                })
+                
+                return enhanced_response
+                
+            except Exception as e:
+                trace_span.record_error(e)
+                self.metrics_registry.requests.labels("supercharged", "failure").inc()
+                logger.error(f"Error in supercharged message processing: {e}")
+                
+                # Fallback response
+                return {
+                    "success": False,
+                    "response": "🐻 I'm experiencing some technical difficulties, but I'm still here for you! Let me try a different approach.",
+                    "error": str(e),
+                    "fallback_used": True,
+                    "request_id": request_id
+                }
+        
     
     async def _analyze_request_intelligence(self, 
                                           message: str,
@@ -489,6 +501,10 @@ class SuperchargedMamaBearAgent:
         # Update satisfaction (simplified - could be enhanced with user feedback)
         if routing_analysis["performance_tier"] in ["ultra_fast", "fast"] and response_time_ms < 500:
             self.metrics["user_satisfaction"] = min(self.metrics["user_satisfaction"] + 0.01, 1.0)
+        
+        self.metrics_registry.request_latency.labels(
+            "supercharged", routing_analysis["processing_path"]).observe(response_time_ms / 1000)
+        self.metrics_registry.requests.labels("supercharged", "success").inc()
     
     # Public API methods
     
@@ -0,0 +1,437 @@
+# backend/services/tracing.py
+"""
+🔭 Request Tracing - Span-based timing across the request pipeline
+One chat request can pass through the supercharged agent, TaskAnalyzer,
+GeminiConductor, PerformanceTracker, GeminiOrchestra and a provider SDK.
+Each of them opens spans on the shared tracer; the active trace and span live
+in contextvars, so nested awaits (and asyncio.to_thread workers) attach their
+spans to the right request without passing ids around.
+
+Every span can carry a `stage` - analysis, routing, queueing, model_call or
+post_processing - and finished traces report time per stage. Finished traces
+are kept in a bounded in-memory buffer for /api/debug/traces. When
+TRACE_EXPORT_FILE is set they are also appended to that JSONL file (one trace
+per line) by a background writer thread, so serialization and file I/O stay
+off the request path; the file is rotated by size.
+
+    tracer = get_tracer()
+    with tracer.start_trace("orchestra.process_request", request_id=request_id):
+        with tracer.span("conductor.analyze_and_route", stage="routing"):
+            ...
+
+Spans opened while no trace is active are no-ops, so library code can be
+instrumented unconditionally - either with tracer.span() or @traced(name, stage).
+"""
+
+import os
+import json
+import time
+import uuid
+import queue
+import atexit
+import inspect
+import functools
+import threading
+import contextvars
+import logging
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Iterator, Callable
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("analysis", "routing", "queueing", "model_call", "post_processing")
+
+
+class Span:
+    """One timed operation inside a trace"""
+
+    __slots__ = ('name', 'span_id', 'parent_id', 'stage', 'start_ns', 'end_ns', 'attributes', 'status')
+
+    def __init__(self, name: str, parent_id: Optional[str], stage: Optional[str],
+                 attributes: Dict[str, Any], start_ns: Optional[int] = None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.stage = stage
+        self.start_ns = start_ns if start_ns is not None else time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.status = "ok"
+
+    @property
+    def duration_ms(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+        return (end - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = "error"
+        self.attributes['error.type'] = type(error).__name__
+        self.attributes['error.message'] = str(error)[:500]
+
+
+class _NullSpan:
+    """Returned when tracing is off or no trace is active"""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def record_error(self, error: BaseException) -> None:
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Trace:
+    """All spans recorded for one request"""
+
+    def __init__(self, name: str, request_id: str, attributes: Dict[str, Any]):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id
+        self.started_at = time.time()
+        self.root = Span(name, None, None, attributes)
+        self.spans: List[Span] = [self.root]
+        self._lock = threading.Lock()
+
+    def add(self, span: Span) -> None:
+        # to_thread workers share the trace, so appends can race
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def duration_ms(self) -> float:
+        return self.root.duration_ms
+
+    def stage_breakdown(self) -> Dict[str, float]:
+        """
+        Milliseconds per stage. A span nested inside another span of the same
+        stage (e.g. the provider call inside the orchestra's model call) is
+        not counted twice; concurrent sibling spans (hedged or fanned-out
+        calls) are summed, so a stage can exceed the wall-clock duration.
+        """
+        by_id = {span.span_id: span for span in self.spans}
+        totals: Dict[str, float] = {}
+        for span in self.spans:
+            if not span.stage:
+                continue
+            parent = by_id.get(span.parent_id)
+            nested = False
+            while parent is not None:
+                if parent.stage == span.stage:
+                    nested = True
+                    break
+                parent = by_id.get(parent.parent_id)
+            if not nested:
+                totals[span.stage] = totals.get(span.stage, 0.0) + span.duration_ms
+        return {stage: round(ms, 2) for stage, ms in totals.items()}
+
+    def to_dict(self, include_spans: bool = True) -> Dict[str, Any]:
+        root_start = self.root.start_ns
+        data = {
+            'trace_id': self.trace_id,
+            'request_id': self.request_id,
+            'name': self.root.name,
+            'status': self.root.status,
+            'started_at': datetime.fromtimestamp(self.started_at).isoformat(),
+            'duration_ms': round(self.duration_ms, 2),
+            'stages': self.stage_breakdown(),
+            'attributes': self.root.attributes
+        }
+        if include_spans:
+            data['spans'] = [{
+                'name': span.name,
+                'span_id': span.span_id,
+                'parent_id': span.parent_id,
+                'stage': span.stage,
+                'offset_ms': round((span.start_ns - root_start) / 1e6, 2),
+                'duration_ms': round(span.duration_ms, 2),
+                'status': span.status,
+                'attributes': span.attributes
+            } for span in sorted(self.spans, key=lambda s: s.start_ns)]
+        return data
+
+
+class JsonlTraceExporter:
+    """
+    Appends finished traces to a JSONL file from a background thread
+
+    export() only enqueues. When the queue (TRACE_EXPORT_QUEUE_SIZE) is full
+    the trace is dropped and counted rather than blocking the request; it is
+    still in the tracer's in-memory buffer. Queued traces are written at
+    interpreter exit.
+
+    Once the file reaches TRACE_EXPORT_MAX_BYTES it is renamed to `path.1`
+    (older files shift to `.2` and so on) and a new one is started; only
+    TRACE_EXPORT_BACKUPS rotated files are kept, so disk use stays bounded.
+    """
+
+    def __init__(self, path: str, queue_size: Optional[int] = None, batch_size: int = 100,
+                 max_bytes: Optional[int] = None, backups: Optional[int] = None):
+        self.path = path
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(os.getenv('TRACE_EXPORT_MAX_BYTES', str(50 * 1024 * 1024)))
+        self.backups = backups if backups is not None else int(os.getenv('TRACE_EXPORT_BACKUPS', '3'))
+        queue_size = queue_size or int(os.getenv('TRACE_EXPORT_QUEUE_SIZE', '1000'))
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self.exported = 0
+        self.errors = 0
+        self.dropped = 0
+        self.rotations = 0
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+        self._writer = threading.Thread(target=self._write_loop, name='trace-exporter', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    def export(self, trace: Trace) -> None:
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self) -> None:
+        while True:
+            trace = self._queue.get()
+            if trace is None:
+                break
+            batch = [trace]
+            closing = False
+            while len(batch) < self.batch_size:
+                try:
+                    trace = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if trace is None:
+                    closing = True
+                    break
+                batch.append(trace)
+            self._write(batch)
+            if closing:
+                break
+
+    def _write(self, batch: List[Trace]) -> None:
+        lines = [json.dumps(trace.to_dict(), ensure_ascii=False, default=str, separators=(',', ':'))
+                 for trace in batch]
+        data = '\n'.join(lines) + '\n'
+        try:
+            self._rotate_if_full(len(data.encode('utf-8')))
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(data)
+            self.exported += len(batch)
+        except OSError as e:
+            self.errors += len(batch)
+            logger.warning(f"Failed to export {len(batch)} traces to {self.path}: {e}")
+
+    def _rotate_if_full(self, incoming: int) -> None:
+        """Start a new file if appending `incoming` bytes would pass max_bytes"""
+        if not self.max_bytes:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if not size or size + incoming <= self.max_bytes:
+            return
+
+        if self.backups > 0:
+            for n in range(self.backups - 1, 0, -1):
+                older = f"{self.path}.{n}"
+                if os.path.exists(older):
+                    os.replace(older, f"{self.path}.{n + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self.rotations += 1
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Write what is queued and stop the writer"""
+        if not self._writer.is_alive():
+            return
+        self._queue.put(None)
+        self._writer.join(timeout)
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar('current_trace', default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """🔭 Creates traces and spans and keeps the most recent finished traces"""
+
+    def __init__(self,
+                 enabled: Optional[bool] = None,
+                 buffer_size: Optional[int] = None,
+                 export_path: Optional[str] = None):
+        self.enabled = enabled if enabled is not None else \
+            os.getenv('TRACING_ENABLED', 'true').lower() == 'true'
+        self.buffer_size = buffer_size or int(os.getenv('TRACE_BUFFER_SIZE', '500'))
+        self.recent: deque = deque(maxlen=self.buffer_size)
+        self._lock = threading.Lock()
+
+        if export_path is None:
+            # File export is opt-in
+            export_path = os.getenv('TRACE_EXPORT_FILE')
+        self.exporter = JsonlTraceExporter(export_path) if self.enabled and export_path else None
+
+        self.stats = {'traces': 0, 'spans': 0, 'errors': 0}
+
+    @contextmanager
+    def start_trace(self, name: str, request_id: Optional[str] = None, **attributes) -> Iterator[Any]:
+        """
+        Start a trace for one request. Inside an existing trace this opens a
+        child span instead, so entry points can nest (agent -> orchestra).
+        """
+        if not self.enabled:
+            yield NULL_SPAN
+            return
+        if _current_trace.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = Trace(name, request_id or str(uuid.uuid4()), attributes)
+        trace_token = _current_trace.set(trace)
+        span_token = _current_span.set(trace.root)
+        try:
+            yield trace.root
+        except BaseException as e:
+            trace.root.record_error(e)
+            raise
+        finally:
+            trace.root.end_ns = time.perf_counter_ns()
+            _current_span.reset(span_token)
+            _current_trace.reset(trace_token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, stage: Optional[str] = None, **attributes) -> Iterator[Any]:
+        trace = _current_trace.get()
+        if trace is None:
+            yield NULL_SPAN
+            return
+
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent else None, stage, attributes)
+        trace.add(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            span.end_ns = time.perf_counter_ns()
+            _current_span.reset(token)
+
+    def record_span(self, name: str, start_ns: int, end_ns: int,
+                    stage: Optional[str] = None, **attributes) -> None:
+        """Add an already-measured interval (perf_counter_ns) under the current span"""
+        trace = _current_trace.get()
+        if trace is None:
+            return
+        parent = _current_span.get()
+        span = Span(name, parent.span_id if parent else None, stage, attributes, start_ns=start_ns)
+        span.end_ns = end_ns
+        trace.add(span)
+
+    def _finish(self, trace: Trace) -> None:
+        with self._lock:
+            self.recent.append(trace)
+            self.stats['traces'] += 1
+            self.stats['spans'] += len(trace.spans)
+            if trace.root.status == 'error':
+                self.stats['errors'] += 1
+        if self.exporter:
+            self.exporter.export(trace)
+
+    def slowest(self, limit: int = 20, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Slowest recent traces with their per-stage breakdown"""
+        with self._lock:
+            traces = [t for t in self.recent if name is None or t.root.name == name]
+        traces.sort(key=lambda t: t.duration_ms, reverse=True)
+        return [trace.to_dict(include_spans=False) for trace in traces[:limit]]
+
+    def get_trace(self, trace_or_request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for trace in reversed(self.recent):
+                if trace_or_request_id in (trace.trace_id, trace.request_id):
+                    return trace.to_dict()
+        return None
+
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        """Average and max milliseconds per stage over the buffered traces"""
+        with self._lock:
+            breakdowns = [t.stage_breakdown() for t in self.recent]
+        summary = {}
+        for stage in STAGES:
+            values = [b[stage] for b in breakdowns if stage in b]
+            if values:
+                summary[stage] = {
+                    'count': len(values),
+                    'avg_ms': round(sum(values) / len(values), 2),
+                    'max_ms': round(max(values), 2)
+                }
+        return summary
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'enabled': self.enabled,
+            'buffered': len(self.recent),
+            'buffer_size': self.buffer_size,
+            'export_file': self.exporter.path if self.exporter else None,
+            'exported': self.exporter.exported if self.exporter else 0,
+            'export_pending': self.exporter.pending if self.exporter else 0,
+            'export_dropped': self.exporter.dropped if self.exporter else 0,
+            'export_errors': self.exporter.errors if self.exporter else 0,
+            'export_rotations': self.exporter.rotations if self.exporter else 0
+        }
+
+
+def traced(name: str, stage: Optional[str] = None) -> Callable:
+    """Decorator: run the (sync or async) function inside a span"""
+
+    def decorator(fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().span(name, stage=stage):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with get_tracer().span(name, stage=stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def current_request_id() -> Optional[str]:
+    """Request id of the active trace, for log lines and outgoing metadata"""
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Process-wide tracer shared by every instrumented component"""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = Tracer()
+        return _tracer
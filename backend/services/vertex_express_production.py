@@ -21,8 +21,60 @@ from google.auth.transport.requests import Request
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
 
+from .prompt_compiler import PromptPrefixCache, CompiledPrompt, estimate_tokens
+from .provider_adapters import gemini_client_options
+from .metrics_registry import get_metrics_registry
+from .single_flight import get_single_flight
+
 logger = logging.getLogger(__name__)
 
+# Mama Bear personality configurations
+EXPRESS_PERSONALITIES = {
+    "scout_commander": {
+        "emoji": "🎯",
+        "style": "Strategic and action-oriented",
+        "focus": "Clear guidance and next steps"
+    },
+    "research_specialist": {
+        "emoji": "📚",
+        "style": "Analytical and thorough",
+        "focus": "Detailed research and insights"
+    },
+    "efficiency_bear": {
+        "emoji": "⚡",
+        "style": "Quick and optimized",
+        "focus": "Fast, actionable solutions"
+    },
+    "creative_bear": {
+        "emoji": "🎨",
+        "style": "Innovative and inspiring",
+        "focus": "Creative solutions and ideas"
+    },
+    "debugging_detective": {
+        "emoji": "🔍",
+        "style": "Methodical problem-solver",
+        "focus": "Error analysis and solutions"
+    },
+    "learning_bear": {
+        "emoji": "🧠",
+        "style": "Patient and educational",
+        "focus": "Teaching and explanation"
+    },
+    "code_review_bear": {
+        "emoji": "📝",
+        "style": "Detail-oriented reviewer",
+        "focus": "Code quality and best practices"
+    }
+}
+
+# Speed tier optimizations
+EXPRESS_TIER_INSTRUCTIONS = {
+    "ultra_fast": "Provide a concise, immediately helpful response. Prioritize speed and clarity.",
+    "fast": "Provide a balanced response with key details. Be helpful and efficient.",
+    "standard": "Provide a comprehensive response with detailed guidance.",
+    "research": "Provide an in-depth, thoroughly researched response with examples."
+}
+
 class VertexExpressModeIntegration:
     """
     ⚡ Production-ready Vertex AI Express Mode Integration with Service Account Auth
@@ -65,15 +117,27 @@ class VertexExpressModeIntegration:
             "imagen-3-fast": "imagen-3.0-fast-generate-001"
         }
         
+        # Personality preambles are rendered once per variant + speed tier
+        self.prompt_cache = PromptPrefixCache()
+        
         # Performance tracking
         self.metrics = {
             "total_requests": 0,
             "express_requests": 0,
+            "successful_requests": 0,
+            "failed_requests": 0,
             "average_latency_ms": 0,
             "cost_savings": 0.0,
-            "success_rate": 0.95
+            "success_rate": 0.0,
+            "prompt_tokens_saved": 0
         }
         
+        self.metrics_registry = get_metrics_registry()
+        self.metrics_registry.register_collector("express_prompt_cache", self._collect_metrics)
+        
+        # Concurrent connectivity probes share one test request
+        self.single_flight = get_single_flight("vertex_express")
+        
         self._initialize_express_mode()
     
     def _initialize_express_mode(self):
@@ -97,7 +161,7 @@ class VertexExpressModeIntegration:
                 logger.warning("⚠️ No service account files found. Trying API key fallback...")
                 if self.api_key:
                     # Configure Google AI as fallback
-                    genai.configure(api_key=self.api_key)
+                    genai.configure(api_key=self.api_key, **gemini_client_options())
                     logger.info("📱 Using Google AI API key as fallback")
                 else:
                     logger.error("❌ No authentication method available")
@@ -134,7 +198,7 @@ class VertexExpressModeIntegration:
                     logger.warning(f"⚠️ Vertex AI test failed, trying Google AI fallback: {test_e}")
                     # Fallback to Google AI
                     if self.api_key:
-                        genai.configure(api_key=self.api_key)
+                        genai.configure(api_key=self.api_key, **gemini_client_options())
                         self.express_enabled = True
                         logger.info("📱 Using Google AI as fallback")
             
@@ -145,7 +209,7 @@ class VertexExpressModeIntegration:
             # Try API key fallback
             if self.api_key:
                 try:
-                    genai.configure(api_key=self.api_key)
+                    genai.configure(api_key=self.api_key, **gemini_client_options())
                     self.express_enabled = True
                     logger.info("📱 Using Google AI API key as final fallback")
                 except Exception as api_e:
@@ -153,7 +217,9 @@ class VertexExpressModeIntegration:
 
     async def test_connectivity(self) -> Dict[str, Any]:
         """Test Express Mode connectivity with service account authentication"""
-        
+        return await self.single_flight.run("test_connectivity", self._test_connectivity)
+    
+    async def _test_connectivity(self) -> Dict[str, Any]:
         if not self.express_enabled:
             return {
                 "success": False,
@@ -264,7 +330,8 @@ class VertexExpressModeIntegration:
                 model_name = self.express_models[speed_tier]
             
             # Build Express Mode prompt
-            express_prompt = self._build_express_prompt(message, mama_bear_variant, speed_tier, context)
+            compiled_prompt = self._compile_express_prompt(message, mama_bear_variant, speed_tier, context)
+            express_prompt = compiled_prompt.text
             
             # Generation config optimized for Express Mode
             generation_config = self._get_express_generation_config(speed_tier)
@@ -281,46 +348,67 @@ class VertexExpressModeIntegration:
                     
                     # Calculate performance metrics
                     latency_ms = (time.time() - start_time) * 1000
-                    self._update_metrics(latency_ms, speed_tier)
+                    self._update_metrics(latency_ms, speed_tier, model_name, "vertex_ai")
                     self.metrics["express_requests"] += 1
                     
-                    return self._build_success_response(response.text, model_name, speed_tier, mama_bear_variant, latency_ms, "vertex_ai")
+                    return self._build_success_response(response.text, model_name, speed_tier, mama_bear_variant, latency_ms, "vertex_ai",
+                                                   self._prompt_token_report(compiled_prompt, response))
                     
                 except Exception as vertex_e:
+                    self.metrics_registry.model_requests.labels("vertex_ai", model_name, "error").inc()
                     logger.warning(f"⚠️ Vertex AI failed, trying Google AI fallback: {vertex_e}")
                     # Fall through to Google AI
             
             # Google AI fallback
             if self.api_key:
                 model = genai.GenerativeModel(model_name)
-                response = await asyncio.to_thread(
-                    model.generate_content,
-                    express_prompt,
-                    generation_config=self._get_genai_config(speed_tier),
-                    safety_settings={
-                        HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                        HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                        HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                        HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
-                    }
-                )
+                try:
+                    response = await asyncio.to_thread(
+                        model.generate_content,
+                        express_prompt,
+                        generation_config=self._get_genai_config(speed_tier),
+                        safety_settings={
+                            HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                            HarmCategory.HARM_CATEGORY_HATE_SPEECH: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                            HarmCategory.HARM_CATEGORY_SEXUALLY_EXPLICIT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                            HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
+                        }
+                    )
+                except Exception:
+                    self.metrics_registry.model_requests.labels("google_ai", model_name, "error").inc()
+                    raise
                 
                 # Calculate performance metrics
                 latency_ms = (time.time() - start_time) * 1000
-                self._update_metrics(latency_ms, speed_tier)
+                self._update_metrics(latency_ms, speed_tier, model_name, "google_ai")
                 self.metrics["express_requests"] += 1
                 
-                return self._build_success_response(response.text, model_name, speed_tier, mama_bear_variant, latency_ms, "google_ai")
+                return self._build_success_response(response.text, model_name, speed_tier, mama_bear_variant, latency_ms, "google_ai",
+                                                   self._prompt_token_report(compiled_prompt, response))
             
             # If all else fails, return fallback
+            self._record_failure()
             return await self._fallback_response(message, user_id, mama_bear_variant, error="No valid authentication method")
             
         except Exception as e:
             logger.error(f"Express Mode request failed: {e}")
+            self._record_failure()
             return await self._fallback_response(message, user_id, mama_bear_variant, error=str(e))
 
+    def _prompt_token_report(self, prompt: CompiledPrompt, response: Any) -> Dict[str, Any]:
+        """Per-request prompt token breakdown; the stable prefix is what implicit caching can reuse"""
+        usage = getattr(response, 'usage_metadata', None)
+        cached_tokens = getattr(usage, 'cached_content_token_count', 0) or 0
+        self.metrics["prompt_tokens_saved"] += cached_tokens
+        return {
+            "prefix_tokens": prompt.prefix_tokens,
+            "request_tokens": estimate_tokens(prompt.suffix),
+            "tokens_saved": cached_tokens
+        }
+
     def _build_success_response(self, response_text: str, model_name: str, speed_tier: str, 
-                              mama_bear_variant: str, latency_ms: float, service_used: str) -> Dict[str, Any]:
+                              mama_bear_variant: str, latency_ms: float, service_used: str,
+                              prompt_tokens: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Build a successful response object"""
         
         cost_savings = 75.0 if speed_tier in ["ultra_fast", "fast"] else 60.0
@@ -340,6 +428,7 @@ class VertexExpressModeIntegration:
                 "cost_tier": self._get_cost_tier(speed_tier),
                 "optimization_level": "express_mode"
             },
+            "prompt_tokens": prompt_tokens,
             "timestamp": datetime.now().isoformat()
         }
 
@@ -409,72 +498,30 @@ class VertexExpressModeIntegration:
 
     def _build_express_prompt(self, message: str, variant: str, speed_tier: str, context: Dict[str, Any] = None) -> str:
         """Build optimized prompt for Express Mode"""
+        return self._compile_express_prompt(message, variant, speed_tier, context).text
+    
+    def _compile_express_prompt(self, message: str, variant: str, speed_tier: str,
+                                context: Dict[str, Any] = None) -> CompiledPrompt:
+        """Personality preamble (rendered once per variant + tier) + the user request"""
+        return self.prompt_cache.compile(
+            ("express", variant, speed_tier),
+            lambda: self._render_express_preamble(variant, speed_tier),
+            f"USER REQUEST: {message}\n\nRESPONSE:"
+        )
+    
+    def _render_express_preamble(self, variant: str, speed_tier: str) -> str:
+        """The request-independent part of an Express Mode prompt"""
         
-        # Mama Bear personality configurations
-        personalities = {
-            "scout_commander": {
-                "emoji": "🎯",
-                "style": "Strategic and action-oriented",
-                "focus": "Clear guidance and next steps"
-            },
-            "research_specialist": {
-                "emoji": "📚",
-                "style": "Analytical and thorough",
-                "focus": "Detailed research and insights"
-            },
-            "efficiency_bear": {
-                "emoji": "⚡",
-                "style": "Quick and optimized",
-                "focus": "Fast, actionable solutions"
-            },
-            "creative_bear": {
-                "emoji": "🎨",
-                "style": "Innovative and inspiring",
-                "focus": "Creative solutions and ideas"
-            },
-            "debugging_detective": {
-                "emoji": "🔍",
-                "style": "Methodical problem-solver",
-                "focus": "Error analysis and solutions"
-            },
-            "learning_bear": {
-                "emoji": "🧠",
-                "style": "Patient and educational",
-                "focus": "Teaching and explanation"
-            },
-            "code_review_bear": {
-                "emoji": "📝",
-                "style": "Detail-oriented reviewer",
-                "focus": "Code quality and best practices"
-            }
-        }
-        
-        personality = personalities.get(variant, personalities["scout_commander"])
-        
-        # Speed tier optimizations
-        if speed_tier == "ultra_fast":
-            instruction = "Provide a concise, immediately helpful response. Prioritize speed and clarity."
-        elif speed_tier == "fast":
-            instruction = "Provide a balanced response with key details. Be helpful and efficient."
-        elif speed_tier == "standard":
-            instruction = "Provide a comprehensive response with detailed guidance."
-        else:  # research
-            instruction = "Provide an in-depth, thoroughly researched response with examples."
+        personality = EXPRESS_PERSONALITIES.get(variant, EXPRESS_PERSONALITIES["scout_commander"])
+        instruction = EXPRESS_TIER_INSTRUCTIONS.get(speed_tier, EXPRESS_TIER_INSTRUCTIONS["research"])
         
-        # Build the prompt
-        prompt = f"""⚡ EXPRESS MODE - {personality['emoji']} Mama Bear {variant.replace('_', ' ').title()}
+        return f"""⚡ EXPRESS MODE - {personality['emoji']} Mama Bear {variant.replace('_', ' ').title()}
 
 PERSONALITY: {personality['style']}
 FOCUS: {personality['focus']}
 OPTIMIZATION: {instruction}
 
-USER REQUEST: {message}
-
-CONTEXT: Podplay Sanctuary - A neurodivergent-friendly development environment where brilliant minds create amazing things. Be caring, technically excellent, and genuinely helpful.
-
-RESPONSE:"""
-
-        return prompt
+CONTEXT: Podplay Sanctuary - A neurodivergent-friendly development environment where brilliant minds create amazing things. Be caring, technically excellent, and genuinely helpful."""
     
     def _analyze_message_for_speed_tier(self, message: str) -> str:
         """Analyze message to determine optimal speed tier"""
@@ -546,20 +593,38 @@ RESPONSE:"""
             "timestamp": datetime.now().isoformat()
         }
     
-    def _update_metrics(self, latency_ms: float, speed_tier: str):
-        """Update performance metrics"""
+    def _update_metrics(self, latency_ms: float, speed_tier: str, model_name: str, provider: str):
+        """Update performance metrics for a successful request"""
         
-        # Update average latency
-        total = self.metrics["total_requests"]
+        self.metrics["successful_requests"] += 1
+        
+        # Update average latency over successful requests only
+        successes = self.metrics["successful_requests"]
         current_avg = self.metrics["average_latency_ms"]
-        self.metrics["average_latency_ms"] = ((current_avg * (total - 1)) + latency_ms) / total
+        self.metrics["average_latency_ms"] = ((current_avg * (successes - 1)) + latency_ms) / successes
         
         # Calculate cost savings (Express Mode is ~75% cheaper)
         self.metrics["cost_savings"] = 75.0
         
-        # Update success rate (simplified)
-        if latency_ms < 2000:  # Reasonable response time
-            self.metrics["success_rate"] = min(self.metrics["success_rate"] + 0.001, 1.0)
+        self._update_success_rate()
+        
+        self.metrics_registry.model_latency.labels(provider, model_name, speed_tier).observe(latency_ms / 1000)
+        self.metrics_registry.model_requests.labels(provider, model_name, "success").inc()
+        self.metrics_registry.requests.labels("vertex_express", "success").inc()
+    
+    def _record_failure(self):
+        """Count a request that ended in the fallback response"""
+        self.metrics["failed_requests"] += 1
+        self._update_success_rate()
+        self.metrics_registry.requests.labels("vertex_express", "failure").inc()
+    
+    def _update_success_rate(self):
+        completed = self.metrics["successful_requests"] + self.metrics["failed_requests"]
+        self.metrics["success_rate"] = self.metrics["successful_requests"] / completed if completed else 0.0
+    
+    def _collect_metrics(self):
+        stats = self.prompt_cache.get_stats()
+        self.metrics_registry.observe_cache("express_prompt_prefix", stats['hits'], stats['misses'])
 
     def get_performance_report(self) -> Dict[str, Any]:
         """Get comprehensive performance report"""
@@ -581,8 +646,12 @@ RESPONSE:"""
                 "total_requests": self.metrics["total_requests"],
                 "express_usage_percent": round(express_usage, 1),
                 "average_latency_ms": round(self.metrics["average_latency_ms"], 1),
+                "successful_requests": self.metrics["successful_requests"],
+                "failed_requests": self.metrics["failed_requests"],
                 "success_rate": round(self.metrics["success_rate"], 3),
-                "cost_savings_percent": self.metrics["cost_savings"]
+                "cost_savings_percent": self.metrics["cost_savings"],
+                "prompt_tokens_saved": self.metrics["prompt_tokens_saved"],
+                "prompt_prefix_cache": self.prompt_cache.get_stats()
             },
             "speed_tiers": {
                 "ultra_fast": "< 200ms - Quick responses",
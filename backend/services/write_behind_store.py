@@ -0,0 +1,223 @@
+# backend/services/write_behind_store.py
+"""
+💾 Write-Behind Store - Coalesced, batched persistence for JSON records
+Request threads hand over a record snapshot and return at once; a background
+flusher writes everything that changed since the last flush in a single
+SQLite transaction, so:
+
+- rapid updates to the same record coalesce (only the latest is written)
+- a batch is all-or-nothing; a crash never leaves a half-written record
+- loading at startup is one indexed query instead of one file per record
+
+Records are dicts stored as compact JSON, with a few fields copied into
+indexed columns for querying. Updates replace rows in place, so the table
+never accumulates stale versions and needs no separate compaction pass.
+Each row keeps the time its record was first put, and loads return records
+in that order rather than in the order they were last flushed.
+
+Durability: a record changed within the last flush interval can be lost if
+the process is killed; flush() runs on close() and at interpreter exit.
+"""
+
+import os
+import json
+import time
+import atexit
+import sqlite3
+import threading
+import logging
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+from .metrics_registry import get_metrics_registry
+
+logger = logging.getLogger(__name__)
+
+_DELETED = object()
+
+
+class WriteBehindStore:
+    """💾 SQLite table of JSON records behind an in-memory dirty map"""
+
+    def __init__(self, db_path: str, table: str, indexed: Sequence[str] = (),
+                 flush_interval: Optional[float] = None, max_batch: Optional[int] = None):
+        self.db_path = db_path
+        self.table = table
+        self.indexed = tuple(indexed)
+        self.flush_interval = flush_interval if flush_interval is not None else \
+            float(os.getenv('WRITE_BEHIND_FLUSH_SECONDS', '0.5'))
+        self.max_batch = max_batch or int(os.getenv('WRITE_BEHIND_MAX_BATCH', '500'))
+
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._db_lock = threading.Lock()
+        self._dirty: Dict[str, Tuple[Any, float]] = {}   # id -> (record, first put at)
+        self._dirty_lock = threading.Lock()
+        self._flush_lock = threading.Lock()   # batches commit in the order they were taken
+        self._wake = threading.Event()
+        self._closed = False
+        self.stats = {'updates': 0, 'coalesced': 0, 'rows_written': 0, 'flushes': 0, 'flush_errors': 0}
+
+        columns = ''.join(f", {column} TEXT" for column in self.indexed)
+        with self._db_lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} (id TEXT PRIMARY KEY, data TEXT NOT NULL, "
+                f"updated_at REAL NOT NULL, created_at REAL{columns})")
+            existing = {row[1] for row in self._conn.execute(f"PRAGMA table_info({table})")}
+            if 'created_at' not in existing:
+                # Tables from before creation times were kept: the last write is the best guess
+                self._conn.execute(f"ALTER TABLE {table} ADD COLUMN created_at REAL")
+                self._conn.execute(f"UPDATE {table} SET created_at = updated_at")
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_created_at ON {table} (created_at)")
+            for column in self.indexed:
+                self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+
+        metrics = get_metrics_registry()
+        self.rows_metric = metrics.counter(
+            'mama_bear_write_behind_rows_total', "Rows written by write-behind flushes", ('store',))
+        self.coalesced_metric = metrics.counter(
+            'mama_bear_write_behind_coalesced_total', "Updates superseded before they were flushed", ('store',))
+        self.flush_metric = metrics.histogram(
+            'mama_bear_write_behind_flush_seconds', "Write-behind flush transaction time", ('store',))
+        self.pending_metric = metrics.gauge(
+            'mama_bear_write_behind_pending', "Records changed but not yet flushed", ('store',))
+        metrics.register_collector(f"write_behind_{table}",
+                                   lambda: self.pending_metric.labels(store=table).set(len(self._dirty)))
+
+        self._flusher = threading.Thread(target=self._flush_loop, name=f'write-behind-{table}', daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # -- writes ---------------------------------------------------------------
+
+    def put(self, record_id: str, record: Dict[str, Any]) -> None:
+        """Queue `record` (a snapshot the caller won't mutate) to be written"""
+        self._mark(record_id, record)
+
+    def delete(self, record_id: str) -> None:
+        self._mark(record_id, _DELETED)
+
+    def _mark(self, record_id: str, value: Any) -> None:
+        if self._closed:
+            raise RuntimeError(f"{self.table} store is closed")
+        with self._dirty_lock:
+            self.stats['updates'] += 1
+            pending = self._dirty.get(record_id)
+            if pending is not None:
+                self.stats['coalesced'] += 1
+                self.coalesced_metric.labels(store=self.table).inc()
+            self._dirty[record_id] = (value, pending[1] if pending is not None else time.time())
+            full = len(self._dirty) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write every pending change in one transaction; returns rows written"""
+        with self._flush_lock:
+            return self._flush_batch()
+
+    def _flush_batch(self) -> int:
+        with self._dirty_lock:
+            if not self._dirty:
+                return 0
+            batch, self._dirty = self._dirty, {}
+
+        columns = ''.join(f", {column}" for column in self.indexed)
+        placeholders = ', ?' * (4 + len(self.indexed))
+        # An existing row keeps its created_at
+        updates = ''.join(f", {column} = excluded.{column}" for column in ('data', 'updated_at', *self.indexed))
+        start = time.perf_counter()
+        try:
+            now = time.time()
+            upserts, deletes = [], []
+            for record_id, (record, created_at) in batch.items():
+                if record is _DELETED:
+                    deletes.append((record_id,))
+                else:
+                    upserts.append((record_id, json.dumps(record, separators=(',', ':'), default=str), now,
+                                    created_at,
+                                    *(self._column_value(record.get(column)) for column in self.indexed)))
+
+            with self._db_lock:
+                self._conn.execute("BEGIN")
+                try:
+                    if upserts:
+                        self._conn.executemany(
+                            f"INSERT INTO {self.table} (id, data, updated_at, created_at{columns}) "
+                            f"VALUES ({placeholders[2:]}) ON CONFLICT(id) DO UPDATE SET {updates[2:]}",
+                            upserts)
+                    if deletes:
+                        self._conn.executemany(f"DELETE FROM {self.table} WHERE id = ?", deletes)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+        except Exception as e:
+            # Put the batch back unless a newer version arrived meanwhile
+            with self._dirty_lock:
+                for record_id, (record, created_at) in batch.items():
+                    newer = self._dirty.get(record_id)
+                    self._dirty[record_id] = (record if newer is None else newer[0], created_at)
+            self.stats['flush_errors'] += 1
+            logger.error("❌ Write-behind flush of %d %s records failed: %s", len(batch), self.table, e)
+            return 0
+
+        self.stats['flushes'] += 1
+        self.stats['rows_written'] += len(batch)
+        self.rows_metric.labels(store=self.table).inc(len(batch))
+        self.flush_metric.labels(store=self.table).observe(time.perf_counter() - start)
+        return len(batch)
+
+    def _flush_loop(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                # Keep flushing; a dead flusher would silently stop all writes
+                logger.error("❌ Write-behind flusher for %s hit an error: %s", self.table, e)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._flusher.join(timeout=5)
+        self.flush()
+
+    # -- reads ----------------------------------------------------------------
+
+    def load(self, **where: Any) -> List[Dict[str, Any]]:
+        """
+        Records matching indexed-column filters (a value or a list of values),
+        in the order they were first put. Pending changes are flushed first so
+        reads see them.
+        """
+        self.flush()
+        clauses, params = [], []
+        for column, value in where.items():
+            if column not in self.indexed:
+                raise ValueError(f"{column} is not an indexed column of {self.table}")
+            values = value if isinstance(value, (list, tuple, set)) else [value]
+            clauses.append(f"{column} IN ({', '.join('?' for _ in values)})")
+            params.extend(self._column_value(v) for v in values)
+        sql = f"SELECT data FROM {self.table}"
+        if clauses:
+            sql += f" WHERE {' AND '.join(clauses)}"
+        with self._db_lock:
+            rows = self._conn.execute(sql + " ORDER BY created_at, rowid", params).fetchall()
+        return [json.loads(data) for (data,) in rows]
+
+    def count(self) -> int:
+        self.flush()
+        with self._db_lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {**self.stats, 'pending': len(self._dirty), 'flush_interval_seconds': self.flush_interval}
+
+    @staticmethod
+    def _column_value(value: Any) -> Optional[str]:
+        return None if value is None else str(value)
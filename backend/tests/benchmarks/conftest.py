@@ -0,0 +1,179 @@
+"""
+⏱️ Hot-path micro-benchmark harness
+
+The `bench` fixture times a callable (sync or async) over several rounds and
+compares the median per-call cost against tests/benchmarks/baselines.json.
+Costs are stored relative to a fixed pure-Python calibration workload
+measured at session start, so a baseline saved on one machine is still
+meaningful on another.
+
+Benchmarks carry the `benchmark` marker and are left out of the default
+run (pytest.ini); select them explicitly:
+
+    pytest tests/benchmarks -m benchmark                      # compare, fail on regressions
+    pytest tests/benchmarks -m benchmark --bench-save         # record new baselines
+    pytest tests/benchmarks -m benchmark --bench-threshold 0.5
+"""
+
+import os
+import re
+import gc
+import sys
+import json
+import time
+import asyncio
+import inspect
+import statistics
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent.parent
+sys.path.append(str(backend_dir))
+
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines.json')
+DEFAULT_THRESHOLD = float(os.getenv('BENCH_REGRESSION_THRESHOLD', '0.25'))
+
+_WORD = re.compile(r"[a-z]+")
+
+
+def _calibration_workload() -> int:
+    """Fixed mix of the operations the hot paths spend time on: regex, dicts, sorting, strings"""
+    text = "debug the quick analysis and create a fast summary of the research " * 20
+    counts: Dict[str, int] = {}
+    for word in _WORD.findall(text):
+        counts[word] = counts.get(word, 0) + 1
+    ranked = sorted(counts.items(), key=lambda item: (-item[1], item[0]))
+    return len(ranked) + sum(len(text.lower().split()) for _ in range(5))
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('benchmarks')
+    group.addoption('--bench-save', action='store_true', default=False,
+                    help="Write measured hot-path costs to tests/benchmarks/baselines.json")
+    group.addoption('--bench-threshold', type=float, default=DEFAULT_THRESHOLD,
+                    help="Allowed slowdown against the baseline before failing (0.25 = 25%%)")
+    group.addoption('--bench-rounds', type=int, default=7, help="Timed rounds per benchmark")
+
+
+class BenchmarkRunner:
+    """Times hot paths and checks them against saved baselines"""
+
+    def __init__(self, config):
+        self.save = config.getoption('--bench-save')
+        self.threshold = config.getoption('--bench-threshold')
+        self.rounds = config.getoption('--bench-rounds')
+        self.baselines: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(BASELINE_FILE):
+            with open(BASELINE_FILE) as f:
+                self.baselines = json.load(f).get('benchmarks', {})
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.calibration_ns = self._measure(_calibration_workload, inner=200, rounds=9)
+
+    def _measure(self, fn: Callable[[], Any], inner: int, rounds: int) -> float:
+        """Median nanoseconds per call over `rounds` batches of `inner` calls"""
+        if inspect.iscoroutinefunction(fn):
+            loop = asyncio.new_event_loop()
+
+            async def _batch():
+                for _ in range(inner):
+                    await fn()
+
+            def run_batch():
+                loop.run_until_complete(_batch())
+        else:
+            def run_batch():
+                for _ in range(inner):
+                    fn()
+
+        try:
+            run_batch()  # warm caches and lazy imports
+            samples: List[float] = []
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                for _ in range(rounds):
+                    start = time.perf_counter_ns()
+                    run_batch()
+                    samples.append((time.perf_counter_ns() - start) / inner)
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        finally:
+            if inspect.iscoroutinefunction(fn):
+                loop.close()
+        return statistics.median(samples)
+
+    def _result(self, name: str, fn: Callable[[], Any], inner: int) -> Dict[str, Any]:
+        per_call_ns = self._measure(fn, inner, self.rounds)
+        result = {
+            'per_call_us': round(per_call_ns / 1000, 3),
+            'relative_cost': round(per_call_ns / self.calibration_ns, 4)
+        }
+        baseline = self.baselines.get(name)
+        if baseline:
+            result['baseline_relative_cost'] = baseline['relative_cost']
+            result['change'] = round(result['relative_cost'] / baseline['relative_cost'] - 1, 4)
+        return result
+
+    def __call__(self, name: str, fn: Callable[[], Any], inner: int = 200) -> Dict[str, Any]:
+        result = self._result(name, fn, inner)
+        baseline = self.baselines.get(name)
+        if baseline and not self.save and result['change'] > self.threshold:
+            # A noisy neighbour can slow one measurement; a real regression survives a re-run
+            self.calibration_ns = self._measure(_calibration_workload, inner=200, rounds=9)
+            retry = self._result(name, fn, inner)
+            if retry['change'] < result['change']:
+                result = retry
+        self.results[name] = result
+
+        if baseline and not self.save and result['change'] > self.threshold:
+            pytest.fail(
+                f"{name} regressed {result['change']:.0%} (limit {self.threshold:.0%}): "
+                f"{result['per_call_us']}us per call, relative cost {result['relative_cost']} "
+                f"vs baseline {baseline['relative_cost']}"
+            )
+        return result
+
+    def write_baselines(self) -> None:
+        merged = dict(self.baselines)
+        merged.update({
+            name: {'relative_cost': r['relative_cost'], 'per_call_us': r['per_call_us']}
+            for name, r in self.results.items()
+        })
+        tmp_path = f"{BASELINE_FILE}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'calibration_ns': round(self.calibration_ns, 1),
+                       'benchmarks': dict(sorted(merged.items()))}, f, indent=2)
+            f.write('\n')
+        os.replace(tmp_path, BASELINE_FILE)
+
+
+_runner: Optional[BenchmarkRunner] = None
+
+
+@pytest.fixture(scope='session')
+def bench(request) -> BenchmarkRunner:
+    global _runner
+    if _runner is None:
+        _runner = BenchmarkRunner(request.config)
+    return _runner
+
+
+def pytest_sessionfinish(session, exitstatus):
+    if _runner is not None and _runner.save and _runner.results:
+        _runner.write_baselines()
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if _runner is None or not _runner.results:
+        return
+    terminalreporter.section("hot-path benchmarks")
+    for name, r in sorted(_runner.results.items()):
+        change = f"{r['change']:+.1%}" if 'change' in r else "no baseline"
+        terminalreporter.write_line(
+            f"{name:<48} {r['per_call_us']:>10.2f} us/call  x{r['relative_cost']:<8} {change}")
+    if _runner.save:
+        terminalreporter.write_line(f"baselines written to {BASELINE_FILE}")
@@ -0,0 +1,143 @@
+"""
+Realistic request corpora for the hot-path benchmarks: the mix of short
+asks, debugging sessions with tracebacks, long creative briefs, research
+questions and check-ins that the Mama Bear endpoints actually receive.
+"""
+
+SHORT_MESSAGES = [
+    "quick question - what's the difference between a list and a tuple?",
+    "hi mama bear!",
+    "fast: convert 3.5 hours to minutes",
+    "can you rename this variable to something clearer?",
+    "thanks, that worked 🎉",
+    "what does HTTP 429 mean?",
+    "summarize this in one line please",
+    "yes, go ahead",
+]
+
+DEBUG_MESSAGES = [
+    """I'm getting this error and I can't figure out why, can you debug it?
+
+Traceback (most recent call last):
+  File "backend/app.py", line 412, in chat
+    response = loop.run_until_complete(orchestra.process_request(payload))
+  File "/usr/lib/python3.11/asyncio/base_events.py", line 653, in run_until_complete
+    return future.result()
+  File "backend/services/orchestration/orchestra_manager.py", line 188, in process_request
+    routing = await self.conductor.route_request(request)
+KeyError: 'primary_model'
+
+It only happens when the conductor times out.""",
+    """Please analyze why my React component re-renders forever:
+
+```tsx
+function Sidebar({ items }) {
+  const [open, setOpen] = useState(false);
+  useEffect(() => { setOpen(!open); }, [open]);
+  return <nav>{items.map(i => <Item key={i.id} {...i} />)}</nav>;
+}
+```""",
+    "debug: socketio disconnects every 30 seconds behind nginx, logs show 'transport close'",
+    "analyze the performance of this SQL query, it takes 9 seconds on 2M rows: "
+    "SELECT * FROM events WHERE user_id = ? ORDER BY created_at DESC LIMIT 50",
+]
+
+CREATIVE_MESSAGES = [
+    "Create a gentle onboarding story for a neurodivergent developer joining the sanctuary, "
+    "around 2000 words, with calm pacing, sensory-friendly descriptions and clear sections.",
+    "generate 20 names for a cozy coding podcast, with a one-line pitch each",
+    "Write a detailed design document for a collaborative whiteboard with real-time cursors, "
+    "presence, undo history, offline support and conflict resolution. Include diagrams described in text, "
+    "API sketches and a phased rollout plan. " * 3,
+]
+
+RESEARCH_MESSAGES = [
+    "Research the trade-offs between vector databases (pgvector, Qdrant, Weaviate) for a 10M document "
+    "RAG system. Compare latency, cost, operational complexity and filtering support, with sources.",
+    "Explain how speculative decoding works and when it helps latency for LLM serving.",
+    "What are current best practices for rate limiting multi-tenant APIs? Token bucket vs sliding window?",
+]
+
+CHECK_IN_MESSAGES = [
+    "I'm feeling overwhelmed by this project, can we break it into tiny steps?",
+    "I need to focus - please keep answers short and give me one thing at a time",
+    "this is urgent, production is down and I'm panicking",
+]
+
+ALL_MESSAGES = SHORT_MESSAGES + DEBUG_MESSAGES + CREATIVE_MESSAGES + RESEARCH_MESSAGES + CHECK_IN_MESSAGES
+
+
+def orchestra_requests():
+    """Request dicts as the orchestra API builds them"""
+    requests = []
+    for i, message in enumerate(ALL_MESSAGES):
+        requests.append({
+            "message": message,
+            "user_id": f"bench-user-{i % 5}",
+            "mama_bear_variant": ["scout_commander", "research_specialist", "code_review_bear"][i % 3],
+            "require_speed": message in SHORT_MESSAGES and i % 2 == 0,
+            "require_reasoning": message in DEBUG_MESSAGES,
+            "require_creativity": message in CREATIVE_MESSAGES,
+            "context_size": 150000 if message in RESEARCH_MESSAGES and i % 2 else len(message) * 4,
+            "max_tokens_needed": 12000 if message in CREATIVE_MESSAGES else 1000,
+            "context": {"conversation_history": [{"role": "user", "content": m} for m in SHORT_MESSAGES[:3]]}
+        })
+    return requests
+
+
+PYTHON_SNIPPET = '''
+import os
+import json
+import subprocess
+from typing import Dict, Any
+
+
+class ReportBuilder{index}:
+    """Collects results and writes a report"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.rows: Dict[str, Any] = {{}}
+
+    def collect(self, command: str) -> int:
+        result = subprocess.run(command.split(), capture_output=True, text=True)
+        for line in result.stdout.splitlines():
+            if line.startswith("#"):
+                continue
+            key, _, value = line.partition("=")
+            self.rows[key] = value
+        return result.returncode
+
+    def write(self) -> str:
+        path = os.path.join(self.root, "report_{index}.json")
+        with open(path, "w") as f:
+            json.dump(self.rows, f)
+        return path
+'''
+
+JS_SNIPPET = '''
+const fs = require('fs');
+const path = require('path');
+
+async function buildIndex{index}(dir) {{
+  const entries = await fs.promises.readdir(dir, {{ withFileTypes: true }});
+  for (const entry of entries) {{
+    if (entry.isDirectory()) {{
+      await buildIndex{index}(path.join(dir, entry.name));
+    }} else if (entry.name.endsWith('.md')) {{
+      const text = await fs.promises.readFile(path.join(dir, entry.name), 'utf8');
+      console.log(entry.name, text.length);
+    }}
+  }}
+}}
+'''
+
+
+def code_snippets():
+    """Snippets from a few lines to a few hundred, Python and JavaScript"""
+    snippets = []
+    for blocks in (1, 4, 16):
+        snippets.append(''.join(PYTHON_SNIPPET.format(index=i) for i in range(blocks)))
+        snippets.append(''.join(JS_SNIPPET.format(index=i) for i in range(blocks)))
+    snippets.append("pip install requests && python -c 'import requests; print(requests.get(\"https://example.com\"))'")
+    return snippets
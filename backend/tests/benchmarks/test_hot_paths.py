@@ -0,0 +1,136 @@
+"""
+Per-request CPU cost of the routing and analysis hot paths.
+
+Each benchmark replays the corpus in tests/benchmarks/corpus.py; the cost of
+one call is the time to process the whole corpus once.
+"""
+
+import logging
+import itertools
+
+import pytest
+
+from corpus import ALL_MESSAGES, orchestra_requests, code_snippets
+
+# The provider SDKs are imported at module level by the services under test
+pytest.importorskip("google.generativeai")
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    # Routing code logs per decision; keep the handlers out of the measurement
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def test_task_analyzer_analyze_request(bench):
+    from services.orchestration.task_analyzer import TaskAnalyzer
+
+    analyzer = TaskAnalyzer()
+    requests = orchestra_requests()
+
+    async def analyze_corpus():
+        for request in requests:
+            await analyzer.analyze_request(request)
+
+    bench("TaskAnalyzer.analyze_request", analyze_corpus, inner=20)
+
+
+def test_conductor_fallback_routing(bench):
+    from services.orchestration.conductor import GeminiConductor
+
+    # _fallback_routing is pure; skip __init__ so no client is configured
+    conductor = GeminiConductor.__new__(GeminiConductor)
+    requests = orchestra_requests()
+
+    def route_corpus():
+        for request in requests:
+            conductor._fallback_routing(request)
+
+    bench("GeminiConductor._fallback_routing", route_corpus)
+
+
+def test_performance_adjusted_routing(bench):
+    from datetime import datetime, timedelta
+    from services.orchestration.conductor import GeminiConductor
+    from services.orchestration.performance_tracker import PerformanceTracker
+
+    tracker = PerformanceTracker()
+    # A realistic mix: healthy, slow, failing and never-used models
+    now = datetime.now()
+    for i, model_key in enumerate(["conductor", "speed_demon_primary", "speed_demon_backup",
+                                   "deep_thinker_primary", "deep_thinker_backup",
+                                   "creative_writer_primary", "context_master_primary"]):
+        perf = tracker.performance_data[model_key]
+        perf["success_rate"] = [0.99, 0.7, 0.95, 0.6, 0.9, 0.97, 0.85][i]
+        perf["avg_latency"] = [900, 6500, 700, 8000, 3000, 1500, 4000][i]
+        perf["total_requests"] = 100 + i * 20
+        perf["recent_latencies"].extend([perf["avg_latency"]] * 50)
+        perf["last_success"] = now - timedelta(minutes=i * 7)
+        if i % 3 == 1:
+            perf["last_failure"] = now - timedelta(minutes=i)
+
+    conductor = GeminiConductor.__new__(GeminiConductor)
+    routings = [conductor._fallback_routing(request) for request in orchestra_requests()]
+
+    async def adjust_corpus():
+        for routing in routings:
+            await tracker.get_performance_adjusted_routing(
+                {**routing, "fallback_models": list(routing["fallback_models"])})
+
+    bench("PerformanceTracker.get_performance_adjusted_routing", adjust_corpus)
+
+
+def test_execution_router_analyze_code_snippet(bench):
+    # The router imports enhanced_code_execution, which needs the E2B SDK
+    pytest.importorskip("e2b_code_interpreter")
+    from services.intelligent_execution_router import IntelligentExecutionRouter
+    from services.snippet_analyzer import SnippetAnalysisCache
+
+    router = IntelligentExecutionRouter(None, None, None)
+    snippets = code_snippets()
+
+    def analyze_cold():
+        router.snippet_cache = SnippetAnalysisCache()
+        for snippet in snippets:
+            router._analyze_code_snippet(snippet)
+
+    def analyze_warm():
+        for snippet in snippets:
+            router._analyze_code_snippet(snippet)
+
+    bench("IntelligentExecutionRouter._analyze_code_snippet[cold]", analyze_cold, inner=5)
+    router.snippet_cache = SnippetAnalysisCache()
+    bench("IntelligentExecutionRouter._analyze_code_snippet[warm]", analyze_warm)
+
+
+def test_model_manager_select_optimal_model(bench):
+    from services.mama_bear_model_manager import MamaBearModelManager
+    from services.quota_forecaster import QuotaForecaster
+
+    # __init__ starts a background health task; the selection path only needs
+    # the model table and the quota forecaster
+    manager = MamaBearModelManager.__new__(MamaBearModelManager)
+    manager.logger = logging.getLogger("bench")
+    manager.models = manager._initialize_models()
+    manager.quota_forecaster = QuotaForecaster()
+    manager.forecast_pressure_threshold = 0.5
+    for config in manager.models.values():
+        manager.quota_forecaster.register(manager._quota_key(config), config.requests_per_minute,
+                                          config.requests_per_day)
+    # Put some models near their quota so every branch of the selection is taken
+    for config in itertools.islice(manager.models.values(), 0, None, 3):
+        config.current_requests_minute = int(config.requests_per_minute * 0.95)
+        manager.quota_forecaster.record(manager._quota_key(config), config.current_requests_minute)
+
+    contexts = [{"message": message, "requires_reasoning": "debug" in message.lower()}
+                for message in ALL_MESSAGES]
+
+    def select_corpus():
+        for context in contexts:
+            manager._select_optimal_model(context)
+
+    bench("MamaBearModelManager._select_optimal_model", select_corpus)
@@ -0,0 +1,87 @@
+"""
+Per-record logging overhead: formatter cost (emoji fallback, JSON) and
+what a request thread pays per logger.info() with a synchronous file
+handler versus the queued background writer.
+"""
+
+import os
+import logging
+import logging.handlers
+import queue
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+MESSAGE = "✅ Request %s completed in %.0fms via %s 🎭"
+ARGS = ("req_8f3a2c", 1234.5, "speed_demon_primary")
+
+
+@pytest.fixture
+def windows_logging(tmp_path, monkeypatch):
+    # The module configures the root logger on import; keep that out of the test run
+    monkeypatch.setenv("LOG_FILE", str(tmp_path / "import.log"))
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+    from utils import windows_logging
+    yield windows_logging
+    windows_logging._stop_queue_listener()
+    for handler in root.handlers:
+        if handler not in saved_handlers:
+            handler.close()
+    root.handlers[:] = saved_handlers
+    root.setLevel(saved_level)
+
+
+def _record() -> logging.LogRecord:
+    return logging.LogRecord("services.orchestration", logging.INFO, __file__, 1, MESSAGE, ARGS, None)
+
+
+def test_emoji_fallback_formatting(bench, windows_logging):
+    formatter = windows_logging.WindowsCompatibleFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    formatter.use_emoji_fallback = True
+    record = _record()
+
+    bench("WindowsCompatibleFormatter.format[emoji_fallback]", lambda: formatter.format(record), inner=2000)
+
+
+def test_json_formatting(bench, windows_logging):
+    formatter = windows_logging.JsonLogFormatter()
+    record = _record()
+    record.request_id = "req_8f3a2c"
+
+    bench("JsonLogFormatter.format", lambda: formatter.format(record), inner=2000)
+
+
+def test_caller_cost_per_record(bench, windows_logging, tmp_path):
+    formatter = windows_logging.WindowsCompatibleFormatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+
+    sync_logger = logging.getLogger("bench.sync")
+    sync_logger.setLevel(logging.INFO)
+    sync_logger.propagate = False
+    file_handler = logging.FileHandler(str(tmp_path / "sync.log"), encoding="utf-8")
+    file_handler.setFormatter(formatter)
+    sync_logger.addHandler(file_handler)
+
+    queued_logger = logging.getLogger("bench.queued")
+    queued_logger.setLevel(logging.INFO)
+    queued_logger.propagate = False
+    queued_file_handler = logging.FileHandler(str(tmp_path / "queued.log"), encoding="utf-8")
+    queued_file_handler.setFormatter(formatter)
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, queued_file_handler)
+    queued_logger.addHandler(windows_logging.DeferredFormattingQueueHandler(log_queue))
+
+    try:
+        bench("logger.info[file_handler]", lambda: sync_logger.info(MESSAGE, *ARGS), inner=1000)
+        # The listener drains afterwards, so only the request thread's share is timed
+        # (a live listener would compete for the GIL inside this tight loop)
+        bench("logger.info[queue_handler]", lambda: queued_logger.info(MESSAGE, *ARGS), inner=1000)
+    finally:
+        listener.start()
+        listener.stop()
+        for logger_, handler in ((sync_logger, file_handler), (queued_logger, queued_file_handler)):
+            logger_.handlers.clear()
+            handler.close()
+
+    assert os.path.getsize(tmp_path / "queued.log") > 0
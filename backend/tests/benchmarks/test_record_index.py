@@ -0,0 +1,56 @@
+"""
+Agent workbench lookups: a linear substring scan over every template (what
+search and stats did per call) versus the indexed store.
+"""
+
+import random
+
+import pytest
+
+from services.record_index import RecordIndex
+
+pytestmark = pytest.mark.benchmark
+
+TYPES = ("research", "ui_design", "api", "security", "custom")
+WORDS = ("research", "design", "security", "api", "analyst", "specialist", "scraper",
+         "review", "deploy", "monitor", "data", "pipeline", "assistant", "vision")
+
+
+def _templates(count: int = 2000):
+    rng = random.Random(7)
+    return [
+        {
+            "id": f"template_{i}",
+            "name": " ".join(rng.sample(WORDS, 2)).title(),
+            "type": rng.choice(TYPES),
+            "description": " ".join(rng.sample(WORDS, 6)),
+            "owner_id": f"user_{i % 50}",
+        }
+        for i in range(count)
+    ]
+
+
+def test_template_search(bench):
+    templates = _templates()
+    index = RecordIndex(keys=("type", "owner_id"), text_fields=("name", "description"))
+    for template in templates:
+        index.put(template["id"], template)
+
+    def linear_search():
+        query = "pipeline"
+        return [t for t in templates if t["type"] == "api"
+                and (query in t["name"].lower() or query in t["description"].lower())]
+
+    assert len(index.search("pipeline", type="api")) == len(linear_search())
+    bench("RecordIndex.search[linear_scan]", linear_search, inner=50)
+    bench("RecordIndex.search", lambda: index.search("pipeline", type="api"), inner=50)
+
+
+def test_stats_counts(bench):
+    templates = _templates()
+    index = RecordIndex(keys=("type", "owner_id"), text_fields=("name", "description"))
+    for template in templates:
+        index.put(template["id"], template)
+
+    bench("RecordIndex.counts_by", lambda: (index.counts_by("type"), index.count_where("owner_id", "user_3")),
+          inner=200)
@@ -0,0 +1,174 @@
+"""
+Adaptive concurrency limits: the limit holds under a steady mix of fast and
+slow calls, backs off on sustained slowdowns and on rate limiting, rate
+limits are recognised by type and status only, and every call site's key
+lands on the same limiter.
+"""
+
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.adaptive_concurrency import (
+    AdaptiveLimiter, LoadShedError, get_concurrency_limiter, is_rate_limit_error, limiter_key
+)
+
+KEY = ("gemini", "test-model", "primary")
+
+
+def _complete(limiter, latency, outcome='ok'):
+    """Finish one call with every slot in use"""
+    limiter.in_flight = limiter._capacity()
+    limiter.release(latency, outcome)
+
+
+def test_mixed_latencies_do_not_shrink_the_limit():
+    limiter = AdaptiveLimiter(KEY, initial_limit=8)
+    rng = random.Random(3)
+    for _ in range(2000):
+        # Short prompts answer in ~100ms, long ones in ~2s
+        _complete(limiter, rng.choice((0.1, 0.12, 2.0, 2.4)))
+
+    assert limiter.limit >= 8
+    assert limiter.stats['decreases'] == 0
+
+
+def test_occasional_slow_calls_do_not_shrink_the_limit():
+    limiter = AdaptiveLimiter(KEY, initial_limit=8)
+    rng = random.Random(5)
+    for _ in range(2000):
+        _complete(limiter, 2.0 if rng.random() < 0.05 else 0.1)
+
+    assert limiter.limit >= 8
+
+
+def test_sustained_slowdown_backs_off_gently():
+    limiter = AdaptiveLimiter(KEY, initial_limit=16)
+    for _ in range(200):
+        _complete(limiter, 0.2)
+    grown = limiter.limit
+    for _ in range(40):
+        _complete(limiter, 1.0)
+
+    assert limiter.limit < grown
+    # At most one 10% step per limit's worth of calls, not one per slow call
+    assert limiter.limit > grown * 0.9 ** 4
+
+
+def test_rate_limiting_and_timeouts_halve_the_limit():
+    limiter = AdaptiveLimiter(KEY, initial_limit=16, min_limit=2)
+    # Zero latency: each call started after the previous cut
+    _complete(limiter, 0.0, 'rate_limited')
+    assert limiter.limit == 8
+    _complete(limiter, 0.0, 'timeout')
+    assert limiter.limit == 4
+    for _ in range(3):
+        _complete(limiter, 0.0, 'rate_limited')
+    assert limiter.limit == 2
+    assert (limiter.stats['rate_limited'], limiter.stats['timeouts']) == (4, 1)
+
+
+def test_burst_of_concurrent_429s_halves_the_limit_once():
+    limiter = AdaptiveLimiter(KEY, initial_limit=16, min_limit=1)
+    # Sixteen calls in flight together all come back rate limited
+    for _ in range(16):
+        _complete(limiter, 0.5, 'rate_limited')
+
+    assert limiter.limit == 8
+    assert limiter.stats['rate_limited'] == 16
+    # A call sent after the cut that is still rejected cuts again
+    _complete(limiter, 0.0, 'rate_limited')
+    assert limiter.limit == 4
+
+
+def test_run_classifies_429_and_sheds_when_queue_is_full():
+    class TooManyRequests(Exception):
+        status_code = 429
+
+    limiter = AdaptiveLimiter(KEY, initial_limit=4, max_queue=0)
+
+    async def throttled():
+        raise TooManyRequests("slow down")
+
+    async def hold(release):
+        await release.wait()
+
+    async def main():
+        with pytest.raises(TooManyRequests):
+            await limiter.run(throttled)
+        assert limiter.limit == 2
+        release = asyncio.Event()
+        holders = [asyncio.create_task(limiter.run(lambda: hold(release))) for _ in range(2)]
+        await asyncio.sleep(0)
+        with pytest.raises(LoadShedError):
+            await limiter.run(lambda: hold(release))
+        release.set()
+        await asyncio.gather(*holders)
+
+    asyncio.run(main())
+    assert limiter.stats['rate_limited'] == 1
+    assert limiter.stats['shed'] == 1
+    assert limiter.in_flight == 0
+
+
+def test_routing_state_follows_the_limit():
+    limiter = AdaptiveLimiter(KEY, initial_limit=4, max_queue=2)
+    assert limiter.routing_state() == (False, False, 0.0)
+
+    limiter.in_flight = 3
+    assert limiter.routing_state() == (False, False, 0.75)
+    # Halving the limit leaves the calls in flight over it
+    limiter.limit = 2.0
+    assert limiter.routing_state() == (False, True, 1.5)
+    for _ in range(2):
+        limiter._waiters.append((None, 0.0))
+    assert limiter.routing_state() == (True, True, 2.5)
+    assert limiter.routing_state() == (limiter.would_shed(), limiter.saturated(), limiter.load())
+
+
+def test_rate_limit_errors_are_recognised_by_type_and_status():
+    class StatusError(Exception):
+        def __init__(self, status_code):
+            super().__init__(f"status {status_code}")
+            self.status_code = status_code
+
+    class StatusCode:
+        def __init__(self, name):
+            self.name = name
+
+    class RpcError(Exception):
+        def __init__(self, name):
+            self._code = StatusCode(name)
+
+        def code(self):
+            return self._code
+
+    class Aborted(Exception):
+        code = 8
+
+    assert is_rate_limit_error(StatusError(429))
+    assert is_rate_limit_error(RpcError('RESOURCE_EXHAUSTED'))
+    assert not is_rate_limit_error(StatusError(500))
+    assert not is_rate_limit_error(RpcError('UNAVAILABLE'))
+    assert not is_rate_limit_error(Aborted())
+    assert not is_rate_limit_error(ValueError("quota of 429 widgets exceeded"))
+
+    exceptions = pytest.importorskip("google.api_core.exceptions")
+    assert is_rate_limit_error(exceptions.ResourceExhausted("quota"))
+
+
+def test_call_sites_share_one_limiter_per_model_and_account():
+    # Model manager, orchestra and the Gemini adapter name the same model differently
+    manager = get_concurrency_limiter("google_ai", "gemini-2.5-flash-test", "primary")
+    assert get_concurrency_limiter("gemini", "gemini-2.5-flash-test") is manager
+    assert get_concurrency_limiter("gemini", "models/Gemini-2.5-Flash-Test") is manager
+    assert get_concurrency_limiter("google_ai", "gemini-2.5-flash-test", "backup") is not manager
+
+    assert limiter_key("Anthropic", "claude-x", "default") == ("claude", "claude-x", "primary")
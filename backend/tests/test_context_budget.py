@@ -0,0 +1,111 @@
+"""
+Context budget: short histories pass through untouched, older turns fold into
+a summary, the recent turns that are always kept are cut down when they alone
+exceed the budget, and the metrics stay exact under concurrent requests.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.context_budget import ContextBudgeter, TokenCounter
+
+# An unknown model gets the default window; the cap keeps budgets small
+MODEL = "test-model"
+
+
+def _budgeter(max_input_tokens=400):
+    return ContextBudgeter(counter=TokenCounter(), max_input_tokens=max_input_tokens)
+
+
+def _turns(*sizes):
+    return [{'role': 'user' if n % 2 == 0 else 'assistant',
+             'content': f"Turn {n} starts here. " + ' '.join(f"word{n}x{i}" for i in range(size))}
+            for n, size in enumerate(sizes)]
+
+
+def test_history_that_fits_is_sent_as_is():
+    budgeter = _budgeter()
+    messages = _turns(5, 5, 5)
+    window = budgeter.fit(messages, "openai", MODEL, max_output_tokens=100)
+
+    assert window.messages == messages
+    assert window.summary == "" and window.truncated_turns == 0
+
+
+def test_older_turns_fold_into_a_summary():
+    budgeter = _budgeter()
+    messages = _turns(60, 60, 60, 60, 10, 10)
+    window = budgeter.fit(messages, "openai", MODEL, max_output_tokens=100, conversation_id="c1")
+
+    assert window.messages == messages[-window.verbatim_turns:]
+    assert window.summarized_turns == len(messages) - window.verbatim_turns > 0
+    assert "Turn 0 starts here." in window.summary
+    assert window.input_tokens <= window.budget_tokens
+    assert window.truncated_turns == 0
+
+
+def test_oversized_recent_turns_are_cut_to_the_budget():
+    budgeter = _budgeter()
+    counter = budgeter.counter
+    messages = _turns(10, 80, 80)
+    window = budgeter.fit(messages, "openai", MODEL, max_output_tokens=100, conversation_id="c2")
+
+    assert window.input_tokens <= window.budget_tokens
+    sent = sum(counter.count_message(message, "openai") for message in window.messages)
+    assert sent + counter.count(window.summary, "openai") <= window.budget_tokens
+    # Both recent turns are kept; the older one loses its middle, the newest is whole
+    assert [message['role'] for message in window.messages] == ['assistant', 'user']
+    assert window.truncated_turns == 1
+    older = window.messages[0]['content']
+    assert older.startswith("Turn 1 starts here.") and older.endswith("word1x79")
+    assert "[truncated]" in older
+    assert window.messages[1] == messages[2]
+    # The caller's messages are not modified
+    assert "[truncated]" not in messages[1]['content']
+
+
+def test_newest_turn_larger_than_the_whole_budget():
+    budgeter = _budgeter(max_input_tokens=150)
+    messages = _turns(10, 10, 2000)
+    window = budgeter.fit(messages, "anthropic", MODEL, max_output_tokens=100)
+
+    assert window.input_tokens <= window.budget_tokens
+    # No room left for the older recent turn: it is folded, not cut to nothing
+    assert window.messages[-1]['content'].startswith("Turn 2 starts here.")
+    assert window.verbatim_turns == 1 and window.truncated_turns == 1
+
+
+def test_image_parts_survive_truncation():
+    budgeter = _budgeter(max_input_tokens=150)
+    image = {'type': 'image_url', 'image_url': {'url': 'data:image/png;base64,AAAA'}}
+    messages = [{'role': 'user', 'content': [
+        {'type': 'text', 'text': ' '.join(f"word{i}" for i in range(1000))}, image]}]
+    window = budgeter.fit(messages, "openai", MODEL, max_output_tokens=100)
+
+    content = window.messages[0]['content']
+    assert image in content
+    assert "[truncated]" in content[0]['text']
+    assert window.input_tokens <= window.budget_tokens
+
+
+def test_metrics_are_exact_under_concurrent_requests():
+    budgeter = _budgeter()
+    messages = _turns(60, 60, 60, 60, 10, 10)
+
+    def fit_many():
+        for _ in range(200):
+            budgeter.fit(messages, "openai", MODEL, max_output_tokens=100)
+
+    threads = [threading.Thread(target=fit_many) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = budgeter.get_stats()
+    assert stats['requests'] == stats['compacted_requests'] == 800
@@ -0,0 +1,70 @@
+"""
+Gemini context cache: concurrent misses for one prefix share a single cache
+creation, and a failed creation backs off before it is retried.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.prompt_compiler import CompiledPrompt, GeminiContextCache, _CachedContentEntry
+
+MODEL = SimpleNamespace(id="gemini-test", features=("createCachedContent",))
+PROMPT = CompiledPrompt(prefix="x" * 40, suffix="question", prefix_key="prefix-1", prefix_tokens=10)
+
+
+class CountingCache(GeminiContextCache):
+    def __init__(self, fail=False, **kwargs):
+        super().__init__(enabled=True, min_tokens=1, ttl_seconds=3600, **kwargs)
+        self.fail = fail
+        self.created = []
+        self.lock = threading.Lock()
+
+    def _create(self, model_id, prefix):
+        with self.lock:
+            self.created.append(model_id)
+        time.sleep(0.05)
+        if self.fail:
+            raise RuntimeError("quota")
+        return _CachedContentEntry(model=f"cached-{len(self.created)}", cache_name="c",
+                                   expires_at=time.time() + 3600)
+
+
+def test_concurrent_misses_create_the_cache_once():
+    cache = CountingCache()
+
+    async def main():
+        return await asyncio.gather(*(cache.model_for(MODEL, PROMPT) for _ in range(8)))
+
+    assert asyncio.run(main()) == ["cached-1"] * 8
+    assert cache.created == ["gemini-test"]
+    assert cache.get_stats()['caches_created'] == 1
+
+    # Later requests hit the stored entry
+    assert asyncio.run(cache.model_for(MODEL, PROMPT)) == "cached-1"
+    assert len(cache.created) == 1
+
+
+def test_failed_creation_is_shared_and_backs_off():
+    cache = CountingCache(fail=True, retry_seconds=0.2)
+
+    async def main():
+        return await asyncio.gather(*(cache.model_for(MODEL, PROMPT) for _ in range(4)))
+
+    assert asyncio.run(main()) == [None] * 4
+    assert len(cache.created) == 1
+    # Inside the backoff the prefix is sent inline without another attempt
+    assert asyncio.run(cache.model_for(MODEL, PROMPT)) is None
+    assert len(cache.created) == 1
+
+    time.sleep(0.25)
+    cache.fail = False
+    assert asyncio.run(cache.model_for(MODEL, PROMPT)) == "cached-2"
+    assert cache.get_stats()['cache_failures'] == 1
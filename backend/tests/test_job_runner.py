@@ -0,0 +1,229 @@
+"""
+Background job runner: results and retries, wait time measured from when a
+job became runnable, the queue limit and duplicate ids under concurrent
+submits, cancellation, recovery of interrupted jobs, and the Scout workflow
+handler failing its job when a stage fails.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.job_runner import JobRunner, JobQueueFullError, JobExistsError
+
+
+def _runner(tmp_path, **kwargs):
+    kwargs.setdefault('max_workers', 2)
+    kwargs.setdefault('retry_backoff_seconds', 0.0)
+    return JobRunner(db_path=str(tmp_path / "jobs.db"), **kwargs)
+
+
+def _wait_for(runner, job_id, statuses=('succeeded', 'failed', 'cancelled'), timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = runner.get(job_id)
+        if job['status'] in statuses:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} stuck in {runner.get(job_id)['status']}")
+
+
+def test_job_result_and_progress_are_stored(tmp_path):
+    async def handler(ctx):
+        ctx.report_progress(0.5, "halfway")
+        await asyncio.sleep(0)
+        return {"echo": ctx.payload["value"], "attempt": ctx.attempt}
+
+    runner = _runner(tmp_path)
+    runner.register("echo", handler)
+    runner.start()
+    try:
+        job = _wait_for(runner, runner.submit("echo", {"value": 7})["id"])
+    finally:
+        runner.stop()
+
+    assert job["status"] == "succeeded"
+    assert job["result"] == {"echo": 7, "attempt": 1}
+    assert job["progress"] == 1.0
+
+
+def test_failed_attempts_are_retried_until_the_limit(tmp_path):
+    attempts = []
+
+    async def flaky(ctx):
+        attempts.append(ctx.attempt)
+        if ctx.attempt < 2:
+            raise RuntimeError("transient")
+        return "ok"
+
+    async def broken(ctx):
+        raise RuntimeError("always")
+
+    runner = _runner(tmp_path, max_attempts=2)
+    runner.register("flaky", flaky)
+    runner.register("broken", broken)
+    runner.start()
+    try:
+        recovered = _wait_for(runner, runner.submit("flaky", {})["id"])
+        failed = _wait_for(runner, runner.submit("broken", {})["id"])
+    finally:
+        runner.stop()
+
+    assert recovered["status"] == "succeeded" and attempts == [1, 2]
+    assert failed["status"] == "failed"
+    assert failed["attempts"] == 2
+    assert failed["error"] == "always"
+
+
+def test_wait_time_excludes_retry_backoff(tmp_path):
+    async def flaky(ctx):
+        if ctx.attempt < 2:
+            raise RuntimeError("transient")
+        return "ok"
+
+    runner = _runner(tmp_path, max_attempts=2, retry_backoff_seconds=0.5)
+    runner.register("backoff_wait", flaky)
+    runner.start()
+    try:
+        job = _wait_for(runner, runner.submit("backoff_wait", {})["id"])
+    finally:
+        runner.stop()
+
+    assert job["status"] == "succeeded"
+    waits = runner.wait_metric.labels("backoff_wait")
+    assert sum(waits.counts) == 2
+    assert waits.sum < 0.25
+
+
+def test_duplicate_job_ids_are_refused(tmp_path):
+    async def handler(ctx):
+        return None
+
+    runner = _runner(tmp_path)
+    runner.register("noop", handler)
+    accepted, refused = [], []
+    barrier = threading.Barrier(10)
+
+    def submit():
+        barrier.wait()
+        try:
+            accepted.append(runner.submit("noop", {}, job_id="session-1"))
+        except JobExistsError:
+            refused.append(True)
+
+    threads = [threading.Thread(target=submit) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(accepted) == 1 and len(refused) == 9
+    assert runner.get_stats()["queued"] == 1
+
+
+def test_queue_limit_holds_under_concurrent_submits(tmp_path):
+    async def handler(ctx):
+        return None
+
+    # Not started, so every accepted job stays queued
+    runner = _runner(tmp_path, queue_limit=5)
+    runner.register("noop", handler)
+    insert = runner.store.insert
+
+    def slow_insert(*args):
+        time.sleep(0.02)  # widen the gap between the limit check and the enqueue
+        insert(*args)
+
+    runner.store.insert = slow_insert
+    accepted, rejected = [], []
+    barrier = threading.Barrier(20)
+
+    def submit():
+        barrier.wait()
+        try:
+            accepted.append(runner.submit("noop", {}))
+        except JobQueueFullError:
+            rejected.append(True)
+
+    threads = [threading.Thread(target=submit) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(accepted) == 5
+    assert len(rejected) == 15
+    assert runner.get_stats()["queued"] == 5
+
+
+def test_cancel_queued_job(tmp_path):
+    async def handler(ctx):
+        return None
+
+    runner = _runner(tmp_path)
+    runner.register("noop", handler)
+    job = runner.submit("noop", {})
+
+    assert runner.cancel(job["id"])
+    assert runner.get(job["id"])["status"] == "cancelled"
+    assert runner.get_stats()["queued"] == 0
+    assert not runner.cancel(job["id"])
+
+
+def test_jobs_interrupted_by_a_restart_run_again(tmp_path):
+    async def handler(ctx):
+        return ctx.payload["n"]
+
+    first = _runner(tmp_path)
+    first.register("count", handler)
+    job = first.submit("count", {"n": 3})
+    first.store.update(job["id"], status="running")  # the process died mid-run
+
+    second = _runner(tmp_path)
+    second.register("count", handler)
+    second.start()
+    try:
+        finished = _wait_for(second, job["id"])
+    finally:
+        second.stop()
+
+    assert finished["status"] == "succeeded"
+    assert finished["result"] == 3
+
+
+def test_scout_job_fails_when_a_stage_fails(tmp_path, monkeypatch):
+    pytest.importorskip("flask_socketio")
+    pytest.importorskip("google.generativeai")
+    import api.scout_workflow_api as scout_api
+
+    class Orchestrator:
+        async def execute_full_workflow(self, description, preferences, workflow_id, progress_callback):
+            return {
+                'success': True,
+                'workflow_id': workflow_id,
+                'results': {
+                    'planning': {'success': True},
+                    'deployment': {'success': False, 'error': 'quota exhausted'}
+                },
+                'metadata': {'failed_stages': ['deployment']}
+            }
+
+    monkeypatch.setattr(scout_api, 'get_scout_orchestrator', lambda: Orchestrator())
+    runner = _runner(tmp_path, max_attempts=1)
+    runner.register(scout_api.SCOUT_JOB_KIND, scout_api.run_scout_workflow_job)
+    runner.start()
+    try:
+        job = _wait_for(runner, runner.submit(scout_api.SCOUT_JOB_KIND, {"description": "todo app"})["id"])
+    finally:
+        runner.stop()
+
+    assert job["status"] == "failed"
+    assert "deployment: quota exhausted" in job["error"]
@@ -0,0 +1,156 @@
+"""
+Lazy components: requests are routed to a component by its longest matching
+path prefix and load it on first use, and declared SocketIO events and job
+kinds are dispatched from startup so they load the component instead of
+being dropped before it has loaded.
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+pytest.importorskip("werkzeug")
+
+from utils.lazy_components import LazyComponentRegistry, blueprint_prefixes
+from services.job_runner import JobRunner
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.handlers = {}
+
+    def on_event(self, event, handler, namespace=None):
+        self.handlers[(event, namespace or '/')] = handler
+
+    def trigger(self, event, *args):
+        return self.handlers[(event, '/')](*args)
+
+
+def _wsgi_app(name):
+    def app(environ, start_response):
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [f"{name}:{environ['PATH_INFO']}".encode()]
+    return app
+
+
+def _call(wsgi_app, path):
+    statuses = []
+    body = b''.join(wsgi_app({'PATH_INFO': path, 'REQUEST_METHOD': 'GET'},
+                             lambda status, headers, exc_info=None: statuses.append(status)))
+    return statuses[0], body.decode()
+
+
+def _registry(socketio=None):
+    return LazyComponentRegistry(socketio or FakeSocketIO(), _wsgi_app)
+
+
+def test_requests_route_by_longest_prefix_and_load_on_first_use():
+    registry = _registry()
+    loads = []
+    registry.declare('chat', ['/api/chat/'], lambda app, socketio: loads.append('chat'))
+    registry.declare('chat_stats', ['/api/chat/stats'], lambda app, socketio: loads.append('chat_stats'))
+    dispatch = registry.wsgi_middleware(_wsgi_app('main'))
+
+    assert _call(dispatch, '/api/chat/stats/today') == ('200 OK', 'chat_stats:/api/chat/stats/today')
+    assert _call(dispatch, '/api/chat') == ('200 OK', 'chat:/api/chat')
+    assert _call(dispatch, '/api/chatty') == ('200 OK', 'main:/api/chatty')
+    assert _call(dispatch, '/api/chat/send') == ('200 OK', 'chat:/api/chat/send')
+    assert loads == ['chat_stats', 'chat']
+    assert registry.get_status()['chat']['loaded_by'] == 'request'
+
+
+def test_failed_component_answers_503():
+    registry = _registry()
+    registry.declare('broken', ['/api/broken'], lambda app, socketio: False)
+    status, body = _call(registry.wsgi_middleware(_wsgi_app('main')), '/api/broken/x')
+
+    assert status.startswith('503')
+    assert 'broken is unavailable' in body
+    assert not registry.is_available('broken')
+
+
+def test_declared_socket_events_load_the_component():
+    socketio = FakeSocketIO()
+    registry = _registry(socketio)
+    received = []
+
+    def loader(app, component_socketio):
+        @component_socketio.on('scout_subscribe')
+        def subscribe(data):
+            received.append(data)
+            return 'subscribed'
+
+        component_socketio.on_event('scout_extra', lambda data: 'extra')
+        return True
+
+    registry.declare('scout', ['/api/scout'], loader, socket_events=['scout_subscribe'])
+
+    # The dispatcher is registered before the component loads
+    assert registry.components['scout'].state == 'declared'
+    assert socketio.trigger('scout_subscribe', {'id': 1}) == 'subscribed'
+    assert received == [{'id': 1}]
+    assert registry.get_status()['scout']['loaded_by'] == 'socket'
+    # Undeclared events still reach the server, once loaded
+    assert socketio.trigger('scout_extra', {}) == 'extra'
+
+
+def test_socket_event_for_a_failed_component_gets_an_error():
+    socketio = FakeSocketIO()
+    registry = _registry(socketio)
+    registry.declare('broken', ['/api/broken'], lambda app, s: False, socket_events=['broken_ping'])
+
+    assert socketio.trigger('broken_ping', {}) == {'success': False, 'error': 'broken is unavailable'}
+
+
+def test_persisted_jobs_are_recovered_before_the_component_loads(tmp_path):
+    async def research(ctx):
+        return ctx.payload['query'].upper()
+
+    def loader(app, socketio):
+        runner.register('research', research)
+        return True
+
+    # A job left queued by the previous run
+    previous = JobRunner(db_path=str(tmp_path / "jobs.db"), retry_backoff_seconds=0.0)
+    previous.register('research', research)
+    job_id = previous.submit('research', {'query': 'bees'})['id']
+
+    runner = JobRunner(db_path=str(tmp_path / "jobs.db"), max_workers=1, retry_backoff_seconds=0.0)
+    runner.start()
+    registry = _registry()
+    registry.declare('library', ['/api/library'], loader, job_kinds=['research'])
+    try:
+        registry.register_job_handlers(runner)
+        deadline = time.monotonic() + 5.0
+        while runner.get(job_id)['status'] not in ('succeeded', 'failed') and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        runner.stop()
+
+    job = runner.get(job_id)
+    assert job['status'] == 'succeeded'
+    assert job['result'] == 'BEES'
+    assert registry.get_status()['library']['loaded_by'] == 'job'
+    assert runner.get_handler('research') is research
+
+
+def test_blueprint_prefixes_cover_only_the_blueprints_own_routes():
+    flask = pytest.importorskip("flask")
+    shared = flask.Blueprint('shared', __name__, url_prefix='/api/chat')
+    for rule in ('/friends', '/friends/<friend_id>', '/group/send', '/history/<friend_id>'):
+        shared.add_url_rule(rule, rule.strip('/').replace('/', '_'), lambda **kwargs: '')
+    variable = flask.Blueprint('variable', __name__, url_prefix='/api/items/')
+    variable.add_url_rule('/<item_id>', 'item', lambda item_id: '')
+
+    assert blueprint_prefixes(shared) == ['/api/chat/friends', '/api/chat/group', '/api/chat/history']
+    assert blueprint_prefixes(variable) == ['/api/items']
+    # Still registrable on the component's own app afterwards
+    component_app = flask.Flask('component')
+    component_app.register_blueprint(shared)
+    assert component_app.test_client().get('/api/chat/friends').status_code == 200
@@ -0,0 +1,113 @@
+"""
+Metrics registry: label sets resolve to one child each, collectors run before
+every scrape without one failure breaking the rest, and the output follows the
+Prometheus text format (HELP/TYPE lines, escaping, cumulative buckets).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.metrics_registry import MetricsRegistry
+
+
+def _samples(text):
+    return dict(line.rsplit(' ', 1) for line in text.splitlines() if not line.startswith('#'))
+
+
+def test_labels_by_position_or_name_share_a_child():
+    registry = MetricsRegistry()
+    requests = registry.counter('test_requests_total', "Requests", ('component', 'outcome'))
+
+    requests.labels('chat', 'ok').inc()
+    requests.labels(outcome='ok', component='chat').inc(2)
+    requests.labels('chat', 'error').inc()
+
+    samples = _samples(registry.render())
+    assert samples['test_requests_total{component="chat",outcome="ok"}'] == '3.0'
+    assert samples['test_requests_total{component="chat",outcome="error"}'] == '1.0'
+
+
+def test_label_mistakes_and_negative_increments_are_rejected():
+    registry = MetricsRegistry()
+    requests = registry.counter('test_requests_total', "Requests", ('component', 'outcome'))
+
+    with pytest.raises(ValueError):
+        requests.labels('chat')
+    with pytest.raises(ValueError):
+        requests.labels('chat', 'ok').inc(-1)
+    # Same name, different type or labels
+    with pytest.raises(ValueError):
+        registry.gauge('test_requests_total', "Requests", ('component', 'outcome'))
+    with pytest.raises(ValueError):
+        registry.counter('test_requests_total', "Requests", ('component',))
+    assert registry.counter('test_requests_total', "Requests", ('component', 'outcome')) is requests
+
+
+def test_label_values_and_help_text_are_escaped():
+    registry = MetricsRegistry()
+    gauge = registry.gauge('test_depth', 'Depth\nof "queues"', ('pool',))
+    gauge.labels('a"b\\c\nd').set(2)
+
+    text = registry.render()
+    assert '# HELP test_depth Depth\\nof \\"queues\\"' in text
+    assert 'test_depth{pool="a\\"b\\\\c\\nd"} 2.0' in text
+
+
+def test_histogram_buckets_are_cumulative_with_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.histogram('test_latency_seconds', "Latency", ('path',), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        latency.labels('fast').observe(value)
+
+    text = registry.render()
+    assert '# TYPE test_latency_seconds histogram' in text
+    samples = _samples(text)
+    assert samples['test_latency_seconds_bucket{path="fast",le="0.1"}'] == '2'
+    assert samples['test_latency_seconds_bucket{path="fast",le="1.0"}'] == '3'
+    assert samples['test_latency_seconds_bucket{path="fast",le="+Inf"}'] == '4'
+    assert samples['test_latency_seconds_sum{path="fast"}'] == '3.65'
+    assert samples['test_latency_seconds_count{path="fast"}'] == '4'
+
+
+def test_collectors_run_per_scrape_and_a_failing_one_is_counted():
+    registry = MetricsRegistry()
+    depth = registry.gauge('test_depth', "Depth")
+    calls = []
+
+    def failing():
+        raise RuntimeError("source gone")
+
+    registry.register_collector('depth', lambda: depth.set(1))
+    # Re-registering a key replaces the collector instead of adding another
+    registry.register_collector('depth', lambda: (calls.append(1), depth.set(len(calls))))
+    registry.register_collector('broken', failing)
+
+    assert _samples(registry.render())['test_depth'] == '1.0'
+    assert _samples(registry.render())['test_depth'] == '2.0'
+    assert calls == [1, 1]
+    assert registry.collector_errors == 2
+
+
+def test_cache_lookups_are_exported_as_a_counter():
+    registry = MetricsRegistry()
+    stats = {'hits': 3, 'misses': 1}
+    registry.register_collector('cache', lambda: registry.observe_cache('routes', stats['hits'], stats['misses']))
+
+    text = registry.render()
+    assert '# TYPE mama_bear_cache_lookups_total counter' in text
+    samples = _samples(text)
+    assert samples['mama_bear_cache_lookups_total{cache="routes",result="hit"}'] == '3.0'
+    assert samples['mama_bear_cache_lookups_total{cache="routes",result="miss"}'] == '1.0'
+    assert samples['mama_bear_cache_hit_ratio{cache="routes"}'] == '0.75'
+
+    # The counter follows the cache's running totals rather than adding them up
+    stats['hits'] = 5
+    samples = _samples(registry.render())
+    assert samples['mama_bear_cache_lookups_total{cache="routes",result="hit"}'] == '5.0'
+    assert samples['mama_bear_cache_lookups_total{cache="routes",result="miss"}'] == '1.0'
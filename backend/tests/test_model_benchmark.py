@@ -0,0 +1,105 @@
+"""
+Model discovery/benchmark engine against the stub provider: concurrency under
+the per-provider limits, probe-first skipping, percentile stats, the results
+file and latency tiers fed back into a registry.
+"""
+
+import sys
+import json
+import time
+import asyncio
+from dataclasses import dataclass
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.model_benchmark import (
+    ModelBenchmark, RateLimiter, StubProvider, latency_tier, registry_with_measured_tiers, write_results
+)
+
+PROFILES = {"fast-model": (20.0, 400.0), "slow-model": (120.0, 100.0)}
+
+
+@dataclass
+class RegistryEntry:
+    id: str
+    latency_tier: str
+
+
+def _run(benchmark, models):
+    return asyncio.run(benchmark.run(models))
+
+
+def test_samples_run_concurrently_within_limits():
+    stub = StubProvider(PROFILES, jitter=0.0, seed=1)
+    benchmark = ModelBenchmark({"stub": stub}, samples=6, limits={"stub": (60000, 4)})
+
+    results = _run(benchmark, {"stub": ["fast-model", "slow-model"]})
+
+    assert stub.calls == 12
+    # Samples overlap up to the provider's concurrency limit, and no further
+    assert stub.peak_in_flight == 4
+    assert results["models"]["stub/slow-model"]["succeeded"] == 6
+
+
+def test_unavailable_models_get_a_single_probe():
+    stub = StubProvider(PROFILES, jitter=0.0, unavailable=("missing-model",), seed=1)
+    results = _run(ModelBenchmark({"stub": stub}, samples=5), {"stub": ["fast-model", "missing-model"]})
+
+    missing = results["models"]["stub/missing-model"]
+    assert missing["status"] == "failed"
+    assert missing["samples"] == 1
+    assert "404" in missing["errors"][0]
+    assert stub.calls == 6
+
+
+def test_percentiles_ttft_and_throughput():
+    stub = StubProvider(PROFILES, jitter=0.0, output_tokens=24, seed=1)
+    results = _run(ModelBenchmark({"stub": stub}, samples=4), {"stub": ["fast-model", "slow-model"]})
+
+    fast, slow = results["models"]["stub/fast-model"], results["models"]["stub/slow-model"]
+    for result in (fast, slow):
+        assert set(result["latency_ms"]) >= {"p50", "p90", "p95", "p99", "mean"}
+        assert result["ttft_ms"]["p50"] <= result["latency_ms"]["p50"]
+        assert result["output_tokens"]["p50"] == 24
+    assert fast["ttft_ms"]["p50"] < slow["ttft_ms"]["p50"]
+    assert fast["tokens_per_second"]["p50"] > slow["tokens_per_second"]["p50"]
+    assert fast["latency_tier"] == "ultra_fast"
+
+
+def test_rate_limiter_spaces_requests():
+    async def burst():
+        limiter = RateLimiter(requests_per_minute=600, max_concurrency=2)
+        start = time.perf_counter()
+        for _ in range(4):
+            async with limiter:
+                pass
+        return time.perf_counter() - start
+
+    # Two requests burst, the next two wait 0.1s each at 10 requests/second
+    assert asyncio.run(burst()) >= 0.18
+
+
+def test_results_file_regenerates_registry_tiers(tmp_path):
+    stub = StubProvider({"gemini-fast": (20.0, 400.0), "gemini-slow": (2500.0, 400.0)}, jitter=0.0, seed=1)
+    results = _run(ModelBenchmark({"google_ai": stub}, samples=1, limits={"google_ai": (60000, 4)}),
+                   {"google_ai": ["gemini-fast", "gemini-slow"]})
+    path = tmp_path / "model_benchmark.json"
+    write_results(results, str(path))
+
+    registry = {
+        "speed_demon": RegistryEntry("gemini-fast", "medium"),
+        "deep_thinker": RegistryEntry("models/gemini-slow", "fast"),
+        "untested": RegistryEntry("gemini-other", "fast"),
+    }
+    updated, changes = registry_with_measured_tiers(json.loads(path.read_text()), registry)
+
+    assert changes == {"speed_demon": ("medium", "ultra_fast"), "deep_thinker": ("fast", "slow")}
+    assert updated["untested"] is registry["untested"]
+    assert registry["speed_demon"].latency_tier == "medium"
+
+
+def test_latency_tier_thresholds():
+    assert [latency_tier(ms) for ms in (120, 700, 1500, 4000)] == ["ultra_fast", "fast", "medium", "slow"]
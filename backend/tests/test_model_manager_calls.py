@@ -0,0 +1,79 @@
+"""
+Model manager provider calls: a call queued behind its account's concurrency
+limit still goes out under its own account's API key, whatever other
+accounts configured while it waited.
+"""
+
+import sys
+import asyncio
+import logging
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+genai = pytest.importorskip("google.generativeai")
+
+from services import mama_bear_model_manager
+from services.mama_bear_model_manager import MamaBearModelManager
+from services.metrics_registry import get_metrics_registry
+from services.single_flight import SingleFlight
+
+
+class FakeGenai:
+    """genai's process-wide key, read when the SDK builds its client"""
+
+    def __init__(self, release):
+        self.api_key = None
+        self.sent = []
+        self.release = release
+        fake = self
+
+        class GenerativeModel:
+            def __init__(self, name, **kwargs):
+                self.name = name
+
+            async def generate_content_async(self, content, **kwargs):
+                fake.sent.append((content, fake.api_key))
+                if content == 'first':
+                    await fake.release.wait()
+                return type('Response', (), {'text': content})()
+
+        self.GenerativeModel = GenerativeModel
+
+    def configure(self, api_key=None, **kwargs):
+        self.api_key = api_key
+
+
+def test_queued_call_is_sent_under_its_own_account(monkeypatch):
+    manager = MamaBearModelManager.__new__(MamaBearModelManager)
+    manager.logger = logging.getLogger("test")
+    manager.models = manager._initialize_models()
+    manager.single_flight = SingleFlight("test_model_manager", enabled=False)
+    manager.metrics_registry = get_metrics_registry()
+    primary = manager.models['gemini-2.5-pro-primary']
+    backup = manager.models['gemini-2.5-pro-backup']
+    assert primary.api_key != backup.api_key
+
+    async def main():
+        fake = FakeGenai(asyncio.Event())
+        monkeypatch.setattr(mama_bear_model_manager, 'genai', fake)
+        limiter = manager._limiter(primary)
+        limiter.limit = 1.0
+
+        first = asyncio.create_task(manager._make_api_call(primary, [{'content': 'first'}]))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(manager._make_api_call(primary, [{'content': 'queued'}]))
+        await asyncio.sleep(0)
+        # Another account's call runs while the second primary call waits for a slot
+        assert await manager._make_api_call(backup, [{'content': 'other'}]) == 'other'
+        fake.release.set()
+        await asyncio.gather(first, queued)
+        return fake.sent
+
+    sent = asyncio.run(main())
+    assert sorted(sent) == sorted([('first', primary.api_key), ('other', backup.api_key),
+                                   ('queued', primary.api_key)])
@@ -0,0 +1,98 @@
+"""
+Quota forecaster: Holt's level and trend over the per-minute request counts,
+and the projected time until the day and minute quotas run out.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+pytest.importorskip("numpy")
+
+from services.quota_forecaster import QuotaForecaster
+
+KEY = "gemini-2.5-flash@primary"
+START = 1_000_000 * 60  # on a minute boundary
+
+
+def _forecaster(per_minute_counts, requests_per_minute=60, requests_per_day=1500):
+    forecaster = QuotaForecaster(window_minutes=60, horizon_minutes=60, refresh_seconds=0)
+    forecaster.register(KEY, requests_per_minute, requests_per_day)
+    for minute, count in enumerate(per_minute_counts):
+        forecaster.record(KEY, count, now=START + minute * 60)
+    return forecaster
+
+
+def test_steady_rate_has_flat_trend():
+    forecast = _forecaster([10] * 30).forecast({KEY: 300}, now=START + 30 * 60)[KEY]
+
+    assert forecast['predicted_rpm'] == pytest.approx(10.0)
+    assert forecast['trend_per_minute'] == pytest.approx(0.0)
+    # 1200 left at 10 a minute is two hours away, beyond the one-hour horizon
+    assert forecast['time_to_exhaustion'] is None
+    assert forecast['pressure'] == 0.0
+
+
+def test_day_exhaustion_eta_at_a_steady_rate():
+    forecast = _forecaster([10] * 30).forecast({KEY: 1000}, now=START + 30 * 60)[KEY]
+
+    # 500 left at 10 a minute: 50 minutes
+    assert forecast['day_exhaustion_seconds'] == pytest.approx(3000.0)
+    assert forecast['minute_exhaustion_seconds'] is None
+    assert forecast['time_to_exhaustion'] == pytest.approx(3000.0)
+    assert forecast['pressure'] == pytest.approx(1 - 3000 / 3600, abs=1e-3)
+
+
+def test_rising_rate_brings_exhaustion_forward():
+    steady = _forecaster([10] * 30).forecast({KEY: 1000}, now=START + 30 * 60)[KEY]
+    rising = _forecaster(list(range(1, 31))).forecast({KEY: 1000}, now=START + 30 * 60)[KEY]
+
+    assert rising['trend_per_minute'] > 0.5
+    assert 20 < rising['predicted_rpm'] <= 30
+    assert rising['time_to_exhaustion'] < steady['time_to_exhaustion']
+
+
+def test_burst_in_the_current_minute_hits_the_minute_quota():
+    forecaster = _forecaster([10] * 30)
+    # 50 of the 60 allowed this minute in the first half of it
+    forecaster.record(KEY, 50, now=START + 30 * 60 + 10)
+    forecast = forecaster.forecast({KEY: 350}, now=START + 30 * 60 + 30)[KEY]
+
+    assert forecast['predicted_rpm'] > 10
+    assert forecast['minute_exhaustion_seconds'] is not None
+    assert forecast['minute_exhaustion_seconds'] < 30
+    assert forecast['time_to_exhaustion'] == forecast['minute_exhaustion_seconds']
+
+
+def test_exhausted_day_and_idle_history():
+    forecaster = _forecaster([10] * 30)
+    exhausted = forecaster.forecast({KEY: 1500}, now=START + 30 * 60)[KEY]
+    assert exhausted['time_to_exhaustion'] == 0.0
+    assert exhausted['pressure'] == 1.0
+
+    # Two idle hours clear the window
+    idle = forecaster.forecast({KEY: 0}, now=START + 150 * 60)[KEY]
+    assert idle['predicted_rpm'] == pytest.approx(0.0)
+    assert idle['time_to_exhaustion'] is None
+
+
+def test_day_usage_is_only_gathered_when_the_forecast_is_recomputed():
+    forecaster = _forecaster([10] * 30)
+    forecaster.refresh_seconds = 5
+    calls = []
+
+    def day_usage():
+        calls.append(True)
+        return {KEY: 300}
+
+    now = START + 30 * 60
+    first = forecaster.forecast(day_usage, now=now)
+    assert forecaster.forecast(day_usage, now=now + 1) is first
+    assert len(calls) == 1
+    forecaster.forecast(day_usage, now=now + 6)
+    assert len(calls) == 2
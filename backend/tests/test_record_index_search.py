@@ -0,0 +1,62 @@
+"""
+Record index search: case-insensitive substring matching over the text
+fields (what the workbench's linear scan did), narrowed by indexed keys and
+kept current as records are replaced and removed.
+"""
+
+import sys
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.record_index import RecordIndex
+
+TEMPLATES = [
+    {"id": "research", "name": "Research Specialist", "type": "research",
+     "description": "Deep research agent with web scraping"},
+    {"id": "ui", "name": "UI Designer", "type": "ui_design",
+     "description": "Builds accessible interfaces"},
+    {"id": "api", "name": "API Architect", "type": "api",
+     "description": "Designs REST and GraphQL endpoints"},
+]
+
+
+def _index():
+    index = RecordIndex(keys=("type",), text_fields=("name", "description"))
+    for template in TEMPLATES:
+        index.put(template["id"], template)
+    return index
+
+
+def _linear(query, records=TEMPLATES):
+    query = query.lower()
+    return {r["id"] for r in records if query in r["name"].lower() or query in r["description"].lower()}
+
+
+def test_search_matches_substrings_like_the_linear_scan():
+    index = _index()
+    for query in ("search", "Research", "SPEC", "igner", "research agent", "st and gr",
+                  "sign", "ui", "i", "", "  ", "missing", "rest-api"):
+        assert index.search(query) == _linear(query), query
+
+
+def test_search_with_filters():
+    index = _index()
+    assert index.search("design", type="api") == {"api"}
+    assert index.search("design", type="ui_design") == {"ui"}
+    assert index.search("", type="research") == {"research"}
+    assert index.search("design", type=None) == {"ui", "api"}
+
+
+def test_search_follows_replaced_and_removed_records():
+    index = _index()
+    index.put("ui", {"id": "ui", "name": "Frontend Helper", "type": "ui_design", "description": ""})
+    assert index.search("designer") == set()
+    assert index.search("front") == {"ui"}
+
+    index.remove("api")
+    assert index.search("design") == set()
+    assert index.search("architect") == set()
+    assert len(index) == 2
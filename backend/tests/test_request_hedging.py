@@ -0,0 +1,53 @@
+"""
+Request hedging: the hedge delay follows the primary's p95 from every call,
+hedged or not, and a hedge that wins cancels the slower primary.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.request_hedging import HedgeBudget, RequestHedger
+
+
+def test_unhedged_calls_tune_the_hedge_delay():
+    hedger = RequestHedger(default_delay_ms=3000.0)
+    assert hedger.hedge_delay_ms("primary") == 3000.0
+
+    for latency_ms in range(100, 120):
+        hedger.record_latency("primary", float(latency_ms))
+
+    assert 115.0 <= hedger.hedge_delay_ms("primary") <= 119.0
+    assert hedger.get_stats()["requests"] == 0
+
+
+def test_hedge_fires_after_the_learned_delay_and_wins():
+    hedger = RequestHedger(budget=HedgeBudget(ratios={"low": 1.0}), default_delay_ms=3000.0)
+    for _ in range(20):
+        hedger.record_latency("primary", 20.0)
+    cancelled = []
+
+    async def slow_primary():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+        return "primary"
+
+    async def fast_backup():
+        await asyncio.sleep(0.01)
+        return "backup"
+
+    result, outcome = asyncio.run(hedger.run("primary", slow_primary, "backup", fast_backup, tier="low"))
+
+    assert result == "backup"
+    assert outcome.hedged and outcome.winner_key == "backup"
+    # Learned ~20ms, not the 3s default
+    assert outcome.latency_ms < 1000
+    assert cancelled == [True]
+    assert hedger.get_stats()["hedge_wins"] == 1
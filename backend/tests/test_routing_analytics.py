@@ -0,0 +1,98 @@
+"""
+Routing analytics: decisions and executions fold into the totals, per-route,
+per-user and time-bucket aggregates; time ranges never reach back before
+their start; old buckets are pruned; totals are read consistently while
+other threads record.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from datetime import datetime, timedelta
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.routing_analytics import RoutingAnalytics, parse_time_range
+
+NOW = datetime(2026, 3, 1, 12, 37, 10)
+
+
+def _decide(analytics, route, minutes_ago, user_id=None, score=5.0):
+    analytics.record_decision(route, score, 0.8, 0.01, 0.1, user_id=user_id,
+                              timestamp=NOW - timedelta(minutes=minutes_ago))
+
+
+def test_decisions_and_executions_fold_into_every_slice():
+    analytics = RoutingAnalytics()
+    _decide(analytics, 'e2b', 1, user_id='u1', score=2.0)
+    _decide(analytics, 'scrapybara', 2, user_id='u2', score=8.0)
+    analytics.record_execution('e2b', True, 1.5, 0.01, user_id='u1', timestamp=NOW)
+    analytics.record_execution('scrapybara', False, 30.0, 0.2, user_id='u2', timestamp=NOW)
+
+    totals = analytics.totals_snapshot()
+    assert totals.decisions == 2 and totals.route_counts == {'e2b': 1, 'scrapybara': 1}
+    assert totals.average_complexity == 5.0
+    assert totals.success_rate == 0.5
+    assert totals.scrapybara_only_cost_sum == pytest.approx(0.2)
+
+    assert analytics.route_summary()['scrapybara']['success_rate'] == 0.0
+    user = analytics.summarize(since=NOW - timedelta(hours=1), user_id='u1')
+    assert (user.decisions, user.executions, user.average_execution_time) == (1, 1, 1.5)
+    assert analytics.summarize(user_id='nobody').decisions == 0
+
+
+def test_a_range_never_includes_events_before_its_start():
+    analytics = RoutingAnalytics()
+    # Within the last hour, and just over an hour ago in the same hour of the clock
+    _decide(analytics, 'e2b', 10)
+    _decide(analytics, 'e2b', 50)
+    _decide(analytics, 'scrapybara', 70)
+    _decide(analytics, 'scrapybara', 95)
+
+    last_hour = analytics.summarize(since=NOW - timedelta(hours=1))
+    assert last_hour.route_counts == {'e2b': 2}
+    assert analytics.summarize(since=NOW - timedelta(hours=2)).decisions == 4
+    assert analytics.summarize().decisions == 4
+
+
+def test_buckets_outside_retention_are_pruned():
+    analytics = RoutingAnalytics(retention_hours=1)
+    _decide(analytics, 'e2b', 120, user_id='u1')
+    _decide(analytics, 'e2b', 0, user_id='u2')
+
+    assert analytics.summarize().decisions == 1
+    assert analytics.summarize(user_id='u1').decisions == 0
+    # All-time totals are kept
+    assert analytics.totals_snapshot().decisions == 2
+
+
+def test_totals_snapshot_is_consistent_under_concurrent_writes():
+    analytics = RoutingAnalytics()
+    stop = threading.Event()
+
+    def record():
+        while not stop.is_set():
+            analytics.record_decision('e2b', 1.0, 1.0, 0.0, 0.0)
+
+    writers = [threading.Thread(target=record) for _ in range(4)]
+    for writer in writers:
+        writer.start()
+    try:
+        for _ in range(500):
+            snapshot = analytics.totals_snapshot()
+            assert snapshot.route_counts.get('e2b', 0) == snapshot.decisions
+            assert snapshot.score_sum == snapshot.decisions
+    finally:
+        stop.set()
+        for writer in writers:
+            writer.join()
+
+
+def test_parse_time_range():
+    assert parse_time_range('1h') == timedelta(hours=1)
+    assert parse_time_range('7d') == timedelta(days=7)
+    assert parse_time_range('soon') == timedelta(hours=24)
@@ -0,0 +1,86 @@
+"""
+Scout workflow execution: stages start only after their dependencies, run
+concurrently where the dependency graph allows, and a rerun resumes from the
+stage checkpoints instead of repeating stages that already succeeded.
+"""
+
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+pytest.importorskip("google.generativeai")
+
+from services.enhanced_gemini_scout_orchestration import (
+    EnhancedGeminiScoutOrchestrator, StageCheckpointStore, STAGE_DEPENDENCIES
+)
+
+
+def _orchestrator(tmp_path, failing=()):
+    """Orchestrator whose stages are stubbed: each one logs its start and end"""
+    orchestrator = EnhancedGeminiScoutOrchestrator.__new__(EnhancedGeminiScoutOrchestrator)
+    orchestrator.active_workflows = {}
+    orchestrator.checkpoints = StageCheckpointStore(directory=str(tmp_path / "checkpoints"), enabled=True)
+    orchestrator.events = []
+    orchestrator.contexts = {}
+
+    async def execute_workflow_stage(stage, prompt, context):
+        orchestrator.events.append(("start", stage.value))
+        orchestrator.contexts[stage.value] = sorted(context['completed_stages'])
+        await asyncio.sleep(0.01)
+        orchestrator.events.append(("end", stage.value))
+        if stage.value in failing:
+            return {'success': False, 'error': f"{stage.value} broke", 'stage': stage.value}
+        return {'success': True, 'content': f"{stage.value} output", 'stage': stage.value, 'duration': 0.01}
+
+    orchestrator.execute_workflow_stage = execute_workflow_stage
+    return orchestrator
+
+
+def _run(orchestrator, workflow_id="wf"):
+    return asyncio.run(orchestrator.execute_full_workflow("todo app", {"frontend": "react"}, workflow_id=workflow_id))
+
+
+def test_stages_wait_for_their_dependencies(tmp_path):
+    orchestrator = _orchestrator(tmp_path)
+    result = _run(orchestrator)
+
+    assert result['metadata']['successful_stages'] == 5
+    position = {event: i for i, event in enumerate(orchestrator.events)}
+    for stage, deps in STAGE_DEPENDENCIES.items():
+        for dep in deps:
+            assert position[("end", dep.value)] < position[("start", stage.value)]
+        assert orchestrator.contexts[stage.value] == sorted(dep.value for dep in deps)
+
+    # Environment and coding only need the plan, so they overlap
+    assert position[("start", "coding")] < position[("end", "environment")]
+    assert position[("start", "environment")] < position[("end", "coding")]
+    assert "testing" in orchestrator.contexts["deployment"]
+
+
+def test_failed_stages_are_reported(tmp_path):
+    result = _run(_orchestrator(tmp_path, failing=("testing",)))
+
+    assert result['success']
+    assert result['metadata']['failed_stages'] == ["testing"]
+    # Deployment still runs, without test results to build on
+    assert result['results']['deployment']['success']
+
+
+def test_rerun_resumes_from_checkpoints(tmp_path):
+    _run(_orchestrator(tmp_path, failing=("testing",)), workflow_id="first")
+
+    rerun = _orchestrator(tmp_path)
+    result = _run(rerun, workflow_id="second")
+
+    started = [stage for event, stage in rerun.events if event == "start"]
+    # Deployment's checkpoint was keyed on missing test results, so it reruns too
+    assert started == ["testing", "deployment"]
+    assert result['metadata']['stages_from_checkpoint'] == 3
+    assert all(result['results'][stage]['from_checkpoint'] for stage in ("planning", "environment", "coding"))
+    assert result['metadata']['failed_stages'] == []
@@ -0,0 +1,144 @@
+"""
+Service graph startup: dependency order, plain inits kept off the event loop,
+timeouts falling back to degraded mode, and a late-starting service swapping
+itself and the services built on its fallback back in.
+"""
+
+import sys
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.service_graph import ServiceGraph, ServiceInitError
+
+
+class Fallback:
+    pass
+
+
+def test_services_start_after_their_dependencies():
+    started = []
+
+    def make(name):
+        def init(**deps):
+            started.append(name)
+            return (name, sorted(deps))
+        return init
+
+    graph = ServiceGraph()
+    graph.add('orchestrator', make('orchestrator'), depends_on=('memory', 'models'))
+    graph.add('memory', make('memory'))
+    graph.add('models', make('models'), depends_on=('config',))
+    graph.add('config', make('config'))
+    services = asyncio.run(graph.start())
+
+    assert started.index('orchestrator') > max(started.index('memory'), started.index('models'))
+    assert started.index('models') > started.index('config')
+    assert services['orchestrator'] == ('orchestrator', ['memory', 'models'])
+    order = graph.topological_order()
+    for name, spec in graph.specs.items():
+        assert all(order.index(dependency) < order.index(name) for dependency in spec.depends_on)
+
+
+def test_unknown_and_cyclic_dependencies_are_rejected():
+    graph = ServiceGraph()
+    graph.add('a', lambda b: None, depends_on=('b',))
+    graph.add('b', lambda a: None, depends_on=('a',))
+    with pytest.raises(ValueError, match="cycle"):
+        graph.topological_order()
+
+    graph = ServiceGraph()
+    graph.add('a', lambda missing: None, depends_on=('missing',))
+    with pytest.raises(ValueError, match="undeclared"):
+        graph.topological_order()
+
+
+def test_plain_inits_run_off_the_event_loop():
+    threads = {}
+    loop_ran = threading.Event()
+
+    def blocking_init():
+        threads['blocking'] = threading.current_thread().name
+        # Run inline on the loop, this would wait out its timeout
+        return loop_ran.wait(timeout=2.0)
+
+    async def async_init():
+        threads['async'] = threading.current_thread().name
+        loop_ran.set()
+        return True
+
+    def on_loop_init():
+        threads['on_loop'] = threading.current_thread().name
+        return asyncio.get_running_loop() is not None
+
+    graph = ServiceGraph()
+    graph.add('blocking', blocking_init)
+    graph.add('async', async_init)
+    graph.add('on_loop', on_loop_init, on_loop=True)
+    services = asyncio.run(graph.start())
+
+    assert services == {'blocking': True, 'async': True, 'on_loop': True}
+    assert threads['blocking'].startswith('service-init')
+    assert threads['async'] == threads['on_loop'] == threading.current_thread().name
+
+
+def test_timeouts_degrade_optional_services_and_fail_required_ones():
+    release = threading.Event()
+
+    async def hangs():
+        await asyncio.sleep(10)
+
+    graph = ServiceGraph()
+    graph.add('optional', lambda: release.wait(5.0), optional=True, timeout=0.05, fallback=Fallback)
+    graph.add('dependant', lambda optional: optional, depends_on=('optional',))
+    graph.add('required', hangs, timeout=0.05)
+    graph.add('downstream', lambda required: required, depends_on=('required',), optional=True)
+    try:
+        with pytest.raises(ServiceInitError, match="required \\(timed out after 0.05s\\)"):
+            asyncio.run(graph.start())
+    finally:
+        release.set()
+
+    status = graph.get_status()['services']
+    assert status['optional']['state'] == 'degraded'
+    assert isinstance(graph.specs['dependant'].instance, Fallback)
+    assert status['required']['state'] == 'failed'
+    assert status['downstream']['state'] == 'degraded'
+    assert 'dependencies unavailable: required' in status['downstream']['error']
+
+
+def test_late_ready_service_rebuilds_its_dependants():
+    release = threading.Event()
+    late = []
+    handed_over = threading.Event()
+
+    def orchestrator(memory):
+        if isinstance(memory, Fallback):
+            raise RuntimeError("needs the real memory manager")
+        return ('orchestrator', memory)
+
+    def on_late_ready(name, service):
+        late.append((name, service))
+        if name == 'orchestrator':
+            handed_over.set()
+
+    graph = ServiceGraph(on_late_ready=on_late_ready)
+    graph.add('memory', lambda: release.wait(5.0) and 'memory', optional=True, timeout=0.05, fallback=Fallback)
+    graph.add('orchestrator', orchestrator, depends_on=('memory',), optional=True, fallback=lambda: 'mock')
+    services = asyncio.run(graph.start())
+
+    assert isinstance(services['memory'], Fallback)
+    assert services['orchestrator'] == 'mock'
+
+    release.set()
+    assert handed_over.wait(5.0)
+    assert late == [('memory', 'memory'), ('orchestrator', ('orchestrator', 'memory'))]
+    status = graph.get_status()['services']
+    assert status['memory']['state'] == status['orchestrator']['state'] == 'ready'
+    assert status['orchestrator']['late_ready_seconds'] is not None
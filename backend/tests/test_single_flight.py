@@ -0,0 +1,148 @@
+"""
+Single-flight coalescing: identical concurrent calls share one provider
+call, its result and its exception; a cancelled leader hands over to a
+follower; streams are shared between concurrent readers, and a caller that
+arrives after a stream was abandoned gets a fresh stream, not a truncated one.
+"""
+
+import sys
+import time
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.single_flight import SingleFlight, request_key
+
+
+def test_request_key_ignores_whitespace_and_key_order():
+    assert request_key("gemini", "hello   world\n") == request_key("gemini", " hello world")
+    assert request_key("m", "p", config={"a": 1, "b": [1, 2]}) == request_key("m", "p", config={"b": [1, 2], "a": 1})
+    assert request_key("m", "p", temperature=0.1) != request_key("m", "p", temperature=0.2)
+
+
+def test_concurrent_identical_calls_share_one():
+    flight = SingleFlight("test_coalesce", enabled=True)
+    calls = []
+
+    async def fetch(value):
+        calls.append(value)
+        await asyncio.sleep(0.05)
+        return value * 2
+
+    async def main():
+        same = [flight.run("a", lambda: fetch(21)) for _ in range(5)]
+        other = flight.run("b", lambda: fetch(1))
+        return await asyncio.gather(*same, other)
+
+    assert asyncio.run(main()) == [42] * 5 + [2]
+    assert calls == [21, 1]
+    stats = flight.get_stats()
+    assert (stats['leaders'], stats['followers'], stats['in_flight']) == (2, 4, 0)
+
+    # Nothing is cached once the call has finished
+    asyncio.run(flight.run("a", lambda: fetch(21)))
+    assert calls == [21, 1, 21]
+
+
+def test_followers_share_the_leaders_exception():
+    flight = SingleFlight("test_errors", enabled=True)
+    calls = []
+
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        raise ValueError("provider down")
+
+    async def main():
+        return await asyncio.gather(*(flight.run("k", fail) for _ in range(3)), return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(isinstance(r, ValueError) and str(r) == "provider down" for r in results)
+
+
+def test_follower_takes_over_from_a_cancelled_leader():
+    flight = SingleFlight("test_cancel", enabled=True)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        leader = asyncio.create_task(flight.run("k", fetch))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flight.run("k", fetch))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+    assert len(calls) == 2
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_concurrent_readers_share_one_stream():
+    flight = SingleFlight("test_stream", enabled=True)
+    opened = []
+    release = threading.Event()
+
+    def source():
+        opened.append(1)
+        release.wait(2.0)
+        yield from ("a", "b", "c")
+
+    results = {}
+
+    def read(name):
+        results[name] = list(flight.stream("k", source))
+
+    def wait_for(condition):
+        deadline = time.monotonic() + 2.0
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    leader = threading.Thread(target=read, args=("leader",))
+    follower = threading.Thread(target=read, args=("follower",))
+    leader.start()
+    wait_for(lambda: opened)
+    # Join while the leader is still waiting for the first chunk
+    follower.start()
+    wait_for(lambda: flight.get_stats()['stream_followers'] == 1)
+    release.set()
+    leader.join(2.0)
+    follower.join(2.0)
+
+    assert results == {"leader": ["a", "b", "c"], "follower": ["a", "b", "c"]}
+    assert len(opened) == 1
+    assert flight.get_stats()['in_flight'] == 0
+
+
+def test_stream_joined_after_abandonment_starts_over():
+    flight = SingleFlight("test_abandon", enabled=True)
+    closed = []
+
+    def source():
+        try:
+            yield from ("a", "b", "c")
+        finally:
+            closed.append(1)
+
+    first = flight.stream("k", source)
+    assert next(first) == "a"
+    # Keep the abandoned entry registered, as if the next caller got in
+    # before the abandoning reader dropped it
+    flight._drop_stream = lambda key, shared: None
+    first.close()
+
+    assert closed == [1]
+    assert list(flight.stream("k", source)) == ["a", "b", "c"]
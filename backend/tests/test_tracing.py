@@ -0,0 +1,143 @@
+"""
+Request tracing: spans nest under the span that was active when they opened,
+the active trace follows awaits, concurrent tasks and to_thread workers, stage
+time isn't double counted, and the JSONL exporter is opt-in and rotates by size.
+"""
+
+import sys
+import json
+import time
+import asyncio
+from pathlib import Path
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.tracing import NULL_SPAN, JsonlTraceExporter, Tracer, current_request_id
+
+
+def _spans(tracer, request_id):
+    return {span['name']: span for span in tracer.get_trace(request_id)['spans']}
+
+
+def test_spans_nest_and_stages_are_not_double_counted():
+    tracer = Tracer(enabled=True, export_path="")
+    with tracer.start_trace("request", request_id="r1"):
+        with tracer.span("orchestra.call", stage="model_call"):
+            with tracer.span("provider.call", stage="model_call"):
+                time.sleep(0.01)
+        with tracer.span("post", stage="post_processing") as span:
+            span.set_attribute("tokens", 12)
+        # A nested entry point opens a child span, not a second trace
+        with tracer.start_trace("agent.handle"):
+            pass
+
+    spans = _spans(tracer, "r1")
+    root = spans["request"]
+    assert spans["orchestra.call"]["parent_id"] == root["span_id"]
+    assert spans["provider.call"]["parent_id"] == spans["orchestra.call"]["span_id"]
+    assert spans["agent.handle"]["parent_id"] == root["span_id"]
+    assert spans["post"]["attributes"] == {"tokens": 12}
+
+    trace = tracer.get_trace("r1")
+    assert trace["stages"]["model_call"] == spans["orchestra.call"]["duration_ms"]
+    assert tracer.get_stats()["traces"] == 1
+
+
+def test_errors_mark_the_span_and_the_trace():
+    tracer = Tracer(enabled=True, export_path="")
+    try:
+        with tracer.start_trace("request", request_id="r2"):
+            with tracer.span("model", stage="model_call"):
+                raise ValueError("quota")
+    except ValueError:
+        pass
+
+    spans = _spans(tracer, "r2")
+    assert spans["model"]["status"] == "error"
+    assert spans["model"]["attributes"]["error.type"] == "ValueError"
+    assert tracer.get_trace("r2")["status"] == "error"
+    assert tracer.get_stats()["errors"] == 1
+
+
+def test_trace_context_follows_tasks_and_threads():
+    tracer = Tracer(enabled=True, export_path="")
+    seen = []
+
+    def blocking_call(name):
+        seen.append(current_request_id())
+        with tracer.span(name, stage="model_call"):
+            time.sleep(0.005)
+
+    async def friend(name):
+        with tracer.span(f"{name}.task"):
+            await asyncio.sleep(0.005)
+            await asyncio.to_thread(blocking_call, f"{name}.thread")
+
+    async def handle():
+        with tracer.start_trace("fanout", request_id="r3"):
+            await asyncio.gather(friend("a"), friend("b"))
+
+    asyncio.run(handle())
+
+    spans = _spans(tracer, "r3")
+    assert seen == ["r3", "r3"]
+    for name in ("a", "b"):
+        assert spans[f"{name}.task"]["parent_id"] == spans["fanout"]["span_id"]
+        assert spans[f"{name}.thread"]["parent_id"] == spans[f"{name}.task"]["span_id"]
+    # Nothing leaks out of the trace
+    assert current_request_id() is None
+
+
+def test_spans_outside_a_trace_and_disabled_tracing_are_no_ops():
+    tracer = Tracer(enabled=True, export_path="")
+    with tracer.span("orphan") as span:
+        assert span is NULL_SPAN
+
+    disabled = Tracer(enabled=False)
+    with disabled.start_trace("request", request_id="r4") as root:
+        assert root is NULL_SPAN
+    assert disabled.get_trace("r4") is None
+
+
+def test_file_export_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.delenv('TRACE_EXPORT_FILE', raising=False)
+    assert Tracer(enabled=True).exporter is None
+
+    path = tmp_path / "traces.jsonl"
+    monkeypatch.setenv('TRACE_EXPORT_FILE', str(path))
+    tracer = Tracer(enabled=True)
+    with tracer.start_trace("request", request_id="r5"):
+        pass
+    tracer.exporter.close()
+
+    [line] = path.read_text().splitlines()
+    assert json.loads(line)["request_id"] == "r5"
+    assert tracer.get_stats()["exported"] == 1
+
+
+def test_exporter_rotates_by_size_and_keeps_a_bounded_number_of_files(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(enabled=True, export_path="")
+    exporter = JsonlTraceExporter(str(path), max_bytes=2000, backups=2)
+    tracer.exporter = exporter
+
+    for n in range(40):
+        with tracer.start_trace("request", request_id=f"req-{n}", padding="x" * 200):
+            pass
+        # One trace per write, so every write checks the size
+        while exporter.pending:
+            time.sleep(0.001)
+    exporter.close()
+
+    files = sorted(p.name for p in tmp_path.iterdir())
+    assert files == ["traces.jsonl", "traces.jsonl.1", "traces.jsonl.2"]
+    assert all(p.stat().st_size <= 2000 for p in tmp_path.iterdir())
+    assert exporter.rotations > 2
+    # The newest trace is in the live file, the oldest ones are gone
+    live = [json.loads(line)["request_id"] for line in path.read_text().splitlines()]
+    assert live[-1] == "req-39"
+    kept = live + [json.loads(line)["request_id"]
+                   for name in files[1:] for line in (tmp_path / name).read_text().splitlines()]
+    assert "req-0" not in kept
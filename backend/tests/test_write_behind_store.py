@@ -0,0 +1,165 @@
+"""
+Write-behind store: updates coalesce, a batch commits all-or-nothing, a
+failed flush keeps its batch and the flusher thread keeps running, records
+survive a restart in creation order, and the workbench imports the old
+per-agent JSON files once.
+"""
+
+import sys
+import json
+import time
+import logging
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+# Add backend to path
+backend_dir = Path(__file__).parent.parent
+sys.path.append(str(backend_dir))
+
+from services.write_behind_store import WriteBehindStore
+
+
+def _store(tmp_path, **kwargs):
+    kwargs.setdefault('flush_interval', 3600)
+    return WriteBehindStore(str(tmp_path / "records.db"), 'records', indexed=('owner_id',), **kwargs)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_failed_flush_keeps_the_batch_and_the_flusher(tmp_path):
+    store = _store(tmp_path, flush_interval=0.01)
+    try:
+        unserializable = {'id': 'a'}
+        unserializable['self'] = unserializable
+        store.put('a', unserializable)
+        store.put('b', {'id': 'b', 'owner_id': 'u1'})
+
+        assert _wait_for(lambda: store.stats['flush_errors'] >= 2)
+        assert store.get_stats()['pending'] == 2
+
+        store.put('a', {'id': 'a', 'owner_id': 'u1'})
+        assert _wait_for(lambda: store.stats['rows_written'] == 2)
+        assert store._flusher.is_alive()
+        assert [record['id'] for record in store.load(owner_id='u1')] == ['a', 'b']
+    finally:
+        store.close()
+
+
+def test_updates_to_one_record_coalesce(tmp_path):
+    store = _store(tmp_path)
+    try:
+        for version in range(5):
+            store.put('a', {'id': 'a', 'owner_id': 'u1', 'version': version})
+        store.put('b', {'id': 'b', 'owner_id': 'u2'})
+        store.delete('b')
+
+        assert store.flush() == 2
+        assert store.stats['coalesced'] == 5
+        assert store.load() == [{'id': 'a', 'owner_id': 'u1', 'version': 4}]
+    finally:
+        store.close()
+
+
+class FailingDeletes:
+    """Connection whose DELETEs fail, after the batch's upserts have run"""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, *args):
+        return self.conn.execute(sql, *args)
+
+    def executemany(self, sql, rows):
+        if sql.startswith("DELETE"):
+            raise sqlite3.OperationalError("disk I/O error")
+        return self.conn.executemany(sql, rows)
+
+
+def test_a_batch_commits_all_or_nothing(tmp_path):
+    store = _store(tmp_path)
+    try:
+        store.put('a', {'id': 'a', 'owner_id': 'u1'})
+        store.flush()
+
+        conn = store._conn
+        store._conn = FailingDeletes(conn)
+        store.put('b', {'id': 'b', 'owner_id': 'u1'})
+        store.delete('a')
+        assert store.flush() == 0
+        rows = conn.execute("SELECT id FROM records").fetchall()
+        assert rows == [('a',)]
+
+        store._conn = conn
+        assert store.flush() == 2
+        assert [record['id'] for record in store.load()] == ['b']
+    finally:
+        store.close()
+
+
+def test_records_reload_after_restart_in_creation_order(tmp_path):
+    store = _store(tmp_path)
+    store.put('first', {'id': 'first', 'owner_id': 'u1', 'n': 1})
+    store.put('second', {'id': 'second', 'owner_id': 'u1', 'n': 1})
+    store.flush()
+    # A later update to the older record doesn't move it to the end
+    store.put('first', {'id': 'first', 'owner_id': 'u2', 'n': 2})
+    store.put('third', {'id': 'third', 'owner_id': 'u2', 'n': 1})
+    store.close()  # flushes what is pending
+
+    restarted = _store(tmp_path)
+    try:
+        assert [record['id'] for record in restarted.load()] == ['first', 'second', 'third']
+        assert [record['id'] for record in restarted.load(owner_id='u2')] == ['first', 'third']
+        assert restarted.load(owner_id='u2')[0]['n'] == 2
+        assert restarted.count() == 3
+    finally:
+        restarted.close()
+
+
+def test_workbench_imports_json_agents_once(tmp_path):
+    # The workbench module pulls in the provider and sandbox SDKs
+    AgentCreationWorkbench = pytest.importorskip("services.agent_creation_workbench").AgentCreationWorkbench
+    from services.record_index import RecordIndex
+
+    agents_dir = tmp_path / "agents"
+    agents_dir.mkdir()
+    for n, (status, created_at) in enumerate([('active', '2026-01-02'), ('stopped', '2026-01-03'),
+                                              ('paused', '2026-01-01')]):
+        (agents_dir / f"agent-{n}.json").write_text(json.dumps({
+            'id': f"agent-{n}", 'template_id': 'research', 'name': f"Agent {n}", 'status': status,
+            'config': {}, 'performance_metrics': {}, 'created_at': created_at, 'owner_id': 'u1'}))
+    (agents_dir / "broken.json").write_text("{not json")
+
+    def workbench():
+        bench = AgentCreationWorkbench.__new__(AgentCreationWorkbench)
+        bench.logger = logging.getLogger("test")
+        bench.agents_storage_path = str(agents_dir)
+        bench.agent_store = WriteBehindStore(str(tmp_path / "agents.db"), 'agents',
+                                             indexed=('owner_id', 'status'), flush_interval=3600)
+        bench.agent_index = RecordIndex(keys=('owner_id', 'status'), text_fields=('name',))
+        bench.active_agents = {}
+        bench._load_active_agents()
+        return bench
+
+    bench = workbench()
+    assert bench.agent_store.count() == 3
+    # Imported in the agents' own creation order, whatever order the files are listed in
+    assert list(bench.active_agents) == ['agent-2', 'agent-0']
+    assert [agent['id'] for agent in bench.agent_store.load()] == ['agent-2', 'agent-0', 'agent-1']
+    bench.agent_store.close()
+
+    # Later edits to the old files are not imported again
+    (agents_dir / "agent-1.json").write_text(json.dumps({'id': 'agent-1', 'status': 'active'}))
+    bench = workbench()
+    try:
+        assert bench.agent_store.count() == 3
+        assert sorted(bench.active_agents) == ['agent-0', 'agent-2']
+    finally:
+        bench.agent_store.close()
@@ -0,0 +1,263 @@
+"""
+Lazy component registry for Podplay Sanctuary
+Optional subsystems (Gemini Orchestra, Scout, Library, Express Mode, ADK...)
+are declared up front with the URL prefixes they serve, but nothing is
+imported until the first request under one of those prefixes or until the
+background warm-up gets to them.
+
+Flask does not allow registering blueprints once the app has served a
+request, so each component is mounted on its own small Flask app (sharing
+the main app's config, CORS and error handlers) and requests are routed to
+it by path prefix at the WSGI layer.
+
+SocketIO events and background job kinds are declared the same way. Their
+dispatchers are registered at startup, so an event or a recovered job that
+arrives before the component has loaded triggers the load instead of being
+dropped, and is then handed to the handler the component registered.
+"""
+
+import json
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Callable, Sequence, Tuple
+
+from werkzeug.wrappers import Response
+
+logger = logging.getLogger(__name__)
+
+
+def blueprint_prefixes(blueprint) -> List[str]:
+    """
+    Prefixes that cover every route of `blueprint`: its url_prefix plus the
+    first path segment of each rule. Several blueprints can share a
+    url_prefix (/api/chat), so a component claims only its own segments. A
+    rule whose first segment is a variable claims the whole url_prefix.
+    Importing the blueprint's module must stay cheap for this to be useful.
+    """
+    from flask import Flask
+
+    # Rules only exist once a blueprint is registered; a scratch app does not
+    # stop it being registered on the component's app later
+    scratch = Flask(blueprint.import_name)
+    scratch.register_blueprint(blueprint)
+    base = (blueprint.url_prefix or '').rstrip('/')
+
+    prefixes = set()
+    for rule in scratch.url_map.iter_rules():
+        if not rule.endpoint.startswith(f"{blueprint.name}."):
+            continue
+        segment = rule.rule[len(base):].strip('/').split('/')[0]
+        prefixes.add(base if not segment or '<' in segment else f"{base}/{segment}")
+    return sorted(prefixes)
+
+
+class LazyComponent:
+    """One optional subsystem: its URL prefixes and how to load it"""
+
+    def __init__(self, name: str, prefixes: Sequence[str], loader: Callable[[Any, Any], bool],
+                 description: str = '', enabled: bool = True,
+                 socket_events: Sequence[str] = (), job_kinds: Sequence[str] = ()):
+        self.name = name
+        self.prefixes = tuple(p.rstrip('/') for p in prefixes)
+        self.loader = loader
+        self.description = description
+        self.socket_events = tuple(socket_events)
+        self.job_kinds = tuple(job_kinds)
+        self.socket_handlers: Dict[Tuple[str, str], Callable] = {}
+        self.state = 'declared' if enabled else 'disabled'
+        self.app = None
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+        self.loaded_by: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == 'ready'
+
+
+class _ComponentSocketIO:
+    """
+    The SocketIO object a component's loader sees: handlers for the events the
+    component declared are kept for the startup dispatchers, anything else goes
+    straight to the real server
+    """
+
+    def __init__(self, socketio, component: LazyComponent):
+        self._socketio = socketio
+        self._component = component
+
+    def on(self, event: str, namespace: Optional[str] = None):
+        def decorator(handler):
+            self.on_event(event, handler, namespace)
+            return handler
+        return decorator
+
+    def on_event(self, event: str, handler: Callable, namespace: Optional[str] = None) -> None:
+        if event in self._component.socket_events:
+            self._component.socket_handlers[(event, namespace or '/')] = handler
+            return
+        logger.warning(f"⚠️ {self._component.name} registered undeclared socket event '{event}'; "
+                       f"it is only handled once the component has loaded")
+        self._socketio.on_event(event, handler, namespace=namespace)
+
+    def __getattr__(self, name):
+        return getattr(self._socketio, name)
+
+
+class LazyComponentRegistry:
+    """🧩 Declares optional components and loads them on first use or in the background"""
+
+    def __init__(self, socketio, app_factory: Callable[[str], Any]):
+        self.socketio = socketio
+        self.app_factory = app_factory
+        self.components: Dict[str, LazyComponent] = {}
+        self._warm_up_thread: Optional[threading.Thread] = None
+
+    def declare(self, name: str, prefixes: Sequence[str], loader: Callable[[Any, Any], bool],
+                description: str = '', enabled: bool = True,
+                socket_events: Sequence[str] = (), job_kinds: Sequence[str] = ()) -> LazyComponent:
+        """
+        `loader(component_app, socketio)` imports and registers the component; returns success.
+        `socket_events` and `job_kinds` list what the loader registers, so they can be
+        dispatched (loading the component first) before it has loaded.
+        """
+        component = LazyComponent(name, prefixes, loader, description, enabled, socket_events, job_kinds)
+        self.components[name] = component
+        if enabled and self.socketio is not None:
+            for event in component.socket_events:
+                self.socketio.on_event(event, self._socket_dispatcher(component, event))
+        return component
+
+    def _socket_dispatcher(self, component: LazyComponent, event: str, namespace: str = '/') -> Callable:
+        def dispatch(*args):
+            if not self.ensure_loaded(component.name, trigger='socket'):
+                return {'success': False, 'error': f"{component.name} is unavailable"}
+            handler = component.socket_handlers.get((event, namespace))
+            if handler is None:
+                logger.warning(f"⚠️ {component.name} did not register a handler for socket event '{event}'")
+                return None
+            return handler(*args)
+
+        return dispatch
+
+    def register_job_handlers(self, runner) -> None:
+        """
+        Stand in for each declared job kind until its component loads, so jobs
+        persisted by a previous run are recovered at startup; the first one to
+        run loads the component, whose own handler then replaces the stand-in
+        """
+        for component in self.components.values():
+            if component.state != 'declared':
+                continue
+            for kind in component.job_kinds:
+                if runner.get_handler(kind) is None:
+                    runner.register(kind, self._job_dispatcher(component, kind, runner))
+
+    def _job_dispatcher(self, component: LazyComponent, kind: str, runner) -> Callable:
+        async def dispatch(ctx):
+            if not await asyncio.to_thread(self.ensure_loaded, component.name, 'job'):
+                raise RuntimeError(f"{component.name} is unavailable: {component.error}")
+            handler = runner.get_handler(kind)
+            if handler is dispatch:
+                raise RuntimeError(f"{component.name} did not register a handler for job kind '{kind}'")
+            return await handler(ctx)
+
+        return dispatch
+
+    def ensure_loaded(self, name: str, trigger: str = 'request') -> bool:
+        component = self.components[name]
+        if component.state in ('ready', 'failed', 'disabled'):
+            return component.ready
+        with component._lock:
+            if component.state != 'declared':
+                return component.ready
+            component.state = 'loading'
+            start = time.perf_counter()
+            try:
+                component_app = self.app_factory(name)
+                loaded = component.loader(component_app, _ComponentSocketIO(self.socketio, component))
+                component.app = component_app
+                component.state = 'ready' if loaded is not False else 'failed'
+                if not component.ready:
+                    component.error = 'loader reported failure'
+            except Exception as e:
+                component.state = 'failed'
+                component.error = str(e)
+                logger.error(f"❌ Failed to load {name}: {e}")
+            component.load_seconds = time.perf_counter() - start
+            component.loaded_by = trigger
+        if component.ready:
+            logger.info(f"✅ {name} loaded in {component.load_seconds:.2f}s ({trigger})")
+        return component.ready
+
+    def is_available(self, name: str) -> bool:
+        """Not known to be broken: ready, or declared and not yet tried"""
+        component = self.components.get(name)
+        return component is not None and component.state in ('declared', 'loading', 'ready')
+
+    def is_ready(self, name: str) -> bool:
+        component = self.components.get(name)
+        return component is not None and component.ready
+
+    def load_all(self, max_workers: int = 1) -> None:
+        """Load every declared component now (eager mode, warm-up, profiling)"""
+        names = [name for name, c in self.components.items() if c.state == 'declared']
+        if max_workers <= 1:
+            for name in names:
+                self.ensure_loaded(name, trigger='warm-up')
+            return
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='component-warm-up') as pool:
+            list(pool.map(lambda n: self.ensure_loaded(n, trigger='warm-up'), names))
+
+    def warm_up(self, max_workers: int = 1) -> threading.Thread:
+        """Load remaining components on a background thread; requests still load on demand"""
+        if self._warm_up_thread is None:
+            self._warm_up_thread = threading.Thread(
+                target=self.load_all, kwargs={'max_workers': max_workers},
+                name='component-warm-up', daemon=True)
+            self._warm_up_thread.start()
+        return self._warm_up_thread
+
+    def _component_for(self, path: str) -> Optional[LazyComponent]:
+        best, best_length = None, -1
+        for component in self.components.values():
+            for prefix in component.prefixes:
+                if len(prefix) > best_length and (path == prefix or path.startswith(prefix + '/')):
+                    best, best_length = component, len(prefix)
+        return best
+
+    def wsgi_middleware(self, wsgi_app: Callable) -> Callable:
+        """Route requests under a component's prefixes to that component's app"""
+
+        def dispatch(environ, start_response):
+            component = self._component_for(environ.get('PATH_INFO', ''))
+            if component is None or component.state == 'disabled':
+                return wsgi_app(environ, start_response)
+            if not self.ensure_loaded(component.name):
+                response = Response(
+                    json.dumps({'success': False, 'error': f"{component.name} is unavailable",
+                                'detail': component.error}),
+                    status=503, mimetype='application/json')
+                return response(environ, start_response)
+            return component.app(environ, start_response)
+
+        return dispatch
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                'state': c.state,
+                'description': c.description,
+                'prefixes': list(c.prefixes),
+                'socket_events': list(c.socket_events),
+                'job_kinds': list(c.job_kinds),
+                'load_seconds': round(c.load_seconds, 3) if c.load_seconds is not None else None,
+                'loaded_by': c.loaded_by,
+                'error': c.error
+            }
+            for name, c in self.components.items()
+        }
@@ -0,0 +1,90 @@
+"""
+Startup profiler for Podplay Sanctuary (python app.py --profile-startup)
+Times every module import made through the import statement (self time
+excludes nested imports) plus named startup phases, and prints a
+breakdown by top-level package so the heavy SDKs stand out.
+"""
+
+import sys
+import time
+import builtins
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+
+class ImportProfiler:
+    """Wraps builtins.__import__ while active; only first-time imports are timed"""
+
+    def __init__(self):
+        self.self_time: Dict[str, float] = defaultdict(float)
+        self.cumulative: Dict[str, float] = {}
+        self.phases: List[Tuple[str, float]] = []
+        self._local = threading.local()
+        self._original_import = None
+        self._phase_start = None
+
+    def start(self) -> None:
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._timed_import
+        self._phase_start = time.perf_counter()
+
+    def stop(self) -> None:
+        if self._original_import is not None:
+            builtins.__import__ = self._original_import
+            self._original_import = None
+
+    def mark(self, phase: str) -> None:
+        """Close the current phase (time since the previous mark) under `phase`"""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._phase_start))
+        self._phase_start = now
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        original = self._original_import
+        if level == 0 and name in sys.modules and not fromlist:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        before = len(sys.modules)
+        stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            if len(sys.modules) != before:
+                if level:
+                    package = (globals or {}).get('__package__') or ''
+                    name = f"{package.rsplit('.', level - 1)[0]}.{name}" if name else package
+                self.self_time[name] += elapsed - nested
+                self.cumulative[name] = max(self.cumulative.get(name, 0.0), elapsed)
+
+    def report(self, top: int = 25) -> str:
+        by_package: Dict[str, float] = defaultdict(float)
+        for module, seconds in self.self_time.items():
+            by_package[module.split('.')[0]] += seconds
+
+        lines = ["", "🐻 Podplay Sanctuary startup profile", ""]
+        if self.phases:
+            lines.append("Phases:")
+            total = sum(seconds for _, seconds in self.phases)
+            for phase, seconds in self.phases:
+                lines.append(f"  {phase:<48} {seconds * 1000:>9.1f} ms")
+            lines.append(f"  {'total':<48} {total * 1000:>9.1f} ms")
+            lines.append("")
+
+        lines.append(f"Import self time by top-level package (top {top}):")
+        for package, seconds in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:top]:
+            lines.append(f"  {package:<48} {seconds * 1000:>9.1f} ms")
+        lines.append("")
+
+        lines.append(f"Slowest imports, including nested imports (top {top}):")
+        for module, seconds in sorted(self.cumulative.items(), key=lambda item: item[1], reverse=True)[:top]:
+            lines.append(f"  {module:<48} {seconds * 1000:>9.1f} ms")
+        return "\n".join(lines)
@@ -1,11 +1,23 @@
 """
 Windows-compatible logging utilities for Podplay Sanctuary
 Handles Unicode emoji characters gracefully on Windows systems
+
+Records are handed to a background writer through a QueueHandler /
+QueueListener pair, so request threads only pay for building the record;
+formatting, emoji fallback and file/console I/O happen on the listener
+thread. Set LOG_FORMAT=json for one JSON object per line, or
+LOG_ASYNC=false to write synchronously (e.g. while debugging a crash).
 """
 
+import atexit
+import json
 import logging
+import logging.handlers
+import queue
+import re
 import sys
 import os
+from datetime import datetime
 
 
 class WindowsCompatibleFormatter(logging.Formatter):
@@ -75,29 +87,118 @@ class WindowsCompatibleFormatter(logging.Formatter):
         '🎻': '[VIOLIN]'
     }
     
+    # One pass over the string: visit each non-ASCII character (plus an
+    # optional variation selector, as in '🏛️') and look it up, instead of
+    # one str.replace scan per table entry
+    NON_ASCII_PATTERN = re.compile('[^\x00-\x7f]\ufe0f?')
+    
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.use_emoji_fallback = sys.platform.startswith('win')
     
+    @classmethod
+    def replace_emojis(cls, text: str) -> str:
+        """Replace known emojis with their ASCII fallbacks"""
+        if text.isascii():
+            return text
+        return cls.NON_ASCII_PATTERN.sub(cls._emoji_fallback, text)
+    
+    @classmethod
+    def _emoji_fallback(cls, match) -> str:
+        found = match.group()
+        fallback = cls.EMOJI_FALLBACKS.get(found)
+        if fallback is not None:
+            return fallback
+        # Bare base character, or a selector the table doesn't list
+        return cls.EMOJI_FALLBACKS.get(found[0], found[0]) + found[1:]
+    
     def format(self, record):
         # Get the formatted message
         formatted = super().format(record)
         
         # Replace emojis with ASCII fallbacks on Windows if needed
         if self.use_emoji_fallback:
-            for emoji, fallback in self.EMOJI_FALLBACKS.items():
-                formatted = formatted.replace(emoji, fallback)
+            formatted = self.replace_emojis(formatted)
+        
+        return formatted
+
+
+class JsonLogFormatter(WindowsCompatibleFormatter):
+    """One JSON object per record; `extra={...}` fields are included as keys"""
+    
+    # Attributes every LogRecord has; anything else came from `extra`
+    RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+    
+    def format(self, record):
+        entry = {
+            'timestamp': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'thread': record.threadName
+        }
+        for key, value in record.__dict__.items():
+            if key not in self.RESERVED_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
         
+        formatted = json.dumps(entry, ensure_ascii=False, default=str)
+        if self.use_emoji_fallback:
+            formatted = self.replace_emojis(formatted)
         return formatted
 
 
+class DeferredFormattingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that only merges the message args in the calling thread.
+    The stock prepare() runs the full formatter there and folds the
+    traceback into the message; this keeps exc_text separate so the
+    listener's formatter (text or JSON) lays it out itself.
+    """
+    
+    def prepare(self, record):
+        # Other handlers may still see the original record; a __dict__ copy
+        # is several times cheaper than copy.copy()
+        original = record
+        record = original.__class__.__new__(original.__class__)
+        record.__dict__.update(original.__dict__)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+_queue_listener = None
+
+
+def _stop_queue_listener():
+    global _queue_listener
+    if _queue_listener is not None:
+        # Drains the queue before returning, so nothing logged at shutdown is lost
+        _queue_listener.stop()
+        _queue_listener = None
+
+
 def setup_windows_compatible_logging():
     """Set up logging that works properly on Windows with Unicode characters"""
+    global _queue_listener
     
     # Create custom formatter
-    formatter = WindowsCompatibleFormatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    if os.getenv('LOG_FORMAT', 'text').lower() == 'json':
+        formatter = JsonLogFormatter()
+    else:
+        formatter = WindowsCompatibleFormatter(
+            '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+        )
     
     # File handler with UTF-8 encoding
     file_handler = logging.FileHandler(
@@ -127,14 +228,30 @@ def setup_windows_compatible_logging():
     
     # Configure root logger
     root_logger = logging.getLogger()
+    for handler in root_logger.handlers:
+        handler.close()
     root_logger.handlers.clear()  # Clear any existing handlers
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
+    _stop_queue_listener()
+    
+    if os.getenv('LOG_ASYNC', 'true').lower() == 'true':
+        # Request threads enqueue; one listener thread formats and writes
+        log_queue = queue.SimpleQueue()
+        _queue_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        _queue_listener.start()
+        root_logger.addHandler(DeferredFormattingQueueHandler(log_queue))
+    else:
+        root_logger.addHandler(file_handler)
+        root_logger.addHandler(console_handler)
     root_logger.setLevel(getattr(logging, os.getenv('LOG_LEVEL', 'INFO')))
     
     return root_logger
 
 
+atexit.register(_stop_queue_listener)
+
+
 def get_windows_compatible_logger(name):
     """Get a logger that works properly on Windows"""
     return logging.getLogger(name)
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+🧪 Fake Provider Server
+Local stand-in for the OpenAI, Anthropic and Gemini HTTP APIs so the backend
+can be load tested without spending real quota. Latency follows a lognormal
+distribution per provider (set by median and p99), a configurable share of
+requests gets a provider-shaped 429, and streaming endpoints emit chunks with
+a realistic time-to-first-token.
+
+Also serves a small linked site under /site/<n> as a scrape target.
+
+Point the backend at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8089/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8089
+    GEMINI_API_ENDPOINT=http://127.0.0.1:8089
+"""
+
+import re
+import json
+import math
+import time
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Tuple
+
+# z-score of the 99th percentile of a standard normal
+Z_99 = 2.3263
+
+DEFAULT_PROFILES = "openai=700:3000,anthropic=900:3500,gemini=450:2000"
+
+LOREM = ("Mama Bear here with a calm, structured answer. Start with the smallest working "
+         "step, verify it, then build on it. Here is the plan, the trade-offs and the next "
+         "action you can take right now without any surprises.").split()
+
+GEMINI_PATH = re.compile(r"^/v1(?:beta)?/models/([^:/]+):(generateContent|streamGenerateContent)$")
+
+
+class LatencyModel:
+    """Lognormal latency from (median, p99) in milliseconds"""
+
+    def __init__(self, median_ms: float, p99_ms: float):
+        self.median_ms = median_ms
+        self.sigma = math.log(max(p99_ms, median_ms + 1) / median_ms) / Z_99
+
+    def sample_ms(self, rng: random.Random) -> float:
+        return self.median_ms * math.exp(self.sigma * rng.gauss(0.0, 1.0))
+
+
+def parse_profiles(spec: str) -> Dict[str, LatencyModel]:
+    profiles = {}
+    for item in spec.split(','):
+        provider, _, numbers = item.partition('=')
+        median, _, p99 = numbers.partition(':')
+        profiles[provider.strip()] = LatencyModel(float(median), float(p99 or median))
+    return profiles
+
+
+class FakeProviderState:
+    """Shared configuration and counters for all handler threads"""
+
+    def __init__(self, args: argparse.Namespace):
+        self.profiles = parse_profiles(args.profiles)
+        self.rate_limit_ratio = args.rate_limit_ratio
+        self.error_ratio = args.error_ratio
+        self.time_scale = args.time_scale
+        self.stream_chunks = args.stream_chunks
+        self.rng = random.Random(args.seed)
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def draw(self, provider: str) -> Tuple[str, float]:
+        """Decide the outcome ('ok', 'rate_limited', 'error') and total latency in seconds"""
+        with self.lock:
+            roll = self.rng.random()
+            latency_ms = self.profiles[provider].sample_ms(self.rng)
+        if roll < self.rate_limit_ratio:
+            # Throttling is answered fast, as real providers do
+            return 'rate_limited', min(latency_ms, 50) / 1000 * self.time_scale
+        if roll < self.rate_limit_ratio + self.error_ratio:
+            return 'error', latency_ms / 1000 * self.time_scale
+        return 'ok', latency_ms / 1000 * self.time_scale
+
+    def count(self, route: str, outcome: str) -> None:
+        with self.lock:
+            entry = self.counters.setdefault(route, {'requests': 0, 'ok': 0, 'rate_limited': 0, 'error': 0})
+            entry['requests'] += 1
+            entry[outcome] += 1
+
+
+def answer_text(words: int) -> str:
+    return ' '.join(LOREM[i % len(LOREM)] for i in range(words))
+
+
+class FakeProviderHandler(BaseHTTPRequestHandler):
+    server_version = "FakeProvider/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self) -> FakeProviderState:
+        return self.server.state
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- plumbing -------------------------------------------------------------
+
+    def _read_json(self) -> Dict[str, Any]:
+        length = int(self.headers.get('Content-Length') or 0)
+        if not length:
+            return {}
+        try:
+            return json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError:
+            return {}
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self) -> None:
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Cache-Control', 'no-cache')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+    def _send_event(self, data: Any, event: str = None) -> None:
+        chunk = f"event: {event}\n" if event else ""
+        chunk += f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n"
+        self.wfile.write(chunk.encode('utf-8'))
+        self.wfile.flush()
+
+    def _stream_schedule(self, latency: float):
+        """Yield (delay, text) pairs: ~40% of latency to first token, the rest spread out"""
+        chunks = max(1, self.state.stream_chunks)
+        first = latency * 0.4
+        rest = (latency - first) / chunks
+        words = answer_text(chunks * 6).split()
+        for i in range(chunks):
+            yield (first if i == 0 else rest), ' '.join(words[i * 6:(i + 1) * 6]) + ' '
+
+    def _refuse(self, provider: str, route: str, outcome: str, latency: float) -> bool:
+        """Send a 429/500 in the provider's error shape; returns True if refused"""
+        if outcome == 'ok':
+            return False
+        time.sleep(latency)
+        self.state.count(route, outcome)
+        status = 429 if outcome == 'rate_limited' else 500
+        message = "Rate limit exceeded (fake provider)" if status == 429 else "Internal error (fake provider)"
+        if provider == 'openai':
+            payload = {"error": {"message": message, "type": "rate_limit_error" if status == 429 else "server_error"}}
+        elif provider == 'anthropic':
+            payload = {"type": "error",
+                       "error": {"type": "rate_limit_error" if status == 429 else "api_error", "message": message}}
+        else:
+            payload = {"error": {"code": status, "message": message,
+                                 "status": "RESOURCE_EXHAUSTED" if status == 429 else "INTERNAL"}}
+        self._send_json(status, payload, {'Retry-After': '1'} if status == 429 else None)
+        return True
+
+    # -- routing --------------------------------------------------------------
+
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path == '/__stats':
+            with self.state.lock:
+                return self._send_json(200, {'routes': self.state.counters})
+        if path.startswith('/site/'):
+            return self._site_page(path)
+        if re.match(r"^/v1(beta)?/models$", path):
+            return self._send_json(200, {"models": [{"name": f"models/{m}"} for m in
+                                                    ("gemini-2.5-flash", "gemini-2.5-pro", "gemini-2.0-flash")]})
+        self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    def do_POST(self):
+        path, _, query = self.path.partition('?')
+        body = self._read_json()
+        if path == '/v1/chat/completions':
+            return self._openai(body)
+        if path == '/v1/messages':
+            return self._anthropic(body)
+        match = GEMINI_PATH.match(path)
+        if match:
+            return self._gemini(match.group(1), match.group(2) == 'streamGenerateContent', body)
+        self._send_json(404, {"error": {"message": f"Unknown path {path}"}})
+
+    # -- providers ------------------------------------------------------------
+
+    def _openai(self, body: Dict[str, Any]) -> None:
+        route = 'openai.chat.completions'
+        outcome, latency = self.state.draw('openai')
+        if self._refuse('openai', route, outcome, latency):
+            return
+        model = body.get('model', 'gpt-4o')
+        created = int(time.time())
+
+        if body.get('stream'):
+            self._start_stream()
+            for delay, text in self._stream_schedule(latency):
+                time.sleep(delay)
+                self._send_event({"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                                  "model": model,
+                                  "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]})
+            self._send_event({"id": "chatcmpl-fake", "object": "chat.completion.chunk", "created": created,
+                              "model": model, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+            self._send_event("[DONE]")
+        else:
+            time.sleep(latency)
+            self._send_json(200, {
+                "id": "chatcmpl-fake", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": answer_text(48)},
+                             "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": 120, "completion_tokens": 64, "total_tokens": 184}
+            })
+        self.state.count(route, 'ok')
+
+    def _anthropic(self, body: Dict[str, Any]) -> None:
+        route = 'anthropic.messages'
+        outcome, latency = self.state.draw('anthropic')
+        if self._refuse('anthropic', route, outcome, latency):
+            return
+        model = body.get('model', 'claude-3-5-sonnet-latest')
+        message = {"id": "msg_fake", "type": "message", "role": "assistant", "model": model,
+                   "content": [], "stop_reason": None, "stop_sequence": None,
+                   "usage": {"input_tokens": 120, "output_tokens": 1}}
+
+        if body.get('stream'):
+            self._start_stream()
+            self._send_event({"type": "message_start", "message": message}, "message_start")
+            self._send_event({"type": "content_block_start", "index": 0,
+                              "content_block": {"type": "text", "text": ""}}, "content_block_start")
+            for delay, text in self._stream_schedule(latency):
+                time.sleep(delay)
+                self._send_event({"type": "content_block_delta", "index": 0,
+                                  "delta": {"type": "text_delta", "text": text}}, "content_block_delta")
+            self._send_event({"type": "content_block_stop", "index": 0}, "content_block_stop")
+            self._send_event({"type": "message_delta", "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                              "usage": {"output_tokens": 64}}, "message_delta")
+            self._send_event({"type": "message_stop"}, "message_stop")
+        else:
+            time.sleep(latency)
+            message.update(content=[{"type": "text", "text": answer_text(48)}], stop_reason="end_turn",
+                           usage={"input_tokens": 120, "output_tokens": 64})
+            self._send_json(200, message)
+        self.state.count(route, 'ok')
+
+    def _gemini(self, model: str, stream: bool, body: Dict[str, Any]) -> None:
+        route = 'gemini.streamGenerateContent' if stream else 'gemini.generateContent'
+        outcome, latency = self.state.draw('gemini')
+        if self._refuse('gemini', route, outcome, latency):
+            return
+
+        def candidate(text: str, finished: bool) -> Dict[str, Any]:
+            payload = {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"},
+                                       "index": 0}],
+                       "modelVersion": model}
+            if finished:
+                payload["candidates"][0]["finishReason"] = "STOP"
+                payload["usageMetadata"] = {"promptTokenCount": 120, "candidatesTokenCount": 64,
+                                            "totalTokenCount": 184}
+            return payload
+
+        if stream:
+            self._start_stream()
+            schedule = list(self._stream_schedule(latency))
+            for i, (delay, text) in enumerate(schedule):
+                time.sleep(delay)
+                self._send_event(candidate(text, i == len(schedule) - 1))
+        else:
+            time.sleep(latency)
+            self._send_json(200, candidate(answer_text(48), True))
+        self.state.count(route, 'ok')
+
+    # -- scrape target --------------------------------------------------------
+
+    def _site_page(self, path: str) -> None:
+        try:
+            page = int(path.rsplit('/', 1)[-1] or 0)
+        except ValueError:
+            page = 0
+        links = ''.join(f'<a href="/site/{child}">Page {child}</a>\n'
+                        for child in (page * 3 + 1, page * 3 + 2, page * 3 + 3) if child < 40)
+        html = (f"<html><head><title>Sanctuary test page {page}</title></head><body>"
+                f"<h1>Test page {page}</h1><p>{answer_text(80)}</p>{links}</body></html>").encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(html)))
+        self.end_headers()
+        self.wfile.write(html)
+        self.state.count('site', 'ok')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake OpenAI/Anthropic/Gemini server for load testing")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--profiles', default=DEFAULT_PROFILES,
+                        help="provider=median_ms:p99_ms, comma separated")
+    parser.add_argument('--rate-limit-ratio', type=float, default=0.02, help="Share of requests answered with 429")
+    parser.add_argument('--error-ratio', type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument('--time-scale', type=float, default=1.0, help="Multiply all latencies (0.1 = 10x faster)")
+    parser.add_argument('--stream-chunks', type=int, default=8, help="Chunks per streamed answer")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer((args.host, args.port), FakeProviderHandler)
+    server.daemon_threads = True
+    server.state = FakeProviderState(args)
+    print(f"🧪 Fake provider server on http://{args.host}:{args.port} "
+          f"(429 ratio {args.rate_limit_ratio:.0%}, time scale {args.time_scale:g})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
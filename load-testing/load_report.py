@@ -0,0 +1,86 @@
+"""
+📊 Load Report
+Shared result format for locustfile.py and simple_load_test.py: per-endpoint
+p50/p95/p99 latency, throughput and failure ratio, written as JSON and
+compared against a saved baseline to catch regressions before deploy.
+"""
+
+import os
+import json
+import math
+from typing import Dict, Any, List, Optional
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(fraction * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def endpoint_summary(latencies_ms: List[float], failures: int, duration_s: float) -> Dict[str, Any]:
+    values = sorted(latencies_ms)
+    requests = len(values)
+    return {
+        'requests': requests,
+        'failures': failures,
+        'failure_ratio': round(failures / requests, 4) if requests else 0.0,
+        'rps': round(requests / duration_s, 2) if duration_s > 0 else 0.0,
+        'p50_ms': round(percentile(values, 0.50), 1),
+        'p95_ms': round(percentile(values, 0.95), 1),
+        'p99_ms': round(percentile(values, 0.99), 1),
+        'max_ms': round(values[-1], 1) if values else 0.0
+    }
+
+
+def print_report(endpoints: Dict[str, Dict[str, Any]], title: str = "Load test results") -> None:
+    print(f"\n📊 {title}")
+    print(f"  {'endpoint':<48} {'reqs':>7} {'fail%':>6} {'rps':>7} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for name in sorted(endpoints):
+        e = endpoints[name]
+        print(f"  {name:<48} {e['requests']:>7} {e['failure_ratio'] * 100:>5.1f}% {e['rps']:>7.2f} "
+              f"{e['p50_ms']:>7.0f}ms {e['p95_ms']:>6.0f}ms {e['p99_ms']:>6.0f}ms")
+
+
+def write_results(path: str, endpoints: Dict[str, Dict[str, Any]], meta: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'meta': meta, 'endpoints': endpoints}, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def check_regressions(endpoints: Dict[str, Dict[str, Any]],
+                      baseline_path: Optional[str],
+                      tolerance: float = 0.2,
+                      max_failure_ratio: float = 0.05,
+                      min_requests: int = 20) -> List[str]:
+    """
+    Problems found against the baseline: p95/p99 more than `tolerance`
+    slower, or a failure ratio above `max_failure_ratio`. Endpoints with too
+    few samples for stable tail percentiles are skipped.
+    """
+    problems = []
+    for name, e in endpoints.items():
+        if e['requests'] >= min_requests and e['failure_ratio'] > max_failure_ratio:
+            problems.append(f"{name}: failure ratio {e['failure_ratio']:.1%} > {max_failure_ratio:.1%}")
+
+    if not baseline_path or not os.path.exists(baseline_path):
+        return problems
+
+    with open(baseline_path) as f:
+        baseline = json.load(f).get('endpoints', {})
+
+    for name, e in endpoints.items():
+        base = baseline.get(name)
+        if not base or e['requests'] < min_requests:
+            continue
+        for key in ('p95_ms', 'p99_ms'):
+            limit = base[key] * (1 + tolerance)
+            if base[key] and e[key] > limit:
+                problems.append(f"{name}: {key} {e[key]:.0f}ms > baseline {base[key]:.0f}ms "
+                                f"+{tolerance:.0%}")
+    return problems
@@ -0,0 +1,151 @@
+"""
+🐻 Podplay Sanctuary - Locust load suite
+
+Scenarios (select with --tags): chat (POST /api/chat/stream), orchestra
+(Gemini orchestra Mama Bear chat), express (Vertex Express chat), memory
+(context read/write) and scrape (start + status polling).
+
+Run against a backend wired to fake_provider_server.py so no real quota is
+spent - scripts/performance-test.sh does the wiring. At the end of a run the
+per-endpoint p50/p95/p99 and throughput are printed and written to
+LOAD_RESULTS_FILE; if LOAD_BASELINE_FILE exists, p95/p99 regressions beyond
+LOAD_REGRESSION_TOLERANCE make locust exit non-zero.
+"""
+
+import os
+import json
+import time
+import uuid
+
+from locust import HttpUser, between, events, tag, task
+
+from load_report import print_report, write_results, check_regressions
+from scenarios import (
+    WEIGHTS, new_user_id, chat_stream_payload, orchestra_chat_payload,
+    express_chat_payload, memory_write_payload, scrape_start_payload
+)
+
+RESULTS_FILE = os.getenv('LOAD_RESULTS_FILE', os.path.join(os.path.dirname(__file__), 'results', 'latest.json'))
+BASELINE_FILE = os.getenv('LOAD_BASELINE_FILE', os.path.join(os.path.dirname(__file__), 'results', 'baseline.json'))
+REGRESSION_TOLERANCE = float(os.getenv('LOAD_REGRESSION_TOLERANCE', '0.2'))
+MAX_FAILURE_RATIO = float(os.getenv('LOAD_MAX_FAILURE_RATIO', '0.05'))
+SCRAPE_MAX_POLLS = int(os.getenv('LOAD_SCRAPE_MAX_POLLS', '10'))
+
+
+class SanctuaryUser(HttpUser):
+    """One frontend session mixing chat, memory and scrape traffic"""
+
+    wait_time = between(0.5, 2.0)
+
+    def on_start(self):
+        self.user_id = new_user_id()
+        self.session_id = str(uuid.uuid4())
+
+    @tag('chat')
+    @task(WEIGHTS['chat_stream'])
+    def chat_stream(self):
+        """SSE chat: records total time plus a separate time-to-first-chunk entry"""
+        start = time.perf_counter()
+        first_chunk_ms = None
+        with self.client.post('/api/chat/stream', json=chat_stream_payload(self.user_id, self.session_id),
+                              stream=True, catch_response=True, name='/api/chat/stream') as response:
+            if response.status_code != 200:
+                response.failure(f"HTTP {response.status_code}")
+                return
+            finished = False
+            for line in response.iter_lines():
+                if not line or not line.startswith(b'data: '):
+                    continue
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - start) * 1000
+                data = json.loads(line[6:])
+                if data.get('error'):
+                    response.failure(data['error'])
+                    return
+                if data.get('finished'):
+                    finished = True
+            if not finished:
+                response.failure("stream ended without a completion event")
+                return
+            response.success()
+
+        if first_chunk_ms is not None:
+            events.request.fire(request_type='SSE', name='/api/chat/stream [first chunk]',
+                                response_time=first_chunk_ms, response_length=0,
+                                exception=None, context={})
+
+    @tag('orchestra')
+    @task(WEIGHTS['orchestra_chat'])
+    def orchestra_chat(self):
+        with self.client.post('/api/orchestra/mama-bear/chat', json=orchestra_chat_payload(self.user_id),
+                              catch_response=True, name='/api/orchestra/mama-bear/chat') as response:
+            if response.status_code != 200 or not response.json().get('success'):
+                response.failure(f"HTTP {response.status_code}")
+
+    @tag('express')
+    @task(WEIGHTS['express_chat'])
+    def express_chat(self):
+        with self.client.post('/api/vertex-express/chat', json=express_chat_payload(self.user_id),
+                              catch_response=True, name='/api/vertex-express/chat') as response:
+            if response.status_code != 200 or not response.json().get('success'):
+                response.failure(f"HTTP {response.status_code}")
+
+    @tag('memory')
+    @task(WEIGHTS['memory_write'])
+    def memory_write(self):
+        self.client.post('/api/memory/context', json=memory_write_payload(self.user_id, self.session_id),
+                         name='/api/memory/context [write]')
+
+    @tag('memory')
+    @task(WEIGHTS['memory_read'])
+    def memory_read(self):
+        self.client.get('/api/memory/context',
+                        params={'user_id': self.user_id, 'session_id': self.session_id},
+                        name='/api/memory/context [read]')
+
+    @tag('scrape')
+    @task(WEIGHTS['scrape'])
+    def scrape(self):
+        scrape_id = str(uuid.uuid4())
+        response = self.client.post('/api/scrape/start', json=scrape_start_payload(scrape_id),
+                                    name='/api/scrape/start')
+        if response.status_code != 200:
+            return
+        for _ in range(SCRAPE_MAX_POLLS):
+            time.sleep(0.5)
+            status = self.client.get(f'/api/scrape/status/{scrape_id}', name='/api/scrape/status/[id]')
+            if status.status_code != 200 or status.json().get('session', {}).get('status') in ('completed', 'error'):
+                break
+
+
+@events.quitting.add_listener
+def report_percentiles(environment, **kwargs):
+    stats = environment.stats
+    duration = max(1e-6, stats.last_request_timestamp - stats.start_time) if stats.last_request_timestamp else 0
+
+    endpoints = {}
+    for entry in stats.entries.values():
+        endpoints[f"{entry.method} {entry.name}"] = {
+            'requests': entry.num_requests,
+            'failures': entry.num_failures,
+            'failure_ratio': round(entry.fail_ratio, 4),
+            'rps': round(entry.num_requests / duration, 2) if duration else 0.0,
+            'p50_ms': entry.get_response_time_percentile(0.50),
+            'p95_ms': entry.get_response_time_percentile(0.95),
+            'p99_ms': entry.get_response_time_percentile(0.99),
+            'max_ms': entry.max_response_time or 0.0
+        }
+
+    print_report(endpoints, "Locust results")
+    write_results(RESULTS_FILE, endpoints, {
+        'driver': 'locust',
+        'host': environment.host,
+        'users': environment.runner.user_count if environment.runner else None,
+        'duration_s': round(duration, 1)
+    })
+
+    problems = check_regressions(endpoints, BASELINE_FILE, REGRESSION_TOLERANCE, MAX_FAILURE_RATIO)
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    if problems:
+        environment.process_exit_code = 1
@@ -0,0 +1,90 @@
+"""
+🎯 Load Scenarios
+Request payloads shared by locustfile.py and simple_load_test.py so both
+drivers exercise the backend the same way.
+"""
+
+import os
+import random
+import uuid
+from typing import Dict, Any
+
+# Scrape sessions crawl the fake provider server's /site pages, never the internet
+FAKE_PROVIDER_URL = os.getenv('LOAD_FAKE_PROVIDER_URL', 'http://127.0.0.1:8089')
+
+# Relative task weights: chat traffic dominates, scrapes are rare
+WEIGHTS = {
+    'chat_stream': 6,
+    'orchestra_chat': 4,
+    'express_chat': 3,
+    'memory_write': 2,
+    'memory_read': 4,
+    'scrape': 1
+}
+
+STREAM_MODELS = ['gemini-2.0-flash-exp', 'gemini-1.5-flash-latest']
+
+PROMPTS = [
+    "Help me plan a small refactor of my Flask routes.",
+    "Explain what a race condition is, gently and with an example.",
+    "Summarize the trade-offs between SQLite and Postgres for a side project.",
+    "I'm overwhelmed - what is one small next step for this bug?",
+    "Write a Python function that deduplicates a list while keeping order."
+]
+
+VARIANTS = ['scout_commander', 'research_specialist', 'code_review_bear', 'creative_bear']
+
+
+def new_user_id() -> str:
+    return f"load-{uuid.uuid4().hex[:10]}"
+
+
+def chat_stream_payload(user_id: str, session_id: str, turns: int = 4) -> Dict[str, Any]:
+    messages = []
+    for i in range(turns):
+        messages.append({'role': 'user', 'content': random.choice(PROMPTS)})
+        if i < turns - 1:
+            messages.append({'role': 'assistant', 'content': "Here's a calm, structured answer. " * 6})
+    return {
+        'model': random.choice(STREAM_MODELS),
+        'messages': messages,
+        'user_id': user_id,
+        'session_id': session_id
+    }
+
+
+def orchestra_chat_payload(user_id: str) -> Dict[str, Any]:
+    return {
+        'message': random.choice(PROMPTS),
+        'variant': random.choice(VARIANTS),
+        'user_id': user_id,
+        'context': {}
+    }
+
+
+def express_chat_payload(user_id: str) -> Dict[str, Any]:
+    return {
+        'message': random.choice(PROMPTS),
+        'user_id': user_id,
+        'speed_tier': random.choice(['ultra_fast', 'fast', 'standard']),
+        'variant': random.choice(VARIANTS)
+    }
+
+
+def memory_write_payload(user_id: str, session_id: str) -> Dict[str, Any]:
+    return {
+        'user_id': user_id,
+        'session_id': session_id,
+        'context': {
+            'messages': [{'role': 'user', 'content': random.choice(PROMPTS)}],
+            'preferences': {'theme': random.choice(['sky', 'neon', 'stellar'])}
+        }
+    }
+
+
+def scrape_start_payload(session_id: str) -> Dict[str, Any]:
+    return {
+        'url': f"{FAKE_PROVIDER_URL}/site/0",
+        'max_depth': 1,
+        'session_id': session_id
+    }
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+🐻 Podplay Sanctuary - Simple load test
+
+Dependency-free driver (stdlib only) running the same scenarios as
+locustfile.py with a fixed number of concurrent users for a fixed duration.
+Useful in CI or anywhere Locust isn't installed. Prints p50/p95/p99 and
+throughput per endpoint, writes them as JSON and exits non-zero on
+regressions against a baseline.
+
+    python simple_load_test.py --host http://localhost:5001 --users 10 --duration 60
+    python simple_load_test.py --scenarios chat_stream memory_read --save-baseline
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import random
+import argparse
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+from load_report import endpoint_summary, print_report, write_results, check_regressions
+from scenarios import (
+    WEIGHTS, new_user_id, chat_stream_payload, orchestra_chat_payload,
+    express_chat_payload, memory_write_payload, scrape_start_payload
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class Recorder:
+    """Thread-safe per-endpoint latency and failure samples"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.failures: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def record(self, name: str, latency_ms: float, ok: bool) -> None:
+        with self._lock:
+            self.latencies[name].append(latency_ms)
+            if not ok:
+                self.failures[name] += 1
+
+    def summary(self, duration_s: float) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: endpoint_summary(values, self.failures[name], duration_s)
+                for name, values in self.latencies.items()
+            }
+
+
+class SimpleUser:
+    """One simulated frontend session"""
+
+    def __init__(self, host: str, recorder: Recorder, timeout: float):
+        self.host = host.rstrip('/')
+        self.recorder = recorder
+        self.timeout = timeout
+        self.user_id = new_user_id()
+        self.session_id = str(uuid.uuid4())
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+                 params: Optional[Dict[str, str]] = None) -> Tuple[int, Any]:
+        url = f"{self.host}{path}"
+        if params:
+            url += '?' + urllib.parse.urlencode(params)
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(url, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            return 0, urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            return e.code, None
+        except (urllib.error.URLError, OSError) as e:
+            return -1, str(e)
+
+    def _json_call(self, name: str, method: str, path: str, payload=None, params=None,
+                   require_success: bool = False) -> Optional[Dict[str, Any]]:
+        start = time.perf_counter()
+        error, response = self._request(method, path, payload, params)
+        body = None
+        ok = error == 0
+        if ok:
+            with response:
+                try:
+                    body = json.loads(response.read() or b'{}')
+                except json.JSONDecodeError:
+                    ok = False
+            ok = ok and response.status == 200 and (not require_success or bool(body.get('success')))
+        self.recorder.record(name, (time.perf_counter() - start) * 1000, ok)
+        return body if ok else None
+
+    # -- scenarios ------------------------------------------------------------
+
+    def chat_stream(self) -> None:
+        name = 'POST /api/chat/stream'
+        start = time.perf_counter()
+        error, response = self._request('POST', '/api/chat/stream',
+                                        chat_stream_payload(self.user_id, self.session_id))
+        if error:
+            self.recorder.record(name, (time.perf_counter() - start) * 1000, False)
+            return
+
+        first_chunk_ms = None
+        finished = False
+        ok = True
+        with response:
+            for raw in response:
+                line = raw.strip()
+                if not line.startswith(b'data: '):
+                    continue
+                if first_chunk_ms is None:
+                    first_chunk_ms = (time.perf_counter() - start) * 1000
+                data = json.loads(line[6:])
+                if data.get('error'):
+                    ok = False
+                    break
+                finished = finished or bool(data.get('finished'))
+
+        self.recorder.record(name, (time.perf_counter() - start) * 1000, ok and finished)
+        if first_chunk_ms is not None:
+            self.recorder.record('SSE /api/chat/stream [first chunk]', first_chunk_ms, True)
+
+    def orchestra_chat(self) -> None:
+        self._json_call('POST /api/orchestra/mama-bear/chat', 'POST', '/api/orchestra/mama-bear/chat',
+                        orchestra_chat_payload(self.user_id), require_success=True)
+
+    def express_chat(self) -> None:
+        self._json_call('POST /api/vertex-express/chat', 'POST', '/api/vertex-express/chat',
+                        express_chat_payload(self.user_id), require_success=True)
+
+    def memory_write(self) -> None:
+        self._json_call('POST /api/memory/context [write]', 'POST', '/api/memory/context',
+                        memory_write_payload(self.user_id, self.session_id))
+
+    def memory_read(self) -> None:
+        self._json_call('GET /api/memory/context [read]', 'GET', '/api/memory/context',
+                        params={'user_id': self.user_id, 'session_id': self.session_id})
+
+    def scrape(self) -> None:
+        scrape_id = str(uuid.uuid4())
+        if self._json_call('POST /api/scrape/start', 'POST', '/api/scrape/start',
+                           scrape_start_payload(scrape_id)) is None:
+            return
+        for _ in range(10):
+            time.sleep(0.5)
+            body = self._json_call('GET /api/scrape/status/[id]', 'GET', f'/api/scrape/status/{scrape_id}')
+            if body is None or body.get('session', {}).get('status') in ('completed', 'error'):
+                break
+
+
+def run_user(host: str, recorder: Recorder, scenarios: List[str], deadline: float,
+             think_time: Tuple[float, float], timeout: float) -> None:
+    user = SimpleUser(host, recorder, timeout)
+    weights = [WEIGHTS[name] for name in scenarios]
+    while time.monotonic() < deadline:
+        getattr(user, random.choices(scenarios, weights)[0])()
+        time.sleep(random.uniform(*think_time))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stdlib load test for the Podplay Sanctuary backend")
+    parser.add_argument('--host', default=os.getenv('LOAD_HOST', 'http://localhost:5001'))
+    parser.add_argument('--users', type=int, default=10, help="Concurrent simulated users")
+    parser.add_argument('--duration', type=float, default=60, help="Seconds to run")
+    parser.add_argument('--ramp', type=float, default=5, help="Seconds over which users start")
+    parser.add_argument('--scenarios', nargs='+', default=list(WEIGHTS), choices=list(WEIGHTS))
+    parser.add_argument('--think-time', type=float, nargs=2, default=(0.5, 2.0), metavar=('MIN', 'MAX'))
+    parser.add_argument('--timeout', type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument('--results', default=os.getenv('LOAD_RESULTS_FILE', os.path.join(RESULTS_DIR, 'latest.json')))
+    parser.add_argument('--baseline', default=os.getenv('LOAD_BASELINE_FILE', os.path.join(RESULTS_DIR, 'baseline.json')))
+    parser.add_argument('--tolerance', type=float, default=float(os.getenv('LOAD_REGRESSION_TOLERANCE', '0.2')),
+                        help="Allowed p95/p99 slowdown against the baseline (0.2 = 20%%)")
+    parser.add_argument('--max-failure-ratio', type=float,
+                        default=float(os.getenv('LOAD_MAX_FAILURE_RATIO', '0.05')))
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    args = parser.parse_args()
+
+    recorder = Recorder()
+    print(f"🐻 {args.users} users for {args.duration:g}s against {args.host} "
+          f"({', '.join(args.scenarios)})")
+
+    start = time.monotonic()
+    deadline = start + args.duration
+    with ThreadPoolExecutor(max_workers=args.users) as pool:
+        for i in range(args.users):
+            pool.submit(run_user, args.host, recorder, args.scenarios, deadline,
+                        tuple(args.think_time), args.timeout)
+            time.sleep(args.ramp / max(args.users, 1))
+    duration = time.monotonic() - start
+
+    endpoints = recorder.summary(duration)
+    print_report(endpoints, "Simple load test results")
+    meta = {'driver': 'simple_load_test', 'host': args.host, 'users': args.users,
+            'duration_s': round(duration, 1), 'scenarios': args.scenarios}
+    write_results(args.results, endpoints, meta)
+    if args.save_baseline:
+        write_results(args.baseline, endpoints, meta)
+        print(f"💾 Baseline saved to {args.baseline}")
+        return 0
+
+    problems = check_regressions(endpoints, args.baseline, args.tolerance, args.max_failure_ratio)
+    for problem in problems:
+        print(f"  ❌ {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+#!/bin/bash
+# 🐻 Podplay Sanctuary - Backend performance test
+#
+# Starts the fake provider server, starts the backend wired to it (no real
+# API quota is spent), runs the load suite and reports p50/p95/p99 and
+# throughput per endpoint. Exits non-zero when latency regresses past the
+# baseline in load-testing/results/baseline.json.
+#
+# Usage:
+#   scripts/performance-test.sh [--users N] [--duration SECONDS] [--tags "chat memory"]
+#                               [--simple] [--save-baseline]
+#
+# Environment:
+#   BACKEND_PORT (5001), FAKE_PROVIDER_PORT (8089), FAKE_PROVIDER_ARGS
+#   (extra fake server flags, e.g. "--rate-limit-ratio 0.1 --time-scale 0.2"),
+#   LOAD_REGRESSION_TOLERANCE (0.2), LOAD_MAX_FAILURE_RATIO (0.05)
+
+set -euo pipefail
+
+ROOT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+LOAD_DIR="$ROOT_DIR/load-testing"
+RESULTS_DIR="$LOAD_DIR/results"
+
+USERS=20
+DURATION=120
+TAGS=""
+SIMPLE=false
+SAVE_BASELINE=false
+
+while [[ $# -gt 0 ]]; do
+    case "$1" in
+        --users) USERS="$2"; shift 2 ;;
+        --duration) DURATION="$2"; shift 2 ;;
+        --tags) TAGS="$2"; shift 2 ;;
+        --simple) SIMPLE=true; shift ;;
+        --save-baseline) SAVE_BASELINE=true; shift ;;
+        -h|--help) sed -n '2,17p' "$0"; exit 0 ;;
+        *) echo "Unknown option: $1"; exit 2 ;;
+    esac
+done
+
+BACKEND_PORT="${BACKEND_PORT:-5001}"
+FAKE_PROVIDER_PORT="${FAKE_PROVIDER_PORT:-8089}"
+FAKE_URL="http://127.0.0.1:$FAKE_PROVIDER_PORT"
+BACKEND_URL="http://127.0.0.1:$BACKEND_PORT"
+
+mkdir -p "$RESULTS_DIR"
+PIDS=()
+cleanup() {
+    for pid in "${PIDS[@]}"; do
+        kill "$pid" 2>/dev/null || true
+    done
+}
+trap cleanup EXIT
+
+wait_for() {
+    local url="$1" name="$2"
+    for _ in $(seq 1 60); do
+        if curl -fs -o /dev/null "$url"; then
+            echo "✅ $name is up"
+            return 0
+        fi
+        sleep 1
+    done
+    echo "❌ $name did not come up at $url"
+    exit 1
+}
+
+echo "🧪 Starting fake provider server on $FAKE_URL"
+python "$LOAD_DIR/fake_provider_server.py" --port "$FAKE_PROVIDER_PORT" ${FAKE_PROVIDER_ARGS:-} \
+    > "$RESULTS_DIR/fake_provider.log" 2>&1 &
+PIDS+=($!)
+wait_for "$FAKE_URL/__stats" "Fake provider server"
+
+echo "🐻 Starting backend on $BACKEND_URL (providers stubbed)"
+(
+    cd "$ROOT_DIR"
+    export PYTHONPATH="$ROOT_DIR:$ROOT_DIR/backend"
+    export BACKEND_PORT
+    export OPENAI_BASE_URL="$FAKE_URL/v1"
+    export ANTHROPIC_BASE_URL="$FAKE_URL"
+    export GEMINI_API_ENDPOINT="$FAKE_URL"
+    export OPENAI_API_KEY="load-test" ANTHROPIC_API_KEY="load-test"
+    export GEMINI_API_KEY_PRIMARY="load-test" GOOGLE_API_KEY="load-test"
+    export VERTEX_AI_EXPRESS_API_KEY="load-test"
+    export GEMINI_CONTEXT_CACHE_ENABLED=false
+    exec python -m backend.app
+) > "$RESULTS_DIR/backend.log" 2>&1 &
+PIDS+=($!)
+wait_for "$BACKEND_URL/api/health" "Backend"
+
+STATUS=0
+if [[ "$SIMPLE" == false ]] && command -v locust > /dev/null; then
+    echo "🦗 Running Locust: $USERS users for ${DURATION}s ${TAGS:+(tags: $TAGS)}"
+    (
+        cd "$LOAD_DIR"
+        export LOAD_FAKE_PROVIDER_URL="$FAKE_URL"
+        [[ "$SAVE_BASELINE" == true ]] && export LOAD_RESULTS_FILE="$RESULTS_DIR/baseline.json"
+        locust --host "$BACKEND_URL" --users "$USERS" --run-time "${DURATION}s" ${TAGS:+--tags $TAGS}
+    ) || STATUS=$?
+else
+    echo "🐍 Running simple load test: $USERS users for ${DURATION}s"
+    SCENARIO_ARGS=()
+    if [[ -n "$TAGS" ]]; then
+        for tag in $TAGS; do
+            case "$tag" in
+                chat) SCENARIO_ARGS+=(chat_stream) ;;
+                orchestra) SCENARIO_ARGS+=(orchestra_chat) ;;
+                express) SCENARIO_ARGS+=(express_chat) ;;
+                memory) SCENARIO_ARGS+=(memory_write memory_read) ;;
+                scrape) SCENARIO_ARGS+=(scrape) ;;
+            esac
+        done
+    fi
+    (
+        cd "$LOAD_DIR"
+        export LOAD_FAKE_PROVIDER_URL="$FAKE_URL"
+        python simple_load_test.py --host "$BACKEND_URL" --users "$USERS" --duration "$DURATION" \
+            ${SCENARIO_ARGS[@]:+--scenarios "${SCENARIO_ARGS[@]}"} \
+            $([[ "$SAVE_BASELINE" == true ]] && echo --save-baseline)
+    ) || STATUS=$?
+fi
+
+echo "🧪 Fake provider traffic:"
+curl -fs "$FAKE_URL/__stats" | python -m json.tool || true
+echo "📁 Results in $RESULTS_DIR"
+exit $STATUS